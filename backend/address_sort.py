@@ -0,0 +1,173 @@
+"""
+Address ordering for GNDR order management (SORTING_RULES.md)
+
+Sheet rows are ordered by the supplier address in column B: 건물명 → 층 →
+호실, then 거래처명 (A) and 상품코드 (E). The upload endpoints used to
+compile the patterns on every call, skip 호실 and read "지하2층" as 2층;
+this module is the one backend implementation:
+
+- patterns are compiled once; parse_address is LRU-memoized, so the few
+  hundred distinct addresses of a day are parsed once each
+- sort keys are built once per distinct cell value, decorated onto the
+  rows as integer ranks and the row indices sorted on them (stable
+  decorate-sort-undecorate, np.lexsort)
+- text compares like the browser's localeCompare(..., 'ko-KR'):
+  spaces/punctuation, digits, 한글, 한자, then Latin (case-insensitive,
+  lowercase first on ties); blanks go last
+"""
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence, Tuple
+from functools import lru_cache
+import re
+import unicodedata
+import numpy as np
+from sheet_model import Sheet
+
+# 정렬 기본값: B열 주소, 동순위는 A열(거래처명) → E열(상품코드)
+ADDRESS_COLUMN = 1
+TIE_COLUMNS = (0, 4)
+
+_PARSE_CACHE_SIZE = 8192
+
+# 건물명: 지하/B층/N층 앞까지
+_BUILDING = re.compile(r'^([가-힣a-zA-Z\s]+?)(?=\s*(?:지하|B\s*\d|\d+층|$))')
+# 지하: "지하 3층", "지하3층", "B 3층", "B3"
+_BASEMENT = re.compile(r'(?:지하|B)\s*(\d+)')
+# 지상: "3층", "F 3층", "3F"
+_FLOOR = re.compile(r'(?:F\s*)?(\d+)(?:층|F)')
+# 호실: "101호", "호실 101", "101호실"
+_ROOM = re.compile(r'(\d+)\s*호|호실\s*(\d+)')
+
+
+class ParsedAddress(NamedTuple):
+    building: str
+    floor: int
+    room: int
+
+
+@lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def _parse(address: str) -> ParsedAddress:
+    match = _BUILDING.match(address)
+    building = match.group(1).strip() if match else address
+
+    floor = 0
+    basement = _BASEMENT.search(address)
+    if basement:
+        floor = -int(basement.group(1))
+    else:
+        above = _FLOOR.search(address)
+        if above:
+            floor = int(above.group(1))
+
+    room = 0
+    match = _ROOM.search(address)
+    if match:
+        room = int(match.group(1) or match.group(2))
+    return ParsedAddress(building, floor, room)
+
+
+def cell_text(value: Any) -> str:
+    """A cell as the browser reads it, (value || '').toString(): blank for null/""/0/NaN/false"""
+    if value is None or value is False or value == "" or (
+            isinstance(value, (int, float)) and (value == 0 or value != value)):
+        return ""
+    if value is True:
+        return "true"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def parse_address(address: Any) -> ParsedAddress:
+    """건물명, 층 (지하는 음수), 호실 of a supplier address (0 when missing)"""
+    text = cell_text(address).strip()
+    if not text:
+        return ParsedAddress("", 0, 0)
+    return _parse(text)
+
+
+def _char_group(ch: str) -> int:
+    if ch.isspace():
+        return 0
+    if ch.isdigit():
+        return 2
+    code = ord(ch)
+    if 0xAC00 <= code <= 0xD7A3 or 0x1100 <= code <= 0x11FF or 0x3130 <= code <= 0x318F:
+        return 3
+    if 0x4E00 <= code <= 0x9FFF:
+        return 4
+    if unicodedata.category(ch).startswith("L"):
+        return 5 if ch.isascii() else 6
+    return 1
+
+
+@lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def collation_key(text: str) -> Tuple[Tuple[int, ...], Tuple[bool, ...]]:
+    """Key that orders text like localeCompare(..., 'ko-KR')
+
+    Letters first (case-insensitive), then lowercase before uppercase for
+    otherwise equal text.
+    """
+    primary = tuple((_char_group(ch) << 21) | ord(ch) for ch in text.casefold())
+    return primary, tuple(ch.isupper() for ch in text)
+
+
+def _text_key(value: Any) -> Tuple[bool, Tuple]:
+    # 빈 값은 맨 뒤
+    text = cell_text(value).strip()
+    return (not text, collation_key(text))
+
+
+def _column_ranks(rows: Sequence[Sequence[Any]], col: int, key: Callable[[Any], Any]) -> np.ndarray:
+    """Rank of each row's cell in key order; key runs once per distinct cell value"""
+    ranks: Dict[Any, int] = {}
+    cells = [row[col] if col < len(row) else None for row in rows]
+    distinct = {}
+    for cell in cells:
+        # 1 / 1.0 / True가 같은 값이 되지 않도록 문자열 외에는 타입까지 포함
+        distinct.setdefault(cell if type(cell) is str else (cell.__class__, cell), cell)
+    # 키가 같은 값(앞뒤 공백, 같은 위치의 다른 표기)은 같은 순위 -> 원래 순서 유지
+    keyed = sorted(((key(value), value_key) for value_key, value in distinct.items()), key=lambda item: item[0])
+    rank, previous = -1, None
+    for sort_value, value_key in keyed:
+        if rank < 0 or sort_value != previous:
+            rank, previous = rank + 1, sort_value
+        ranks[value_key] = rank
+    return np.fromiter(
+        (ranks[cell if type(cell) is str else (cell.__class__, cell)] for cell in cells),
+        dtype=np.int64, count=len(cells)
+    )
+
+
+def _address_key(value: Any) -> Tuple:
+    address = parse_address(value)
+    return (not address.building, collation_key(address.building), address.floor, address.room)
+
+
+def address_order(rows: Sequence[Sequence[Any]], address_col: int = ADDRESS_COLUMN,
+                  tie_columns: Sequence[int] = TIE_COLUMNS) -> List[int]:
+    """Indices of rows in address order (stable)
+
+    Each column is ranked once over its distinct values, then the rows are
+    sorted on the rank columns (np.lexsort: last key first).
+    """
+    if not rows:
+        return []
+    keys = [_column_ranks(rows, col, _text_key) for col in reversed(tie_columns)]
+    keys.append(_column_ranks(rows, address_col, _address_key))
+    return np.lexsort(keys).tolist()
+
+
+def sort_by_address(data: Sequence[Sequence[Any]], header_rows: int = 4,
+                    address_col: int = ADDRESS_COLUMN,
+                    tie_columns: Sequence[int] = TIE_COLUMNS) -> Tuple[List[Any], List[int]]:
+    """(sorted rows, order): header rows stay on top, the rest in address order
+
+    order[i] is the original index of the i-th output row, so per-row state
+    (colors, checked rows) can be carried along.
+    """
+    if isinstance(data, Sheet):
+        data = data.to_rows()
+    body = data[header_rows:]
+    order = list(range(min(header_rows, len(data))))
+    order += [header_rows + i for i in address_order(body, address_col, tie_columns)]
+    return [data[i] for i in order], order
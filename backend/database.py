@@ -11,7 +11,8 @@ load_dotenv()
 # Force SQLite regardless of environment variable
 DATABASE_URL = "sqlite:///./gndr_database.db"
 
-engine = create_engine(DATABASE_URL)
+# 요청은 스레드 풀에서 처리되므로 세션을 만든 스레드와 쿼리하는 스레드가 다를 수 있음
+engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -0,0 +1,143 @@
+"""
+Date normalization for GNDR order management
+
+Single place that turns Excel serial dates, datetimes and date strings into
+the MM/DD form shown in the sheets, and parses the YYYY-MM-DD dates sent to
+the /payments and /orders endpoints.
+"""
+from typing import Any, Iterable, List, Optional
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+import numpy as np
+
+# Excel serial date 0 (1900 date system, including the 1900 leap year bug)
+EXCEL_EPOCH = datetime(1899, 12, 30)
+_EXCEL_EPOCH_US = np.datetime64(EXCEL_EPOCH, 'us')
+_US_PER_DAY = 86_400_000_000
+
+# Serial range that stays inside datetime's year 1..9999
+_MIN_SERIAL = (datetime.min - EXCEL_EPOCH).days
+_MAX_SERIAL = (datetime.max - EXCEL_EPOCH).days
+
+# "MM/DD" lookup table indexed by [month - 1, day - 1]
+_MMDD_TABLE = np.array(
+    [[f"{month:02d}/{day:02d}" for day in range(1, 32)] for month in range(1, 13)],
+    dtype=object
+)
+
+
+def _convert_excel_date(excel_date) -> Optional[str]:
+    """Convert one Excel date value to MM/DD format (uncached)"""
+    try:
+        # Handle datetime objects directly
+        if isinstance(excel_date, datetime):
+            return excel_date.strftime('%m/%d')
+
+        # Handle Excel serial date numbers
+        if isinstance(excel_date, (int, float)):
+            date_obj = EXCEL_EPOCH + timedelta(days=float(excel_date))
+            return date_obj.strftime('%m/%d')
+
+        # Handle string values
+        elif isinstance(excel_date, str):
+            # If it contains 'T' (ISO format like "2025-08-12T00:00:00")
+            if 'T' in excel_date:
+                # Parse ISO format and extract MM/DD
+                date_obj = datetime.fromisoformat(excel_date.replace('Z', '+00:00'))
+                return date_obj.strftime('%m/%d')
+
+            # If already has '/' just extract MM/DD
+            if '/' in excel_date:
+                parts = excel_date.split('/')
+                if len(parts) >= 2:
+                    return f"{parts[0]}/{parts[1]}"
+                return excel_date
+
+            # Try parsing as number
+            try:
+                num = float(excel_date)
+                date_obj = EXCEL_EPOCH + timedelta(days=num)
+                return date_obj.strftime('%m/%d')
+            except:
+                return excel_date
+
+        return excel_date
+    except:
+        return str(excel_date) if excel_date else excel_date
+
+
+@lru_cache(maxsize=4096)
+def _convert_excel_date_cached(excel_date) -> Optional[str]:
+    return _convert_excel_date(excel_date)
+
+
+def excel_date_to_string(excel_date) -> Optional[str]:
+    """Convert an Excel date (serial number, datetime or string) to MM/DD format
+
+    The same few dates appear thousands of times per sheet, so results for
+    hashable inputs are memoized.
+    """
+    try:
+        return _convert_excel_date_cached(excel_date)
+    except TypeError:
+        # Unhashable input
+        return _convert_excel_date(excel_date)
+
+
+def excel_serials_to_strings(serials: Iterable[Any]) -> np.ndarray:
+    """Convert a column of Excel serial numbers to MM/DD with array arithmetic
+
+    Returns an object array. Non-finite or out-of-range serials fall back to
+    excel_date_to_string, so the result always matches the per-cell conversion.
+    """
+    if not isinstance(serials, (list, np.ndarray)):
+        serials = list(serials)
+    days_f = np.asarray(serials, dtype=np.float64)
+    result = np.empty(len(days_f), dtype=object)
+    if len(days_f) == 0:
+        return result
+
+    valid = np.isfinite(days_f) & (days_f >= _MIN_SERIAL) & (days_f < _MAX_SERIAL)
+
+    # epoch + serial days, rounded to microseconds like timedelta(days=...)
+    offsets = np.rint(days_f[valid] * _US_PER_DAY).astype(np.int64)
+    days = (_EXCEL_EPOCH_US + offsets.astype('m8[us]')).astype('M8[D]')
+    months = days.astype('M8[M]')
+    month_idx = months.astype(np.int64) % 12
+    day_idx = (days - months).astype(np.int64)
+    result[valid] = _MMDD_TABLE[month_idx, day_idx]
+
+    for idx in np.flatnonzero(~valid):
+        value = serials[idx]
+        result[idx] = excel_date_to_string(value.item() if isinstance(value, np.generic) else value)
+
+    return result
+
+
+def excel_dates_to_strings(values: Iterable[Any]) -> List[Any]:
+    """Convert a mixed column (serials, strings, datetimes) to MM/DD in one pass
+
+    Numbers go through the batch serial conversion, everything else through
+    the memoized per-value conversion.
+    """
+    values = list(values)
+    result: List[Any] = [None] * len(values)
+
+    number_idx = []
+    for idx, value in enumerate(values):
+        if isinstance(value, (int, float)):
+            number_idx.append(idx)
+        else:
+            result[idx] = excel_date_to_string(value)
+
+    if number_idx:
+        converted = excel_serials_to_strings([values[idx] for idx in number_idx])
+        for idx, value in zip(number_idx, converted):
+            result[idx] = value
+    return result
+
+
+@lru_cache(maxsize=1024)
+def parse_date(date_str: str, fmt: str = "%Y-%m-%d") -> date:
+    """Parse a request date string (YYYY-MM-DD by default) into a date"""
+    return datetime.strptime(date_str, fmt).date()
@@ -0,0 +1,123 @@
+"""
+Excel rendering for GNDR order management
+
+Builds the xlsx files returned by the download/export endpoints and saved by
+/files/save-three-files. Every function is module-level and takes plain rows,
+so the endpoints can run them in the worker process pool (workers.run_cpu)
+instead of on the event loop. All of them write through
+xlsx_stream.XlsxStreamWriter: one pass over the rows, shared named styles,
+column widths from the longest value of each column.
+"""
+from typing import Any, BinaryIO, Dict, List, Union
+from datetime import datetime, date, timedelta
+from pathlib import Path
+import logging
+import numpy as np
+from sheet_model import Sheet
+from xlsx_stream import XlsxStreamWriter, CellStyle
+
+logger = logging.getLogger(__name__)
+
+# 일별 주문서 스타일: 헤더 2행, L~N 주황, O~P 파랑, Q~W 초록, 모든 셀 테두리
+DAILY_HEADER_ROWS = 2
+DAILY_HEADER_STYLE = CellStyle(fill="CCE5FF", bold=True, border=True, horizontal="center", vertical="center")
+DAILY_BODY_STYLE = CellStyle(border=True)
+DAILY_COLUMN_STYLES = (
+    ((11, 12, 13), CellStyle(fill="FFF3E0", border=True)),
+    ((14, 15), CellStyle(fill="E3F2FD", border=True)),
+    ((16, 17, 18, 19, 20, 21, 22), CellStyle(fill="E8F5E9", border=True)),
+)
+# P열: L+M+N과 O가 다르면 "차이 있음" (빨간 굵은 글자)
+DAILY_DIFF_COLUMN = 15
+DAILY_DIFF_TEXT = "차이 있음"
+DAILY_DIFF_STYLE = CellStyle(fill="E3F2FD", font_color="FF0000", bold=True, border=True)
+
+# /excel/export 헤더 (pandas to_excel과 같은 모양)
+EXPORT_HEADER_STYLE = CellStyle(bold=True, border=True, horizontal="center", vertical="top")
+# pandas to_excel의 날짜 표시 형식 (시각 등 그 밖의 값은 글자로)
+EXPORT_DATE_FORMATS = (
+    (datetime, "YYYY-MM-DD HH:MM:SS"),
+    (date, "YYYY-MM-DD"),
+    (timedelta, "0"),
+)
+
+
+def render_daily_order(sheet_name: str, data: List[List[Any]], target: Union[str, BinaryIO]):
+    """Write a saved daily order (DailyOrder.data) as xlsx to target (path or binary file)
+
+    Header rows are highlighted, L~W columns are colored and the P column
+    (차이 있음) is recalculated from L+M+N vs O.
+    """
+    # P열(차이 있음): L+M+N과 O를 시트의 숫자 열로 한 번에 비교
+    # (빈 값은 0, 숫자로 바꿀 수 없는 값이 있으면 빈칸)
+    if data:
+        sheet = Sheet.from_rows(data, header_rows=DAILY_HEADER_ROWS)
+        l_num, m_num, n_num, o_num = (sheet.numeric(col_idx, blank=0.0) for col_idx in (11, 12, 13, 14))
+        lmn_sum = l_num + m_num + n_num
+        p_invalid = np.isnan(lmn_sum) | np.isnan(o_num)
+        p_differs = ~p_invalid & (lmn_sum != o_num)
+        if p_invalid[DAILY_HEADER_ROWS:].any():
+            rows = (np.nonzero(p_invalid[DAILY_HEADER_ROWS:])[0] + DAILY_HEADER_ROWS + 1).tolist()
+            logger.warning(f"P열 계산 실패 rows={rows[:20]}")
+
+    with XlsxStreamWriter(target, sheet_name) as writer:
+        header = writer.add_style("daily header", DAILY_HEADER_STYLE)
+        body = writer.add_style("daily body", DAILY_BODY_STYLE)
+        diff = writer.add_style("daily differs", DAILY_DIFF_STYLE)
+        # 열별 스타일 번호 (W열 이후는 테두리만)
+        column_styles = [body] * 23
+        for n, (columns, style) in enumerate(DAILY_COLUMN_STYLES):
+            style_id = writer.add_style(f"daily color {n + 1}", style)
+            for col_idx in columns:
+                column_styles[col_idx] = style_id
+
+        for row_idx, row_data in enumerate(data):
+            if row_idx < DAILY_HEADER_ROWS:
+                writer.write_row(row_data, header)
+                continue
+            width = len(row_data)
+            styles = column_styles[:width] + [body] * (width - len(column_styles))
+            # P열은 무조건 재계산: 합계와 O열 값이 다르면 "차이 있음", 같으면 빈칸
+            if width > DAILY_DIFF_COLUMN:
+                row_data = list(row_data)
+                if p_differs[row_idx]:
+                    row_data[DAILY_DIFF_COLUMN] = DAILY_DIFF_TEXT
+                    styles[DAILY_DIFF_COLUMN] = diff
+                else:
+                    row_data[DAILY_DIFF_COLUMN] = ""
+            writer.write_row(row_data, styles)
+
+
+def write_colored_workbook(file_path: str, data: List[List[Any]],
+                           row_colors: Dict[str, str], row_text_colors: Dict[str, str]):
+    """Write rows to file_path, filling/coloring rows by their index ("0", "1", ...)"""
+    with XlsxStreamWriter(file_path, "Sheet") as writer:
+        for row_idx, row_data in enumerate(data):
+            # 행 배경색 / 글자색 조합마다 스타일 하나
+            style = writer.color_style(row_colors.get(str(row_idx)), row_text_colors.get(str(row_idx)))
+            writer.write_row(row_data, style)
+
+
+def export_to_excel(data: List[List[Any]], columns: List[str], file_name: str,
+                    sheet_name: str = "Sheet1", export_dir: str = "./exports") -> str:
+    """Export rows to a timestamped xlsx file under export_dir and return its path"""
+    try:
+        # Create export directory
+        export_path = Path(export_dir)
+        export_path.mkdir(exist_ok=True)
+
+        # Generate file path
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = export_path / f"{file_name}_{timestamp}.xlsx"
+
+        # Write to Excel
+        with XlsxStreamWriter(str(output_file), sheet_name,
+                              date_formats=EXPORT_DATE_FORMATS, other_as_text=True) as writer:
+            writer.write_row(columns, writer.add_style("export header", EXPORT_HEADER_STYLE))
+            for row in data:
+                writer.write_row(row)
+
+        return str(output_file)
+
+    except Exception as e:
+        raise Exception(f"Error exporting to Excel: {e}")
@@ -0,0 +1,329 @@
+"""
+Disk retention for GNDR order management
+
+Several directories only ever grow: every parse adds files to sheet_cache,
+every /excel/export leaves a timestamped xlsx in exports, uploaded workbooks
+stay in workbooks after a restart forgets them, and saved_files keeps files
+whose SavedFile row was replaced or deleted. The janitor sweeps them on a
+schedule inside the app:
+
+- sheet_cache: index entries of workbooks that are no longer open and
+  edited sheets with no DailyOrder of the same sheet name are orphans;
+  the rest is bounded by age and total size (open workbooks are kept).
+  Files the index does not list (legacy JSON metadata and manifest,
+  tmpXXXX_*.json, interrupted writes) are orphans.
+- exports: bounded by age and total size (nothing refers to them after the
+  download).
+- workbooks: files of workbooks that are not open are orphans.
+- saved_files: files no SavedFile row points to are orphans; referenced
+  files are never removed.
+
+Files younger than JANITOR_GRACE_SECONDS are never touched, so files being
+written or downloaded are safe. A dry run reports what would be removed
+without deleting anything. Each run scans every directory once. With
+several worker processes only the holder of the shared "janitor" lease runs
+the scheduled sweep.
+"""
+from typing import Any, Callable, Dict, Optional, Set
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from database import SessionLocal, DailyOrder, SavedFile
+from sheet_manager import sheet_manager, SheetManager, EDITED_SHEETS_WORKBOOK
+from sheet_store import EDIT_LOG_SUFFIX
+from workers import run_io
+
+logger = logging.getLogger(__name__)
+
+JANITOR_INTERVAL_SECONDS = int(os.getenv("JANITOR_INTERVAL_SECONDS", 6 * 3600))
+JANITOR_STARTUP_DELAY_SECONDS = int(os.getenv("JANITOR_STARTUP_DELAY_SECONDS", 60))
+JANITOR_GRACE_SECONDS = int(os.getenv("JANITOR_GRACE_SECONDS", 3600))
+
+SHEET_CACHE_MAX_AGE_DAYS = int(os.getenv("JANITOR_SHEET_CACHE_MAX_AGE_DAYS", 14))
+SHEET_CACHE_MAX_MB = int(os.getenv("JANITOR_SHEET_CACHE_MAX_MB", 512))
+EXPORTS_MAX_AGE_DAYS = int(os.getenv("JANITOR_EXPORTS_MAX_AGE_DAYS", 3))
+EXPORTS_MAX_MB = int(os.getenv("JANITOR_EXPORTS_MAX_MB", 256))
+
+# 삭제 사유
+REASON_ORPHAN = "orphan"
+REASON_AGE = "age"
+REASON_SIZE = "size"
+
+_DAY_SECONDS = 24 * 3600
+
+
+def _dir_report(path: Path) -> Dict[str, Any]:
+    return {
+        "path": str(path),
+        "files": 0,
+        "bytes": 0,
+        "removed_files": 0,
+        "reclaimed_bytes": 0,
+        "removed": {REASON_ORPHAN: 0, REASON_AGE: 0, REASON_SIZE: 0}
+    }
+
+
+def _count_removed(report: Dict[str, Any], reason: str, size: int):
+    report["removed_files"] += 1
+    report["reclaimed_bytes"] += size
+    report["removed"][reason] += 1
+
+
+def _timestamp(value: Optional[str]) -> float:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Janitor:
+    """Age, size and orphan sweeps over the app's data directories"""
+
+    def __init__(self, manager: SheetManager = sheet_manager, session_factory=SessionLocal,
+                 exports_dir: str = "./exports", saved_files_dir: str = "./saved_files"):
+        self.manager = manager
+        self.session_factory = session_factory
+        self.exports_dir = Path(exports_dir)
+        self.saved_files_dir = Path(saved_files_dir)
+        self.grace_seconds = JANITOR_GRACE_SECONDS
+        self.sheet_cache_max_age = SHEET_CACHE_MAX_AGE_DAYS * _DAY_SECONDS
+        self.sheet_cache_max_bytes = SHEET_CACHE_MAX_MB * 1024 * 1024
+        self.exports_max_age = EXPORTS_MAX_AGE_DAYS * _DAY_SECONDS
+        self.exports_max_bytes = EXPORTS_MAX_MB * 1024 * 1024
+
+        self.runs = 0
+        self.total_removed_files = 0
+        self.total_reclaimed_bytes = 0
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        # 예약 실행과 관리자 실행이 겹치지 않도록
+        self._run_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # 워커 프로세스 중 예약 실행을 맡을 하나를 고르는 공유 임대 이름
+        self._lease_holder = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Sweep every directory once and return what was removed
+
+        dry_run=True only reports what would be removed; nothing is deleted
+        and the totals in stats() are left alone.
+        """
+        with self._run_lock:
+            started = time.perf_counter()
+            now = time.time()
+            db = self.session_factory()
+            try:
+                daily_sheet_names = {name for (name,) in db.query(DailyOrder.sheet_name).distinct()}
+                saved_paths = {os.path.abspath(path) for (path,) in db.query(SavedFile.file_path)}
+            finally:
+                db.close()
+            open_ids = self.manager.open_workbook_ids()
+
+            directories = {
+                "sheet_cache": self._sweep_sheet_cache(now, open_ids, daily_sheet_names, dry_run),
+                "exports": self._sweep_files(
+                    self.exports_dir, now,
+                    max_age=self.exports_max_age, max_bytes=self.exports_max_bytes,
+                    dry_run=dry_run
+                ),
+                "workbooks": self._sweep_files(
+                    self.manager.workbook_dir, now,
+                    protected=lambda path: path.stem in open_ids,
+                    orphan=lambda path: True,
+                    dry_run=dry_run
+                ),
+                "saved_files": self._sweep_files(
+                    self.saved_files_dir, now,
+                    protected=lambda path: os.path.abspath(path) in saved_paths,
+                    orphan=lambda path: True,
+                    dry_run=dry_run
+                ),
+            }
+
+            report = {
+                "ran_at": datetime.now().isoformat(),
+                "dry_run": dry_run,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                "removed_files": sum(d["removed_files"] for d in directories.values()),
+                "reclaimed_bytes": sum(d["reclaimed_bytes"] for d in directories.values()),
+                "directories": directories
+            }
+            if dry_run:
+                return report
+            with self._lock:
+                self.runs += 1
+                self.total_removed_files += report["removed_files"]
+                self.total_reclaimed_bytes += report["reclaimed_bytes"]
+                self.last_report = report
+                self.last_error = None
+            if report["removed_files"]:
+                logger.info(f"Janitor removed {report['removed_files']} files "
+                            f"({report['reclaimed_bytes']} bytes)")
+            return report
+
+    def _sweep_sheet_cache(self, now: float, open_ids: Set[str],
+                           daily_sheet_names: Set[str], dry_run: bool = False) -> Dict[str, Any]:
+        store = self.manager.store
+        report = _dir_report(store.cache_dir)
+
+        # 1) 색인 항목: 고아 / 기간 / 용량
+        removals: Dict[str, tuple] = {}
+        candidates = []
+        kept_bytes = 0
+        for entry in store.entries():
+            key = store.key(entry["workbook"], entry["sheet_name"])
+            size = entry.get("bytes", 0)
+            age = now - _timestamp(entry.get("written_at"))
+            if entry["workbook"] in open_ids or age < self.grace_seconds:
+                kept_bytes += size
+                continue
+            if entry["workbook"] != EDITED_SHEETS_WORKBOOK or entry["sheet_name"] not in daily_sheet_names:
+                removals[key] = (REASON_ORPHAN, size)
+            elif age > self.sheet_cache_max_age:
+                removals[key] = (REASON_AGE, size)
+            else:
+                kept_bytes += size
+                candidates.append((age, key, size))
+
+        # 오래된 것부터 용량 한도까지
+        for age, key, size in sorted(candidates, reverse=True):
+            if kept_bytes <= self.sheet_cache_max_bytes:
+                break
+            removals[key] = (REASON_SIZE, size)
+            kept_bytes -= size
+
+        if removals:
+            if not dry_run:
+                store.remove_entries(list(removals)).result()
+            for reason, size in removals.values():
+                _count_removed(report, reason, size)
+
+        # 2) 색인에 없는 파일: 예전 JSON 캐시/manifest, tmpXXXX_*.json, 중단된 기록
+        # (미리 보기에서는 1)에서 지울 항목의 파일도 색인에 남아 있어 두 번 세지 않음)
+        listed = set()
+        for entry in store.entries():
+            listed.add(entry["file"])
+            listed.add(entry["file"] + EDIT_LOG_SUFFIX)
+        unlisted = self._sweep_files(
+            store.cache_dir, now,
+            protected=lambda path: path.name in listed,
+            orphan=lambda path: True,
+            dry_run=dry_run
+        )
+        report["files"] = unlisted["files"]
+        report["bytes"] = unlisted["bytes"]
+        report["removed_files"] += unlisted["removed_files"]
+        report["reclaimed_bytes"] += unlisted["reclaimed_bytes"]
+        for reason, count in unlisted["removed"].items():
+            report["removed"][reason] += count
+        return report
+
+    def _sweep_files(self, directory: Path, now: float,
+                     protected: Optional[Callable[[Path], bool]] = None,
+                     orphan: Optional[Callable[[Path], bool]] = None,
+                     max_age: Optional[float] = None,
+                     max_bytes: Optional[int] = None,
+                     dry_run: bool = False) -> Dict[str, Any]:
+        """Remove orphans, then files past max_age, then the oldest files over max_bytes"""
+        report = _dir_report(directory)
+        if not directory.is_dir():
+            return report
+
+        files = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                files.append((Path(entry.path), stat.st_size, now - stat.st_mtime))
+
+        candidates = []
+        kept_bytes = 0
+        for path, size, age in files:
+            if (protected and protected(path)) or age < self.grace_seconds:
+                kept_bytes += size
+                continue
+            if orphan and orphan(path):
+                reason = REASON_ORPHAN
+            elif max_age is not None and age > max_age:
+                reason = REASON_AGE
+            else:
+                kept_bytes += size
+                candidates.append((age, path, size))
+                continue
+            if dry_run or self._unlink(path):
+                _count_removed(report, reason, size)
+            else:
+                kept_bytes += size
+
+        if max_bytes is not None:
+            for age, path, size in sorted(candidates, key=lambda item: item[0], reverse=True):
+                if kept_bytes <= max_bytes:
+                    break
+                if dry_run or self._unlink(path):
+                    _count_removed(report, REASON_SIZE, size)
+                    kept_bytes -= size
+
+        report["files"] = len(files) - report["removed_files"]
+        report["bytes"] = kept_bytes
+        return report
+
+    @staticmethod
+    def _unlink(path: Path) -> bool:
+        try:
+            os.unlink(path)
+            return True
+        except OSError as e:
+            logger.warning(f"Janitor could not remove {path}: {e}")
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Budgets, totals since startup and the last run's report"""
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "total_removed_files": self.total_removed_files,
+                "total_reclaimed_bytes": self.total_reclaimed_bytes,
+                "interval_seconds": JANITOR_INTERVAL_SECONDS,
+                "grace_seconds": self.grace_seconds,
+                "budgets": {
+                    "sheet_cache": {"max_age_days": SHEET_CACHE_MAX_AGE_DAYS, "max_bytes": self.sheet_cache_max_bytes},
+                    "exports": {"max_age_days": EXPORTS_MAX_AGE_DAYS, "max_bytes": self.exports_max_bytes},
+                },
+                "last_error": self.last_error,
+                "last_report": self.last_report
+            }
+
+    # --- 앱 안에서 주기 실행 ---
+
+    def start(self):
+        """Start the periodic sweep on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run_periodically())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run_periodically(self):
+        await asyncio.sleep(JANITOR_STARTUP_DELAY_SECONDS)
+        while True:
+            try:
+                # 임대를 가진 워커만 실행 (다음 실행 전까지 유지)
+                if self.manager.state.try_lease("janitor", self._lease_holder, JANITOR_INTERVAL_SECONDS + 60):
+                    await run_io(self.run)
+            except Exception as e:
+                logger.error(f"Janitor run failed: {str(e)}")
+                with self._lock:
+                    self.last_error = str(e)
+            await asyncio.sleep(JANITOR_INTERVAL_SECONDS)
+
+
+janitor = Janitor()
@@ -0,0 +1,181 @@
+"""
+Background ingestion jobs for GNDR order management
+
+A large upload used to keep its HTTP request open through parsing, saving
+and client sync, so a browser or proxy timeout threw the work away. Upload
+endpoints now start a job and return its id at once; the job runs its stages
+on the worker pools and records its progress here, where GET /jobs/{id}
+reads it. Jobs live in the shared state file, so the status can be polled
+through any worker process. Finished jobs (and their results) are kept for
+JOB_RESULT_TTL_SECONDS. A job whose process exited before it finished
+(restart, crash) is failed as interrupted when a worker process starts.
+"""
+from typing import Any, Awaitable, Dict, List, Optional
+from datetime import datetime
+import asyncio
+import json
+import logging
+import os
+import pickle
+import time
+import uuid
+from shared_state import SharedState, shared_state
+
+logger = logging.getLogger(__name__)
+
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", 3600))
+
+# 작업 상태
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+JOB_INTERRUPTED_ERROR = "작업이 중단되었습니다 (서버 재시작). 파일을 다시 업로드해 주세요."
+
+
+class JobStore:
+    """Job registry in the shared state: status, stage, progress, errors and result
+
+    Any worker process can report on a job started by another one; only the
+    coroutine itself runs in the process that started it.
+    """
+
+    def __init__(self, ttl_seconds: int = JOB_RESULT_TTL_SECONDS, state: Optional[SharedState] = None):
+        self.ttl_seconds = ttl_seconds
+        self.state = state or shared_state
+        # 실행 중인 asyncio 태스크 (가비지 컬렉션 방지용 참조)
+        self._tasks = set()
+
+    def create(self, kind: str, user: str, **info) -> str:
+        """Register a new job and return its id"""
+        self.prune()
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        self.state.execute(
+            "INSERT INTO jobs (job_id, user, kind, status, errors, info, created_at, updated_at, runner) "
+            "VALUES (?, ?, ?, ?, '[]', ?, ?, ?, ?)",
+            (job_id, user, kind, JOB_QUEUED, json.dumps(info, ensure_ascii=False, default=str), now, now,
+             os.getpid())
+        )
+        return job_id
+
+    def start(self, job_id: str, coro: Awaitable[Any]):
+        """Run a job coroutine in the background on the running event loop
+
+        The coroutine returns the job result; an exception fails the job.
+        """
+        async def run():
+            try:
+                result = await coro
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {str(e)}")
+                self.fail(job_id, str(e))
+            else:
+                self.finish(job_id, result)
+
+        task = asyncio.get_running_loop().create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def set_stage(self, job_id: str, stage: str, rows_total: Optional[int] = None):
+        """Enter a new stage (progress counters restart)"""
+        self._update(job_id, status=JOB_RUNNING, stage=stage, rows_processed=0, rows_total=rows_total)
+
+    def set_progress(self, job_id: str, rows_processed: int):
+        """Rows processed so far in the current stage (callable from worker threads)"""
+        self._update(job_id, rows_processed=rows_processed)
+
+    def add_error(self, job_id: str, message: str):
+        """Record a non-fatal error; the job keeps running"""
+        with self.state.transaction() as conn:
+            row = conn.execute("SELECT errors FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE jobs SET errors = ?, updated_at = ? WHERE job_id = ?",
+                             (json.dumps(json.loads(row["errors"]) + [message], ensure_ascii=False),
+                              datetime.now().isoformat(), job_id))
+
+    def finish(self, job_id: str, result: Any):
+        # 결과는 pickle로 (시트 데이터는 응답 시 JSON으로 변환)
+        self._update(job_id, status=JOB_DONE, stage=None, result=pickle.dumps(result, protocol=5))
+        self._mark_finished(job_id)
+
+    def fail(self, job_id: str, error: str):
+        self.add_error(job_id, error)
+        self._update(job_id, status=JOB_FAILED)
+        self._mark_finished(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a job (None if unknown or expired)
+
+        Read-only: expired jobs are skipped here and deleted by prune() when
+        the next job is created.
+        """
+        row = self.state.query_one(
+            "SELECT * FROM jobs WHERE job_id = ? AND (finished_ts IS NULL OR finished_ts >= ?)",
+            (job_id, time.time() - self.ttl_seconds)
+        )
+        if row is None:
+            return None
+        return {
+            "job_id": row["job_id"],
+            "kind": row["kind"],
+            "user": row["user"],
+            "status": row["status"],
+            "stage": row["stage"],
+            "rows_processed": row["rows_processed"],
+            "rows_total": row["rows_total"],
+            "errors": json.loads(row["errors"]),
+            "result": pickle.loads(row["result"]) if row["result"] is not None else None,
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "finished_at": row["finished_at"],
+            **json.loads(row["info"])
+        }
+
+    def prune(self):
+        """Drop finished jobs older than the TTL"""
+        self.state.execute("DELETE FROM jobs WHERE finished_ts < ?", (time.time() - self.ttl_seconds,))
+
+    def fail_interrupted(self) -> int:
+        """Fail the queued/running jobs whose process is gone (call at startup)
+
+        Each job runs in the process that created it, so a job left unfinished
+        by a restart or crash would otherwise be polled forever. Jobs of other
+        live worker processes are left alone. Returns the number failed.
+        """
+        rows = self.state.query("SELECT job_id, runner FROM jobs WHERE status IN (?, ?)",
+                                (JOB_QUEUED, JOB_RUNNING))
+        interrupted = [row["job_id"] for row in rows if not _process_alive(row["runner"])]
+        for job_id in interrupted:
+            self.fail(job_id, JOB_INTERRUPTED_ERROR)
+        if interrupted:
+            logger.warning(f"Failed {len(interrupted)} interrupted job(s)")
+        return len(interrupted)
+
+    def _update(self, job_id: str, **fields):
+        fields["updated_at"] = datetime.now().isoformat()
+        # 필드 이름은 이 모듈 안에서만 정해짐
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self.state.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def _mark_finished(self, job_id: str):
+        self.state.execute("UPDATE jobs SET finished_at = updated_at, finished_ts = ? WHERE job_id = ?",
+                           (time.time(), job_id))
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    # 이 프로세스는 방금 시작했으므로 같은 pid의 작업은 이전 프로세스의 것
+    if not pid or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Global instance
+job_store = JobStore()
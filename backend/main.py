@@ -1,11 +1,13 @@
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import FastAPI, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from fastapi.responses import JSONResponse, FileResponse
+from starlette.background import BackgroundTask
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Union
 import pandas as pd
+import numpy as np
 import os
 import json
 import hashlib
@@ -13,13 +15,29 @@ from pydantic import BaseModel
 from dotenv import load_dotenv
 import tempfile
 from urllib.parse import quote
-from sheet_manager import sheet_manager, SheetType
-from database import init_db, get_db, Supplier, Product, Order, OrderItem, FileUploadHistory, DailyOrder, WorkDraft, Client
+from sheet_manager import sheet_manager, SheetType, SheetVersionConflict, MAX_CELL_EDITS, parse_workbook
+from sheet_model import Sheet
+from workbook_reader import read_sheet_by_keyword
+from date_utils import parse_date
+from upload_cache import upload_cache
+from workers import run_io, run_cpu
+from uploads import UploadSizeLimitMiddleware, spool_upload
+from jobs import job_store
+from janitor import janitor
+from preflight import preflight_workbook, LAYOUT_ORDER, LAYOUT_RECEIPT_SLIP
+import workers
+import excel_render
+from xlsx_stream import XLSX_MEDIA_TYPE
+from shared_state import shared_state
+from sheet_view import sheet_views
+from address_sort import sort_by_address, ADDRESS_COLUMN, TIE_COLUMNS
+from receipt_merge import merge_order_receipt, merge_receipt_slip
+from receipt_suggest import suggest_matches, DEFAULT_TOP_K, DEFAULT_BUDGET_MS
+from receipt_classify import prepare_receipt_sheet, split_receipt_sheet
+from database import init_db, get_db, SessionLocal, Supplier, Product, Order, OrderItem, FileUploadHistory, DailyOrder, WorkDraft, Client
 from sqlalchemy.orm import Session
 from datetime import date
-import io
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+import anyio
 import logging
 
 # Configure logging
@@ -29,8 +47,9 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Initialize database
-init_db()
+# Initialize database (워커 프로세스들이 동시에 시작해도 하나씩 테이블 생성)
+with shared_state.transaction():
+    init_db()
 
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-this-in-production")
@@ -41,6 +60,26 @@ ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "gndr12345!")
 
 app = FastAPI(title="GNDR Order Management API", version="1.0.0")
 
+@app.on_event("startup")
+async def configure_worker_pools():
+    # 동기(def) 엔드포인트가 실행되는 스레드 풀도 IO 풀과 같은 크기로 제한
+    anyio.to_thread.current_default_thread_limiter().total_tokens = workers.IO_WORKERS
+    # 재시작/비정상 종료로 끝나지 못한 작업은 실패 처리 (폴링이 끝나도록)
+    job_store.fail_interrupted()
+    # 캐시/내보내기/저장 파일 정리 (주기 실행)
+    janitor.start()
+
+@app.on_event("shutdown")
+async def shutdown_worker_pools():
+    janitor.stop()
+    workers.shutdown()
+    # 대기 중인 시트 캐시 기록을 마저 씀
+    sheet_manager.store.close()
+
+# 업로드 크기 제한 (본문을 다 받기 전에 거절)
+# 나중에 추가한 미들웨어가 바깥에서 돌기 때문에 CORS보다 먼저 등록해야 413 응답에도 CORS 헤더가 붙음
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # CORS settings
 app.add_middleware(
     CORSMiddleware,
@@ -69,6 +108,71 @@ class SheetData(BaseModel):
     rows: int
     cols: int
 
+class CellEdit(BaseModel):
+    row: int
+    col: int
+    value: Union[str, int, float, bool, None] = None
+
+class SheetCellPatch(BaseModel):
+    base_version: int
+    edits: List[CellEdit]
+
+class AddressSortRequest(BaseModel):
+    """주소 정렬 요청 (헤더 행은 그대로 두고 나머지를 정렬)"""
+    data: List[List[Any]]
+    header_rows: int = 4
+    address_col: int = ADDRESS_COLUMN
+    tie_columns: List[int] = list(TIE_COLUMNS)
+
+class OrderReceiptMergeRequest(BaseModel):
+    """주문서 + 주문입고 병합 요청 (거래처명, 상품코드, 수량으로 매칭)
+
+    suggestions > 0이면 매칭 실패 행마다 비슷한 입고 행을 그 수만큼 제안
+    """
+    original_data: List[List[Any]]
+    receipt_data: List[List[Any]]
+    consume_duplicates: bool = True
+    suggestions: int = 0
+    suggest_budget_ms: int = DEFAULT_BUDGET_MS
+
+class ReceiptSlipMergeRequest(BaseModel):
+    """주문서 + 입고전표 병합 요청 (상품코드로 매칭)"""
+    current_data: List[List[Any]]
+    slip_data: List[List[Any]]
+    consume_duplicates: bool = True
+    suggestions: int = 0
+    suggest_budget_ms: int = DEFAULT_BUDGET_MS
+    # 주소 정렬 + 구분선 + 행 색상/중복/자동 체크까지 (sortReceiptData + processReceiptSlipData)
+    classify: bool = False
+
+class MatchSuggestionRequest(BaseModel):
+    """매칭 실패 행의 비슷한 입고 행 제안 (kind: order=주문입고, slip=입고전표)"""
+    data: List[List[Any]]
+    receipt_data: List[List[Any]]
+    rows: List[int]
+    kind: str = "order"
+    top_k: int = DEFAULT_TOP_K
+    budget_ms: int = DEFAULT_BUDGET_MS
+
+class ViewSort(BaseModel):
+    col: int
+    desc: bool = False
+
+class ViewFilter(BaseModel):
+    col: int
+    op: str = "eq"  # eq, ne, in, contains, empty, not_empty
+    value: Any = None
+
+class SheetViewQuery(BaseModel):
+    """한 화면 분량의 행 조회 (필터 → 정렬 → offset/limit)"""
+    offset: int = 0
+    limit: int = 500
+    columns: Optional[List[int]] = None  # 돌려받을 열 (없으면 전체)
+    sort: List[ViewSort] = []
+    filters: List[ViewFilter] = []
+    checked_rows: Optional[Dict[int, bool]] = None  # 없으면 저장된 체크 상태 (작업 임시저장)
+    hide_checked: Optional[bool] = None
+
 # Utility functions
 def hash_password(password: str) -> str:
     """Simple SHA256 password hashing"""
@@ -115,11 +219,36 @@ def convert_datetime_in_data(data):
         return {k: convert_datetime_in_data(v) for k, v in data.items()}
     elif isinstance(data, list):
         return [convert_datetime_in_data(item) for item in data]
+    elif isinstance(data, Sheet):
+        # 열 단위 시트는 기존과 같은 행 리스트로
+        return convert_datetime_in_data(data.to_json())
     elif isinstance(data, (datetime, date)):
         return data.isoformat()
     else:
         return data
 
+def json_response(content: Any) -> JSONResponse:
+    """Encode a sheet-sized response body up front
+
+    FastAPI runs jsonable_encoder on returned dicts in the event loop (over a
+    second for a 30k-row sheet), so endpoints returning sheets build the
+    JSONResponse themselves: directly in sync endpoints, through run_io in
+    async ones.
+    """
+    return JSONResponse(content=convert_datetime_in_data(content))
+
+def in_session(func: Callable[[Session], Any]) -> Any:
+    """Run func(db) with a session of its own, then close it
+
+    For DB work handed to run_io from async endpoints: the request-scoped
+    session from get_db must not be used from worker threads.
+    """
+    db = SessionLocal()
+    try:
+        return func(db)
+    finally:
+        db.close()
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     """Get current user from token"""
     credentials_exception = HTTPException(
@@ -606,7 +735,7 @@ async def restart_server():
         raise HTTPException(status_code=500, detail=f"재시작 실패: {str(e)}")
 
 @app.post("/admin/fix-p-column")
-async def fix_p_column(db: Session = Depends(get_db)):
+def fix_p_column(db: Session = Depends(get_db)):
     """기존 저장된 모든 주문서의 P열을 재계산하여 수정"""
     try:
         # 모든 일별 주문서 가져오기
@@ -672,8 +801,13 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     return current_user
 
 # Save order data to database
-def save_order_data_to_db(sheets: List[Dict], file_path: str, db: Session):
-    """Save order data to database from sheets"""
+def save_order_data_to_db(sheets: List[Dict], file_path: str, db: Session,
+                          progress: Optional[Callable[[int], None]] = None):
+    """Save order data to database from sheets
+
+    progress, if given, is called with the number of rows handled so far.
+    """
+    rows_done = 0
     try:
         for sheet in sheets:
             # Create or update Order
@@ -686,8 +820,16 @@ def save_order_data_to_db(sheets: List[Dict], file_path: str, db: Session):
             db.add(order)
             db.flush()  # Get the order ID
 
+            # 수량 열(I~O)은 시트의 숫자 열에서 한 번에 정수로 변환
+            data = Sheet.from_rows(sheet.get("data", []))
+            quantities = {col_idx: data.int_column(col_idx) for col_idx in range(8, 15)}
+
             # Process each row of data
-            for idx, row in enumerate(sheet.get("data", [])[1:]):  # Skip header row
+            for idx, row in enumerate(data[1:]):  # Skip header row
+                row_idx = idx + 1
+                rows_done += 1
+                if progress and rows_done % 500 == 0:
+                    progress(rows_done)
                 if idx == 0:  # Skip the first data row (column names)
                     continue
 
@@ -730,13 +872,13 @@ def save_order_data_to_db(sheets: List[Dict], file_path: str, db: Session):
                     order_item = OrderItem(
                         order_id=order.id,
                         product_id=product.id,
-                        new_order_qty=int(row[8]) if len(row) > 8 and row[8] else 0,
-                        undelivered_qty=int(row[9]) if len(row) > 9 and row[9] else 0,
-                        exchange_qty=int(row[10]) if len(row) > 10 and row[10] else 0,
-                        janggi_qty=int(row[11]) if len(row) > 11 and row[11] else 0,
-                        janggi_undelivered=int(row[12]) if len(row) > 12 and row[12] else 0,
-                        janggi_exchange=int(row[13]) if len(row) > 13 and row[13] else 0,
-                        received_qty=int(row[14]) if len(row) > 14 and row[14] else 0,
+                        new_order_qty=int(quantities[8][row_idx]),
+                        undelivered_qty=int(quantities[9][row_idx]),
+                        exchange_qty=int(quantities[10][row_idx]),
+                        janggi_qty=int(quantities[11][row_idx]),
+                        janggi_undelivered=int(quantities[12][row_idx]),
+                        janggi_exchange=int(quantities[13][row_idx]),
+                        received_qty=int(quantities[14][row_idx]),
                         difference_qty=int(row[15]) if len(row) > 15 and row[15] else 0,
                         uncle_comment=row[16] if len(row) > 16 else None,
                         gndr_comment=row[17] if len(row) > 17 else None
@@ -759,6 +901,8 @@ def save_order_data_to_db(sheets: List[Dict], file_path: str, db: Session):
         db.add(file_history)
 
         db.commit()
+        if progress:
+            progress(rows_done)
         return True
 
     except Exception as e:
@@ -766,6 +910,117 @@ def save_order_data_to_db(sheets: List[Dict], file_path: str, db: Session):
         print(f"Error saving to database: {e}")
         return False
 
+# 거래처 시트 컬럼명 → Client 필드 매핑
+CLIENT_COLUMN_MAPPING = {
+    'Code': 'code',
+    '업체명': 'company_name',
+    '아이디': 'user_id',
+    '담당MD': 'manager_md',
+    '대표이사': 'ceo_name',
+    '사업자등록번호': 'business_number',
+    '업태': 'business_type',
+    '업종': 'business_category',
+    '추가코드1': 'additional_code1',
+    '추가코드2': 'additional_code2',
+    '담당자명': 'contact_person',
+    '우편번호': 'postal_code',
+    '주소': 'address',
+    '상세주소': 'address_detail',
+    '연락처': 'phone',
+    '휴대폰번호': 'mobile',
+    '이메일': 'email',
+    '비고': 'notes',
+    '그룹': 'group_name',
+    '계좌번호': 'account_number',
+    '은행': 'bank_name',
+    '예금주': 'account_holder',
+    '잔': 'balance',
+    '사입서비스사용': 'use_purchase_service',
+    '입고대기자동계산': 'auto_calculate_receipt',
+    '사용안함': 'is_disabled'
+}
+
+def sync_clients_from_rows(rows: List[List[Any]], db: Session, username: str,
+                           progress: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+    """Create or update clients from '거래처' sheet rows (first row holds the column names)
+
+    progress, if given, is called with the number of rows handled so far.
+    """
+    created_count = 0
+    updated_count = 0
+    error_count = 0
+
+    if not rows:
+        return {"created": created_count, "updated": updated_count, "errors": error_count}
+
+    # 컬럼명 → 컬럼 인덱스 (중복 컬럼은 첫 번째 것 사용)
+    column_index = {}
+    for idx, name in enumerate(rows[0]):
+        if name is not None and str(name) not in column_index:
+            column_index[str(name)] = idx
+
+    for row_idx, row in enumerate(rows[1:], start=1):
+        if progress and row_idx % 100 == 0:
+            progress(row_idx)
+        code = None
+        try:
+            record = {name: row[idx] for name, idx in column_index.items() if idx < len(row)}
+
+            # Code가 없으면 스킵
+            if record.get('Code') is None or str(record.get('Code')).strip() == '':
+                continue
+
+            code = str(record.get('Code')).strip()
+            company_name = str(record.get('업체명') or '').strip()
+
+            if not company_name:
+                continue
+
+            # 기존 거래처 찾기
+            existing_client = db.query(Client).filter(Client.code == code).first()
+
+            # 데이터 준비
+            client_data = {
+                'code': code,
+                'company_name': company_name
+            }
+
+            # 나머지 필드 매핑
+            for excel_col, db_field in CLIENT_COLUMN_MAPPING.items():
+                if excel_col in column_index and db_field not in ['code', 'company_name']:
+                    value = record.get(excel_col)
+                    if value is not None:
+                        if db_field in ['balance', 'use_purchase_service', 'auto_calculate_receipt', 'is_disabled']:
+                            client_data[db_field] = int(value) if value != '' else 0
+                        else:
+                            client_data[db_field] = str(value).strip()
+
+            if existing_client:
+                # 업데이트
+                for key, value in client_data.items():
+                    setattr(existing_client, key, value)
+                existing_client.updated_at = datetime.now()
+                updated_count += 1
+            else:
+                # 새로 생성
+                new_client = Client(**client_data, created_by=username)
+                db.add(new_client)
+                created_count += 1
+
+            # 각 행마다 커밋 (중복 오류 방지)
+            db.commit()
+            db.expire_all()  # 세션 갱신하여 최신 데이터 반영
+
+        except Exception as row_error:
+            db.rollback()
+            error_count += 1
+            logger.warning(f"Error processing client row with code {code}: {str(row_error)}")
+            continue
+
+    if progress:
+        progress(len(rows) - 1)
+    return {"created": created_count, "updated": updated_count, "errors": error_count}
+
 # Excel handling routes
 @app.get("/excel/check")
 async def check_excel(
@@ -773,11 +1028,11 @@ async def check_excel(
 ):
     """저장된 엑셀 파일이 있는지 확인"""
     try:
-        has_file = sheet_manager.has_loaded_file()
+        has_file = sheet_manager.has_loaded_file(current_user.username)
         filename = None
 
         if has_file:
-            file_info = sheet_manager.get_current_file_info()
+            file_info = sheet_manager.get_current_file_info(current_user.username)
             if file_info and 'file_path' in file_info:
                 import os
                 filename = os.path.basename(file_info['file_path'])
@@ -795,7 +1050,7 @@ async def check_excel(
         )
 
 @app.get("/excel/load")
-async def load_excel_file(
+def load_excel_file(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -804,8 +1059,8 @@ async def load_excel_file(
         # Default file path - Updated to correct file
         file_path = "/Users/pablokim/gndr-orma/docs/references/0828가나다란 주문서.xlsx"
 
-        # Load using sheet manager
-        result = sheet_manager.load_excel_file(file_path)
+        # Load using sheet manager (every sheet, parsed in parallel)
+        result = sheet_manager.load_excel_file(file_path, workers=sheet_manager.parse_workers)
 
         if not result["success"]:
             raise HTTPException(status_code=500, detail=result.get("error", "Failed to load Excel file"))
@@ -835,93 +1090,71 @@ async def load_excel_file(
 
             logger.info(f"Restored work state for user {current_user.username}")
 
-        return result
+        return json_response(result)
 
     except Exception as e:
         logger.error(f"Error loading excel file: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def preflight_upload(tmp_path: str, filename: str, expected_layouts: List[str]) -> Dict[str, Any]:
+    """Check the header rows of a spooled upload before the full parse
+
+    Deletes the temp file and raises 400 if the first sheet does not have
+    one of the expected layouts.
+    """
+    preflight = await run_io(preflight_workbook, tmp_path, filename, expected_layouts)
+    if not preflight["accepted"]:
+        await run_io(os.unlink, tmp_path)
+        logger.info(f"Upload rejected by preflight ({preflight['elapsed_ms']}ms): {filename}: {preflight['errors']}")
+        raise HTTPException(status_code=400, detail=" / ".join(preflight["errors"][:3]))
+    return preflight
+
 @app.post("/excel/upload-order-receipt")
 async def upload_order_receipt_file(
-    file: UploadFile = File(...),
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """Upload order receipt file for validation and merging"""
     try:
-        # Check file extension
-        if not file.filename.endswith(('.xlsx', '.xls')):
-            raise HTTPException(status_code=400, detail="Only Excel files are allowed")
+        # Stream the file part to a temp file (extension and format checked before the rest is read)
+        tmp_path, digest, filename = await spool_upload(request)
+        suffix = '.xls' if filename.endswith('.xls') else '.xlsx'
 
-        # Save uploaded file temporarily
-        suffix = '.xls' if file.filename.endswith('.xls') else '.xlsx'
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
+        # 헤더 행만 읽어서 양식이 다르면 전체 파싱 전에 거절
+        preflight = await preflight_upload(tmp_path, filename, [LAYOUT_ORDER])
 
-        # Read the order receipt file with original filename
-        result = sheet_manager.load_excel_file(tmp_path, original_filename=file.filename)
+        # 같은 파일을 다시 올리면 파싱/정렬 없이 이전 결과를 반환
+        cache_key = upload_cache.key_for_digest("order_receipt" + suffix, digest)
+        try:
+            receipt_data = await run_io(upload_cache.get, cache_key)
 
-        if not result["success"]:
-            os.unlink(tmp_path)
-            raise HTTPException(status_code=400, detail="Failed to read order receipt file")
-
-        # Get the first sheet data
-        receipt_data = result["sheets"][0]["data"]
-
-        # Clean up temp file
-        os.unlink(tmp_path)
-
-        # Sort data by: 건물명 → 층수 → 거래처명 (B열 기준)
-        import re
-
-        def extract_building(address):
-            """주소에서 건물명 추출"""
-            if not address:
-                return ""
-            address = str(address).strip()
-
-            # 건물명 패턴: "건물명 층수" 형식
-            match = re.search(r'^([가-힣a-zA-Z0-9\s]+?)(?:\s+[0-9B]+층|$)', address)
-            if match:
-                return match.group(1).strip()
-            return address.split()[0] if address else ""
-
-        def extract_floor(address):
-            """주소에서 층수 추출"""
-            if not address:
-                return 0
-            address = str(address).strip()
-
-            # 층수 패턴: "B2", "2층", "B2층" 등
-            match = re.search(r'(B)?(\d+)층?', address)
-            if match:
-                floor_num = int(match.group(2))
-                # 지하층은 음수로 처리
-                return -floor_num if match.group(1) else floor_num
-            return 0
-
-        # 헤더 행 분리 (첫 3행은 헤더)
-        header_rows = receipt_data[:3] if len(receipt_data) >= 3 else []
-        data_rows = receipt_data[3:] if len(receipt_data) > 3 else []
-
-        # 데이터 행 정렬: B열(공급처주소) 기준
-        data_rows.sort(key=lambda row: (
-            extract_building(row[1] if len(row) > 1 else ""),  # 1. 건물명
-            extract_floor(row[1] if len(row) > 1 else ""),     # 2. 층수
-            str(row[0] if len(row) > 0 else "")                 # 3. 거래처명(A열)
-        ))
-
-        # 헤더 + 정렬된 데이터 합치기
-        receipt_data = header_rows + data_rows
-
-        # Convert datetime objects in data to ISO format strings
-        receipt_data = convert_datetime_in_data(receipt_data)
+            if receipt_data is None:
+                # Read the order receipt file with original filename (first sheet only, in a worker process)
+                result = await run_cpu(parse_workbook, tmp_path, filename, 1)
+        finally:
+            # Clean up temp file
+            await run_io(os.unlink, tmp_path)
+
+        if receipt_data is None:
+            if not result["success"]:
+                raise HTTPException(status_code=400, detail="Failed to read order receipt file")
+
+            # Get the first sheet data
+            receipt_data = result["sheets"][0]["data"]
+
+            # 정렬: 건물명 → 층 → 호실 → 거래처명 → 상품코드 (B열 주소, 첫 3행은 헤더)
+            receipt_data, _ = sort_by_address(receipt_data, header_rows=3)
+
+            # Convert datetime objects in data to ISO format strings
+            receipt_data = convert_datetime_in_data(receipt_data)
+
+            await run_io(upload_cache.put, cache_key, receipt_data)
 
         # Return the receipt data for merging
-        return JSONResponse(content={
+        return await run_io(json_response, {
             "success": True,
             "data": receipt_data,
+            "preflight": preflight,
             "message": "주문 입고 파일이 검증되었습니다."
         })
 
@@ -933,82 +1166,47 @@ async def upload_order_receipt_file(
 
 @app.post("/excel/upload-receipt-slip")
 async def upload_receipt_slip_file(
-    file: UploadFile = File(...),
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """Upload receipt slip file (입고전표) for matching product codes and store names"""
     try:
-        # Check file extension
-        if not file.filename.endswith(('.xlsx', '.xls')):
-            raise HTTPException(status_code=400, detail="Only Excel files are allowed")
+        # Stream the file part to a temp file (extension and format checked before the rest is read)
+        tmp_path, digest, filename = await spool_upload(request)
+        suffix = '.xls' if filename.endswith('.xls') else '.xlsx'
 
-        # Save uploaded file temporarily
-        suffix = '.xls' if file.filename.endswith('.xls') else '.xlsx'
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
+        # 헤더 행만 읽어서 양식이 다르면 전체 파싱 전에 거절
+        preflight = await preflight_upload(tmp_path, filename, [LAYOUT_RECEIPT_SLIP])
 
-        # Read the receipt slip file with original filename
-        result = sheet_manager.load_excel_file(tmp_path, original_filename=file.filename)
+        # 같은 파일을 다시 올리면 파싱/정렬 없이 이전 결과를 반환
+        cache_key = upload_cache.key_for_digest("receipt_slip" + suffix, digest)
+        try:
+            receipt_slip_data = await run_io(upload_cache.get, cache_key)
 
-        if not result["success"]:
-            os.unlink(tmp_path)
-            raise HTTPException(status_code=400, detail="Failed to read receipt slip file")
-
-        # Get the first sheet data
-        receipt_slip_data = result["sheets"][0]["data"]
-
-        # Clean up temp file
-        os.unlink(tmp_path)
-
-        # Sort data by: 건물명 → 층수 → 거래처명 (B열 기준)
-        import re
-
-        def extract_building(address):
-            """주소에서 건물명 추출"""
-            if not address:
-                return ""
-            address = str(address).strip()
-
-            # 건물명 패턴: "건물명 층수" 형식
-            match = re.search(r'^([가-힣a-zA-Z0-9\s]+?)(?:\s+[0-9B]+층|$)', address)
-            if match:
-                return match.group(1).strip()
-            return address.split()[0] if address else ""
-
-        def extract_floor(address):
-            """주소에서 층수 추출"""
-            if not address:
-                return 0
-            address = str(address).strip()
-
-            # 층수 패턴: "B2", "2층", "B2층" 등
-            match = re.search(r'(B)?(\d+)층?', address)
-            if match:
-                floor_num = int(match.group(2))
-                # 지하층은 음수로 처리
-                return -floor_num if match.group(1) else floor_num
-            return 0
-
-        # 헤더 행 분리 (첫 3행은 헤더)
-        header_rows = receipt_slip_data[:3] if len(receipt_slip_data) >= 3 else []
-        data_rows = receipt_slip_data[3:] if len(receipt_slip_data) > 3 else []
-
-        # 데이터 행 정렬: B열(공급처주소) 기준
-        data_rows.sort(key=lambda row: (
-            extract_building(row[1] if len(row) > 1 else ""),  # 1. 건물명
-            extract_floor(row[1] if len(row) > 1 else ""),     # 2. 층수
-            str(row[0] if len(row) > 0 else "")                 # 3. 거래처명(A열)
-        ))
-
-        # 헤더 + 정렬된 데이터 합치기
-        receipt_slip_data = header_rows + data_rows
+            if receipt_slip_data is None:
+                # Read the receipt slip file with original filename (first sheet only, in a worker process)
+                result = await run_cpu(parse_workbook, tmp_path, filename, 1)
+        finally:
+            # Clean up temp file
+            await run_io(os.unlink, tmp_path)
+
+        if receipt_slip_data is None:
+            if not result["success"]:
+                raise HTTPException(status_code=400, detail="Failed to read receipt slip file")
+
+            # Get the first sheet data
+            receipt_slip_data = result["sheets"][0]["data"]
+
+            # 정렬: 건물명 → 층 → 호실 → 거래처명 → 상품코드 (B열 주소, 첫 3행은 헤더)
+            receipt_slip_data, _ = sort_by_address(receipt_slip_data, header_rows=3)
+
+            await run_io(upload_cache.put, cache_key, receipt_slip_data)
 
         # Return the receipt slip data for processing
-        return JSONResponse(content={
+        return await run_io(json_response, {
             "success": True,
             "data": receipt_slip_data,
+            "preflight": preflight,
             "message": "입고전표가 성공적으로 업로드되었습니다."
         })
 
@@ -1018,140 +1216,105 @@ async def upload_receipt_slip_file(
         logger.error(f"Error processing receipt slip: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/excel/upload")
+@app.post("/excel/upload", status_code=202)
 async def upload_excel_file(
-    file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: User = Depends(get_current_user)
 ):
-    """Upload a new Excel file"""
+    """Upload a new Excel file
+
+    Only receives the file and checks its header rows; parsing, DB save and
+    client sync run as a background job. Poll GET /jobs/{job_id} for progress and the result.
+    """
     try:
-        # Check file extension
-        if not file.filename.endswith(('.xlsx', '.xls')):
-            raise HTTPException(status_code=400, detail="Only Excel files are allowed")
+        # Stream the file part to a temp file (extension and format checked before the rest is read)
+        tmp_path, digest, filename = await spool_upload(request)
+        suffix = '.xls' if filename.endswith('.xls') else '.xlsx'
 
-        # Save uploaded file temporarily
-        suffix = '.xls' if file.filename.endswith('.xls') else '.xlsx'
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
+        # 주문서 양식인지 헤더 행만 보고 먼저 확인 (통과해야 파싱 작업 시작)
+        preflight = await preflight_upload(tmp_path, filename, [LAYOUT_ORDER])
 
-        # Use sheet manager to load file with original filename
-        result = sheet_manager.load_excel_file(tmp_path, original_filename=file.filename)
+        job_id = job_store.create("excel_upload", current_user.username, filename=filename)
+        job_store.start(job_id, run_upload_job(job_id, tmp_path, digest, filename, suffix, current_user.username))
 
-        if not result["success"]:
-            # Clean up temporary file on error
-            os.unlink(tmp_path)
-            raise HTTPException(status_code=500, detail=result.get("error", "Unknown error"))
+        return {
+            "success": True,
+            "job_id": job_id,
+            "status": "queued",
+            "filename": filename,
+            "preflight": preflight
+        }
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# 업로드 시 바로 파싱해 주문 DB에 저장하는 앞쪽 시트 수 (나머지는 화면에서 열 때 파싱)
+UPLOAD_DB_SHEETS = 3
+
+async def run_upload_job(job_id: str, tmp_path: str, digest: str, filename: str,
+                         suffix: str, username: str) -> Dict[str, Any]:
+    """Upload pipeline (background job): parse → cache → save orders → sync clients"""
+    def progress(rows: int):
+        job_store.set_progress(job_id, rows)
+
+    # 같은 파일을 다시 올리면 이전 파싱 결과를 재사용
+    job_store.set_stage(job_id, "parsing")
+    cache_key = upload_cache.key_for_digest(f"upload{suffix}", digest)
+    cached = await run_io(upload_cache.get, cache_key)
+
+    # 앞쪽 UPLOAD_DB_SHEETS개 시트와 '거래처' 시트는 워커 프로세스에서 파싱
+    # ('거래처' 행도 캐시에 함께 두고, 캐시 적중이어도 거래처 동기화는 매번 실행)
+    parsed = cached
+    if cached is None:
+        try:
+            parsed = await run_cpu(parse_workbook, tmp_path, filename, UPLOAD_DB_SHEETS, '거래처')
+        except Exception:
+            await run_io(os.unlink, tmp_path)
+            raise
+        if not parsed["success"]:
+            await run_io(os.unlink, tmp_path)
+            raise Exception(parsed.get("error", "Unknown error"))
+    client_sheet = parsed.pop("extra_sheet", None)
+    progress(sum(sheet["rows"] for sheet in parsed["sheets"]))
+
+    # 업로드한 워크북은 sheet_manager가 보관하고 시트 목록만 반환 (임시 파일은 여기로 이동)
+    # (나머지 시트는 /excel/workbooks/{id}/sheets/{name} 요청 시 파싱)
+    result = await run_io(sheet_manager.open_workbook, tmp_path, original_filename=filename, parsed=parsed, user=username)
+
+    if not result["success"]:
+        raise Exception(result.get("error", "Unknown error"))
+
+    if cached is None:
+        job_store.set_stage(job_id, "caching")
+        entry = {k: v for k, v in result.items() if k != "workbook_id"}
+        if client_sheet:
+            entry["extra_sheet"] = client_sheet
+        await run_io(upload_cache.put, cache_key, entry)
+
+    db = SessionLocal()
+    try:
         # Save to database
         if result.get("sheets"):
-            save_order_data_to_db(result["sheets"], tmp_path, db)
+            job_store.set_stage(job_id, "saving_orders", rows_total=sum(len(sheet["data"]) - 1 for sheet in result["sheets"]))
+            if not await run_io(save_order_data_to_db, result["sheets"], tmp_path, db, progress):
+                job_store.add_error(job_id, "주문 데이터 DB 저장 실패")
 
         # 거래처 시트 자동 감지 및 저장
         try:
-            # 파일을 다시 읽어서 '거래처' 시트 찾기
-            df_dict = pd.read_excel(tmp_path, sheet_name=None, engine='openpyxl')
-
-            client_sheet_name = None
-            for sheet_name in df_dict.keys():
-                if '거래처' in sheet_name:
-                    client_sheet_name = sheet_name
-                    break
-
-            if client_sheet_name:
-                df = df_dict[client_sheet_name]
-
-                # 컬럼명 매핑
-                column_mapping = {
-                    'Code': 'code',
-                    '업체명': 'company_name',
-                    '아이디': 'user_id',
-                    '담당MD': 'manager_md',
-                    '대표이사': 'ceo_name',
-                    '사업자등록번호': 'business_number',
-                    '업태': 'business_type',
-                    '업종': 'business_category',
-                    '추가코드1': 'additional_code1',
-                    '추가코드2': 'additional_code2',
-                    '담당자명': 'contact_person',
-                    '우편번호': 'postal_code',
-                    '주소': 'address',
-                    '상세주소': 'address_detail',
-                    '연락처': 'phone',
-                    '휴대폰번호': 'mobile',
-                    '이메일': 'email',
-                    '비고': 'notes',
-                    '그룹': 'group_name',
-                    '계좌번호': 'account_number',
-                    '은행': 'bank_name',
-                    '예금주': 'account_holder',
-                    '잔': 'balance',
-                    '사입서비스사용': 'use_purchase_service',
-                    '입고대기자동계산': 'auto_calculate_receipt',
-                    '사용안함': 'is_disabled'
-                }
-
-                updated_count = 0
-                created_count = 0
-                error_count = 0
-
-                for _, row in df.iterrows():
-                    try:
-                        # Code가 없으면 스킵
-                        if pd.isna(row.get('Code')) or str(row.get('Code')).strip() == '':
-                            continue
-
-                        code = str(row.get('Code')).strip()
-                        company_name = str(row.get('업체명', '')).strip()
-
-                        if not company_name:
-                            continue
-
-                        # 기존 거래처 찾기
-                        existing_client = db.query(Client).filter(Client.code == code).first()
-
-                        # 데이터 준비
-                        client_data = {
-                            'code': code,
-                            'company_name': company_name
-                        }
-
-                        # 나머지 필드 매핑
-                        for excel_col, db_field in column_mapping.items():
-                            if excel_col in df.columns and db_field not in ['code', 'company_name']:
-                                value = row.get(excel_col)
-                                if pd.notna(value):
-                                    if db_field in ['balance', 'use_purchase_service', 'auto_calculate_receipt', 'is_disabled']:
-                                        client_data[db_field] = int(value) if value != '' else 0
-                                    else:
-                                        client_data[db_field] = str(value).strip()
-
-                        if existing_client:
-                            # 업데이트
-                            for key, value in client_data.items():
-                                setattr(existing_client, key, value)
-                            existing_client.updated_at = datetime.now()
-                            updated_count += 1
-                        else:
-                            # 새로 생성
-                            new_client = Client(**client_data, created_by=current_user.username)
-                            db.add(new_client)
-                            created_count += 1
-
-                        # 각 행마다 커밋 (중복 오류 방지)
-                        db.commit()
-                        db.expire_all()  # 세션 갱신하여 최신 데이터 반영
+            if client_sheet:
+                client_sheet_name = client_sheet["sheet_name"]
+                job_store.set_stage(job_id, "syncing_clients", rows_total=max(len(client_sheet["rows"]) - 1, 0))
+                counts = await run_io(sync_clients_from_rows, client_sheet["rows"], db, username, progress)
+                created_count = counts["created"]
+                updated_count = counts["updated"]
 
-                    except Exception as row_error:
-                        db.rollback()
-                        error_count += 1
-                        logger.warning(f"Error processing client row with code {code}: {str(row_error)}")
-                        continue
+                if counts["errors"]:
+                    job_store.add_error(job_id, f"거래처 {counts['errors']}건 처리 실패")
 
                 if created_count > 0 or updated_count > 0:
-                    logger.info(f"Client data auto-uploaded from '{client_sheet_name}': {created_count} created, {updated_count} updated by {current_user.username}")
+                    logger.info(f"Client data auto-uploaded from '{client_sheet_name}': {created_count} created, {updated_count} updated by {username}")
                     result["client_update"] = {
                         "success": True,
                         "created": created_count,
@@ -1161,24 +1324,194 @@ async def upload_excel_file(
         except Exception as e:
             # 거래처 처리 실패는 로그만 남기고 전체 업로드는 성공 처리
             logger.error(f"Error processing client sheet: {str(e)}")
+            job_store.add_error(job_id, f"거래처 처리 실패: {str(e)}")
             result["client_update"] = {
                 "success": False,
                 "error": str(e)
             }
+    finally:
+        await run_io(db.close)
 
-        # Clean up temporary file
-        os.unlink(tmp_path)
+    result["filename"] = filename
+    return result
 
-        result["filename"] = file.filename
-        return result
+@app.get("/jobs/{job_id}")
+def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Background job status: stage, rows processed, errors and (once done) the result"""
+    job = job_store.get(job_id)
+    if job is None or job["user"] != current_user.username:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return json_response({
+        "success": True,
+        "job": job
+    })
+
+def sheet_view_response(source: tuple, version: Any, sheet: Sheet, query: SheetViewQuery,
+                        checked_rows: Optional[Dict[Any, bool]] = None, hide_checked: bool = False):
+    """Run a view query on a sheet and return the window (400 on a bad query)"""
+    try:
+        view = sheet_views.query(
+            source, version, sheet,
+            offset=query.offset, limit=query.limit, columns=query.columns,
+            sort=[s.model_dump() for s in query.sort],
+            filters=[f.model_dump() for f in query.filters],
+            checked_rows=query.checked_rows if query.checked_rows is not None else checked_rows,
+            hide_checked=query.hide_checked if query.hide_checked is not None else hide_checked
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response({"success": True, "version": version, **view})
+
+@app.get("/excel/workbooks/{workbook_id}/sheets/{sheet_name}")
+def get_workbook_sheet(
+    workbook_id: str,
+    sheet_name: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Load one sheet of an uploaded workbook (parsed on first request, then cached)"""
+    try:
+        sheet = sheet_manager.load_sheet(workbook_id, sheet_name, current_user.username)
+        return json_response({
+            "success": True,
+            "workbook_id": workbook_id,
+            "sheet": sheet,
+            "version": sheet.get("version", 0)
+        })
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-    except HTTPException:
-        raise
+@app.post("/excel/workbooks/{workbook_id}/sheets/{sheet_name}/rows")
+def query_workbook_sheet_rows(
+    workbook_id: str,
+    sheet_name: str,
+    query: SheetViewQuery,
+    current_user: User = Depends(get_current_user)
+):
+    """One window of rows of an uploaded workbook's sheet (filtered, sorted, projected)"""
+    try:
+        sheet_data = sheet_manager.load_sheet(workbook_id, sheet_name, current_user.username)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    sheet = sheet_data["data"]
+    if not isinstance(sheet, Sheet):
+        sheet = sheet_data["data"] = Sheet.from_rows(sheet)
+    return sheet_view_response(("workbook", workbook_id, sheet_name), sheet_data.get("version", 0), sheet, query)
+
+@app.patch("/excel/workbooks/{workbook_id}/sheets/{sheet_name}")
+def patch_workbook_sheet_cells(
+    workbook_id: str,
+    sheet_name: str,
+    patch: SheetCellPatch,
+    current_user: User = Depends(get_current_user)
+):
+    """Apply cell edits to a sheet (only the changed cells are sent and stored)
+
+    base_version must be the version the client last saw; the response
+    carries the new version for the next patch and the P열 / row 3 sum
+    cells recalculated from the edits (derived).
+    """
+    if len(patch.edits) > MAX_CELL_EDITS:
+        raise HTTPException(status_code=400, detail=f"Too many edits (max {MAX_CELL_EDITS})")
+    try:
+        version, derived = sheet_manager.apply_cell_edits(
+            workbook_id, sheet_name, patch.base_version,
+            [(edit.row, edit.col, edit.value) for edit in patch.edits],
+            current_user.username
+        )
+        return {
+            "success": True,
+            "workbook_id": workbook_id,
+            "sheet_name": sheet_name,
+            "version": version,
+            "applied": len(patch.edits),
+            "derived": [{"row": row, "col": col, "value": value} for row, col, value in derived]
+        }
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except SheetVersionConflict as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "version": e.current_version})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/excel/sort-by-address")
+def sort_sheet_by_address(
+    request: AddressSortRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """시트 행을 건물명 → 층 → 호실 → 거래처명 → 상품코드 순으로 정렬 (SORTING_RULES.md)
+
+    order[i]는 i번째 결과 행의 원래 행 번호 (행 색상/체크 상태 이동용)
+    """
+    if request.header_rows < 0 or request.address_col < 0 or any(col < 0 for col in request.tie_columns):
+        raise HTTPException(status_code=400, detail="Invalid header_rows or column")
+    data, order = sort_by_address(request.data, request.header_rows, request.address_col, request.tie_columns)
+    return json_response({
+        "success": True,
+        "data": data,
+        "order": order
+    })
+
+@app.post("/excel/merge-order-receipt")
+def merge_order_receipt_data(
+    request: OrderReceiptMergeRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """주문입고의 J~N, Q열을 같은 (거래처명, 상품코드, 수량) 주문서 행에 병합
+
+    같은 키의 입고 행은 위에서부터 한 번씩 사용 (consume_duplicates=false면 항상 첫 행)
+    """
+    result = merge_order_receipt(request.original_data, request.receipt_data, request.consume_duplicates)
+    if request.suggestions:
+        result.update(match_suggestions(request.original_data, request.receipt_data, result["unmatched_rows"],
+                                        "order", request.suggestions, request.suggest_budget_ms))
+    return json_response({"success": True, **result})
+
+@app.post("/excel/merge-receipt-slip")
+def merge_receipt_slip_data(
+    request: ReceiptSlipMergeRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """입고전표 O열(입고수량)을 같은 상품코드의 주문서 행에 병합"""
+    result = merge_receipt_slip(request.current_data, request.slip_data, request.consume_duplicates)
+    if request.suggestions:
+        result.update(match_suggestions(request.current_data, request.slip_data, result["unmatched_rows"],
+                                        "slip", request.suggestions, request.suggest_budget_ms))
+    if request.classify:
+        # 정렬하면 행 번호가 바뀌므로 제안/실패 행 번호는 정렬 전 기준
+        classified = prepare_receipt_sheet(result["merged_data"])
+        result["merged_data"] = classified.pop("data")
+        result.update(classified)
+    return json_response({"success": True, **result})
+
+def match_suggestions(data: List[List[Any]], receipt_data: List[List[Any]], rows: List[int],
+                      kind: str, top_k: int, budget_ms: int) -> Dict[str, Any]:
+    """suggest_matches with bad parameters as 400"""
+    try:
+        return suggest_matches(data, receipt_data, rows, kind, top_k, budget_ms)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/excel/suggest-matches")
+def suggest_receipt_matches(
+    request: MatchSuggestionRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """매칭 실패 행마다 비슷한 입고 행 top-k (시간 예산 안에서, 남은 행은 pending_rows)"""
+    result = match_suggestions(request.data, request.receipt_data, request.rows,
+                               request.kind, request.top_k, request.budget_ms)
+    return json_response({"success": True, **result})
 
 @app.put("/excel/update")
-async def update_excel_data(
+def update_excel_data(
     sheet_data: SheetData,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -1212,7 +1545,7 @@ async def update_excel_data(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/excel/cached")
-async def get_cached_sheets(current_user: User = Depends(get_current_user)):
+def get_cached_sheets(current_user: User = Depends(get_current_user)):
     """Get list of cached sheets"""
     try:
         cached = sheet_manager.get_cached_sheets()
@@ -1259,7 +1592,8 @@ async def export_excel(
 ):
     """Export data to Excel file"""
     try:
-        output_file = sheet_manager.export_to_excel(
+        output_file = await run_cpu(
+            excel_render.export_to_excel,
             data=export_data.data,
             columns=export_data.columns,
             file_name=export_data.file_name,
@@ -1269,7 +1603,7 @@ async def export_excel(
         # Return file as download
         return FileResponse(
             path=output_file,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            media_type=XLSX_MEDIA_TYPE,
             filename=os.path.basename(output_file)
         )
 
@@ -1277,7 +1611,7 @@ async def export_excel(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/orders/statistics")
-async def get_order_statistics(
+def get_order_statistics(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -1332,7 +1666,7 @@ async def get_order_statistics(
 
 # Daily Order Management Endpoints
 @app.post("/daily-orders/save")
-async def save_daily_order(
+def save_daily_order(
     order_data: SaveDailyOrderData,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -1429,7 +1763,7 @@ async def save_daily_order(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/daily-orders/list")
-async def get_daily_orders(
+def get_daily_orders(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     order_type: Optional[str] = None,
@@ -1471,7 +1805,7 @@ async def get_daily_orders(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/daily-orders/{order_id}")
-async def get_daily_order(
+def get_daily_order(
     order_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -1483,7 +1817,7 @@ async def get_daily_order(
         if not order:
             raise HTTPException(status_code=404, detail="주문서를 찾을 수 없습니다")
 
-        return {
+        return json_response({
             "success": True,
             "order": {
                 "id": order.id,
@@ -1497,14 +1831,34 @@ async def get_daily_order(
                 "created_by": order.created_by,
                 "notes": order.notes
             }
-        }
+        })
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/daily-orders/{order_id}/rows")
+def query_daily_order_rows(
+    order_id: int,
+    query: SheetViewQuery,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """특정 일별 주문서의 행 일부 조회 (필터/정렬/열 선택)"""
+    order = db.query(DailyOrder.updated_at).filter(DailyOrder.id == order_id).first()
+    if not order:
+        raise HTTPException(status_code=404, detail="주문서를 찾을 수 없습니다")
+
+    # JSON 데이터는 버전(updated_at)마다 한 번만 읽음
+    def load_rows():
+        return db.query(DailyOrder.data).filter(DailyOrder.id == order_id).scalar()
+
+    version = order.updated_at.isoformat() if order.updated_at else None
+    sheet = sheet_views.materialize(("daily_order", order_id), version, load_rows)
+    return sheet_view_response(("daily_order", order_id), version, sheet, query)
+
 @app.delete("/daily-orders/{order_id}")
-async def delete_daily_order(
+def delete_daily_order(
     order_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -1527,106 +1881,22 @@ async def delete_daily_order(
 @app.get("/daily-orders/{order_id}/download")
 async def download_daily_order(
     order_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """일별 주문서를 엑셀 파일로 다운로드"""
     try:
-        order = db.query(DailyOrder).filter(DailyOrder.id == order_id).first()
+        order = await run_io(in_session, lambda db: db.query(DailyOrder).filter(DailyOrder.id == order_id).first())
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
 
-        # 워크북 생성
-        wb = Workbook()
-        ws = wb.active
-        ws.title = order.sheet_name
-
-        # 스타일 정의
-        header_fill = PatternFill(start_color="CCE5FF", end_color="CCE5FF", fill_type="solid")
-        orange_fill = PatternFill(start_color="FFF3E0", end_color="FFF3E0", fill_type="solid")
-        blue_fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-        green_fill = PatternFill(start_color="E8F5E9", end_color="E8F5E9", fill_type="solid")
-        red_font = Font(color="FF0000", bold=True)
-
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-
-        # 데이터 쓰기
-        data = order.data
-        if data:
-            for row_idx, row_data in enumerate(data, start=1):
-                for col_idx, value in enumerate(row_data, start=1):
-                    # P열(16번 컬럼)은 무조건 재계산
-                    if col_idx == 16 and row_idx > 2:  # 헤더 이후 행에서만 처리
-                        # L, M, N열 값 가져오기 (인덱스 11, 12, 13)
-                        try:
-                            l_val = row_data[11] if len(row_data) > 11 else 0
-                            m_val = row_data[12] if len(row_data) > 12 else 0
-                            n_val = row_data[13] if len(row_data) > 13 else 0
-                            o_val = row_data[14] if len(row_data) > 14 else 0
-
-                            # 숫자로 변환 (빈 값이나 None은 0으로)
-                            l_num = float(l_val) if l_val not in [None, "", " "] else 0
-                            m_num = float(m_val) if m_val not in [None, "", " "] else 0
-                            n_num = float(n_val) if n_val not in [None, "", " "] else 0
-                            o_num = float(o_val) if o_val not in [None, "", " "] else 0
-
-                            lmn_sum = l_num + m_num + n_num
-
-                            # 합계와 O열 값이 다르면 "차이 있음", 같으면 빈칸
-                            if lmn_sum != o_num:
-                                cell = ws.cell(row=row_idx, column=col_idx, value="차이 있음")
-                                cell.font = red_font
-                            else:
-                                cell = ws.cell(row=row_idx, column=col_idx, value="")
-                        except (ValueError, TypeError, IndexError) as e:
-                            # 변환 실패 시 빈칸
-                            logger.warning(f"P열 계산 실패 row={row_idx}: {e}")
-                            cell = ws.cell(row=row_idx, column=col_idx, value="")
-                    else:
-                        cell = ws.cell(row=row_idx, column=col_idx, value=value)
-
-                    # 테두리 추가
-                    cell.border = thin_border
-
-                    # 헤더 행 스타일
-                    if row_idx <= 2:
-                        cell.fill = header_fill
-                        cell.font = Font(bold=True)
-                        cell.alignment = Alignment(horizontal='center', vertical='center')
-                    # 데이터 행 색상 적용
-                    elif row_idx > 2:
-                        # 색상 적용 (L, M, N열: 12, 13, 14)
-                        if 12 <= col_idx <= 14:
-                            cell.fill = orange_fill
-                        # O, P열: 15, 16
-                        elif 15 <= col_idx <= 16:
-                            cell.fill = blue_fill
-                        # Q~W열: 17~23
-                        elif 17 <= col_idx <= 23:
-                            cell.fill = green_fill
-
-        # 열 너비 자동 조정
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-        # 메모리에 저장
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
+        # 엑셀 렌더링은 워커 프로세스에서 임시 파일로, 응답은 파일을 조각씩 전송한 뒤 삭제
+        tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
+        tmp_file.close()
+        try:
+            await run_cpu(excel_render.render_daily_order, order.sheet_name, order.data, tmp_file.name)
+        except Exception:
+            await run_io(os.unlink, tmp_file.name)
+            raise
 
         # 파일명 생성
         order_type_name = {
@@ -1638,12 +1908,13 @@ async def download_daily_order(
         filename = f"{order.date}_{order_type_name}_{order.sheet_name}.xlsx"
         encoded_filename = quote(filename)
 
-        return StreamingResponse(
-            io.BytesIO(output.getvalue()),
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        return FileResponse(
+            tmp_file.name,
+            media_type=XLSX_MEDIA_TYPE,
             headers={
                 "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
-            }
+            },
+            background=BackgroundTask(os.unlink, tmp_file.name)
         )
     except Exception as e:
         logger.error(f"Error downloading daily order {order_id}: {str(e)}")
@@ -1654,7 +1925,7 @@ async def download_daily_order(
 # ==========================================
 
 @app.post("/work-drafts/save")
-async def save_work_draft(
+def save_work_draft(
     draft_data: WorkDraftData,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -1730,7 +2001,7 @@ async def save_work_draft(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/work-drafts/load")
-async def load_work_draft(
+def load_work_draft(
     draft_type: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -1751,7 +2022,7 @@ async def load_work_draft(
                 "message": "저장된 작업이 없습니다"
             }
 
-        return {
+        return json_response({
             "success": True,
             "has_draft": True,
             "draft": {
@@ -1771,14 +2042,49 @@ async def load_work_draft(
                 "updated_at": draft.updated_at.isoformat(),
                 "expires_at": draft.expires_at.isoformat()
             }
-        }
+        })
 
     except Exception as e:
         logger.error(f"Error loading work draft: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/work-drafts/rows")
+def query_work_draft_rows(
+    draft_type: str,
+    query: SheetViewQuery,
+    sheet_index: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """작업 중간 저장 시트의 행 일부 조회 (기본: 선택된 시트, 저장된 체크/숨김 상태 적용)"""
+    draft = db.query(
+        WorkDraft.id, WorkDraft.updated_at, WorkDraft.selected_sheet,
+        WorkDraft.checked_rows, WorkDraft.hide_checked
+    ).filter(
+        WorkDraft.user == current_user.username,
+        WorkDraft.draft_type == draft_type,
+        WorkDraft.expires_at > datetime.now()
+    ).order_by(WorkDraft.updated_at.desc()).first()
+
+    if not draft:
+        raise HTTPException(status_code=404, detail="저장된 작업이 없습니다")
+
+    index = sheet_index if sheet_index is not None else (draft.selected_sheet or 0)
+
+    def load_rows():
+        sheets = db.query(WorkDraft.sheets_data).filter(WorkDraft.id == draft.id).scalar() or []
+        if not 0 <= index < len(sheets):
+            raise HTTPException(status_code=404, detail="시트를 찾을 수 없습니다")
+        return sheets[index].get("data") or []
+
+    version = draft.updated_at.isoformat() if draft.updated_at else None
+    source = ("work_draft", draft.id, index)
+    sheet = sheet_views.materialize(source, version, load_rows)
+    return sheet_view_response(source, version, sheet, query,
+                               checked_rows=draft.checked_rows or {}, hide_checked=bool(draft.hide_checked))
+
 @app.delete("/work-drafts/delete")
-async def delete_work_draft(
+def delete_work_draft(
     draft_type: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -1809,7 +2115,7 @@ async def delete_work_draft(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/work-drafts/cleanup-expired")
-async def cleanup_expired_drafts(
+def cleanup_expired_drafts(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -1840,9 +2146,40 @@ class PaymentDataRequest(BaseModel):
     columns: List[str]
     created_by: Optional[str] = None
 
+# 입금 내역에 숫자로 저장하는 열: (열, 이름, 정수만 허용)
+PAYMENT_NUMBER_COLUMNS = ((7, "H열(원가)", False), (14, "O열(입고수량)", True), (19, "T열(입금액)", False))
+# 400 응답에 나열하는 잘못된 셀 수
+MAX_REPORTED_CELLS = 20
+
+def payment_numbers(data: List[List[Any]]) -> Dict[int, np.ndarray]:
+    """원가/입고수량/입금액 열을 float64로 (빈 칸은 0)
+
+    거래처명이 있는 행에 숫자가 아닌 값("abc", "1,000", inf)이나 정수가 아닌
+    입고수량("3.9")이 있으면 해당 셀을 나열해 400으로 거부합니다.
+    """
+    sheet = Sheet.from_rows(data)
+    numbers = {col: sheet.numeric(col, blank=0.0) for col, _, _ in PAYMENT_NUMBER_COLUMNS}
+    rows = np.array([i for i in range(4, len(data)) if data[i] and data[i][0]], dtype=np.int64)
+
+    invalid = []
+    for col, label, whole in PAYMENT_NUMBER_COLUMNS:
+        values = numbers[col][rows]
+        bad = ~np.isfinite(values)
+        if whole:
+            bad |= np.isfinite(values) & (values != np.trunc(values))
+        invalid += [(int(i), col, label) for i in rows[bad]]
+
+    if invalid:
+        invalid.sort()
+        cells = [f"행 {i + 1} {label} {data[i][col]!r}" for i, col, label in invalid[:MAX_REPORTED_CELLS]]
+        more = f" 외 {len(invalid) - MAX_REPORTED_CELLS}개" if len(invalid) > MAX_REPORTED_CELLS else ""
+        raise HTTPException(status_code=400, detail=f"숫자로 저장할 수 없는 값이 있습니다: {', '.join(cells)}{more}")
+    return numbers
+
 @app.post("/payments/save")
-async def save_payment_data(
+def save_payment_data(
     request: PaymentDataRequest,
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """입금 내역 저장 - 중복 제거 후 체크된 항목을 일자별로 누적 저장"""
@@ -1850,20 +2187,20 @@ async def save_payment_data(
         from datetime import datetime
         from database import PaymentRecord
 
-        payment_date = datetime.strptime(request.payment_date, "%Y-%m-%d").date()
+        payment_date = parse_date(request.payment_date)
         saved_count = 0
         skipped_count = 0
 
+        # 원가(H)/입고수량(O)/입금액(T)은 시트의 숫자 열에서 한 번에 변환 (잘못된 값이 있으면 아무것도 저장하지 않음)
+        numbers = payment_numbers(request.data)
+        unit_prices, receipt_qtys, payment_amounts = (numbers[col] for col, _, _ in PAYMENT_NUMBER_COLUMNS)
+
         # 헤더 4행 추출 (인덱스 0-3)
         header_rows = request.data[:4] if len(request.data) >= 4 else []
 
-        # 헤더를 sheet_manager에 저장하여 나중에 불러올 수 있도록 함
-        if header_rows and sheet_manager.loaded_sheets:
-            for sheet_key, sheet_data in sheet_manager.loaded_sheets.items():
-                if 'data' in sheet_data:
-                    # 기존 시트 데이터의 헤더 4행을 현재 헤더로 업데이트
-                    sheet_data['data'][:4] = header_rows
-                    break
+        # 헤더를 사용자 작업 공간에 저장하여 나중에 불러올 수 있도록 함 (시트 데이터는 그대로)
+        if header_rows:
+            sheet_manager.set_header_rows(current_user.username, header_rows)
 
         # 해당 날짜의 기존 입금 내역 조회
         existing_payments = db.query(PaymentRecord).filter(
@@ -1928,7 +2265,7 @@ async def save_payment_data(
             product_code = str(row[4]) if len(row) > 4 and row[4] else None
             product_name = str(row[5]) if len(row) > 5 and row[5] else None
             product_option = str(row[6]) if len(row) > 6 and row[6] else None
-            receipt_qty = int(row[14]) if len(row) > 14 and row[14] else 0
+            receipt_qty = int(receipt_qtys[i])
 
             new_key = create_payment_key(
                 company_name,
@@ -1950,9 +2287,9 @@ async def save_payment_data(
                 product_code=product_code,
                 product_name=product_name,
                 product_option=product_option,
-                unit_price=float(row[7]) if len(row) > 7 and row[7] else 0.0,  # H열: 원가
+                unit_price=float(unit_prices[i]),  # H열: 원가
                 receipt_qty=receipt_qty,
-                payment_amount=float(row[19]) if len(row) > 19 and row[19] else 0.0,  # T열: 입금액
+                payment_amount=float(payment_amounts[i]),  # T열: 입금액
                 original_data=row,  # 전체 행 데이터 저장
                 created_by=request.created_by
             )
@@ -1975,13 +2312,15 @@ async def save_payment_data(
             "payment_date": request.payment_date
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         logger.error(f"Error saving payment data: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/payments/delete")
-async def delete_payment_records(
+def delete_payment_records(
     payment_ids: List[int],
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
@@ -2011,7 +2350,7 @@ async def delete_payment_records(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/payments/delete-all")
-async def delete_all_payment_records(
+def delete_all_payment_records(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -2034,7 +2373,7 @@ async def delete_all_payment_records(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/payments/date/{payment_date}")
-async def get_payments_by_date(
+def get_payments_by_date(
     payment_date: str,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
@@ -2044,7 +2383,7 @@ async def get_payments_by_date(
         from datetime import datetime
         from database import PaymentRecord
 
-        date_obj = datetime.strptime(payment_date, "%Y-%m-%d").date()
+        date_obj = parse_date(payment_date)
 
         payments = db.query(PaymentRecord).filter(
             PaymentRecord.payment_date == date_obj
@@ -2069,13 +2408,9 @@ async def get_payments_by_date(
                 header_rows = payment.original_data.get('header_rows', [])
                 break
 
-        # 2. 헤더가 없으면 sheet_manager에서 가져오기
-        if not header_rows and sheet_manager.loaded_sheets:
-            first_sheet = list(sheet_manager.loaded_sheets.values())[0]
-            if first_sheet and 'data' in first_sheet:
-                sheet_data = first_sheet['data']
-                if len(sheet_data) >= 4:
-                    header_rows = sheet_data[:4]
+        # 2. 헤더가 없으면 사용자 작업 공간에서 가져오기
+        if not header_rows:
+            header_rows = sheet_manager.get_header_rows(current_user.username)
 
         # 헤더 레코드 제외하고 실제 데이터만 반환
         actual_payments = [p for p in payments if not (isinstance(p.original_data, dict) and p.original_data.get('_is_header'))]
@@ -2109,7 +2444,7 @@ async def get_payments_by_date(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/payments/range")
-async def get_payments_by_range(
+def get_payments_by_range(
     start: str,
     end: str,
     db: Session = Depends(get_db)
@@ -2119,8 +2454,8 @@ async def get_payments_by_range(
         from datetime import datetime
         from database import PaymentRecord
 
-        start_date = datetime.strptime(start, "%Y-%m-%d").date()
-        end_date = datetime.strptime(end, "%Y-%m-%d").date()
+        start_date = parse_date(start)
+        end_date = parse_date(end)
 
         payments = db.query(PaymentRecord).filter(
             PaymentRecord.payment_date >= start_date,
@@ -2181,13 +2516,13 @@ class OrderRequest(BaseModel):
     items: list  # 발주 항목 리스트
 
 @app.post("/orders/save")
-async def save_order_records(request: OrderRequest, db: Session = Depends(get_db)):
+def save_order_records(request: OrderRequest, db: Session = Depends(get_db)):
     """발주 내역 저장 (교환/미송 등)"""
     try:
         from database import OrderRecord
         from datetime import datetime
 
-        order_date_obj = datetime.strptime(request.order_date, "%Y-%m-%d").date()
+        order_date_obj = parse_date(request.order_date)
         saved_count = 0
 
         for item in request.items:
@@ -2238,7 +2573,7 @@ async def save_order_records(request: OrderRequest, db: Session = Depends(get_db
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/orders/list")
-async def list_order_records(
+def list_order_records(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -2292,7 +2627,7 @@ async def list_order_records(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/orders/date/{date}")
-async def get_orders_by_date(
+def get_orders_by_date(
     date: str,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
@@ -2302,7 +2637,7 @@ async def get_orders_by_date(
         from database import OrderRecord
         from datetime import datetime
 
-        order_date = datetime.strptime(date, "%Y-%m-%d").date()
+        order_date = parse_date(date)
         orders = db.query(OrderRecord).filter(
             OrderRecord.order_date == order_date
         ).all()
@@ -2316,13 +2651,9 @@ async def get_orders_by_date(
                 header_rows = order.original_data.get('header_rows', [])
                 break
 
-        # 2. 헤더가 없으면 sheet_manager에서 가져오기
-        if not header_rows and sheet_manager.loaded_sheets:
-            first_sheet = list(sheet_manager.loaded_sheets.values())[0]
-            if first_sheet and 'data' in first_sheet:
-                sheet_data = first_sheet['data']
-                if len(sheet_data) >= 4:
-                    header_rows = sheet_data[:4]
+        # 2. 헤더가 없으면 사용자 작업 공간에서 가져오기
+        if not header_rows:
+            header_rows = sheet_manager.get_header_rows(current_user.username)
 
         # 헤더 레코드 제외하고 실제 데이터만 반환
         actual_orders = [o for o in orders if not (isinstance(o.original_data, dict) and o.original_data.get('_is_header'))]
@@ -2365,92 +2696,95 @@ class SaveFilesRequest(BaseModel):
     error_data: dict  # 오류 파일 데이터
     created_by: str
 
-@app.post("/files/save-three-files")
-async def save_three_files(request: SaveFilesRequest, db: Session = Depends(get_db)):
-    """입금관리로 보낼 때 3개 파일을 자동 저장"""
-    try:
-        from database import SavedFile
-        import os
+class ReceiptSplitSaveRequest(BaseModel):
+    """입금관리로 보낼 때: 시트 한 번 + 체크/색상 맵 (매칭/정상/오류는 서버에서 생성)"""
+    date: str  # MMDD 형식
+    data: List[List[Any]]
+    columns: List[str] = []
+    checked_rows: Dict[int, bool]
+    row_colors: Dict[int, str] = {}
+    row_text_colors: Dict[int, str] = {}
+    created_by: str
 
-        # 저장 디렉토리 생성
-        save_dir = "./saved_files"
-        os.makedirs(save_dir, exist_ok=True)
-
-        files_to_save = [
-            ("matched", f"{request.date}주문입고-매칭.xlsx", request.matched_data),
-            ("normal", f"{request.date}주문입고-정상.xlsx", request.normal_data),
-            ("error", f"{request.date}주문입고-오류.xlsx", request.error_data)
-        ]
-
-        saved_files = []
-
-        for file_type, file_name, file_data in files_to_save:
-            file_path = os.path.join(save_dir, file_name)
-
-            # 기존 파일이 있으면 삭제
-            existing = db.query(SavedFile).filter(
-                SavedFile.date == request.date,
-                SavedFile.file_type == file_type
-            ).first()
-
-            if existing:
-                if os.path.exists(existing.file_path):
-                    os.remove(existing.file_path)
-                db.delete(existing)
-                db.commit()
-
-            # 엑셀 파일 생성
-            from openpyxl import Workbook
-            from openpyxl.styles import PatternFill, Font
-
-            wb = Workbook()
-            ws = wb.active
-
-            data = file_data.get('data', [])
-            row_colors = file_data.get('row_colors', {})
-            row_text_colors = file_data.get('row_text_colors', {})
-
-            # 데이터 쓰기
-            for row_idx, row_data in enumerate(data):
-                for col_idx, cell_value in enumerate(row_data):
-                    cell = ws.cell(row=row_idx+1, column=col_idx+1, value=cell_value)
-
-                    # 행 색상 적용
-                    if str(row_idx) in row_colors:
-                        color = row_colors[str(row_idx)].replace('#', '')
-                        cell.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
-
-                    # 텍스트 색상 적용
-                    if str(row_idx) in row_text_colors:
-                        color = row_text_colors[str(row_idx)].replace('#', '')
-                        cell.font = Font(color=color)
-
-            wb.save(file_path)
-
-            # DB에 저장
-            new_file = SavedFile(
-                date=request.date,
-                file_type=file_type,
-                file_name=file_name,
-                file_path=file_path,
-                sheet_data=file_data.get('data', []),
-                columns=file_data.get('columns', []),
-                row_colors=row_colors,
-                row_text_colors=row_text_colors,
-                total_rows=len(file_data.get('data', [])),
-                created_by=request.created_by
-            )
+async def store_three_files(date: str, files: Dict[str, dict], created_by: str) -> List[Dict[str, Any]]:
+    """매칭/정상/오류 파일을 엑셀로 쓰고 SavedFile로 기록 (같은 날짜/종류는 교체)
+
+    DB 작업은 스레드에서 각자 세션을 열어 처리 (in_session)
+    """
+    from database import SavedFile
 
-            db.add(new_file)
+    def remove_existing(db: Session, file_type: str):
+        """같은 날짜/종류로 이미 저장된 파일이 있으면 삭제"""
+        existing = db.query(SavedFile).filter(
+            SavedFile.date == date,
+            SavedFile.file_type == file_type
+        ).first()
+
+        if existing:
+            if os.path.exists(existing.file_path):
+                os.remove(existing.file_path)
+            db.delete(existing)
             db.commit()
-            db.refresh(new_file)
 
-            saved_files.append({
-                "file_type": file_type,
-                "file_name": file_name,
-                "file_path": file_path,
-                "total_rows": new_file.total_rows
-            })
+    def add_saved_file(db: Session, new_file: SavedFile) -> SavedFile:
+        db.add(new_file)
+        db.commit()
+        db.refresh(new_file)
+        return new_file
+
+    # 저장 디렉토리 생성
+    save_dir = "./saved_files"
+    os.makedirs(save_dir, exist_ok=True)
+
+    saved_files = []
+    for file_type, suffix in (("matched", "매칭"), ("normal", "정상"), ("error", "오류")):
+        file_name = f"{date}주문입고-{suffix}.xlsx"
+        file_path = os.path.join(save_dir, file_name)
+        file_data = files[file_type]
+
+        # 기존 파일이 있으면 삭제
+        await run_io(in_session, lambda db: remove_existing(db, file_type))
+
+        data = file_data.get('data', [])
+        # 색상 키는 행 번호 문자열 ("0", "1", ...)
+        row_colors = {str(k): v for k, v in file_data.get('row_colors', {}).items()}
+        row_text_colors = {str(k): v for k, v in file_data.get('row_text_colors', {}).items()}
+
+        # 엑셀 파일 생성 (워커 프로세스에서)
+        await run_cpu(excel_render.write_colored_workbook, file_path, data, row_colors, row_text_colors)
+
+        # DB에 저장
+        new_file = SavedFile(
+            date=date,
+            file_type=file_type,
+            file_name=file_name,
+            file_path=file_path,
+            sheet_data=data,
+            columns=file_data.get('columns', []),
+            row_colors=row_colors,
+            row_text_colors=row_text_colors,
+            total_rows=len(data),
+            created_by=created_by
+        )
+        new_file = await run_io(in_session, lambda db: add_saved_file(db, new_file))
+
+        saved_files.append({
+            "file_type": file_type,
+            "file_name": file_name,
+            "file_path": file_path,
+            "total_rows": new_file.total_rows
+        })
+    return saved_files
+
+@app.post("/files/save-three-files")
+async def save_three_files(request: SaveFilesRequest):
+    """입금관리로 보낼 때 3개 파일을 자동 저장"""
+    try:
+        saved_files = await store_three_files(request.date, {
+            "matched": request.matched_data,
+            "normal": request.normal_data,
+            "error": request.error_data
+        }, request.created_by)
 
         return {
             "success": True,
@@ -2460,11 +2794,38 @@ async def save_three_files(request: SaveFilesRequest, db: Session = Depends(get_
 
     except Exception as e:
         logger.error(f"Error saving three files: {str(e)}")
-        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/files/save-receipt-split")
+async def save_receipt_split(
+    request: ReceiptSplitSaveRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """체크된 행으로 매칭/정상/오류 시트를 만들어 저장, 정상/오류 시트 반환"""
+    try:
+        # 정렬/분류는 가벼워서 시트를 워커 프로세스로 복사하지 않고 스레드에서
+        split = await run_io(split_receipt_sheet, request.data, request.checked_rows,
+                             request.row_colors, request.row_text_colors)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    files = {file_type: dict(sheet, columns=request.columns) for file_type, sheet in split.items()}
+    try:
+        saved_files = await store_three_files(request.date, files, request.created_by)
+    except Exception as e:
+        logger.error(f"Error saving receipt split: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return await run_io(json_response, {
+        "success": True,
+        "message": "3개 파일이 모두 저장되었습니다",
+        "files": saved_files,
+        "normal_data": split["normal"],
+        "error_data": split["error"]
+    })
+
 @app.get("/files/list")
-async def list_saved_files(db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
+def list_saved_files(db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
     """저장된 파일 목록 조회 (날짜별로 그룹화)"""
     try:
         from database import SavedFile
@@ -2502,7 +2863,7 @@ async def list_saved_files(db: Session = Depends(get_db), current_user: dict = D
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/files/view/{file_id}")
-async def view_saved_file(file_id: int, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
+def view_saved_file(file_id: int, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
     """저장된 파일 데이터 조회"""
     try:
         from database import SavedFile
@@ -2512,7 +2873,7 @@ async def view_saved_file(file_id: int, db: Session = Depends(get_db), current_u
         if not file:
             raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
 
-        return {
+        return json_response({
             "success": True,
             "data": {
                 "file_name": file.file_name,
@@ -2525,7 +2886,7 @@ async def view_saved_file(file_id: int, db: Session = Depends(get_db), current_u
                 "total_rows": file.total_rows,
                 "created_at": file.created_at.isoformat() if file.created_at else None
             }
-        }
+        })
 
     except HTTPException:
         raise
@@ -2533,8 +2894,29 @@ async def view_saved_file(file_id: int, db: Session = Depends(get_db), current_u
         logger.error(f"Error viewing saved file: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/files/view/{file_id}/rows")
+def query_saved_file_rows(
+    file_id: int,
+    query: SheetViewQuery,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """저장된 파일 데이터의 행 일부 조회 (필터/정렬/열 선택)"""
+    from database import SavedFile
+
+    file = db.query(SavedFile.updated_at).filter(SavedFile.id == file_id).first()
+    if not file:
+        raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
+
+    def load_rows():
+        return db.query(SavedFile.sheet_data).filter(SavedFile.id == file_id).scalar()
+
+    version = file.updated_at.isoformat() if file.updated_at else None
+    sheet = sheet_views.materialize(("saved_file", file_id), version, load_rows)
+    return sheet_view_response(("saved_file", file_id), version, sheet, query)
+
 @app.get("/files/download/{file_id}")
-async def download_saved_file(file_id: int, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
+def download_saved_file(file_id: int, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
     """저장된 파일 다운로드"""
     try:
         from database import SavedFile
@@ -2550,7 +2932,7 @@ async def download_saved_file(file_id: int, db: Session = Depends(get_db), curre
         return FileResponse(
             path=file.file_path,
             filename=file.file_name,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            media_type=XLSX_MEDIA_TYPE
         )
 
     except HTTPException:
@@ -2564,7 +2946,7 @@ async def download_saved_file(file_id: int, db: Session = Depends(get_db), curre
 # ============================================
 
 @app.delete("/admin/payments/clear-all")
-async def admin_clear_all_payments(
+def admin_clear_all_payments(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -2589,7 +2971,7 @@ async def admin_clear_all_payments(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/admin/files/clear-all")
-async def admin_clear_all_files(
+def admin_clear_all_files(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -2631,7 +3013,7 @@ async def admin_clear_all_files(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/admin/orders/clear-all")
-async def admin_clear_all_orders(
+def admin_clear_all_orders(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -2656,7 +3038,7 @@ async def admin_clear_all_orders(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/admin/stats")
-async def admin_get_stats(
+def admin_get_stats(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -2683,6 +3065,53 @@ async def admin_get_stats(
         logger.error(f"Error getting admin stats: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/admin/upload-cache/stats")
+async def admin_get_upload_cache_stats(
+    current_user: dict = Depends(get_current_user)
+):
+    """[관리자] 업로드 파싱 캐시 적중/미스 통계"""
+    return {
+        "success": True,
+        "stats": upload_cache.stats()
+    }
+
+@app.get("/admin/loaded-sheets/stats")
+async def admin_get_loaded_sheets_stats(
+    current_user: dict = Depends(get_current_user)
+):
+    """[관리자] 메모리에 올라온 시트 캐시 크기/제거 통계 (사용자별 포함)"""
+    return {
+        "success": True,
+        "stats": sheet_manager.loaded_sheets.stats(),
+        "views": sheet_views.stats()
+    }
+
+@app.get("/admin/janitor/stats")
+async def admin_get_janitor_stats(
+    current_user: dict = Depends(get_current_user)
+):
+    """[관리자] 디스크 정리 예산과 누적/최근 정리 결과 (확보한 용량 포함)"""
+    return {
+        "success": True,
+        "stats": janitor.stats()
+    }
+
+@app.post("/admin/janitor/run")
+async def admin_run_janitor(
+    dry_run: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """[관리자] 디스크 정리를 지금 실행하고 결과 반환 (dry_run=true면 지울 파일만 보고)"""
+    try:
+        report = await run_io(janitor.run, dry_run)
+        return await run_io(json_response, {
+            "success": True,
+            "report": report
+        })
+    except Exception as e:
+        logger.error(f"Janitor run failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ==========================================
 # 거래처 관리 (Client Management) API
 # ==========================================
@@ -2715,26 +3144,24 @@ class ClientData(BaseModel):
     auto_calculate_receipt: Optional[int] = 0
     is_disabled: Optional[int] = 0
 
+
 @app.post("/clients/upload")
 async def upload_clients_from_excel(
-    file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: User = Depends(get_current_user)
 ):
     """엑셀 파일에서 '거래처' 시트를 읽어서 거래처 정보를 자동으로 업데이트"""
     try:
-        # 파일 읽기
-        contents = await file.read()
-        df_dict = pd.read_excel(io.BytesIO(contents), sheet_name=None, engine='openpyxl')
-
-        # '거래처' 시트 찾기
-        client_sheet_name = None
-        for sheet_name in df_dict.keys():
-            if '거래처' in sheet_name:
-                client_sheet_name = sheet_name
-                break
+        # 파일 받기 - 청크 단위로 임시 파일에 저장 (xlsx만 허용)
+        tmp_path, _, _ = await spool_upload(request, '.xlsx')
 
-        if not client_sheet_name:
+        # '거래처' 시트만 디코딩 (워커 프로세스에서)
+        try:
+            client_sheet = await run_cpu(read_sheet_by_keyword, tmp_path, '거래처')
+        finally:
+            await run_io(os.unlink, tmp_path)
+
+        if not client_sheet:
             return {
                 "success": True,
                 "message": "거래처 시트가 없습니다",
@@ -2742,94 +3169,11 @@ async def upload_clients_from_excel(
                 "created_count": 0
             }
 
-        df = df_dict[client_sheet_name]
-
-        # 컬럼명 매핑 (엑셀 컬럼 → DB 필드)
-        column_mapping = {
-            'Code': 'code',
-            '업체명': 'company_name',
-            '아이디': 'user_id',
-            '담당MD': 'manager_md',
-            '대표이사': 'ceo_name',
-            '사업자등록번호': 'business_number',
-            '업태': 'business_type',
-            '업종': 'business_category',
-            '추가코드1': 'additional_code1',
-            '추가코드2': 'additional_code2',
-            '담당자명': 'contact_person',
-            '우편번호': 'postal_code',
-            '주소': 'address',
-            '상세주소': 'address_detail',
-            '연락처': 'phone',
-            '휴대폰번호': 'mobile',
-            '이메일': 'email',
-            '비고': 'notes',
-            '그룹': 'group_name',
-            '계좌번호': 'account_number',
-            '은행': 'bank_name',
-            '예금주': 'account_holder',
-            '잔': 'balance',
-            '사입서비스사용': 'use_purchase_service',
-            '입고대기자동계산': 'auto_calculate_receipt',
-            '사용안함': 'is_disabled'
-        }
-
-        updated_count = 0
-        created_count = 0
-        error_count = 0
-
-        for _, row in df.iterrows():
-            try:
-                # Code가 없으면 스킵
-                if pd.isna(row.get('Code')) or str(row.get('Code')).strip() == '':
-                    continue
-
-                code = str(row.get('Code')).strip()
-                company_name = str(row.get('업체명', '')).strip()
-
-                if not company_name:
-                    continue
-
-                # 기존 거래처 찾기
-                existing_client = db.query(Client).filter(Client.code == code).first()
-
-                # 데이터 준비
-                client_data = {
-                    'code': code,
-                    'company_name': company_name
-                }
-
-                # 나머지 필드 매핑
-                for excel_col, db_field in column_mapping.items():
-                    if excel_col in df.columns and db_field not in ['code', 'company_name']:
-                        value = row.get(excel_col)
-                        if pd.notna(value):
-                            if db_field in ['balance', 'use_purchase_service', 'auto_calculate_receipt', 'is_disabled']:
-                                client_data[db_field] = int(value) if value != '' else 0
-                            else:
-                                client_data[db_field] = str(value).strip()
-
-                if existing_client:
-                    # 업데이트
-                    for key, value in client_data.items():
-                        setattr(existing_client, key, value)
-                    existing_client.updated_at = datetime.now()
-                    updated_count += 1
-                else:
-                    # 새로 생성
-                    new_client = Client(**client_data, created_by=current_user.username)
-                    db.add(new_client)
-                    created_count += 1
-
-                # 각 행마다 커밋 (중복 오류 방지)
-                db.commit()
-                db.expire_all()  # 세션 갱신하여 최신 데이터 반영
-
-            except Exception as row_error:
-                db.rollback()
-                error_count += 1
-                logger.warning(f"Error processing row with code {code}: {str(row_error)}")
-                continue
+        client_sheet_name, client_rows = client_sheet
+        counts = await run_io(in_session, lambda db: sync_clients_from_rows(client_rows, db, current_user.username))
+        created_count = counts["created"]
+        updated_count = counts["updated"]
+        error_count = counts["errors"]
 
         logger.info(f"Client data uploaded: {created_count} created, {updated_count} updated, {error_count} errors by {current_user.username}")
 
@@ -2845,13 +3189,14 @@ async def upload_clients_from_excel(
             "error_count": error_count
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
         logger.error(f"Error uploading clients: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/clients/list")
-async def list_clients(
+def list_clients(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     search: Optional[str] = None,
@@ -2921,7 +3266,7 @@ async def list_clients(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/clients/{client_id}")
-async def get_client(
+def get_client(
     client_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -2980,7 +3325,7 @@ async def get_client(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/clients/{client_id}")
-async def update_client(
+def update_client(
     client_id: int,
     client_data: ClientData,
     db: Session = Depends(get_db),
@@ -3015,7 +3360,7 @@ async def update_client(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/clients/{client_id}")
-async def delete_client(
+def delete_client(
     client_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -0,0 +1,197 @@
+"""
+Upload preflight for GNDR order management
+
+Before an uploaded workbook is parsed in full (seconds for a large file),
+only the first rows of every sheet are read and checked against the header
+layout the endpoint expects: the 주문서/주문입고 layout (group titles in row 1,
+column names in row 2, yellow totals in row 3) or the 입고전표 layout (one
+header row). A wrong file is rejected in milliseconds instead of after the
+full parse.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+from pathlib import Path
+import time
+from sheet_manager import sheet_manager, SheetType
+from workbook_reader import read_head_rows
+
+# 헤더 판정에 필요한 앞부분 행 수 (제목 / 컬럼명 / 합계)
+PREFLIGHT_ROWS = 3
+
+LAYOUT_ORDER = "order"
+LAYOUT_RECEIPT_SLIP = "receipt_slip"
+
+# 1행 그룹 제목 (열 인덱스 -> 제목)
+ORDER_GROUP_TITLES = {8: '발주', 11: '장끼', 14: '입고', 15: '차이'}
+
+# 2행 컬럼명 (P열은 화면에서 '차이'로 바꿔 저장되기도 함)
+ORDER_COLUMNS = [
+    ('거래처명',), ('공급처주소',), ('공급처연락처',), ('공급처휴대전화',), ('상품코드',),
+    ('공급처상품명',), ('공급처옵션',), ('원가',), ('신규주문',), ('미송',), ('교환',),
+    ('장끼',), ('미송',), ('교환',), ('주문',), ('주문', '차이'), ('삼촌 코멘트',),
+    ('가나다란 코멘트',), ('실입고수',), ('오늘입금할금액',), ('미송/매입금액',), ('입금일',),
+    ('공급처예금주',),
+]
+
+# 3행 합계가 들어가는 수량 열 (I~O)
+ORDER_TOTAL_COLUMNS = range(8, 15)
+
+# 입고전표 헤더 (병합에 쓰는 상품코드/수량 열 포함)
+RECEIPT_SLIP_COLUMNS = {0: '공급처', 5: '공급처 상품명', 6: '공급처 옵션', 8: '상품코드', 14: '수량'}
+
+# 시트 종류별로 기대하는 레이아웃
+SHEET_TYPE_LAYOUTS = {
+    SheetType.ORDER: LAYOUT_ORDER,
+    SheetType.ORDER_RECEIPT: LAYOUT_ORDER,
+    SheetType.NEXT_ORDER: LAYOUT_ORDER,
+    SheetType.RECEIPT_INQUIRY: LAYOUT_RECEIPT_SLIP,
+}
+
+LAYOUT_LABELS = {
+    LAYOUT_ORDER: "주문서/주문입고",
+    LAYOUT_RECEIPT_SLIP: "입고전표",
+}
+
+
+def _cell(rows: List[List[Any]], row_idx: int, col_idx: int) -> Any:
+    if row_idx >= len(rows) or col_idx >= len(rows[row_idx]):
+        return None
+    value = rows[row_idx][col_idx]
+    return value.strip() if isinstance(value, str) else value
+
+
+def _is_number(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return True
+    if isinstance(value, str):
+        try:
+            float(value.replace(',', ''))
+            return True
+        except ValueError:
+            return False
+    return False
+
+
+def check_order_layout(rows: List[List[Any]]) -> List[str]:
+    """Problems with the 주문서 header rows (empty list if the layout matches)"""
+    problems = []
+
+    for col_idx, title in ORDER_GROUP_TITLES.items():
+        if _cell(rows, 0, col_idx) != title:
+            problems.append(f"1행 {_column_letter(col_idx)}열에 '{title}' 제목이 없습니다")
+
+    for col_idx, names in enumerate(ORDER_COLUMNS):
+        value = _cell(rows, 1, col_idx)
+        # 예전 파일에는 R열 이후 컬럼이 없을 수 있음
+        if value is None and col_idx > 16:
+            continue
+        if value not in names:
+            problems.append(f"2행 {_column_letter(col_idx)}열은 '{names[0]}'이어야 합니다 (현재: {value!r})")
+
+    if any(_cell(rows, 2, col_idx) not in (None, '') for col_idx in range(0, 8)):
+        problems.append("3행 합계 행의 A~H열은 비어 있어야 합니다")
+    for col_idx in ORDER_TOTAL_COLUMNS:
+        value = _cell(rows, 2, col_idx)
+        if value not in (None, '') and not _is_number(value):
+            problems.append(f"3행 {_column_letter(col_idx)}열 합계가 숫자가 아닙니다 (현재: {value!r})")
+
+    return problems
+
+
+def check_receipt_slip_layout(rows: List[List[Any]]) -> List[str]:
+    """Problems with the 입고전표 header row (empty list if the layout matches)"""
+    problems = []
+    for col_idx, name in RECEIPT_SLIP_COLUMNS.items():
+        value = _cell(rows, 0, col_idx)
+        if value != name:
+            problems.append(f"1행 {_column_letter(col_idx)}열은 '{name}'이어야 합니다 (현재: {value!r})")
+    return problems
+
+
+LAYOUT_CHECKS = {
+    LAYOUT_ORDER: check_order_layout,
+    LAYOUT_RECEIPT_SLIP: check_receipt_slip_layout,
+}
+
+
+def _column_letter(col_idx: int) -> str:
+    letters = ''
+    col_idx += 1
+    while col_idx:
+        col_idx, remainder = divmod(col_idx - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def detect_layout(rows: List[List[Any]]) -> Optional[str]:
+    """Header layout the rows match, or None"""
+    for layout, check in LAYOUT_CHECKS.items():
+        if not check(rows):
+            return layout
+    return None
+
+
+def preflight_workbook(file_path: str, original_filename: Optional[str] = None,
+                       expected_layouts: Sequence[str] = (LAYOUT_ORDER,)) -> Dict[str, Any]:
+    """Classify every sheet and check the header rows of the first one
+
+    Only the first PREFLIGHT_ROWS rows of each sheet are read. The first
+    sheet is the one the upload endpoints work on, so it decides whether the
+    file is accepted: its header rows must match one of expected_layouts.
+    Other sheets (earlier days, 거래처 lists) are only reported. A first
+    sheet whose name-based classification disagrees with its content is
+    accepted by content, with a warning.
+
+    Returns:
+        {"accepted", "layout", "errors", "warnings", "sheets": [{"sheet_name",
+        "sheet_type", "layout"}], "elapsed_ms"}
+    """
+    started = time.perf_counter()
+    filename = original_filename or Path(file_path).name
+
+    try:
+        heads = read_head_rows(file_path, PREFLIGHT_ROWS)
+    except Exception as e:
+        return {
+            "accepted": False,
+            "layout": None,
+            "errors": [f"엑셀 파일을 읽을 수 없습니다: {str(e)}"],
+            "warnings": [],
+            "sheets": [],
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    sheets = []
+    for sheet_name, rows in heads:
+        sheets.append({
+            "sheet_name": sheet_name,
+            "sheet_type": sheet_manager.classify_sheet(filename, sheet_name).value,
+            "layout": detect_layout(rows)
+        })
+
+    errors = []
+    warnings = []
+    layout = None
+    if not heads:
+        errors.append("시트가 없습니다")
+    else:
+        first_rows = heads[0][1]
+        layout = sheets[0]["layout"]
+        if layout not in expected_layouts:
+            expected = " 또는 ".join(LAYOUT_LABELS[name] for name in expected_layouts)
+            errors.append(f"'{heads[0][0]}' 시트가 {expected} 양식이 아닙니다")
+            # 기대한 양식 기준으로 어디가 다른지 알려줌
+            errors.extend(LAYOUT_CHECKS[expected_layouts[0]](first_rows)[:5])
+        elif SHEET_TYPE_LAYOUTS[SheetType(sheets[0]["sheet_type"])] != layout:
+            warnings.append(f"'{heads[0][0]}' 시트는 {sheets[0]['sheet_type']}(으)로 분류되지만 "
+                            f"내용은 {LAYOUT_LABELS[layout]} 양식입니다")
+
+    return {
+        "accepted": not errors,
+        "layout": layout,
+        "errors": errors,
+        "warnings": warnings,
+        "sheets": sheets,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
@@ -0,0 +1,286 @@
+"""
+입고전표 classification for GNDR order management
+
+After the 입고전표 merge the browser sorted the sheet (sortReceiptData),
+ran detectDuplicateProducts and processReceiptSlipData over it, and on
+"입금 관리로 보내기" built the 매칭 / 정상 / 오류 sheets itself and posted
+all three to /files/save-three-files. The same rules run here:
+
+- prepare_receipt_sheet: address order (address_sort) with 건물 (gray) /
+  거래처 (white) separator rows, then classify_receipt_rows
+- classify_receipt_rows: one pass over the sheet's columns. Cells are
+  parsed once per distinct value (Sheet.body_values) and compared as
+  arrays, and duplicate 상품코드 (E) are found by counting rows per code
+  (np.bincount) over real rows, skipping the __BUILDING_SEP__ /
+  __COMPANY_SEP__ markers. Returns row colors, red text for 교환 rows,
+  duplicates and the auto-checked rows (I = L = O and not a duplicate).
+- split_receipt_sheet: the three sheets to save from the sheet, its
+  checked rows and colors. 매칭 is the sheet as is, 정상 is the checked
+  rows with 입금액 (T = H × O) in payment order, and 오류 is the other
+  rows in address order.
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+import re
+import numpy as np
+from sheet_model import Sheet
+from address_sort import sort_by_address, parse_address, collation_key, cell_text
+from receipt_merge import js_string, js_parse_float, QTY_TOLERANCE
+
+HEADER_ROWS = 4
+
+# 구분선 행 마커 (A열)
+BUILDING_SEP = "__BUILDING_SEP__"
+COMPANY_SEP = "__COMPANY_SEP__"
+
+# 행 색상
+SEPARATOR_COLOR = "#d1d5db"  # 건물 구분선 (회색 배경)
+MATCH_COLOR = "#e6fffa"      # I = L = O (연한 초록 배경)
+EXCHANGE_COLOR = "#ff0000"   # 교환 (빨간 글자)
+
+# 열
+COL_COMPANY = 0    # A: 거래처명
+COL_ADDRESS = 1    # B: 공급처주소
+COL_PRODUCT = 4    # E: 공급처상품명 (상품코드)
+COL_NAME = 5       # F: 상품명
+COL_PRICE = 7      # H: 원가
+COL_ORDERED = 8    # I: 발주수량
+COL_EXCHANGE = 10  # K: 교환
+COL_RECEIPT = 11   # L: 장끼
+COL_RECEIVED = 14  # O: 입고수량
+COL_PAYMENT = 19   # T: 입금액
+
+# 분류에 읽는 열 (값 종류별로 한 번만 변환하도록 모두 범주형으로)
+CLASSIFY_COLUMNS = (COL_COMPANY, COL_ADDRESS, COL_PRODUCT, COL_NAME, COL_ORDERED, COL_EXCHANGE,
+                    COL_RECEIPT, COL_RECEIVED)
+
+# 입금 관리 건물명 (긴 이름 먼저, extractBuilding)
+PAYMENT_BUILDINGS = (
+    "APM", "apm", "Apm", "누죤", "누존", "스튜디오W", "스튜디오w", "테크노",
+    "디오트", "신평화", "청평화", "신발상가", "평화시장", "동평화",
+    "남평화", "서평화", "북평화", "중앙상가", "제일상가"
+)
+OTHER_BUILDING = "기타"
+
+_BASEMENT_FLOOR = re.compile(r'지하\s*(\d+)층')
+_FLOOR = re.compile(r'(\d+)층')
+
+
+def _truthy(value: Any) -> bool:
+    # JS 참/거짓: null, "", 0, NaN, false는 거짓
+    if value is None or value is False or value == "":
+        return False
+    if isinstance(value, (int, float)) and (value == 0 or value != value):
+        return False
+    return True
+
+
+def _cell(row: Sequence[Any], col: int) -> Any:
+    return row[col] if col < len(row) else None
+
+
+def _separator(kind: str, width: int) -> List[Any]:
+    row = [""] * max(width, 1)
+    row[0] = kind
+    return row
+
+
+def insert_separators(rows: Sequence[Sequence[Any]]) -> List[List[Any]]:
+    """Marker rows between 건물 (BUILDING_SEP) and between 거래처 of one 건물 (COMPANY_SEP)"""
+    result: List[List[Any]] = []
+    previous_building = previous_company = ""
+    for i, row in enumerate(rows):
+        building = parse_address(cell_text(_cell(row, COL_ADDRESS))).building
+        company = cell_text(_cell(row, COL_COMPANY)).strip()
+        if i > 0 and previous_building != building and previous_building != "":
+            result.append(_separator(BUILDING_SEP, len(row)))
+        elif i > 0 and previous_building == building and previous_company != company and previous_company != "":
+            result.append(_separator(COMPANY_SEP, len(row)))
+        result.append(row)
+        previous_building, previous_company = building, company
+    return result
+
+
+def _numbers(sheet: Sheet, col: int) -> np.ndarray:
+    """Body cells as compareNumbers reads them (commas removed, NaN when not a number)"""
+    codes, values = sheet.body_values(col)
+    parsed = np.fromiter((js_parse_float(v, strip_commas=True) for v in values), dtype=np.float64,
+                         count=len(values))
+    return parsed[codes]
+
+
+def _equal(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore"):
+        return np.abs(a - b) < QTY_TOLERANCE
+
+
+def classify_receipt_rows(data: List[List[Any]]) -> Dict[str, Any]:
+    """Row colors, 교환 text colors, duplicate codes and auto-checked rows of a merged sheet
+
+    Separator marker cells are cleared in place (building separators turn
+    gray), as processReceiptSlipData did. Row keys are absolute row indices.
+    """
+    sheet = Sheet.from_rows(data, header_rows=HEADER_ROWS, numeric_columns=(), category_columns=CLASSIFY_COLUMNS)
+    body = len(data) - HEADER_ROWS
+    if body <= 0:
+        return {"data": data, "row_colors": {}, "row_text_colors": {}, "duplicates": {}, "auto_checked": {}}
+
+    building_sep = sheet.body_mask(COL_COMPANY, lambda v: v == BUILDING_SEP)
+    separator = building_sep | sheet.body_mask(COL_COMPANY, lambda v: v == COMPANY_SEP)
+
+    # 중복 상품코드: 실제 행(A, B, F 중 하나라도 값)에서 E열 문자열별 행 수
+    valid = ~separator & (sheet.body_mask(COL_COMPANY, _truthy) | sheet.body_mask(COL_ADDRESS, _truthy) |
+                          sheet.body_mask(COL_NAME, _truthy))
+    codes, values = sheet.body_values(COL_PRODUCT)
+    code_texts = [js_string(v) if _truthy(v) else None for v in values]
+    group_ids: Dict[str, int] = {}
+    value_groups = np.fromiter(
+        (group_ids.setdefault(text, len(group_ids)) if text is not None else -1 for text in code_texts),
+        dtype=np.int64, count=len(code_texts)
+    )
+    row_groups = value_groups[codes]
+    counted = valid & (row_groups >= 0)
+    group_sizes = np.bincount(row_groups[counted], minlength=len(group_ids))
+    duplicate = np.zeros(body, dtype=bool)
+    duplicate[counted] = group_sizes[row_groups[counted]] > 1
+
+    # I = L = O (오차 0.01), 교환 K > 0
+    ordered, receipt, received = (_numbers(sheet, col) for col in (COL_ORDERED, COL_RECEIPT, COL_RECEIVED))
+    matched = ~separator & _equal(ordered, receipt) & _equal(receipt, received)
+    exchange = ~separator & sheet.body_mask(COL_EXCHANGE, lambda v: js_parse_float(v, strip_commas=True) > 0)
+
+    for i in np.flatnonzero(separator):
+        data[HEADER_ROWS + i][0] = ""
+
+    def rows(mask: np.ndarray) -> List[int]:
+        return (np.flatnonzero(mask) + HEADER_ROWS).tolist()
+
+    row_colors = {i: SEPARATOR_COLOR for i in rows(building_sep)}
+    row_colors.update({i: MATCH_COLOR for i in rows(matched & ~exchange)})
+    return {
+        "data": data,
+        "row_colors": dict(sorted(row_colors.items())),
+        "row_text_colors": {i: EXCHANGE_COLOR for i in rows(exchange)},
+        "duplicates": {i: code_texts[codes[i - HEADER_ROWS]] for i in rows(duplicate)},
+        "auto_checked": {i: True for i in rows(matched & ~duplicate)}
+    }
+
+
+def prepare_receipt_sheet(data: Sequence[Sequence[Any]]) -> Dict[str, Any]:
+    """Address-sorted sheet with separator rows, classified (replaces sortReceiptData + processReceiptSlipData)"""
+    rows, _ = sort_by_address(data, header_rows=HEADER_ROWS)
+    rows = rows[:HEADER_ROWS] + insert_separators(rows[HEADER_ROWS:])
+    return classify_receipt_rows([list(row) for row in rows])
+
+
+# --- 매칭 / 정상 / 오류 ---
+
+def payment_building(address: str) -> str:
+    """건물명 for 입금 관리 (extractBuilding): known 건물 names, else 기타"""
+    if not address:
+        return OTHER_BUILDING
+    for name in PAYMENT_BUILDINGS:
+        if name in address:
+            return "APM" if name.lower() == "apm" else name
+    return OTHER_BUILDING
+
+
+def payment_floor(address: str) -> int:
+    """층 for 입금 관리 (extractFloor): 지하는 음수, 없으면 0"""
+    match = _BASEMENT_FLOOR.search(address)
+    if match:
+        return -int(match.group(1))
+    match = _FLOOR.search(address)
+    return int(match.group(1)) if match else 0
+
+
+def _payment_amount(row: Sequence[Any]) -> float:
+    # (parseFloat(H) || 0) * (parseFloat(O) || 0)
+    price = js_parse_float(_cell(row, COL_PRICE))
+    qty = js_parse_float(_cell(row, COL_RECEIVED))
+    amount = (price if price == price else 0.0) * (qty if qty == qty else 0.0)
+    return int(amount) if amount.is_integer() else amount
+
+
+def _normal_sheet(data: Sequence[Sequence[Any]], checked: List[int]) -> Tuple[List[List[Any]], Dict[int, str]]:
+    rows = []
+    for i in checked:
+        row = list(data[i])
+        if len(row) <= COL_PAYMENT:
+            row.extend([None] * (COL_PAYMENT + 1 - len(row)))
+        row[COL_PAYMENT] = _payment_amount(row)
+        rows.append(row)
+
+    # 건물명 → 층 → 거래처명
+    def key(row):
+        address = cell_text(row[COL_ADDRESS])
+        return (collation_key(payment_building(address)), payment_floor(address),
+                collation_key(cell_text(row[COL_COMPANY])))
+    rows.sort(key=key)
+
+    result = [list(row) for row in data[:HEADER_ROWS]]
+    colors: Dict[int, str] = {}
+    previous_building = previous_company = ""
+    for n, row in enumerate(rows):
+        building = payment_building(cell_text(row[COL_ADDRESS]))
+        company = cell_text(row[COL_COMPANY])
+        if n > 0 and previous_building != building and previous_building != "":
+            colors[len(result)] = SEPARATOR_COLOR
+            result.append([""] * len(row))
+        elif n > 0 and previous_building == building and previous_company != company and previous_company != "":
+            result.append([""] * len(row))
+        result.append(row)
+        previous_building, previous_company = building, company
+    return result, colors
+
+
+def _error_sheet(data: Sequence[Sequence[Any]], unchecked: List[int], row_colors: Dict[int, str],
+                 row_text_colors: Dict[int, str]) -> Tuple[List[List[Any]], Dict[int, str], Dict[int, str]]:
+    result = [list(row) for row in data[:HEADER_ROWS]]
+    colors = {i: c for i, c in row_colors.items() if i < HEADER_ROWS and i < len(data)}
+    text_colors = {i: c for i, c in row_text_colors.items() if i < HEADER_ROWS and i < len(data)}
+
+    # 값이 있는 행 (A, B, E 중 하나)만, 주소 순서로
+    kept = [i for i in unchecked if _truthy(_cell(data[i], COL_COMPANY)) or
+            _truthy(_cell(data[i], COL_ADDRESS)) or _truthy(_cell(data[i], COL_PRODUCT))]
+    _, order = sort_by_address([data[i] for i in kept], header_rows=0)
+    previous_building = previous_company = ""
+    for n, k in enumerate(order):
+        i = kept[k]
+        row = data[i]
+        building = parse_address(cell_text(_cell(row, COL_ADDRESS))).building
+        company = cell_text(_cell(row, COL_COMPANY)).strip()
+        if n > 0 and previous_building != building and previous_building != "":
+            colors[len(result)] = SEPARATOR_COLOR
+            result.append([""] * len(row))
+        elif n > 0 and previous_building == building and previous_company != company and previous_company != "":
+            result.append([""] * len(row))
+        if row_text_colors.get(i):
+            text_colors[len(result)] = row_text_colors[i]
+        result.append(list(row))
+        previous_building, previous_company = building, company
+    return result, colors, text_colors
+
+
+def split_receipt_sheet(data: Sequence[Sequence[Any]], checked_rows: Dict[int, bool],
+                        row_colors: Dict[int, str], row_text_colors: Dict[int, str]) -> Dict[str, Dict[str, Any]]:
+    """매칭 / 정상 / 오류 sheets ({data, row_colors, row_text_colors} each) of a classified sheet
+
+    정상: checked rows with 입금액 (T = H × O), by 건물 → 층 → 거래처 with
+    separator rows; 오류: the unchecked rows that have data, in address
+    order with separator rows, keeping their text colors.
+
+    Raises:
+        ValueError: no checked data row
+    """
+    checked = [i for i in range(HEADER_ROWS, len(data)) if checked_rows.get(i)]
+    if not checked:
+        raise ValueError("체크된 항목이 없습니다")
+    unchecked = [i for i in range(HEADER_ROWS, len(data)) if not checked_rows.get(i)]
+
+    normal, normal_colors = _normal_sheet(data, checked)
+    error, error_colors, error_text_colors = _error_sheet(data, unchecked, row_colors, row_text_colors)
+    return {
+        "matched": {"data": data, "row_colors": row_colors, "row_text_colors": row_text_colors},
+        "normal": {"data": normal, "row_colors": normal_colors, "row_text_colors": {}},
+        "error": {"data": error, "row_colors": error_colors, "row_text_colors": error_text_colors}
+    }
@@ -0,0 +1,290 @@
+"""
+주문입고 / 입고전표 merge for GNDR order management
+
+The browser matched every order row against every receipt row
+(validateAndMergeData / validateAndMergeReceiptSlip in
+frontend/src/utils/excelValidation.ts), O(n·m) per upload. This module does
+the same reconciliation as a hash join, O(n+m):
+
+- 주문입고: receipt rows are indexed on normalized (거래처명 A, 상품코드 E,
+  수량 I); receipt rows without a numeric 수량 are indexed on (A, E) and
+  match any 수량. An order row takes the lowest-numbered matching receipt
+  row, as the browser did, and gets its J–N and Q cells.
+- 입고전표: slip rows are indexed on normalized 상품코드 (I); an order row
+  gets O (입고수량) of the first matching slip row.
+
+The browser reused the first match for every order row with the same key,
+so the second "ABC-1" order row got the first "ABC-1" receipt row again.
+With consume_duplicates (the default) each receipt row is taken once, in
+order: the n-th order row of a key gets the n-th receipt row of that key.
+Rows left over once a key's receipt rows run out fall back to the first
+match, so matched counts and unmatched lists are the same either way.
+
+String normalization and number parsing follow the browser's
+normalizeString / compareNumbers / parseFloat (dataProcessing.ts).
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from functools import lru_cache
+import math
+import re
+
+# 데이터는 5행부터 (index 4)
+DATA_START_ROW = 4
+# 교환(K열) 값이 있는 행의 글자색
+EXCHANGE_COLOR = "#ff0000"
+# 수량 비교 허용 오차 (compareNumbers)
+QTY_TOLERANCE = 0.01
+
+# 주문서 / 주문입고 열
+COL_STORE = 0      # A: 거래처명
+COL_PRODUCT = 4    # E: 공급처상품명 (상품코드)
+COL_QTY = 8        # I: 발주수량
+COL_EXCHANGE = 10  # K: 교환
+COL_RECEIVED = 14  # O: 입고수량
+# 주문입고에서 복사하는 열: J 미송, K 교환, L 장끼, M, N, Q 삼촌 코멘트
+RECEIPT_COPY_COLUMNS = (9, 10, 11, 12, 13, 16)
+# 입고전표 열
+SLIP_COL_PRODUCT = 8    # I: 상품코드
+SLIP_COL_RECEIVED = 14  # O: 입고수량
+
+# parseFloat: 앞쪽 공백 뒤의 가장 긴 숫자 부분
+_JS_FLOAT = re.compile(r'[+-]?(?:Infinity|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+_WHITESPACE = re.compile(r'[\s\ufeff]+')
+_NORMALIZE_CACHE_SIZE = 65536
+
+
+def js_string(value: Any) -> str:
+    """String(value) as the browser prints it (3.0 -> "3", None -> "null")"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "Infinity" if value > 0 else "-Infinity"
+        if value.is_integer() and abs(value) < 1e21:
+            return str(int(value))
+    return str(value)
+
+
+def _falsy(value: Any) -> bool:
+    # JS falsy: null, "", 0, NaN, false
+    if value is None or value is False or value == "":
+        return True
+    if isinstance(value, (int, float)) and (value == 0 or value != value):
+        return True
+    return False
+
+
+@lru_cache(maxsize=_NORMALIZE_CACHE_SIZE)
+def _normalize_text(text: str) -> str:
+    return _WHITESPACE.sub("", text.lower())
+
+
+def normalize(value: Any) -> str:
+    """normalizeString: trimmed, lowercased, whitespace removed ("" for falsy)"""
+    if type(value) is str:
+        # 같은 거래처명/상품코드가 하루에도 수백 번 나오므로 문자열만 캐시
+        return _normalize_text(value)
+    if _falsy(value):
+        return ""
+    return _WHITESPACE.sub("", js_string(value).lower())
+
+
+def js_parse_float(value: Any, strip_commas: bool = False) -> float:
+    """parseFloat(String(value)) (NaN when there is no leading number)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    text = js_string(value)
+    if strip_commas:
+        text = text.replace(",", "")
+    match = _JS_FLOAT.match(text.lstrip())
+    if not match:
+        return math.nan
+    return float(match.group(0).replace("Infinity", "inf"))
+
+
+def _cell(row: Optional[Sequence[Any]], col: int) -> Any:
+    if not row or col >= len(row):
+        return None
+    return row[col]
+
+
+def _label(row: Sequence[Any], col: int) -> str:
+    # 템플릿 문자열: 없는 칸은 undefined, null은 null
+    return "undefined" if col >= len(row) else js_string(row[col])
+
+
+def _result_message(matched: int, unmatched: int) -> str:
+    if unmatched:
+        return f"{matched}개 행 매칭됨. 매칭 실패: {unmatched}개"
+    return f"{matched}개 행 매칭됨"
+
+
+class _Candidates:
+    """Receipt row numbers of one key, ascending, with a cursor past the consumed ones"""
+    __slots__ = ("rows", "head")
+
+    def __init__(self):
+        self.rows: List[int] = []
+        self.head = 0
+
+    def first(self, accept=None) -> Optional[int]:
+        """Lowest row (accept(row) true); the browser's first match"""
+        for row in self.rows:
+            if accept is None or accept(row):
+                return row
+        return None
+
+    def first_free(self, used: List[bool], accept=None) -> Optional[int]:
+        """Lowest row not yet consumed (accept(row) true)"""
+        rows = self.rows
+        while self.head < len(rows) and used[rows[self.head]]:
+            self.head += 1
+        for k in range(self.head, len(rows)):
+            row = rows[k]
+            if not used[row] and (accept is None or accept(row)):
+                return row
+        return None
+
+
+def _lowest(*rows: Optional[int]) -> Optional[int]:
+    found = [row for row in rows if row is not None]
+    return min(found) if found else None
+
+
+def merge_order_receipt(original: Sequence[Sequence[Any]], receipt: Sequence[Sequence[Any]],
+                        consume_duplicates: bool = True) -> Dict[str, Any]:
+    """Copy J–N and Q of the matching 주문입고 row onto each order row
+
+    Returns merged_data, matched_count, exchange_rows ({row: color}),
+    unmatched (messages), unmatched_rows (row indices) and message, as
+    validateAndMergeData did.
+    """
+    # 색인: 수량 있는 행은 (거래처, 상품, 수량 0.01 구간), 없는 행은 (거래처, 상품)
+    by_qty: Dict[Tuple[str, str, int], _Candidates] = {}
+    any_qty: Dict[Tuple[str, str], _Candidates] = {}
+    qty_values: Dict[int, float] = {}
+    for j in range(DATA_START_ROW, len(receipt)):
+        row = receipt[j]
+        key = (normalize(_cell(row, COL_STORE)), normalize(_cell(row, COL_PRODUCT)))
+        raw_qty = _cell(row, COL_QTY)
+        qty = math.nan if raw_qty is None or raw_qty == "" else js_parse_float(raw_qty, strip_commas=True)
+        if math.isnan(qty):
+            any_qty.setdefault(key, _Candidates()).rows.append(j)
+        else:
+            qty_values[j] = qty
+            by_qty.setdefault(key + (math.floor(qty / QTY_TOLERANCE) if math.isfinite(qty) else qty,),
+                              _Candidates()).rows.append(j)
+
+    used = [False] * len(receipt)
+    merged = [list(row) for row in original]
+    matched_count = 0
+    exchange_rows: Dict[int, str] = {}
+    unmatched: List[str] = []
+    unmatched_rows: List[int] = []
+
+    for i in range(DATA_START_ROW, len(original)):
+        row = original[i]
+        store, product, qty = _cell(row, COL_STORE), _cell(row, COL_PRODUCT), _cell(row, COL_QTY)
+        if _falsy(store) and _falsy(product) and _falsy(qty):
+            continue
+
+        key = (normalize(store), normalize(product))
+        groups = [any_qty.get(key)]
+        accepts = [None]
+        order_qty = js_parse_float(qty, strip_commas=True)
+        if math.isfinite(order_qty):
+            # 오차 안의 값은 이웃 구간에 있을 수 있음 (부동소수 반올림까지 ±2 구간)
+            bucket = math.floor(order_qty / QTY_TOLERANCE)
+            accept = (lambda j, q=order_qty: abs(qty_values[j] - q) < QTY_TOLERANCE)
+            for b in range(bucket - 2, bucket + 3):
+                groups.append(by_qty.get(key + (b,)))
+                accepts.append(accept)
+
+        first = _lowest(*(g.first(a) for g, a in zip(groups, accepts) if g))
+        match = first
+        if consume_duplicates and first is not None:
+            # 아직 쓰지 않은 행 우선, 다 썼으면 첫 번째 행
+            free = _lowest(*(g.first_free(used, a) for g, a in zip(groups, accepts) if g))
+            if free is not None:
+                used[free] = True
+                match = free
+
+        if match is None:
+            unmatched.append(f"행 {i + 1}: {_label(row, COL_STORE)} - {_label(row, COL_PRODUCT)}")
+            unmatched_rows.append(i)
+            continue
+
+        matched_count += 1
+        source = receipt[match]
+        target = merged[i]
+        if len(target) <= RECEIPT_COPY_COLUMNS[-1]:
+            target.extend([None] * (RECEIPT_COPY_COLUMNS[-1] + 1 - len(target)))
+        for col in RECEIPT_COPY_COLUMNS:
+            target[col] = _cell(source, col)
+        # K열(교환) 값이 있으면 빨간색
+        exchange = js_parse_float(target[COL_EXCHANGE])
+        if exchange > 0:
+            exchange_rows[i] = EXCHANGE_COLOR
+
+    return {
+        "merged_data": merged,
+        "matched_count": matched_count,
+        "exchange_rows": exchange_rows,
+        "unmatched": unmatched,
+        "unmatched_rows": unmatched_rows,
+        "message": _result_message(matched_count, len(unmatched))
+    }
+
+
+def merge_receipt_slip(current: Sequence[Sequence[Any]], slip: Sequence[Sequence[Any]],
+                       consume_duplicates: bool = True) -> Dict[str, Any]:
+    """Copy O (입고수량) of the 입고전표 row with the same 상품코드 onto each order row
+
+    Returns merged_data, matched_count, unmatched (messages), unmatched_rows
+    and message, as validateAndMergeReceiptSlip did.
+    """
+    by_product: Dict[str, _Candidates] = {}
+    for j in range(DATA_START_ROW, len(slip)):
+        by_product.setdefault(normalize(_cell(slip[j], SLIP_COL_PRODUCT)), _Candidates()).rows.append(j)
+
+    used = [False] * len(slip)
+    merged = [list(row) for row in current]
+    matched_count = 0
+    unmatched: List[str] = []
+    unmatched_rows: List[int] = []
+
+    for i in range(DATA_START_ROW, len(current)):
+        product = _cell(current[i], COL_PRODUCT)
+        if _falsy(product):
+            continue
+
+        group = by_product.get(normalize(product))
+        match = group.first() if group else None
+        if consume_duplicates and match is not None:
+            free = group.first_free(used)
+            if free is not None:
+                used[free] = True
+                match = free
+
+        if match is None:
+            unmatched.append(f"행 {i + 1}: {_label(current[i], COL_PRODUCT)}")
+            unmatched_rows.append(i)
+            continue
+
+        matched_count += 1
+        target = merged[i]
+        if len(target) <= COL_RECEIVED:
+            target.extend([None] * (COL_RECEIVED + 1 - len(target)))
+        target[COL_RECEIVED] = _cell(slip[match], SLIP_COL_RECEIVED)
+
+    return {
+        "merged_data": merged,
+        "matched_count": matched_count,
+        "unmatched": unmatched,
+        "unmatched_rows": unmatched_rows,
+        "message": _result_message(matched_count, len(unmatched))
+    }
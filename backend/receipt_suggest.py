@@ -0,0 +1,272 @@
+"""
+Fuzzy match suggestions for GNDR order management
+
+Order rows that the exact merge (receipt_merge) cannot match, usually
+because of spacing or typos in 공급처상품명 or 거래처명, used to go to the
+오류 file to be fixed by hand. This module suggests the most likely
+receipt rows for each of them:
+
+- Text is normalized like the exact merge, then Hangul syllables are split
+  into jamo (NFD), so "가방" and "가반" still share most of their
+  character n-grams.
+- An inverted index maps each n-gram to the distinct receipt keys
+  (거래처명, 상품코드) containing it. For a row, the rarest n-grams are
+  read first, and reading stops after MAX_POSTINGS entries, so common
+  n-grams such as a shared store name cannot make a lookup scan the whole
+  day.
+- Only the MAX_CANDIDATES keys sharing the most n-grams are scored:
+  Dice similarity of the n-gram sets per field, weighted, with a small
+  bonus for an equal 수량.
+- Rows are answered in order until budget_ms runs out. Rows left over
+  are returned in pending_rows, and suggestions_complete is false.
+"""
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+from collections import defaultdict
+from functools import lru_cache
+import heapq
+import itertools
+import math
+import time
+import unicodedata
+from receipt_merge import (
+    DATA_START_ROW, COL_STORE, COL_PRODUCT, COL_QTY, SLIP_COL_PRODUCT,
+    normalize, js_parse_float, QTY_TOLERANCE
+)
+
+DEFAULT_TOP_K = 3
+MAX_TOP_K = 10
+DEFAULT_BUDGET_MS = 300
+MAX_BUDGET_MS = 5000
+# 이 점수 미만은 제안하지 않음
+MIN_SCORE = 0.3
+# 값마다 점수를 매기는 후보 수 / 읽는 색인 항목 수 / 비슷한 값으로 고르는 수
+MAX_CANDIDATES = 32
+MAX_POSTINGS = 1000
+MAX_SIMILAR_VALUES = 8
+# 같은 거래처의 다른 키를 후보로 더하는 최대 수
+MAX_BLOCK_KEYS = 256
+# 문자 n-gram 길이 (자모 기준, 상품코드처럼 숫자가 많은 값은 2글자로는 거의 모든 키에 걸림)
+NGRAM = 3
+_NGRAM_CACHE_SIZE = 65536
+
+# 필드 가중치: (거래처명, 상품코드), 나머지는 수량 일치 보너스
+ORDER_WEIGHTS = (0.3, 0.65)
+QTY_BONUS = 0.05
+
+SUGGEST_KINDS = ("order", "slip")
+
+
+def _jamo(text: str) -> str:
+    # 한글 음절 -> 자모 (가 -> ㄱ + ㅏ)
+    return unicodedata.normalize("NFD", text)
+
+
+@lru_cache(maxsize=_NGRAM_CACHE_SIZE)
+def _text_ngrams(text: str) -> FrozenSet[str]:
+    text = "\x02" + _jamo(text) + "\x03"
+    return frozenset(text[i:i + NGRAM] for i in range(max(1, len(text) - NGRAM + 1)))
+
+
+def ngrams(text: str) -> FrozenSet[str]:
+    """Jamo-level character n-grams of normalized text, with start/end markers"""
+    return _text_ngrams(text) if text else frozenset()
+
+
+def dice(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class _ValueIndex:
+    """N-gram inverted index over the distinct normalized values of one column"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.grams: List[FrozenSet[str]] = []
+        # n-gram -> 값 번호들
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self._similar: Dict[str, List[int]] = {}
+
+    def add(self, text: str) -> int:
+        value_id = self.ids.get(text)
+        if value_id is None:
+            value_id = self.ids[text] = len(self.grams)
+            grams = ngrams(text)
+            self.grams.append(grams)
+            for gram in grams:
+                self.postings[gram].append(value_id)
+        return value_id
+
+    def similar(self, text: str) -> List[int]:
+        """The same value if present, else the MAX_SIMILAR_VALUES most similar ones
+
+        Reads the rarest n-grams first, stops after MAX_POSTINGS entries, and
+        scores only the MAX_CANDIDATES values sharing the most n-grams.
+        """
+        exact = self.ids.get(text)
+        if exact is not None:
+            return [exact]
+        found = self._similar.get(text)
+        if found is not None:
+            return found
+        grams = ngrams(text)
+        lists = sorted((self.postings[gram] for gram in grams if gram in self.postings), key=len)
+        shared: Dict[int, int] = defaultdict(int)
+        read = 0
+        for posting in lists:
+            if shared and read + len(posting) > MAX_POSTINGS:
+                break
+            read += len(posting)
+            for value_id in posting:
+                shared[value_id] += 1
+        candidates = heapq.nlargest(MAX_CANDIDATES, shared, key=shared.__getitem__)
+        found = heapq.nlargest(MAX_SIMILAR_VALUES, candidates, key=lambda v: dice(grams, self.grams[v]))
+        self._similar[text] = found
+        return found
+
+
+class SuggestionIndex:
+    """Per-column n-gram indexes over the receipt rows, and their distinct keys
+
+    fields: receipt columns forming the key, weights: their share of the score.
+    A key's candidates are the keys combining similar values of each column,
+    plus (with several columns) the other keys of the same first-column value,
+    e.g. every product of the same 거래처.
+    """
+
+    def __init__(self, rows: Sequence[Sequence[Any]], fields: Sequence[int], weights: Sequence[float],
+                 qty_col: Optional[int] = None):
+        self.fields = tuple(fields)
+        self.weights = tuple(weights)
+        self.qty_col = qty_col
+        self.rows = rows
+        self.values = [_ValueIndex() for _ in self.fields]
+        # 키 (열별 값 번호) -> 키 번호, 키별 입고 행 번호들
+        self.key_ids: Dict[Tuple[int, ...], int] = {}
+        self.keys: List[Tuple[int, ...]] = []
+        self.key_rows: List[List[int]] = []
+        # 첫 열 값 번호 -> 키 번호들 (거래처별 상품)
+        self.blocks: Dict[int, List[int]] = defaultdict(list)
+
+        text_keys: Dict[Tuple[str, ...], int] = {}
+        for j in range(DATA_START_ROW, len(rows)):
+            row = rows[j] or []
+            texts = tuple(normalize(row[col]) if col < len(row) else "" for col in self.fields)
+            key_id = text_keys.get(texts)
+            if key_id is None:
+                if not any(texts):
+                    continue
+                key = tuple(index.add(text) for index, text in zip(self.values, texts))
+                key_id = text_keys[texts] = self.key_ids[key] = len(self.keys)
+                self.keys.append(key)
+                self.key_rows.append([])
+                self.blocks[key[0]].append(key_id)
+            self.key_rows[key_id].append(j)
+
+    def candidates(self, texts: Sequence[str]) -> List[int]:
+        similar = [index.similar(text) for index, text in zip(self.values, texts)]
+        found = {self.key_ids[key] for key in itertools.product(*similar) if key in self.key_ids}
+        if len(self.fields) > 1:
+            first = self.values[0].ids.get(texts[0])
+            if first is not None:
+                found.update(self.blocks[first][:MAX_BLOCK_KEYS])
+        return list(found)
+
+    def rank(self, texts: Sequence[str]) -> List[Tuple[float, int]]:
+        """(score, key) of the candidate keys, best first"""
+        grams = [ngrams(text) for text in texts]
+        fields = list(zip(self.weights, grams, self.values))
+        ranked = [
+            (sum(weight * dice(query, index.grams[value_id])
+                 for (weight, query, index), value_id in zip(fields, self.keys[key_id])), key_id)
+            for key_id in self.candidates(texts)
+        ]
+        ranked.sort(key=lambda item: -item[0])
+        return ranked
+
+    def best_row(self, key_id: int, qty: float) -> Tuple[int, bool]:
+        """Receipt row to suggest for a key: the first with an equal 수량, else the first"""
+        rows = self.key_rows[key_id]
+        if self.qty_col is not None and math.isfinite(qty):
+            for j in rows:
+                row = self.rows[j]
+                value = js_parse_float(row[self.qty_col] if self.qty_col < len(row) else None, strip_commas=True)
+                if abs(value - qty) < QTY_TOLERANCE:
+                    return j, True
+        return rows[0], False
+
+
+def suggest_matches(data: Sequence[Sequence[Any]], receipt: Sequence[Sequence[Any]],
+                    rows: Sequence[int], kind: str = "order", top_k: int = DEFAULT_TOP_K,
+                    budget_ms: int = DEFAULT_BUDGET_MS, min_score: float = MIN_SCORE) -> Dict[str, Any]:
+    """Top-k receipt rows for each of the given order rows (usually the merge's unmatched_rows)
+
+    kind "order": (거래처명 A, 상품코드 E) against 주문입고 A, E, with a bonus
+    for an equal 수량 (I); "slip": 상품코드 E against 입고전표 I.
+
+    Returns suggestions ({row: [{receipt_row, score, qty_match, values}]}),
+    suggestions_complete, pending_rows and suggest_ms.
+
+    Raises:
+        ValueError: unknown kind or out-of-range top_k/budget_ms
+    """
+    if kind not in SUGGEST_KINDS:
+        raise ValueError(f"Unknown kind: {kind} (use one of {', '.join(SUGGEST_KINDS)})")
+    if not 0 < top_k <= MAX_TOP_K or not 0 < budget_ms <= MAX_BUDGET_MS:
+        raise ValueError(f"top_k must be 1-{MAX_TOP_K} and budget_ms 1-{MAX_BUDGET_MS}")
+
+    started = time.perf_counter()
+    deadline = started + budget_ms / 1000
+    if kind == "order":
+        fields, weights, qty_col = (COL_STORE, COL_PRODUCT), ORDER_WEIGHTS, COL_QTY
+        index = SuggestionIndex(receipt, fields, weights, qty_col)
+    else:
+        fields, qty_col = (COL_PRODUCT,), None
+        index = SuggestionIndex(receipt, (SLIP_COL_PRODUCT,), (1.0,))
+
+    suggestions: Dict[int, List[Dict[str, Any]]] = {}
+    # 같은 키의 행은 후보 점수를 한 번만 계산
+    scored: Dict[Tuple[str, ...], List[Tuple[float, int]]] = {}
+    pending: List[int] = []
+    for n, i in enumerate(rows):
+        if time.perf_counter() > deadline:
+            pending = list(rows[n:])
+            break
+        if not DATA_START_ROW <= i < len(data):
+            continue
+        row = data[i] or []
+        cells = [row[col] if col < len(row) else None for col in fields]
+        key = tuple(normalize(cell) for cell in cells)
+
+        ranked = scored.get(key)
+        if ranked is None:
+            ranked = scored[key] = index.rank(key)
+
+        qty = js_parse_float(row[qty_col] if qty_col is not None and qty_col < len(row) else None,
+                             strip_commas=True)
+        found = []
+        for score, key_id in ranked:
+            receipt_row, qty_match = index.best_row(key_id, qty)
+            if qty_match:
+                score += QTY_BONUS
+            if score >= min_score:
+                found.append((score, receipt_row, qty_match))
+        found.sort(key=lambda item: (-item[0], item[1]))
+        suggestions[i] = [
+            {
+                "receipt_row": receipt_row,
+                "score": round(score, 3),
+                "qty_match": qty_match,
+                "values": [receipt[receipt_row][col] if col < len(receipt[receipt_row]) else None
+                           for col in index.fields + ((qty_col,) if qty_col is not None else ())]
+            }
+            for score, receipt_row, qty_match in found[:top_k]
+        ]
+
+    return {
+        "suggestions": suggestions,
+        "suggestions_complete": not pending,
+        "pending_rows": pending,
+        "suggest_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
@@ -0,0 +1,170 @@
+"""
+Cross-process shared state for GNDR order management
+
+Workspace state used to live in process memory, so the API could only run
+as one uvicorn worker: a job polled on another worker was unknown, a sheet
+uploaded through one worker was missing on the next. Everything requests
+share now lives in one SQLite file (WAL mode) that every worker process
+reads and writes:
+
+- workbooks: uploaded workbooks (owner, stored file, sheet names)
+- workspaces: each user's active workbook and saved header rows
+- sheets: the sheet cache index (file, version, edit count; see sheet_store)
+- jobs: background job status and results (see jobs)
+- leases: who runs a periodic task (see janitor)
+- upload_cache: the parsed upload cache index (see upload_cache)
+
+Parsed sheets themselves stay in each process's memory cache and in the
+mmap-able sheet files; only their versions are checked here, one indexed
+lookup per request.
+"""
+from typing import Any, Iterator, List, Optional, Sequence
+from contextlib import contextmanager
+import os
+import sqlite3
+import threading
+import time
+
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", "./workspace_state.db")
+
+# 다른 프로세스가 쓰는 중일 때 기다리는 최대 시간 (초)
+BUSY_TIMEOUT_SECONDS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workbooks (
+    workbook_id TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    display_filename TEXT,
+    sheet_names TEXT NOT NULL,
+    is_html INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_workbooks_user ON workbooks (user);
+
+CREATE TABLE IF NOT EXISTS workspaces (
+    user TEXT PRIMARY KEY,
+    active_workbook TEXT,
+    header_rows TEXT,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sheets (
+    key TEXT PRIMARY KEY,
+    workbook TEXT NOT NULL,
+    sheet_name TEXT NOT NULL,
+    file TEXT NOT NULL,
+    info TEXT NOT NULL,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0,
+    file_version INTEGER NOT NULL DEFAULT 0,
+    edit_count INTEGER NOT NULL DEFAULT 0,
+    written_at TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_sheets_workbook ON sheets (workbook);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT,
+    rows_processed INTEGER NOT NULL DEFAULT 0,
+    rows_total INTEGER,
+    errors TEXT NOT NULL,
+    info TEXT NOT NULL,
+    result BLOB,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    finished_at TEXT,
+    finished_ts REAL,
+    runner INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT,
+    expires_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS upload_cache (
+    key TEXT PRIMARY KEY,
+    bytes INTEGER NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_upload_cache_last_used ON upload_cache (last_used_at);
+"""
+
+# 예전 상태 파일에 없는 열: (표, 열, 정의)
+_ADDED_COLUMNS = [
+    ("jobs", "runner", "INTEGER"),
+]
+
+
+class SharedState:
+    """SQLite file shared by all worker processes (one connection per thread)"""
+
+    def __init__(self, path: str = SHARED_STATE_PATH):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        for table, column, definition in _ADDED_COLUMNS:
+            if column not in {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}:
+                try:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                except sqlite3.OperationalError:
+                    # 다른 프로세스가 먼저 추가함
+                    pass
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: 트랜잭션은 transaction()에서 직접 시작
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        return self._connection().execute(sql, params).fetchall()
+
+    def query_one(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        return self._connection().execute(sql, params).fetchone()
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Run one statement in its own transaction and return the changed row count"""
+        return self._connection().execute(sql, params).rowcount
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction across processes (BEGIN IMMEDIATE takes the write lock up front)"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def try_lease(self, name: str, holder: str, seconds: float) -> bool:
+        """Take (or renew) a named lease unless another holder has an unexpired one"""
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT holder, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+            if row is not None and row["holder"] != holder and row["expires_at"] > now:
+                return False
+            conn.execute(
+                "INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at",
+                (name, holder, now + seconds)
+            )
+            return True
+
+
+# Global instance
+shared_state = SharedState()
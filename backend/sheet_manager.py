@@ -2,13 +2,26 @@
 Sheet management system for GNDR order management
 """
 from enum import Enum
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
+from collections import OrderedDict
 from datetime import datetime, date
 import pandas as pd
 import numpy as np
-import json
 import os
+import shutil
+import json
+import threading
+import time
+import uuid
 from pathlib import Path
+from workbook_reader import WorkbookReader, is_html_xls, read_html_table
+from sheet_model import Sheet, cell_float
+from sheet_memory import SheetMemoryCache, SHEET_MEMORY_BUDGET_BYTES, SYSTEM_USER
+from sheet_store import SheetStore, SheetVersionConflict
+from shared_state import SharedState, shared_state
+from date_utils import excel_date_to_string, excel_dates_to_strings, excel_serials_to_strings
+import excel_render
+from workers import map_cpu, CPU_WORKERS
 
 class SheetType(Enum):
     ORDER = "주문서"  # Day A 주문서
@@ -16,29 +29,195 @@ class SheetType(Enum):
     RECEIPT_INQUIRY = "입고전표"  # Day A+1 입고전표 조회
     NEXT_ORDER = "다음주문서"  # Day A+1 주문서
 
+def _parse_sheets_rows(file_path: str, sheet_names: List[str]) -> List[List[List[Any]]]:
+    """Read several sheets of one workbook in a worker process
+
+    The workbook is opened read-only once for all the given sheets and closed
+    again, so the shared pool's workers keep no file open between tasks.
+    Returns plain row lists (str/int/float/datetime/None), which pickle far
+    smaller and faster than a DataFrame.
+    """
+    with WorkbookReader(file_path) as reader:
+        return [reader.read_rows(sheet_name) for sheet_name in sheet_names]
+
+def parse_workbook(file_path: str, original_filename: Optional[str] = None,
+                   max_sheets: Optional[int] = None,
+                   extra_sheet: Optional[str] = None) -> Dict[str, Any]:
+    """Parse a workbook without caching anything (runs in a worker process)
+
+    Returns the load_excel_file result; the caller caches the sheets in its
+    own process (open_workbook(parsed=...)). With extra_sheet, the rows of the
+    first sheet whose name contains it are read from the same open workbook
+    and returned as result["extra_sheet"] = {"sheet_name", "rows"}.
+    """
+    if is_html_xls(file_path):
+        return sheet_manager.load_excel_file(file_path, original_filename=original_filename,
+                                             max_sheets=max_sheets, cache=False)
+
+    try:
+        reader = WorkbookReader(file_path)
+    except Exception as e:
+        return {"success": False, "error": str(e), "file_path": original_filename or file_path}
+
+    with reader:
+        result = sheet_manager.load_excel_file(file_path, original_filename=original_filename,
+                                               reader=reader, max_sheets=max_sheets, cache=False)
+        if result["success"] and extra_sheet:
+            extra_sheet_name = reader.find_sheet(extra_sheet)
+            if extra_sheet_name:
+                result["extra_sheet"] = {
+                    "sheet_name": extra_sheet_name,
+                    "rows": reader.read_rows(extra_sheet_name)
+                }
+    return result
+
+# 화면에서 수정해 저장한 시트를 디스크 캐시에 둘 때 쓰는 워크북 이름
+EDITED_SHEETS_WORKBOOK = "edited"
+
+# 노란 3행(index 2)에 5행(index 4)부터의 합계를 두는 열: I, J, K, L, M, N, O, S, T, U
+SUM_COLUMNS = (8, 9, 10, 11, 12, 13, 14, 18, 19, 20)
+SUM_ROW_INDEX = 2
+SUM_START_ROW = 4
+# P열(차이 있음)은 L+M+N과 O로 다시 계산 (3행까지는 헤더, 일별 주문서 저장과 같은 규칙)
+DIFF_SOURCE_COLUMNS = (11, 12, 13, 14)
+DIFF_HEADER_ROWS = 3
+
+# 셀 편집 한 번에 받을 수 있는 최대 개수 / 열 범위
+MAX_CELL_EDITS = 10000
+MAX_SHEET_COLUMNS = 256
+# 디스크 편집 기록이 이만큼 쌓이면 시트 파일을 통째로 다시 씀
+EDIT_LOG_COMPACT_EDITS = 2000
+# 워크북 마지막 사용 시각은 이 간격보다 오래됐을 때만 갱신 (읽기마다 쓰지 않도록)
+WORKBOOK_TOUCH_SECONDS = 60
+
+
+class Workspace:
+    """One user's working state: active workbook, open workbooks and saved header rows
+
+    The state lives in the shared state file, so every worker process sees
+    the same workspace; the lock serializes compound changes within a
+    process. Parsed sheets live in each process's memory cache under
+    (user, workbook, sheet) keys.
+    """
+
+    def __init__(self, user: str, state: SharedState):
+        self.user = user
+        self.state = state
+        self.lock = threading.RLock()
+
+    def active_workbook(self) -> Optional[str]:
+        row = self.state.query_one("SELECT active_workbook FROM workspaces WHERE user = ?", (self.user,))
+        return row["active_workbook"] if row else None
+
+    def activate(self, workbook_id: str):
+        self.state.execute(
+            "INSERT INTO workspaces (user, active_workbook, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(user) DO UPDATE SET active_workbook = excluded.active_workbook, "
+            "updated_at = excluded.updated_at",
+            (self.user, workbook_id, time.time())
+        )
+
+    def workbook_ids(self) -> List[str]:
+        """Workbooks this user uploaded that are still open (oldest first)"""
+        rows = self.state.query("SELECT workbook_id FROM workbooks WHERE user = ? ORDER BY created_at",
+                                (self.user,))
+        return [row["workbook_id"] for row in rows]
+
+    def header_rows(self) -> Optional[List[List[Any]]]:
+        row = self.state.query_one("SELECT header_rows FROM workspaces WHERE user = ?", (self.user,))
+        return json.loads(row["header_rows"]) if row and row["header_rows"] else None
+
+    def set_header_rows(self, header_rows: List[List[Any]]):
+        # 입금 내역 저장 시 함께 보낸 헤더 4행 (시트 데이터는 건드리지 않음)
+        self.state.execute(
+            "INSERT INTO workspaces (user, header_rows, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(user) DO UPDATE SET header_rows = excluded.header_rows, "
+            "updated_at = excluded.updated_at",
+            (self.user, json.dumps(header_rows, ensure_ascii=False, default=str), time.time())
+        )
+
+
 class SheetManager:
-    def __init__(self, cache_dir: str = "./sheet_cache"):
+    def __init__(self, cache_dir: str = "./sheet_cache", workbook_dir: str = "./workbooks",
+                 max_loaded_bytes: int = SHEET_MEMORY_BUDGET_BYTES, max_workbooks: int = 8,
+                 state: Optional[SharedState] = None):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
-        self.loaded_sheets: Dict[str, Any] = {}
+        # 워커 프로세스들이 함께 쓰는 상태 (워크북 목록, 작업 공간, 시트 캐시 색인)
+        self.state = state or shared_state
+        # 파싱된 시트의 디스크 사본 (바이너리, 백그라운드 기록, 공유 상태에 색인)
+        self.store = SheetStore(cache_dir, self.state)
+        # 업로드된 워크북 원본 (시트를 요청 시점에 파싱하기 위해 보관)
+        self.workbook_dir = Path(workbook_dir)
+        self.workbook_dir.mkdir(exist_ok=True)
+        # 파싱된 시트 캐시: (사용자, 워크북, 시트) 키, 메모리 예산 기준 LRU, 사용자별 작업 워크북 고정
+        self.loaded_sheets = SheetMemoryCache(max_loaded_bytes)
+        # 이 프로세스가 쓰는 워크북 핸들: workbook_id -> {file_path, display_filename,
+        # sheet_names, is_html, reader, user, lock} (목록 자체는 공유 상태의 workbooks 표)
+        self.workbooks: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.max_workbooks = max_workbooks
+        # 전체 시트 로딩 시 병렬 파싱 프로세스 수
+        self.parse_workers = int(os.getenv("SHEET_PARSE_WORKERS", min(4, os.cpu_count() or 1)))
         self.current_file_path = None
         self.current_data = {}
-
-    def has_loaded_file(self):
-        """Check if a file is currently loaded"""
-        return len(self.loaded_sheets) > 0
-
-    def get_current_file_info(self):
-        """Get information about the currently loaded file"""
-        if self.loaded_sheets:
-            # Get the first sheet's info
-            first_sheet = list(self.loaded_sheets.values())[0] if self.loaded_sheets else None
-            if first_sheet and 'file_path' in first_sheet:
-                return {
-                    'file_path': first_sheet['file_path'],
-                    'sheet_count': len(self.loaded_sheets)
-                }
-        return None
+        # 사용자별 작업 공간 (프로세스 안 잠금, 상태는 공유)
+        self.workspaces: Dict[str, Workspace] = {}
+        # workbooks/workspaces 목록 변경만 보호 (짧게 잡음). 파싱/편집은 워크북별 잠금으로
+        self._lock = threading.RLock()
+
+    def workspace(self, user: Optional[str]) -> Workspace:
+        """The user's workspace"""
+        user = user or SYSTEM_USER
+        with self._lock:
+            workspace = self.workspaces.get(user)
+            if workspace is None:
+                workspace = self.workspaces[user] = Workspace(user, self.state)
+            return workspace
+
+    def active_sheet(self, user: Optional[str]) -> Optional[Dict[str, Any]]:
+        """First sheet of the user's active workbook (None if they have none)"""
+        workbook_id = self.workspace(user).active_workbook()
+        if workbook_id is None:
+            return None
+        try:
+            entry = self._workbook_entry(workbook_id)
+            if not entry["sheet_names"]:
+                return None
+            return self.load_sheet(workbook_id, entry["sheet_names"][0])
+        except KeyError:
+            return None
+
+    def set_header_rows(self, user: Optional[str], header_rows: List[List[Any]]):
+        """Remember the header rows the user last saved with (e.g. payments)"""
+        self.workspace(user).set_header_rows([list(row) for row in header_rows])
+
+    def get_header_rows(self, user: Optional[str]) -> List[List[Any]]:
+        """Header rows the user last saved, else the first 4 rows of their active sheet"""
+        header_rows = self.workspace(user).header_rows()
+        if header_rows:
+            return header_rows
+        sheet_data = self.active_sheet(user)
+        if sheet_data and len(sheet_data["data"]) >= 4:
+            return [list(row) for row in sheet_data["data"][:4]]
+        return []
+
+    def has_loaded_file(self, user: Optional[str] = None):
+        """Check if the user has an uploaded workbook open"""
+        return self.get_current_file_info(user) is not None
+
+    def get_current_file_info(self, user: Optional[str] = None):
+        """Get information about the user's active workbook"""
+        workbook_id = self.workspace(user).active_workbook()
+        if workbook_id is None:
+            return None
+        row = self.state.query_one("SELECT display_filename, sheet_names FROM workbooks WHERE workbook_id = ?",
+                                   (workbook_id,))
+        if row is None:
+            return None
+        return {
+            'file_path': row['display_filename'],
+            'sheet_count': len(json.loads(row['sheet_names']))
+        }
 
     def classify_sheet(self, filename: str, sheet_name: str) -> SheetType:
         """Classify sheet type based on filename and sheet name"""
@@ -58,131 +237,114 @@ class SheetManager:
 
     def excel_date_to_string(self, excel_date) -> Optional[str]:
         """Convert Excel date to MM/DD format"""
-        try:
-            from datetime import datetime, timedelta
-
-            # Handle datetime objects directly
-            if isinstance(excel_date, datetime):
-                return excel_date.strftime('%m/%d')
-
-            # Handle Excel serial date numbers
-            if isinstance(excel_date, (int, float)):
-                excel_epoch = datetime(1899, 12, 30)
-                date_obj = excel_epoch + timedelta(days=float(excel_date))
-                return date_obj.strftime('%m/%d')
-
-            # Handle string values
-            elif isinstance(excel_date, str):
-                # If it contains 'T' (ISO format like "2025-08-12T00:00:00")
-                if 'T' in excel_date:
-                    # Parse ISO format and extract MM/DD
-                    date_obj = datetime.fromisoformat(excel_date.replace('Z', '+00:00'))
-                    return date_obj.strftime('%m/%d')
-
-                # If already has '/' just extract MM/DD
-                if '/' in excel_date:
-                    parts = excel_date.split('/')
-                    if len(parts) >= 2:
-                        return f"{parts[0]}/{parts[1]}"
-                    return excel_date
-
-                # Try parsing as number
-                try:
-                    num = float(excel_date)
-                    excel_epoch = datetime(1899, 12, 30)
-                    date_obj = excel_epoch + timedelta(days=num)
-                    return date_obj.strftime('%m/%d')
-                except:
-                    return excel_date
-
-            return excel_date
-        except:
-            return str(excel_date) if excel_date else excel_date
+        return excel_date_to_string(excel_date)
 
     def process_dataframe(self, df: pd.DataFrame, convert_dates: bool = True) -> List[List[Any]]:
-        """Process dataframe to handle NaN, inf values for JSON serialization"""
-        # Convert to list of lists while preserving string data
-        data = []
-        for row_idx, row in enumerate(df.values.tolist()):
-            processed_row = []
-            for col_idx, cell in enumerate(row):
-                # Handle string cells (including phone numbers and product names)
+        """Process dataframe to handle NaN, inf values for JSON serialization
+
+        Works column by column: null/inf/'nan' masks are built with NumPy,
+        string columns are stripped in bulk and the row lists are only
+        materialized once at the end.
+        """
+        if len(df) == 0:
+            return []
+
+        processed = np.empty((df.shape[1], len(df)), dtype=object)
+        for col_idx in range(df.shape[1]):
+            processed[col_idx] = self._process_column(df.iloc[:, col_idx], convert_dates and col_idx == 21)
+
+        # Materialize row lists once
+        return processed.T.tolist()
+
+    def _process_column(self, series: pd.Series, is_date_column: bool) -> np.ndarray:
+        """Clean one dataframe column into an object array (None for NaN/inf/'nan')"""
+        values = series.to_numpy(dtype=object, copy=True)
+        raw_values = values.copy() if is_date_column else values
+        n_rows = len(values)
+        kind = series.dtype.kind
+
+        str_mask = np.zeros(n_rows, dtype=bool)
+        number_mask = np.zeros(n_rows, dtype=bool)
+
+        if kind in 'iub':
+            null_mask = np.zeros(n_rows, dtype=bool)
+            number_mask[:] = True
+        elif kind == 'f':
+            null_mask = ~np.isfinite(series.to_numpy())
+            number_mask[:] = True
+        elif kind == 'O':
+            # Same few values repeat thousands of times per sheet - classify each
+            # distinct value once (string / 'nan' / inf / number) and broadcast by code
+            codes, uniques = pd.factorize(values)
+            n_uniques = len(uniques)
+            codes[codes < 0] = n_uniques  # NaN/None -> extra "null" slot
+
+            is_str = np.zeros(n_uniques + 1, dtype=bool)
+            is_null = np.zeros(n_uniques + 1, dtype=bool)
+            is_number = np.zeros(n_uniques + 1, dtype=bool)
+            stripped = np.empty(n_uniques + 1, dtype=object)
+            is_null[n_uniques] = True
+            for u_idx, cell in enumerate(uniques):
                 if isinstance(cell, str):
-                    # Check if it's a 'nan' string that pandas creates
-                    if cell.lower() == 'nan':
-                        processed_row.append(None)
-                    else:
-                        # V열(입금일, col_idx=21)인 경우 날짜 변환 시도
-                        if convert_dates and col_idx == 21 and row_idx >= 4:  # V열, 5행부터
-                            converted = self.excel_date_to_string(cell)
-                            processed_row.append(converted)
-                        else:
-                            # Preserve the string as-is
-                            processed_row.append(cell.strip() if cell else cell)
-                # Handle numeric cells
+                    is_str[u_idx] = True
+                    # 'nan' strings that pandas creates
+                    is_null[u_idx] = cell.lower() == 'nan'
+                    stripped[u_idx] = cell.strip()
                 elif isinstance(cell, (int, float, np.integer, np.floating)):
-                    if pd.isna(cell) or np.isinf(cell):
-                        processed_row.append(None)
-                    else:
-                        # V열(입금일, col_idx=21)인 경우 날짜 변환
-                        if convert_dates and col_idx == 21 and row_idx >= 4:  # V열, 5행부터
-                            converted = self.excel_date_to_string(cell)
-                            processed_row.append(converted)
-                        else:
-                            # Keep as string if it was read as string (dtype=str)
-                            processed_row.append(cell)
-                # Handle NaN/None
-                elif pd.isna(cell) or cell is None:
-                    processed_row.append(None)
+                    is_number[u_idx] = True
+                    is_null[u_idx] = bool(np.isinf(cell))
+
+            str_mask = is_str[codes]
+            null_mask = is_null[codes]
+            number_mask = is_number[codes]
+            values[str_mask] = stripped[codes[str_mask]]
+        else:
+            null_mask = pd.isna(values)
+
+        values[null_mask] = None
+
+        # V열(입금일, col_idx=21) 5행부터: 숫자와 문자열(원본값)을 날짜로 한 번에 변환
+        if is_date_column and n_rows > 4:
+            convert_mask = (str_mask | number_mask) & ~null_mask
+            convert_mask[:4] = False
+            convert_idx = np.flatnonzero(convert_mask)
+            if len(convert_idx):
+                if kind == 'O':
+                    values[convert_idx] = excel_dates_to_strings(raw_values[convert_idx])
                 else:
-                    processed_row.append(cell)
-            data.append(processed_row)
+                    values[convert_idx] = excel_serials_to_strings(series.to_numpy()[convert_idx])
 
-        return data
+        return values
 
-    def load_excel_file(self, file_path: str, original_filename: Optional[str] = None) -> Dict[str, Any]:
+    def load_excel_file(self, file_path: str, original_filename: Optional[str] = None,
+                        reader: Optional[WorkbookReader] = None,
+                        max_sheets: Optional[int] = None,
+                        workers: int = 1, cache: bool = True) -> Dict[str, Any]:
         """Load Excel file with proper handling of special cases
 
         Args:
             file_path: Path to the Excel file (may be temporary)
             original_filename: Original filename to display (if file_path is temporary)
+            reader: Already opened workbook to reuse (opened and closed here if not given)
+            max_sheets: Parse only the first N sheets (None = all); the rest are listed
+                in sheet_catalog and can be loaded later with load_sheet
+            workers: Parse sheets in up to this many worker processes (1 = in process)
+            cache: Keep the parsed sheets in loaded_sheets (False in worker processes)
         """
         try:
             # Use original filename if provided, otherwise use file_path
             display_filename = original_filename if original_filename else file_path
-            # Check file extension
-            file_ext = Path(file_path).suffix.lower()
-
-            # Check if it's an HTML-formatted .xls file
-            is_html_xls = False
-            if file_ext == '.xls':
-                with open(file_path, 'rb') as f:
-                    header = f.read(100)
-                    if b'<html' in header.lower() or b'<!doctype' in header.lower() or b'<meta' in header.lower():
-                        is_html_xls = True
-                        print(f"Detected HTML-formatted XLS file")
 
             # Handle HTML-formatted .xls files
-            if is_html_xls:
-                # Read HTML table with header
-                df_with_header = pd.read_html(file_path, header=0, encoding='utf-8')[0]
-
-                # Convert header row to data and prepend it
-                header_row = df_with_header.columns.tolist()
-                df_data = df_with_header.values.tolist()
-
-                # Combine header as first row with data
-                all_data = [header_row] + df_data
-
-                # Create a new DataFrame without header
-                df = pd.DataFrame(all_data)
+            if reader is None and is_html_xls(file_path):
+                print(f"Detected HTML-formatted XLS file")
+                # Stream the first table straight into sheet rows (header row first)
+                data = read_html_table(file_path)
+                self.convert_date_column(data)
 
                 sheet_names = ["Sheet1"]
                 sheets_data = []
 
-                # Process dataframe
-                data = self.process_dataframe(df)
-
                 # Generate column names
                 if len(data) > 0:
                     columns = [f"Col{i+1}" for i in range(len(data[0]))]
@@ -195,10 +357,11 @@ class SheetManager:
                 sheet_data = {
                     "sheet_name": "Sheet1",
                     "sheet_type": sheet_type.value,
-                    "data": data,
+                    # 입고전표는 헤더가 1행뿐
+                    "data": Sheet.from_rows(data, header_rows=1),
                     "columns": columns,
-                    "rows": len(df),
-                    "cols": len(df.columns),
+                    "rows": len(data),
+                    "cols": len(data[0]) if data else 0,
                     "file_path": display_filename,
                     "loaded_at": datetime.now().isoformat()
                 }
@@ -206,93 +369,62 @@ class SheetManager:
                 sheets_data.append(sheet_data)
 
                 # Cache the sheet
-                self.cache_sheet(file_path, "Sheet1", sheet_data)
+                if cache:
+                    self.cache_sheet(file_path, "Sheet1", sheet_data)
 
                 return {
                     "success": True,
                     "sheets": sheets_data,
+                    "sheet_catalog": [self._catalog_entry(sheet_data)],
                     "total_sheets": 1,
                     "file_path": display_filename
                 }
 
             # Handle regular Excel files
-            if file_ext == '.xls':
-                # For older Excel files
-                xl_file = pd.ExcelFile(file_path, engine='xlrd')
-            else:
-                # For newer Excel files
-                xl_file = pd.ExcelFile(file_path, engine='openpyxl')
-
-            sheet_names = xl_file.sheet_names
-            sheets_data = []
-
-            # Only load first 3 sheets for performance
-            sheet_names_to_load = sheet_names[:3]
-            print(f"Loading {len(sheet_names_to_load)} sheets out of {len(sheet_names)} total sheets")
-
-            for sheet_name in sheet_names_to_load:
-                # Read without treating first row as header
-                # Don't use dtype=str to allow proper date parsing
-                if file_ext == '.xls':
-                    df = pd.read_excel(file_path, sheet_name=sheet_name, header=None, engine='xlrd')
-                else:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name, header=None, engine='openpyxl')
-
-                # Process dataframe with date conversion
-                data = self.process_dataframe(df, convert_dates=True)
-
-                # Add sum formulas to yellow row 3 (index 2) for specific columns
-                # I, J, K, L, M, N, O, S, T, U columns (indices: 8,9,10,11,12,13,14,18,19,20)
-                if len(data) > 3:  # Ensure we have at least 4 rows (index 0-3)
-                    sum_columns = [8, 9, 10, 11, 12, 13, 14, 18, 19, 20]  # I,J,K,L,M,N,O,S,T,U
-                    row_index = 2  # Yellow row 3 (0-indexed)
-
-                    # Ensure row has enough columns
-                    while len(data[row_index]) < max(sum_columns) + 1:
-                        data[row_index].append(None)
-
-                    # Calculate sum from row 4 (index 3) to end for each column
-                    for col_idx in sum_columns:
-                        total = 0
-                        for data_row_idx in range(4, len(data)):  # Start from row 5 (index 4)
-                            cell_value = data[data_row_idx][col_idx] if col_idx < len(data[data_row_idx]) else None
-                            if cell_value is not None:
-                                try:
-                                    total += float(cell_value)
-                                except (ValueError, TypeError):
-                                    pass  # Skip non-numeric values
-
-                        # Set the sum in yellow row 3
-                        data[row_index][col_idx] = total if total != 0 else 0
+            # Open the workbook once (read-only streaming) and reuse it for every sheet
+            owns_reader = reader is None
+            if owns_reader:
+                reader = WorkbookReader(file_path)
 
-                # Generate column names
-                if len(data) > 0:
-                    columns = [f"Col{i+1}" for i in range(len(data[0]))]
+            try:
+                sheet_names = reader.sheet_names
+                sheets_data = []
+                sheet_catalog = []
+
+                # 시트 목록(이름/크기/종류)은 전체를 바로 만들고, 파싱은 앞쪽 max_sheets개만
+                # (나머지 시트는 load_sheet로 요청 시점에 파싱)
+                sheet_names_to_load = sheet_names if max_sheets is None else sheet_names[:max_sheets]
+                print(f"Loading {len(sheet_names_to_load)} sheets out of {len(sheet_names)} total sheets")
+
+                for sheet_name in sheet_names:
+                    # <dimension> is read before parsing (reading rows resets it)
+                    rows, cols = reader.sheet_dimensions(sheet_name)
+                    sheet_catalog.append({
+                        "sheet_name": sheet_name,
+                        "sheet_type": self.classify_sheet(file_path, sheet_name).value,
+                        "rows": rows,
+                        "cols": cols,
+                        "loaded": False
+                    })
+
+                if workers > 1 and len(sheet_names_to_load) > 1 and isinstance(file_path, str):
+                    parsed_rows = self._read_sheets_parallel(file_path, sheet_names_to_load, workers)
                 else:
-                    columns = []
-
-                # Classify sheet type
-                sheet_type = self.classify_sheet(file_path, sheet_name)
-
-                sheet_data = {
-                    "sheet_name": sheet_name,
-                    "sheet_type": sheet_type.value,
-                    "data": data,
-                    "columns": columns,
-                    "rows": len(df),
-                    "cols": len(df.columns),
-                    "file_path": display_filename,
-                    "loaded_at": datetime.now().isoformat()
-                }
+                    parsed_rows = (reader.read_rows(sheet_name) for sheet_name in sheet_names_to_load)
 
-                sheets_data.append(sheet_data)
-
-                # Cache the sheet
-                self.cache_sheet(file_path, sheet_name, sheet_data)
+                for idx, (sheet_name, data) in enumerate(zip(sheet_names_to_load, parsed_rows)):
+                    self.convert_date_column(data)
+                    sheet_data = self._build_sheet_data(data, file_path, sheet_name, display_filename, cache=cache)
+                    sheets_data.append(sheet_data)
+                    sheet_catalog[idx] = self._catalog_entry(sheet_data)
+            finally:
+                if owns_reader:
+                    reader.close()
 
             return {
                 "success": True,
                 "sheets": sheets_data,
+                "sheet_catalog": sheet_catalog,
                 "total_sheets": len(sheet_names),
                 "file_path": display_filename
             }
@@ -304,62 +436,492 @@ class SheetManager:
                 "file_path": file_path
             }
 
-    def cache_sheet(self, file_path: str, sheet_name: str, data: Dict[str, Any]):
-        """Cache sheet data for later retrieval"""
-        cache_key = f"{Path(file_path).stem}_{sheet_name}"
-        self.loaded_sheets[cache_key] = data
+    def _parse_sheet(self, reader: WorkbookReader, file_path: str, sheet_name: str,
+                     display_filename: str) -> Dict[str, Any]:
+        """Parse one sheet from an open workbook into the cached sheet format"""
+        # Rows are streamed straight into the sheet row format (no DataFrame)
+        data = reader.read_rows(sheet_name)
+        self.convert_date_column(data)
+        return self._build_sheet_data(data, file_path, sheet_name, display_filename)
 
-        # Also save to disk for persistence
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        try:
-            # Convert data for JSON serialization
-            cache_data = {
-                "file_path": file_path,
-                "sheet_name": sheet_name,
-                "sheet_type": data.get("sheet_type"),
-                "loaded_at": data.get("loaded_at"),
-                "rows": data.get("rows"),
-                "cols": data.get("cols")
-            }
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False)
-        except Exception as e:
-            print(f"Error caching sheet: {e}")
+    def _read_sheets_parallel(self, file_path: str, sheet_names: List[str],
+                              workers: int) -> List[List[List[Any]]]:
+        """Read sheets in the shared CPU process pool (map_cpu)
 
-    def get_cached_sheets(self) -> List[Dict[str, Any]]:
-        """Get list of all cached sheets"""
-        cached = []
-        for cache_file in self.cache_dir.glob("*.json"):
+        The sheets are dealt round-robin into up to `workers` tasks, each of
+        which opens the workbook once. Results come back in sheet_names order.
+        """
+        n_tasks = max(1, min(workers, CPU_WORKERS, len(sheet_names)))
+        chunks = [sheet_names[i::n_tasks] for i in range(n_tasks)]
+        chunk_rows = map_cpu(_parse_sheets_rows, [file_path] * n_tasks, chunks)
+
+        rows: List[List[List[Any]]] = [None] * len(sheet_names)
+        for i, sheet_rows in enumerate(chunk_rows):
+            rows[i::n_tasks] = sheet_rows
+        return rows
+
+    def _catalog_entry(self, sheet_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Sheet catalog entry for an already parsed sheet"""
+        return {
+            "sheet_name": sheet_data["sheet_name"],
+            "sheet_type": sheet_data["sheet_type"],
+            "rows": sheet_data["rows"],
+            "cols": sheet_data["cols"],
+            "loaded": True
+        }
+
+    def open_workbook(self, file_path: str, original_filename: Optional[str] = None,
+                      max_sheets: int = 1, parsed: Optional[Dict[str, Any]] = None,
+                      user: Optional[str] = None) -> Dict[str, Any]:
+        """Keep an uploaded workbook and return its sheet catalog
+
+        The file is moved into workbook_dir and stays open, so only the first
+        max_sheets sheets are parsed now; every other sheet is parsed the first
+        time load_sheet asks for it. The workbook becomes the user's active
+        workbook: its parsed sheets stay in memory until the user opens another.
+
+        Args:
+            user: Uploading user (owner of the cached sheets)
+            parsed: Earlier open_workbook result for the same bytes (upload cache).
+                Its sheets are reused and the workbook is only opened if another
+                sheet is requested later.
+        """
+        workbook_id = uuid.uuid4().hex
+        stored_path = str(self.workbook_dir / f"{workbook_id}{Path(file_path).suffix.lower()}")
+        shutil.move(file_path, stored_path)
+
+        display_filename = original_filename if original_filename else file_path
+        # HTML 형식 .xls는 시트가 하나뿐이라 통째로 파싱 (reader 없음)
+        is_html = is_html_xls(stored_path)
+        reader = None
+        if parsed is None and not is_html:
             try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cached.append(json.load(f))
+                reader = WorkbookReader(stored_path)
             except Exception as e:
-                print(f"Error reading cache file {cache_file}: {e}")
-        return cached
+                os.unlink(stored_path)
+                return {
+                    "success": False,
+                    "error": str(e),
+                    "file_path": display_filename
+                }
 
-    def export_to_excel(self, data: List[List[Any]], columns: List[str],
-                       file_name: str, sheet_name: str = "Sheet1") -> str:
-        """Export data to Excel file"""
-        try:
-            # Create DataFrame
-            df = pd.DataFrame(data, columns=columns)
+        if parsed is not None:
+            sheet_names = [entry["sheet_name"] for entry in parsed["sheet_catalog"]]
+        else:
+            sheet_names = reader.sheet_names if reader else ["Sheet1"]
+        workspace = self.workspace(user)
+        now = time.time()
+        self.state.execute(
+            "INSERT INTO workbooks (workbook_id, user, file_path, display_filename, sheet_names, is_html, "
+            "created_at, last_used_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (workbook_id, workspace.user, stored_path, display_filename,
+             json.dumps(sheet_names, ensure_ascii=False), int(is_html), now, now)
+        )
+        with self._lock:
+            self.workbooks[workbook_id] = self._local_entry(
+                stored_path, display_filename, sheet_names, is_html, user, reader)
+        with workspace.lock:
+            workspace.activate(workbook_id)
+            self.loaded_sheets.pin(user, workbook_id)
+        self._evict_workbooks()
+
+        if parsed is not None:
+            result = dict(parsed, file_path=display_filename, sheets=[])
+            for sheet_data in parsed["sheets"]:
+                sheet_data = dict(sheet_data, file_path=display_filename)
+                self.cache_sheet(stored_path, sheet_data["sheet_name"], sheet_data)
+                result["sheets"].append(sheet_data)
+        else:
+            result = self.load_excel_file(stored_path, original_filename=display_filename,
+                                          reader=reader, max_sheets=max_sheets)
+            if not result["success"]:
+                self.close_workbook(workbook_id)
+                return result
+
+        result["workbook_id"] = workbook_id
+        return result
+
+    def open_workbook_ids(self) -> Set[str]:
+        """Ids of the workbooks currently kept open (by any worker)"""
+        return {row["workbook_id"] for row in self.state.query("SELECT workbook_id FROM workbooks")}
+
+    @staticmethod
+    def _local_entry(file_path: str, display_filename: str, sheet_names: List[str], is_html: bool,
+                     user: Optional[str], reader: Optional[WorkbookReader] = None) -> Dict[str, Any]:
+        return {
+            "file_path": file_path,
+            "display_filename": display_filename,
+            "sheet_names": sheet_names,
+            "is_html": is_html,
+            "reader": reader,
+            "user": user,
+            # 시트 파싱/편집과 워크북 핸들 사용을 워크북 단위로 직렬화
+            "lock": threading.RLock()
+        }
+
+    def _workbook_entry(self, workbook_id: str, user: Optional[str] = None) -> Dict[str, Any]:
+        """This process's handle for an open workbook (marks it recently used)
+
+        The shared workbooks table decides whether the workbook exists; a
+        workbook uploaded through another worker gets a local handle here.
+        With user, a workbook another user uploaded counts as unknown.
+
+        Raises:
+            KeyError: unknown workbook_id (or not the user's)
+        """
+        row = self.state.query_one(
+            "SELECT w.*, ws.active_workbook FROM workbooks w "
+            "LEFT JOIN workspaces ws ON ws.user = w.user WHERE w.workbook_id = ?",
+            (workbook_id,)
+        )
+        if row is None:
+            # 다른 워커에서 닫힌 워크북
+            self._forget_workbook(workbook_id)
+            raise KeyError(f"Workbook not found: {workbook_id}")
+        if user is not None and row["user"] != user:
+            # 다른 사용자의 워크북은 있는지도 알리지 않음
+            raise KeyError(f"Workbook not found: {workbook_id}")
+
+        with self._lock:
+            entry = self.workbooks.get(workbook_id)
+            if entry is None:
+                user = None if row["user"] == SYSTEM_USER else row["user"]
+                entry = self.workbooks[workbook_id] = self._local_entry(
+                    row["file_path"], row["display_filename"], json.loads(row["sheet_names"]),
+                    bool(row["is_html"]), user)
+            self.workbooks.move_to_end(workbook_id)
+            trim = len(self.workbooks) > self.max_workbooks
+        if row["active_workbook"] == workbook_id and not self.loaded_sheets.is_pinned(workbook_id):
+            self.loaded_sheets.pin(entry["user"], workbook_id)
+        if time.time() - row["last_used_at"] > WORKBOOK_TOUCH_SECONDS:
+            self.state.execute("UPDATE workbooks SET last_used_at = ? WHERE workbook_id = ?",
+                               (time.time(), workbook_id))
+        if trim:
+            self._trim_local_workbooks()
+        return entry
+
+    def get_workbook_reader(self, workbook_id: str) -> Optional[WorkbookReader]:
+        """Open workbook handle of an uploaded workbook (None for HTML .xls)
+
+        Use it while holding the workbook's lock (load_sheet does).
+        """
+        with self._lock:
+            entry = self.workbooks.get(workbook_id)
+        if entry is None or entry["is_html"]:
+            return None
+        with entry["lock"]:
+            if entry["reader"] is None:
+                entry["reader"] = WorkbookReader(entry["file_path"])
+            return entry["reader"]
+
+    def load_sheet(self, workbook_id: str, sheet_name: str, user: Optional[str] = None) -> Dict[str, Any]:
+        """Return one sheet of an uploaded workbook, parsing it on first request
 
-            # Create export directory
-            export_dir = Path("./exports")
-            export_dir.mkdir(exist_ok=True)
+        Args:
+            user: Requesting user; another user's workbook is reported as unknown
 
-            # Generate file path
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = export_dir / f"{file_name}_{timestamp}.xlsx"
+        Raises:
+            KeyError: unknown workbook_id or sheet_name
+        """
+        entry = self._workbook_entry(workbook_id, user)
+        if sheet_name not in entry["sheet_names"]:
+            raise KeyError(f"Sheet not found: {sheet_name}")
+
+        # 같은 워크북의 시트만 서로 기다림 (다른 사용자/워크북은 병렬)
+        with entry["lock"]:
+            if entry.get("closed"):
+                raise KeyError(f"Workbook not found: {workbook_id}")
+            cache_key = self._cache_key(entry["file_path"], sheet_name)
+            cached = self.loaded_sheets.get(cache_key)
+            if cached is not None:
+                # 다른 워커에서 편집된 셀을 반영
+                version = self.store.refresh(workbook_id, sheet_name, cached["data"], cached.get("version", 0))
+                if version is not None:
+                    cached["version"] = version
+                    return cached
+                self.loaded_sheets.pop(cache_key)
+
+            # 메모리에서 밀려난 시트는 디스크 캐시에서 (다시 파싱하지 않음)
+            loaded = self.store.load(workbook_id, sheet_name)
+            if loaded is not None:
+                sheet, info = loaded
+                sheet_data = {
+                    "sheet_name": sheet_name,
+                    "sheet_type": info["sheet_type"],
+                    "data": sheet,
+                    "columns": info["columns"],
+                    "rows": info["rows"],
+                    "cols": max(info["cols"] or 0, sheet.width),
+                    "file_path": entry["display_filename"],
+                    "loaded_at": info["loaded_at"],
+                    "version": info["version"]
+                }
+                self.loaded_sheets.put(cache_key, sheet_data)
+                return sheet_data
+
+            if entry["is_html"]:
+                result = self.load_excel_file(entry["file_path"], original_filename=entry["display_filename"])
+                if not result["success"]:
+                    raise Exception(result.get("error", "Failed to load sheet"))
+                return result["sheets"][0]
+
+            reader = self.get_workbook_reader(workbook_id)
+            return self._parse_sheet(reader, entry["file_path"], sheet_name, entry["display_filename"])
+
+    @staticmethod
+    def derived_cell_edits(sheet: Sheet, edits: List[Tuple[int, int, Any]]) -> List[Tuple[int, int, Any]]:
+        """Cells that follow from edits, computed on the sheet as it will be after them
+
+        - P열 of every row whose L/M/N/O changed: "차이 있음" if L+M+N != O,
+          else "" (left alone if a value is not a number), as save_daily_order does
+        - the yellow row 3 sum of every sum column edited from row 5 on, as
+          _build_sheet_data does
+        """
+        edited_rows: Dict[int, Dict[int, Any]] = {}
+        for row, col, value in edits:
+            edited_rows.setdefault(row, {})[col] = value
+        derived = []
+
+        for row in sorted(edited_rows):
+            row_edits = edited_rows[row]
+            if row < DIFF_HEADER_ROWS or not any(col in row_edits for col in DIFF_SOURCE_COLUMNS):
+                continue
+            cells = list(sheet.row(row))
+            for col, value in row_edits.items():
+                if col >= len(cells):
+                    cells.extend([None] * (col + 1 - len(cells)))
+                cells[col] = value
+            if len(cells) <= excel_render.DAILY_DIFF_COLUMN:
+                continue
+            try:
+                l_num, m_num, n_num, o_num = [float(cells[col]) if cells[col] else 0 for col in DIFF_SOURCE_COLUMNS]
+            except (ValueError, TypeError):
+                continue
+            derived.append((row, excel_render.DAILY_DIFF_COLUMN,
+                            excel_render.DAILY_DIFF_TEXT if l_num + m_num + n_num != o_num else ""))
+
+        if len(sheet) > 3:
+            for col_idx in SUM_COLUMNS:
+                changed = [(row, row_edits[col_idx]) for row, row_edits in edited_rows.items()
+                           if row >= SUM_START_ROW and col_idx in row_edits]
+                if not changed:
+                    continue
+                values = sheet.numeric(col_idx)
+                for row, value in changed:
+                    values[row] = cell_float(value, np.nan)
+                total = float(np.nansum(values[SUM_START_ROW:]))
+                derived.append((SUM_ROW_INDEX, col_idx, total if total != 0 else 0))
+        return derived
+
+    def apply_cell_edits(self, workbook_id: str, sheet_name: str, base_version: int,
+                         edits: List[Tuple[int, int, Any]],
+                         user: Optional[str] = None) -> Tuple[int, List[Tuple[int, int, Any]]]:
+        """Apply (row, col, value) edits to a sheet of an uploaded workbook
+
+        The edits are committed to the sheet's edit log on disk (which
+        checks the version across worker processes) and applied to the
+        cached sheet in memory; the sheet itself is not rewritten. The
+        P열 and row 3 sums that follow from the edits (derived_cell_edits)
+        are committed with them. Returns the new version and those derived
+        (row, col, value) cells.
 
-            # Write to Excel
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
+        Args:
+            user: Editing user; another user's workbook is reported as unknown
 
-            return str(output_file)
+        Raises:
+            KeyError: unknown workbook_id or sheet_name
+            SheetVersionConflict: base_version is not the current version
+            ValueError: a cell is outside the sheet
+        """
+        entry = self._workbook_entry(workbook_id, user)
+        with entry["lock"]:
+            sheet_data = self.load_sheet(workbook_id, sheet_name, user)
+            version = sheet_data.get("version", 0)
+            if base_version != version:
+                raise SheetVersionConflict(version)
+
+            sheet = sheet_data["data"]
+            if not isinstance(sheet, Sheet):
+                sheet = sheet_data["data"] = Sheet.from_rows(sheet)
+            # 범위를 모두 확인한 뒤 적용 (일부만 반영되지 않도록)
+            for row, col, _ in edits:
+                if not 0 <= row < len(sheet) or not 0 <= col < MAX_SHEET_COLUMNS:
+                    raise ValueError(f"Cell out of range: row {row}, col {col}")
+
+            derived = self.derived_cell_edits(sheet, edits)
+            edits = list(edits) + derived
+            batch = [list(edit) for edit in edits]
+            try:
+                version, edit_count = self.store.commit_edits(workbook_id, sheet_name, base_version, batch)
+            except KeyError:
+                # 첫 기록이 아직 끝나지 않았거나 실패함: 지금 기록하고 다시
+                self.store.flush()
+                if self.store.current_version(workbook_id, sheet_name) is None:
+                    self.store.save(workbook_id, sheet_name, sheet,
+                                    self._store_info(entry["file_path"], sheet_data)).result()
+                version, edit_count = self.store.commit_edits(workbook_id, sheet_name, base_version, batch)
+
+            width = sheet.width
+            for row, col, value in edits:
+                sheet.set_cell(row, col, value)
+            sheet_data["version"] = version
+            if sheet.width != width:
+                sheet_data["cols"] = max(sheet_data.get("cols") or 0, sheet.width)
+                self.loaded_sheets.resize(self._cache_key(entry["file_path"], sheet_name))
+
+            if edit_count >= EDIT_LOG_COMPACT_EDITS:
+                self.store.save(workbook_id, sheet_name, sheet, self._store_info(entry["file_path"], sheet_data))
+            return version, derived
+
+    def close_workbook(self, workbook_id: str):
+        """Forget an uploaded workbook everywhere: drop its sheets and delete the file"""
+        with self.state.transaction() as conn:
+            row = conn.execute("SELECT file_path FROM workbooks WHERE workbook_id = ?", (workbook_id,)).fetchone()
+            conn.execute("DELETE FROM workbooks WHERE workbook_id = ?", (workbook_id,))
+            conn.execute("UPDATE workspaces SET active_workbook = NULL WHERE active_workbook = ?", (workbook_id,))
+        self._forget_workbook(workbook_id)
+        if row is None:
+            return
+        self.store.remove_workbook(workbook_id)
+        try:
+            os.unlink(row["file_path"])
+        except OSError as e:
+            print(f"Error removing workbook file: {e}")
+
+    def _forget_workbook(self, workbook_id: str):
+        """Drop this process's handle and cached sheets of a workbook"""
+        with self._lock:
+            entry = self.workbooks.pop(workbook_id, None)
+        if entry is None:
+            return
+        # 진행 중인 파싱/편집이 끝난 뒤 닫음
+        with entry["lock"]:
+            entry["closed"] = True
+            if entry["reader"]:
+                entry["reader"].close()
+            self.loaded_sheets.drop_workbook(workbook_id)
+
+    def _evict_workbooks(self):
+        """Close least recently used workbooks beyond max_workbooks (users' active workbooks are kept)"""
+        total = self.state.query_one("SELECT COUNT(*) AS n FROM workbooks")["n"]
+        if total <= self.max_workbooks:
+            return
+        rows = self.state.query(
+            "SELECT workbook_id FROM workbooks WHERE workbook_id NOT IN "
+            "(SELECT active_workbook FROM workspaces WHERE active_workbook IS NOT NULL) "
+            "ORDER BY last_used_at LIMIT ?",
+            (total - self.max_workbooks,)
+        )
+        for row in rows:
+            self.close_workbook(row["workbook_id"])
+
+    def _trim_local_workbooks(self):
+        """Release this process's least recently used handles beyond max_workbooks (the workbooks stay open)"""
+        with self._lock:
+            excess = len(self.workbooks) - self.max_workbooks
+            victims = [workbook_id for workbook_id in self.workbooks
+                       if not self.loaded_sheets.is_pinned(workbook_id)][:max(excess, 0)]
+        for workbook_id in victims:
+            self._forget_workbook(workbook_id)
+
+    def convert_date_column(self, data: List[List[Any]], col_idx: int = 21, start_row: int = 4):
+        """Convert V열(입금일) cells to MM/DD in place, from row 5 on"""
+        rows = [
+            row for row in data[start_row:]
+            if len(row) > col_idx and isinstance(row[col_idx], (str, int, float)) and not isinstance(row[col_idx], bool)
+        ]
+        converted = excel_dates_to_strings(row[col_idx] for row in rows)
+        for row, value in zip(rows, converted):
+            row[col_idx] = value
+
+    def _build_sheet_data(self, data: List[List[Any]], file_path: str, sheet_name: str,
+                          display_filename: str, cache: bool = True) -> Dict[str, Any]:
+        """Store a parsed sheet as a columnar Sheet, add yellow row sums, classify and cache it"""
+        cols = len(data[0]) if data else 0
+        rows = len(data)
+        sheet = Sheet.from_rows(data)
+
+        # Add sum formulas to yellow row 3 (index 2) for specific columns
+        # I, J, K, L, M, N, O, S, T, U columns (indices: 8,9,10,11,12,13,14,18,19,20)
+        if len(data) > 3:  # Ensure we have at least 4 rows (index 0-3)
+            # Sum from row 5 (index 4) to end; non-numeric cells are skipped
+            for col_idx in SUM_COLUMNS:
+                total = sheet.column_sum(col_idx, start_row=SUM_START_ROW)
+                sheet.set_cell(SUM_ROW_INDEX, col_idx, total if total != 0 else 0)
+
+        # Generate column names
+        if len(data) > 0:
+            columns = [f"Col{i+1}" for i in range(len(data[0]))]
+        else:
+            columns = []
+
+        # Classify sheet type
+        sheet_type = self.classify_sheet(file_path, sheet_name)
+
+        sheet_data = {
+            "sheet_name": sheet_name,
+            "sheet_type": sheet_type.value,
+            "data": sheet,
+            "columns": columns,
+            "rows": rows,
+            "cols": cols,
+            "file_path": display_filename,
+            "loaded_at": datetime.now().isoformat()
+        }
+
+        # Cache the sheet
+        if cache:
+            self.cache_sheet(file_path, sheet_name, sheet_data)
+
+        return sheet_data
+
+    def _cache_key(self, file_path: str, sheet_name: str):
+        """(owner, workbook, sheet) key; stored workbooks are named after their workbook_id"""
+        workbook = Path(file_path).stem
+        with self._lock:
+            entry = self.workbooks.get(workbook)
+        return self.loaded_sheets.key(entry["user"] if entry else None, workbook, sheet_name)
 
-        except Exception as e:
-            raise Exception(f"Error exporting to Excel: {e}")
+    def cache_sheet(self, file_path: str, sheet_name: str, data: Dict[str, Any]):
+        """Cache sheet data for later retrieval (in memory now, on disk in the background)"""
+        self.loaded_sheets.put(self._cache_key(file_path, sheet_name), data)
+
+        sheet = data["data"]
+        if not isinstance(sheet, Sheet):
+            sheet = Sheet.from_rows(sheet)
+        self.store.save(Path(file_path).stem, sheet_name, sheet, self._store_info(file_path, data))
+
+    @staticmethod
+    def _store_info(file_path: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Index fields kept with a cached sheet"""
+        return {
+            "file_path": file_path,
+            "sheet_type": data.get("sheet_type"),
+            "columns": data.get("columns"),
+            "loaded_at": data.get("loaded_at"),
+            "rows": data.get("rows"),
+            "cols": data.get("cols"),
+            "version": data.get("version", 0)
+        }
+
+    def get_cached_sheets(self) -> List[Dict[str, Any]]:
+        """Get list of all cached sheets (from the cache index)"""
+        return [
+            {
+                "file_path": entry.get("file_path"),
+                "sheet_name": entry["sheet_name"],
+                "sheet_type": entry.get("sheet_type"),
+                "loaded_at": entry.get("loaded_at"),
+                "rows": entry.get("rows"),
+                "cols": entry.get("cols")
+            }
+            for entry in self.store.entries()
+        ]
+
+    def export_to_excel(self, data: List[List[Any]], columns: List[str],
+                       file_name: str, sheet_name: str = "Sheet1") -> str:
+        """Export data to Excel file"""
+        return excel_render.export_to_excel(data, columns, file_name, sheet_name)
 
     def update_sheet_data(self, sheet_name: str, data: List[List[Any]]):
         """Update sheet data in cache"""
@@ -374,16 +936,15 @@ class SheetManager:
                             sheet["cols"] = len(data[0]) if data else 0
                             break
 
-            # Optionally save to cache file
-            cache_file = self.cache_dir / f"{sheet_name}_cache.json"
-            cache_data = {
-                "sheet_name": sheet_name,
-                "data": data,
-                "updated_at": datetime.now().isoformat()
-            }
-
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2, default=str)
+            # 수정본은 디스크 캐시에 바이너리로 (백그라운드 기록)
+            self.store.save(EDITED_SHEETS_WORKBOOK, sheet_name, Sheet.from_rows(data), {
+                "file_path": None,
+                "sheet_type": None,
+                "columns": None,
+                "loaded_at": datetime.now().isoformat(),
+                "rows": len(data),
+                "cols": len(data[0]) if data else 0
+            }, replace=True)
 
         except Exception as e:
             raise Exception(f"Error updating sheet data: {e}")
@@ -0,0 +1,188 @@
+"""
+In-memory sheet cache for GNDR order management
+
+Parsed sheets are kept in memory so switching between sheets of an uploaded
+workbook does not parse them again. Entries are keyed by (user, workbook,
+sheet) and sized when they are stored; when the total passes the byte
+budget, least recently used sheets are dropped. Each user's active
+workbook (the one they uploaded last) is pinned and never evicted, so the
+sheets someone is working on survive other users' uploads. Evicted sheets
+are read back from their SheetStore file (pickle with mmap-ed arrays, see
+sheet_store.py) the next time they are asked for; only a sheet with no
+stored file is parsed again from the workbook.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from collections import OrderedDict
+import os
+import threading
+from sheet_model import Sheet, estimate_rows_bytes
+
+SHEET_MEMORY_BUDGET_BYTES = int(os.getenv("SHEET_MEMORY_BUDGET_MB", 512)) * 1024 * 1024
+
+# 사용자 정보 없이 올라온 시트 (경로로 직접 연 파일 등)
+SYSTEM_USER = "system"
+
+SheetKey = Tuple[str, str, str]
+
+
+def sheet_data_bytes(sheet_data: Dict[str, Any]) -> int:
+    """Estimated memory of a cached sheet dict (its rows dominate)"""
+    data = sheet_data.get("data")
+    if isinstance(data, Sheet):
+        return data.memory_usage()
+    return estimate_rows_bytes(data or [])
+
+
+class SheetMemoryCache:
+    """LRU of parsed sheets bounded by estimated bytes, with per-user pinning"""
+
+    def __init__(self, max_bytes: int = SHEET_MEMORY_BUDGET_BYTES):
+        self.max_bytes = max_bytes
+        # (user, workbook, sheet) -> sheet dict, least recently used first
+        self._entries: "OrderedDict[SheetKey, Dict[str, Any]]" = OrderedDict()
+        self._sizes: Dict[SheetKey, int] = {}
+        # 사용자별 작업 중인 워크북 (고정, 제거 대상에서 제외)
+        self._active: Dict[str, str] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(user: Optional[str], workbook: str, sheet_name: str) -> SheetKey:
+        return (user or SYSTEM_USER, workbook, sheet_name)
+
+    def get(self, key: SheetKey) -> Optional[Dict[str, Any]]:
+        """Cached sheet dict, or None on a miss"""
+        with self._lock:
+            sheet_data = self._entries.get(key)
+            if sheet_data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return sheet_data
+
+    def put(self, key: SheetKey, sheet_data: Dict[str, Any]):
+        """Store a sheet, then evict unpinned sheets until the total fits the budget"""
+        size = sheet_data_bytes(sheet_data)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = sheet_data
+            self._sizes[key] = size
+            self.total_bytes += size
+            self._evict()
+
+    def pop(self, key: SheetKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._remove(key)
+
+    def resize(self, key: SheetKey):
+        """Re-measure an entry after its rows were changed in place"""
+        with self._lock:
+            sheet_data = self._entries.get(key)
+            if sheet_data is None:
+                return
+            size = sheet_data_bytes(sheet_data)
+            self.total_bytes += size - self._sizes[key]
+            self._sizes[key] = size
+            self._evict()
+
+    def drop_workbook(self, workbook: str):
+        """Forget every cached sheet of a workbook (and unpin it)"""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == workbook]:
+                self._remove(key)
+            for user in [user for user, active in self._active.items() if active == workbook]:
+                del self._active[user]
+
+    def pin(self, user: Optional[str], workbook: str):
+        """Make workbook the user's active workbook (replaces the previous pin)"""
+        with self._lock:
+            self._active[user or SYSTEM_USER] = workbook
+            self._evict()
+
+    def unpin(self, user: Optional[str]):
+        with self._lock:
+            self._active.pop(user or SYSTEM_USER, None)
+            self._evict()
+
+    def active_workbook(self, user: Optional[str]) -> Optional[str]:
+        with self._lock:
+            return self._active.get(user or SYSTEM_USER)
+
+    def is_pinned(self, workbook: str) -> bool:
+        with self._lock:
+            return workbook in self._active.values()
+
+    def _is_pinned_key(self, key: SheetKey) -> bool:
+        return self._active.get(key[0]) == key[1]
+
+    def _remove(self, key: SheetKey) -> Optional[Dict[str, Any]]:
+        sheet_data = self._entries.pop(key, None)
+        if sheet_data is not None:
+            self.total_bytes -= self._sizes.pop(key)
+        return sheet_data
+
+    def _evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        # 오래 사용하지 않은 것부터, 고정된 워크북의 시트는 건너뜀
+        for key in list(self._entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if self._is_pinned_key(key):
+                continue
+            self.evicted_bytes += self._sizes[key]
+            self.evictions += 1
+            self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, hit/miss and eviction counters, overall and per user"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            users: Dict[str, Dict[str, Any]] = {}
+            pinned_bytes = 0
+            for key, size in self._sizes.items():
+                user = users.setdefault(key[0], {"entries": 0, "bytes": 0, "active_workbook": self._active.get(key[0])})
+                user["entries"] += 1
+                user["bytes"] += size
+                if self._is_pinned_key(key):
+                    pinned_bytes += size
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "pinned_bytes": pinned_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+                "users": users
+            }
+
+    # --- 기존 loaded_sheets(dict) 사용 코드 호환 ---
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: SheetKey) -> bool:
+        return key in self._entries
+
+    def keys(self) -> List[SheetKey]:
+        with self._lock:
+            return list(self._entries.keys())
+
+    def values(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def items(self) -> List[Tuple[SheetKey, Dict[str, Any]]]:
+        with self._lock:
+            return list(self._entries.items())
+
+    def __iter__(self) -> Iterator[SheetKey]:
+        return iter(self.keys())
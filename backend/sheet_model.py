@@ -0,0 +1,490 @@
+"""
+Columnar sheet model for GNDR order management
+
+A parsed sheet used to be a list of row lists of Python objects, and every
+step that needed numbers (yellow row-3 sums, the P열 차이 rule, order and
+payment saves) coerced the cells again with float()/int(). Sheet keeps the
+header rows as plain lists and stores the body by column:
+
+- quantity/amount columns (I~O, S~U) as float64 arrays, remembering which
+  cells were ints and keeping any non-numeric cell as-is
+- repetitive string columns (A/B/E/F/G: 거래처명, 주소, 상품코드, 상품명, 옵션)
+  dictionary-encoded as int32 codes into a list of distinct values
+- every other column as a plain list
+
+Rows come back as lists (sheet[i], slices, iteration, to_rows), exactly as
+they were given, so response shapes do not change.
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from itertools import zip_longest
+import sys
+import numpy as np
+
+# 주문서 헤더 행 수 (제목 / 컬럼명 / 노란 합계 / 메모), 데이터는 5행부터
+ORDER_HEADER_ROWS = 4
+
+# 수량/금액 열: I~O (신규주문~입고 주문), S~U (실입고수, 오늘입금할금액, 미송/매입금액)
+NUMERIC_COLUMNS = (8, 9, 10, 11, 12, 13, 14, 18, 19, 20)
+
+# 반복이 많은 문자열 열: A(거래처명), B(공급처주소), E(상품코드), F(공급처상품명), G(공급처옵션)
+CATEGORY_COLUMNS = (0, 1, 4, 5, 6)
+
+# 빈칸으로 보는 값 (기존 float() 변환 코드와 동일)
+BLANK_VALUES = ("", " ")
+
+# float64로 정확히 표현되는 정수 범위
+_MAX_EXACT_INT = 2 ** 53
+
+# 메모리 추정 시 열마다 크기를 재는 셀 수
+SIZE_SAMPLE = 1000
+
+# 서로 다른 값이 행 수의 이 비율을 넘으면 사전 인코딩이 오히려 커지므로 리스트로 보관
+MAX_CATEGORY_RATIO = 0.5
+
+
+def cell_float(value: Any, blank: float) -> float:
+    """float() of a cell the way the old per-cell code did it (NaN if it fails)"""
+    if value is None or (isinstance(value, str) and value in BLANK_VALUES):
+        return blank
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def _cells_size(cells: Sequence[Any]) -> int:
+    """Estimated bytes of the cell objects (sampled for long columns; None and shared small ints are free)"""
+    if not cells:
+        return 0
+    step = max(1, len(cells) // SIZE_SAMPLE)
+    sample = cells[::step]
+    sampled = sum(sys.getsizeof(v) for v in sample if v is not None and not (type(v) is int and -5 <= v <= 256))
+    return sampled * len(cells) // len(sample)
+
+
+def estimate_rows_bytes(rows: Sequence[Sequence[Any]]) -> int:
+    """Estimated bytes of a list-of-lists sheet (row lists + sampled cells)"""
+    if not rows:
+        return sys.getsizeof(rows)
+    step = max(1, len(rows) // SIZE_SAMPLE)
+    sample = rows[::step]
+    sampled = sum(sys.getsizeof(row) + _cells_size(row) for row in sample)
+    return sys.getsizeof(rows) + sampled * len(rows) // len(sample)
+
+
+def _category_key(value: Any) -> Any:
+    # 1 / 1.0 / True가 같은 키가 되지 않도록 문자열 외에는 타입까지 포함
+    # (소수는 hex로: 0.0과 -0.0이 다른 키, NaN끼리는 같은 키)
+    if type(value) is str:
+        return value
+    if isinstance(value, float):
+        return (value.__class__, value.hex())
+    return (value.__class__, value)
+
+
+def _fits_float32(value: float) -> bool:
+    with np.errstate(over="ignore"):
+        return np.float32(value) == value
+
+
+class _NumericColumn:
+    """float values + int flags; NaN is an empty cell unless listed in exceptions
+
+    Values are kept as float32 when that loses nothing (quantities and won
+    amounts almost always), float64 otherwise.
+    """
+
+    def __init__(self, values: np.ndarray, is_int: np.ndarray, exceptions: Dict[int, Any]):
+        self.values = values
+        self.is_int = is_int
+        # 숫자가 아닌 셀 (문자열 등): 행 번호 -> 원래 값
+        self.exceptions = exceptions
+
+    @classmethod
+    def from_values(cls, cells: Sequence[Any]) -> Optional["_NumericColumn"]:
+        """None if most of the non-empty cells are not numbers (kept as a list instead)"""
+        n = len(cells)
+        values = np.fromiter(
+            (v if (t := type(v)) is float or (t is int and -_MAX_EXACT_INT <= v <= _MAX_EXACT_INT) else np.nan
+             for v in cells),
+            dtype=np.float64, count=n
+        )
+        is_int = np.fromiter((type(v) is int for v in cells), dtype=bool, count=n)
+        exceptions = {
+            i: v for i, v in enumerate(cells)
+            if v is not None and not (
+                (t := type(v)) is float and v == v or t is int and -_MAX_EXACT_INT <= v <= _MAX_EXACT_INT
+            )
+        }
+        filled = n - sum(1 for v in cells if v is None)
+        if len(exceptions) * 2 > filled:
+            return None
+        # float32 범위를 넘는 값은 inf가 되어 비교에서 걸러짐
+        with np.errstate(over="ignore"):
+            compact = values.astype(np.float32)
+        if np.array_equal(compact, values, equal_nan=True):
+            values = compact
+        return cls(values, is_int & ~np.isnan(values), exceptions)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get(self, i: int) -> Any:
+        value = self.values[i]
+        if value != value:
+            return self.exceptions.get(i)
+        return int(value) if self.is_int[i] else float(value)
+
+    def set(self, i: int, value: Any):
+        self.exceptions.pop(i, None)
+        t = type(value)
+        if t is float and value == value or t is int and -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT:
+            if self.values.dtype != np.float64 and not _fits_float32(value):
+                self.values = self.values.astype(np.float64)
+            self.values[i] = value
+            self.is_int[i] = t is int
+        else:
+            self.values[i] = np.nan
+            self.is_int[i] = False
+            if value is not None:
+                self.exceptions[i] = value
+
+    def to_list(self) -> List[Any]:
+        values = self.values.astype(np.float64)
+        cells = values.astype(object)
+        cells[self.is_int] = values[self.is_int].astype(np.int64)
+        cells[np.isnan(values)] = None
+        for i, value in self.exceptions.items():
+            cells[i] = value
+        return cells.tolist()
+
+    def numeric(self, blank: float) -> np.ndarray:
+        result = self.values.astype(np.float64)
+        result[np.isnan(result)] = blank
+        for i, value in self.exceptions.items():
+            result[i] = cell_float(value, blank)
+        return result
+
+    def memory_usage(self) -> int:
+        return (self.values.nbytes + self.is_int.nbytes + sys.getsizeof(self.exceptions)
+                + _cells_size(list(self.exceptions.values())))
+
+
+class _CategoryColumn:
+    """int32 codes into a list of distinct cell values"""
+
+    def __init__(self, codes: np.ndarray, categories: List[Any]):
+        self.codes = codes
+        self.categories = categories
+        self._index: Optional[Dict[Any, int]] = None
+
+    @classmethod
+    def from_values(cls, cells: Sequence[Any]) -> Optional["_CategoryColumn"]:
+        """None if the column has too many distinct values (kept as a list instead)"""
+        index: Dict[Any, int] = {}
+        categories: List[Any] = []
+
+        def code(value: Any) -> int:
+            key = _category_key(value)
+            found = index.get(key)
+            if found is None:
+                found = index[key] = len(categories)
+                categories.append(value)
+            return found
+
+        codes = np.fromiter((code(v) for v in cells), dtype=np.int32, count=len(cells))
+        if len(categories) > max(1, len(cells) * MAX_CATEGORY_RATIO):
+            return None
+        # 값 -> 코드 색인은 셀을 바꿀 때 다시 만듦
+        return cls(codes, categories)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def get(self, i: int) -> Any:
+        return self.categories[self.codes[i]]
+
+    def set(self, i: int, value: Any):
+        if self._index is None:
+            self._index = {_category_key(v): code for code, v in enumerate(self.categories)}
+        key = _category_key(value)
+        code = self._index.get(key)
+        if code is None:
+            code = self._index[key] = len(self.categories)
+            self.categories.append(value)
+        self.codes[i] = code
+
+    def to_list(self) -> List[Any]:
+        lookup = np.empty(len(self.categories), dtype=object)
+        for code, value in enumerate(self.categories):
+            lookup[code] = value
+        return lookup[self.codes].tolist()
+
+    def numeric(self, blank: float) -> np.ndarray:
+        lookup = np.array([cell_float(v, blank) for v in self.categories], dtype=np.float64)
+        return lookup[self.codes] if len(lookup) else np.full(len(self.codes), blank)
+
+    def memory_usage(self) -> int:
+        return self.codes.nbytes + sys.getsizeof(self.categories) + _cells_size(self.categories)
+
+    def __getstate__(self):
+        return {"codes": self.codes, "categories": self.categories}
+
+    def __setstate__(self, state):
+        self.codes = state["codes"]
+        self.categories = state["categories"]
+        self._index = None
+
+
+class _ObjectColumn:
+    """Plain list of cell values"""
+
+    def __init__(self, cells: List[Any]):
+        self.cells = cells
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def get(self, i: int) -> Any:
+        return self.cells[i]
+
+    def set(self, i: int, value: Any):
+        self.cells[i] = value
+
+    def to_list(self) -> List[Any]:
+        return list(self.cells)
+
+    def numeric(self, blank: float) -> np.ndarray:
+        return np.fromiter((cell_float(v, blank) for v in self.cells), dtype=np.float64, count=len(self.cells))
+
+    def memory_usage(self) -> int:
+        return sys.getsizeof(self.cells) + _cells_size(self.cells)
+
+
+class Sheet:
+    """Sheet rows stored by column (see module docstring)
+
+    Behaves like the list of rows it was built from: len(), sheet[i],
+    sheet[a:b], iteration and sheet[i] = row all work on row lists. Header
+    rows are returned as the stored lists themselves, body rows as new lists.
+    """
+
+    def __init__(self, header: List[List[Any]], lengths: np.ndarray, columns: List[Any]):
+        self.header = header
+        # 행별 셀 개수 (원래 행 길이를 그대로 돌려주기 위해)
+        self.lengths = lengths
+        self.columns = columns
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]], header_rows: int = ORDER_HEADER_ROWS,
+                  numeric_columns: Sequence[int] = NUMERIC_COLUMNS,
+                  category_columns: Sequence[int] = CATEGORY_COLUMNS) -> "Sheet":
+        """Build a sheet from row lists; the first header_rows rows stay lists"""
+        if isinstance(rows, Sheet):
+            return rows
+        header = [list(row) for row in rows[:header_rows]]
+        body = rows[header_rows:]
+        lengths = np.fromiter((len(row) for row in body), dtype=np.int32, count=len(body))
+
+        columns = []
+        for col_idx, cells in enumerate(zip_longest(*body)):
+            column = None
+            if col_idx in numeric_columns:
+                column = _NumericColumn.from_values(cells)
+            elif col_idx in category_columns:
+                column = _CategoryColumn.from_values(cells)
+            columns.append(column or _ObjectColumn(list(cells)))
+        return cls(header, lengths, columns)
+
+    # --- 행 단위 접근 (기존 list-of-lists 코드 호환) ---
+
+    @property
+    def header_rows(self) -> int:
+        return len(self.header)
+
+    @property
+    def body_rows(self) -> int:
+        return len(self.lengths)
+
+    @property
+    def width(self) -> int:
+        return len(self.columns)
+
+    def __len__(self) -> int:
+        return len(self.header) + len(self.lengths)
+
+    def row(self, i: int) -> List[Any]:
+        """Row i as a list (header rows: the stored list itself)"""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("sheet row index out of range")
+        if i < len(self.header):
+            return self.header[i]
+        j = i - len(self.header)
+        return [column.get(j) for column in self.columns[:self.lengths[j]]]
+
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            indices = range(*key.indices(len(self)))
+            # 헤더만 자르는 작은 슬라이스는 행 단위로, 큰 슬라이스는 열 단위로 한 번에
+            if len(indices) <= 64:
+                return [self.row(i) for i in indices]
+            return self.to_rows()[key]
+        return self.row(key)
+
+    def __setitem__(self, key: Union[int, slice], value):
+        if isinstance(key, slice):
+            indices = range(*key.indices(len(self)))
+            value = list(value)
+            if len(value) != len(indices):
+                raise ValueError("sheet rows can only be replaced one for one")
+            for i, row in zip(indices, value):
+                self.set_row(i, row)
+        else:
+            self.set_row(key, value)
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        return iter(self.to_rows())
+
+    def set_row(self, i: int, row: Sequence[Any]):
+        """Replace row i"""
+        if i < 0:
+            i += len(self)
+        if i < len(self.header):
+            self.header[i] = list(row)
+            return
+        j = i - len(self.header)
+        if len(row) > self.width:
+            for _ in range(len(row) - self.width):
+                self.columns.append(_ObjectColumn([None] * self.body_rows))
+        for col_idx, column in enumerate(self.columns):
+            column.set(j, row[col_idx] if col_idx < len(row) else None)
+        self.lengths[j] = len(row)
+
+    def set_cell(self, i: int, col_idx: int, value: Any):
+        """Set one cell, extending the row (and the sheet width) if needed"""
+        if i < 0:
+            i += len(self)
+        if i < len(self.header):
+            row = self.header[i]
+            if col_idx >= len(row):
+                row.extend([None] * (col_idx + 1 - len(row)))
+            row[col_idx] = value
+            return
+        j = i - len(self.header)
+        while col_idx >= self.width:
+            self.columns.append(_ObjectColumn([None] * self.body_rows))
+        self.columns[col_idx].set(j, value)
+        if col_idx >= self.lengths[j]:
+            self.lengths[j] = col_idx + 1
+
+    # --- JSON 어댑터 ---
+
+    def to_rows(self) -> List[List[Any]]:
+        """All rows as lists, as they were given (what responses serialize)"""
+        body = [list(row) for row in zip(*(column.to_list() for column in self.columns))]
+        if not self.columns:
+            body = [[] for _ in range(self.body_rows)]
+        # 원래 더 짧았던 행은 잘라서 돌려줌
+        for j in np.nonzero(self.lengths < self.width)[0]:
+            del body[j][self.lengths[j]:]
+        return self.header + body
+
+    def to_json(self) -> List[List[Any]]:
+        """JSON-ready rows (same as to_rows; datetimes are left to the caller)"""
+        return self.to_rows()
+
+    def take(self, rows: Sequence[int], columns: Optional[Sequence[int]] = None) -> List[List[Any]]:
+        """Rows at the given indices as lists, optionally only the given columns
+
+        Without columns a row comes back as long as it was given; with
+        columns every row has one cell per column (None past its end).
+        """
+        result = []
+        for i in rows:
+            if i < len(self.header):
+                row = self.header[i]
+                result.append(list(row) if columns is None
+                              else [row[c] if c < len(row) else None for c in columns])
+                continue
+            j = i - len(self.header)
+            length = int(self.lengths[j])
+            if columns is None:
+                result.append([column.get(j) for column in self.columns[:length]])
+            else:
+                result.append([self.columns[c].get(j) if c < length else None for c in columns])
+        return result
+
+    # --- 필터/정렬 ---
+
+    def body_values(self, col_idx: int) -> Tuple[np.ndarray, List[Any]]:
+        """(codes, values): body cells of a column as codes into its distinct values"""
+        if col_idx >= self.width:
+            return np.zeros(self.body_rows, dtype=np.int32), [None]
+        column = self.columns[col_idx]
+        if isinstance(column, _CategoryColumn):
+            codes, values = column.codes, list(column.categories)
+        else:
+            index: Dict[Any, int] = {}
+            values = []
+
+            def code(value: Any) -> int:
+                key = _category_key(value)
+                found = index.get(key)
+                if found is None:
+                    found = index[key] = len(values)
+                    values.append(value)
+                return found
+
+            cells = column.to_list()
+            codes = np.fromiter((code(v) for v in cells), dtype=np.int32, count=len(cells))
+        # 행 길이 밖의 셀은 None
+        short = self.lengths <= col_idx
+        if short.any():
+            values = values + [None]
+            codes = np.where(short, len(values) - 1, codes)
+        return codes, values
+
+    def body_mask(self, col_idx: int, predicate: Callable[[Any], bool]) -> np.ndarray:
+        """Body-row mask of the cells of a column for which predicate(cell) is true
+
+        The predicate runs once per distinct value, not once per row.
+        """
+        codes, values = self.body_values(col_idx)
+        return np.fromiter((bool(predicate(v)) for v in values), dtype=bool, count=len(values))[codes]
+
+    # --- 숫자 열 ---
+
+    def numeric(self, col_idx: int, blank: float = np.nan) -> np.ndarray:
+        """Column as float64 for every row (header rows included)
+
+        Empty cells (None, "", " ") become blank; other cells go through
+        float(), NaN if that fails.
+        """
+        head = np.array([cell_float(row[col_idx] if col_idx < len(row) else None, blank)
+                         for row in self.header], dtype=np.float64)
+        if col_idx < self.width:
+            body = self.columns[col_idx].numeric(blank)
+            # 행 길이 밖의 셀은 빈칸
+            body[self.lengths <= col_idx] = blank
+        else:
+            body = np.full(self.body_rows, blank)
+        return np.concatenate([head, body])
+
+    def float_column(self, col_idx: int) -> np.ndarray:
+        """Column as float64 for every row, 0.0 for empty/non-numeric cells"""
+        return np.nan_to_num(self.numeric(col_idx, blank=0.0), nan=0.0)
+
+    def int_column(self, col_idx: int) -> np.ndarray:
+        """Column as int64 for every row: int() of the number, 0 for empty/non-numeric cells"""
+        return np.trunc(self.float_column(col_idx)).astype(np.int64)
+
+    def column_sum(self, col_idx: int, start_row: int = 0) -> float:
+        """Sum of the numeric cells of a column from start_row on (non-numeric cells skipped)"""
+        return float(np.nansum(self.numeric(col_idx)[start_row:]))
+
+    def memory_usage(self) -> int:
+        """Estimated bytes held by the sheet (arrays exact, cell objects sampled)"""
+        return (estimate_rows_bytes(self.header) + self.lengths.nbytes
+                + sum(column.memory_usage() for column in self.columns))
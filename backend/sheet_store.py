@@ -0,0 +1,378 @@
+"""
+On-disk sheet cache for GNDR order management
+
+Parsed sheets are written to sheet_cache/ in a compact binary file per sheet
+and indexed by one table in the shared state file (see shared_state), so
+every worker process sees the same cache:
+
+- file format: pickle protocol 5 of the Sheet with its NumPy arrays stored
+  out-of-band, each at a 64-byte aligned offset after the pickle. Reading
+  maps the file (copy-on-write) and the arrays are rebuilt directly over the
+  mapping, so loading a sheet copies no numeric data.
+- writes go through one background thread: the request only queues the
+  sheet. Each snapshot gets a new file name (written to a temporary file
+  and renamed), and the index is switched to it in one transaction, so
+  readers never see a partial or replaced file.
+- cell edits are appended to a small log next to the sheet file (one JSON
+  line per batch) under the index's write lock, which also checks and
+  bumps the sheet version; edits from any process are replayed on load
+  and onto stale in-memory copies. A new snapshot starts a new log with
+  the edits it does not contain yet.
+
+Sheets evicted from memory (see sheet_memory) are loaded back from here
+instead of being parsed again from the workbook.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import uuid
+from sheet_model import Sheet
+from shared_state import SharedState, shared_state
+
+SHEET_FILE_MAGIC = b"GNDRSHT1"
+SHEET_FILE_SUFFIX = ".sheet"
+EDIT_LOG_SUFFIX = ".edits"
+
+# 배열 시작 위치 정렬 (mmap 위에서 바로 NumPy 배열로 읽기 위해)
+_ALIGNMENT = 64
+# magic, pickle 길이, 버퍼 개수
+_HEADER = struct.Struct("<8sQQ")
+# 버퍼별 (오프셋, 길이)
+_BUFFER_ENTRY = struct.Struct("<QQ")
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def write_sheet_file(path: Path, sheet: Sheet) -> int:
+    """Write a sheet atomically (temp file + rename) and return the file size"""
+    buffers: List[pickle.PickleBuffer] = []
+    payload = pickle.dumps(sheet, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+
+    offset = _aligned(_HEADER.size + _BUFFER_ENTRY.size * len(raws) + len(payload))
+    table = []
+    for raw in raws:
+        table.append((offset, raw.nbytes))
+        offset = _aligned(offset + raw.nbytes)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(SHEET_FILE_MAGIC, len(payload), len(raws)))
+            for entry in table:
+                f.write(_BUFFER_ENTRY.pack(*entry))
+            f.write(payload)
+            for (start, _), raw in zip(table, raws):
+                f.write(b"\0" * (start - f.tell()))
+                f.write(raw)
+            size = f.tell()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return size
+
+
+def read_sheet_file(path: Path) -> Sheet:
+    """Map a sheet file; the NumPy arrays of the returned Sheet live in the mapping
+
+    The mapping is copy-on-write: the Sheet can be edited in memory without
+    touching the file.
+    """
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    view = memoryview(mapping)
+    magic, payload_size, buffer_count = _HEADER.unpack_from(view, 0)
+    if magic != SHEET_FILE_MAGIC:
+        raise ValueError(f"Not a sheet cache file: {path.name}")
+
+    position = _HEADER.size
+    buffers = []
+    for _ in range(buffer_count):
+        start, length = _BUFFER_ENTRY.unpack_from(view, position)
+        buffers.append(view[start:start + length])
+        position += _BUFFER_ENTRY.size
+    return pickle.loads(view[position:position + payload_size], buffers=buffers)
+
+
+class SheetVersionConflict(Exception):
+    """Cell edits were based on an older version of the sheet"""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Sheet was changed (current version {current_version})")
+        self.current_version = current_version
+
+
+def _read_edit_log(path: Path, after: int, upto: int) -> List[Dict[str, Any]]:
+    """Edit batches with after < version <= upto, in order"""
+    batches = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            # 기록 중 끊긴 줄은 건너뜀 (그 뒤에 이어 쓴 편집은 다음 줄에 있음)
+            try:
+                batch = json.loads(line)
+            except ValueError:
+                continue
+            if after < batch["version"] <= upto:
+                batches.append(batch)
+    return batches
+
+
+def _apply_batches(sheet: Sheet, batches: List[Dict[str, Any]]):
+    for batch in batches:
+        for row, col, value in batch["edits"]:
+            sheet.set_cell(row, col, value)
+
+
+class SheetStore:
+    """Binary per-sheet files in cache_dir, indexed in the shared state"""
+
+    def __init__(self, cache_dir: str = "./sheet_cache", state: Optional[SharedState] = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(exist_ok=True)
+        self.state = state or shared_state
+        self._lock = threading.Lock()
+        # 쓰기 전용 스레드 (요청 처리와 분리, 순서대로 기록)
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+
+    @staticmethod
+    def key(workbook: str, sheet_name: str) -> str:
+        return f"{workbook}\u0000{sheet_name}"
+
+    def _new_file(self, key: str) -> Path:
+        """Unique file for a new snapshot of a sheet"""
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+        return self.cache_dir / f"{digest}.{uuid.uuid4().hex[:12]}{SHEET_FILE_SUFFIX}"
+
+    def _log_path(self, file_name: str) -> Path:
+        return self.cache_dir / (file_name + EDIT_LOG_SUFFIX)
+
+    @staticmethod
+    def _entry(row) -> Dict[str, Any]:
+        return dict(
+            json.loads(row["info"]),
+            workbook=row["workbook"],
+            sheet_name=row["sheet_name"],
+            file=row["file"],
+            bytes=row["bytes"],
+            version=row["version"],
+            file_version=row["file_version"],
+            edit_count=row["edit_count"],
+            written_at=row["written_at"]
+        )
+
+    def _submit(self, func, *args) -> Future:
+        with self._lock:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sheet-cache")
+            future = self._writer.submit(func, *args)
+            self._pending = [f for f in self._pending if not f.done()] + [future]
+        return future
+
+    def save(self, workbook: str, sheet_name: str, sheet: Sheet, info: Dict[str, Any],
+             replace: bool = False) -> Future:
+        """Queue a snapshot of a sheet for writing; info (sheet_type, rows, ...) goes into the index
+
+        info["version"] is the version the snapshot contains. It is only
+        used if it is newer than the one on disk (another worker may have
+        written the same sheet first). replace=True stores new content
+        (a whole-sheet save) as the next version instead.
+        """
+        return self._submit(self._write, workbook, sheet_name, sheet, dict(info), replace)
+
+    def _write(self, workbook: str, sheet_name: str, sheet: Sheet, info: Dict[str, Any], replace: bool):
+        key = self.key(workbook, sheet_name)
+        path = self._new_file(key)
+        try:
+            size = write_sheet_file(path, sheet)
+        except Exception as e:
+            print(f"Error caching sheet: {e}")
+            return
+
+        snapshot_version = info.pop("version", 0)
+        stale = [path]
+        with self.state.transaction() as conn:
+            row = conn.execute("SELECT * FROM sheets WHERE key = ?", (key,)).fetchone()
+            if replace:
+                version = file_version = row["version"] + 1 if row else 0
+                carried = []
+            elif row is None and snapshot_version == 0:
+                version = file_version = 0
+                carried = []
+            elif row is not None and row["file_version"] < snapshot_version:
+                # 새 스냅샷에 없는 편집은 새 기록으로 옮김
+                version, file_version = row["version"], snapshot_version
+                carried = _read_edit_log(self._log_path(row["file"]), snapshot_version, version) \
+                    if self._log_path(row["file"]).exists() else []
+            else:
+                # 이미 같거나 더 새 스냅샷이 있음 (다른 워커가 먼저 씀) / 삭제된 시트
+                carried = None
+
+            if carried is not None:
+                if carried:
+                    with open(self._log_path(path.name), "w", encoding="utf-8") as f:
+                        for batch in carried:
+                            f.write(json.dumps(batch, ensure_ascii=False, default=str) + "\n")
+                conn.execute(
+                    "INSERT INTO sheets (key, workbook, sheet_name, file, info, bytes, version, file_version, "
+                    "edit_count, written_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET file = excluded.file, info = excluded.info, "
+                    "bytes = excluded.bytes, version = excluded.version, file_version = excluded.file_version, "
+                    "edit_count = excluded.edit_count, written_at = excluded.written_at",
+                    (key, workbook, sheet_name, path.name, json.dumps(info, ensure_ascii=False, default=str),
+                     size, version, file_version, sum(len(batch["edits"]) for batch in carried),
+                     datetime.now().isoformat())
+                )
+                stale = [self.cache_dir / row["file"], self._log_path(row["file"])] if row else []
+
+        for stale_path in stale:
+            self._unlink(stale_path)
+
+    def commit_edits(self, workbook: str, sheet_name: str, base_version: int,
+                     edits: List[Any]) -> Tuple[int, int]:
+        """Append a batch of (row, col, value) edits made on base_version
+
+        Runs under the index's write lock, so workers cannot commit two
+        batches on the same version. Returns (new version, edits in the log).
+
+        Raises:
+            KeyError: the sheet is not in the cache
+            SheetVersionConflict: base_version is not the current version
+        """
+        key = self.key(workbook, sheet_name)
+        with self.state.transaction() as conn:
+            row = conn.execute("SELECT file, version, edit_count FROM sheets WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                raise KeyError(f"Sheet not cached: {sheet_name}")
+            if row["version"] != base_version:
+                raise SheetVersionConflict(row["version"])
+            version = base_version + 1
+            line = json.dumps({"version": version, "edits": edits}, ensure_ascii=False, default=str) + "\n"
+            with open(self._log_path(row["file"]), "ab+") as f:
+                # 앞 기록이 줄 중간에서 끊겼으면 새 줄에서 시작
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = "\n" + line
+                f.write(line.encode("utf-8"))
+            conn.execute("UPDATE sheets SET version = ?, edit_count = edit_count + ? WHERE key = ?",
+                         (version, len(edits), key))
+        return version, row["edit_count"] + len(edits)
+
+    def current_version(self, workbook: str, sheet_name: str) -> Optional[int]:
+        row = self.state.query_one("SELECT version FROM sheets WHERE key = ?", (self.key(workbook, sheet_name),))
+        return row["version"] if row else None
+
+    def refresh(self, workbook: str, sheet_name: str, sheet: Sheet, from_version: int) -> Optional[int]:
+        """Bring an in-memory copy at from_version up to the current version
+
+        Replays the edits other workers made since; returns the version the
+        copy is now at, or None if it is too old for the log (reload it).
+        """
+        row = self.state.query_one("SELECT file, version, file_version FROM sheets WHERE key = ?",
+                                   (self.key(workbook, sheet_name),))
+        if row is None or row["version"] == from_version:
+            return from_version
+        if not row["file_version"] <= from_version < row["version"]:
+            return None
+        try:
+            batches = _read_edit_log(self._log_path(row["file"]), from_version, row["version"])
+        except FileNotFoundError:
+            return None
+        if not batches or batches[-1]["version"] != row["version"]:
+            return None
+        _apply_batches(sheet, batches)
+        return row["version"]
+
+    def load(self, workbook: str, sheet_name: str) -> Optional[Tuple[Sheet, Dict[str, Any]]]:
+        """Mapped Sheet (edit log replayed) and its index entry, or None if it is not on disk
+
+        This process's queued writes are finished first.
+        """
+        self.flush()
+        key = self.key(workbook, sheet_name)
+        # 읽는 사이 다른 워커가 새 스냅샷으로 바꿨으면 한 번 더
+        for _ in range(2):
+            row = self.state.query_one("SELECT * FROM sheets WHERE key = ?", (key,))
+            if row is None:
+                return None
+            try:
+                sheet = read_sheet_file(self.cache_dir / row["file"])
+                log_path = self._log_path(row["file"])
+                if row["version"] > row["file_version"]:
+                    _apply_batches(sheet, _read_edit_log(log_path, row["file_version"], row["version"]))
+                return sheet, self._entry(row)
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                print(f"Error reading cached sheet {row['file']}: {e}")
+                return None
+        return None
+
+    def entry(self, workbook: str, sheet_name: str) -> Optional[Dict[str, Any]]:
+        row = self.state.query_one("SELECT * FROM sheets WHERE key = ?", (self.key(workbook, sheet_name),))
+        return self._entry(row) if row else None
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Index entries of every cached sheet (no sheet file is read)"""
+        return [self._entry(row) for row in self.state.query("SELECT * FROM sheets")]
+
+    def remove_workbook(self, workbook: str) -> Future:
+        """Drop every cached sheet of a workbook (files are deleted in the background)"""
+        with self.state.transaction() as conn:
+            rows = conn.execute("SELECT file FROM sheets WHERE workbook = ?", (workbook,)).fetchall()
+            conn.execute("DELETE FROM sheets WHERE workbook = ?", (workbook,))
+        return self._submit(self._remove_files, [row["file"] for row in rows])
+
+    def remove_entries(self, keys: List[str]) -> Future:
+        """Drop cached sheets by key (see key())"""
+        files = []
+        with self.state.transaction() as conn:
+            for key in keys:
+                row = conn.execute("SELECT file FROM sheets WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    files.append(row["file"])
+                    conn.execute("DELETE FROM sheets WHERE key = ?", (key,))
+        return self._submit(self._remove_files, files)
+
+    def _remove_files(self, files: List[str]):
+        for file_name in files:
+            self._unlink(self.cache_dir / file_name)
+            self._unlink(self._log_path(file_name))
+
+    @staticmethod
+    def _unlink(path: Path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def flush(self):
+        """Wait until every write queued by this process has finished"""
+        while True:
+            with self._lock:
+                pending = [future for future in self._pending if not future.done()]
+            if not pending:
+                return
+            for future in pending:
+                future.result()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._writer is not None:
+                self._writer.shutdown(wait=True)
+                self._writer = None
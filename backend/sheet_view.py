@@ -0,0 +1,217 @@
+"""
+Windowed sheet views for GNDR order management
+
+/excel/load, /daily-orders/{id}, /files/view/{id} and /work-drafts/load
+return every row of every sheet, and the grid filters, sorts and hides
+checked rows in the browser. A view query instead asks for one window of
+rows (offset/limit) of a filtered, sorted sheet, optionally only some
+columns:
+
+- sheets stored as JSON in the DB (daily orders, saved files, drafts) are
+  materialized once as a columnar Sheet and kept in a small LRU keyed by
+  their updated_at, so later windows do not touch the JSON again; uploaded
+  workbook sheets come from sheet_manager's cache as they are
+- the filtered and sorted row order is computed once per (sheet version,
+  filters, sort, checked rows) and cached, so scrolling only slices it
+- filters and sort keys are evaluated once per distinct cell value of the
+  column (see Sheet.body_values / Sheet.body_mask)
+
+Row indices in responses are absolute sheet rows, the same indices row
+colors and checked rows use.
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+import json
+import threading
+import numpy as np
+from sheet_model import Sheet, BLANK_VALUES
+
+# 한 번에 돌려주는 최대 행 수
+MAX_VIEW_ROWS = 5000
+# DB JSON에서 만든 시트를 보관하는 개수 / 필터·정렬 결과(행 순서)를 보관하는 개수
+MAX_MATERIALIZED_SHEETS = 16
+MAX_CACHED_ORDERS = 64
+
+# 필터 연산
+FILTER_OPS = ("eq", "ne", "in", "contains", "empty", "not_empty")
+
+
+def cell_text(value: Any) -> str:
+    """Cell as text for filters: None -> "", 3.0 -> "3", strings stripped"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def sort_key(value: Any) -> Tuple[int, Any]:
+    """Numbers first (by value), then text, blanks last"""
+    if value is None or (isinstance(value, str) and value in BLANK_VALUES):
+        return (2, "")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if value != value:  # NaN
+            return (2, "")
+        return (0, value)
+    return (1, str(value))
+
+
+def _predicate(op: str, value: Any) -> Callable[[Any], bool]:
+    if op == "eq":
+        text = cell_text(value)
+        return lambda cell: cell_text(cell) == text
+    if op == "ne":
+        text = cell_text(value)
+        return lambda cell: cell_text(cell) != text
+    if op == "in":
+        texts = {cell_text(v) for v in (value or [])}
+        return lambda cell: cell_text(cell) in texts
+    if op == "contains":
+        text = cell_text(value).lower()
+        return lambda cell: text in cell_text(cell).lower()
+    if op == "empty":
+        return lambda cell: cell_text(cell) == ""
+    if op == "not_empty":
+        return lambda cell: cell_text(cell) != ""
+    raise ValueError(f"Unknown filter op: {op} (use one of {', '.join(FILTER_OPS)})")
+
+
+def _ranks(sheet: Sheet, col: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Body-row sort ranks of a column (sort_key order) and its blank-cell mask
+
+    Keys are computed and sorted once per distinct value.
+    """
+    codes, values = sheet.body_values(col)
+    keys = [sort_key(v) for v in values]
+    order = sorted(range(len(values)), key=keys.__getitem__)
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = np.arange(len(values))
+    blanks = np.fromiter((key[0] == 2 for key in keys), dtype=bool, count=len(keys))
+    return ranks[codes], blanks[codes]
+
+
+class SheetViews:
+    """Materialized DB sheets and cached row orders for view queries"""
+
+    def __init__(self, max_sheets: int = MAX_MATERIALIZED_SHEETS, max_orders: int = MAX_CACHED_ORDERS):
+        self.max_sheets = max_sheets
+        self.max_orders = max_orders
+        # (source key, version) -> Sheet
+        self._sheets: "OrderedDict[Tuple, Sheet]" = OrderedDict()
+        # (source key, version, filters, sort, hidden rows) -> 본문 행 순서 (np.ndarray)
+        self._orders: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def materialize(self, source: Tuple, version: Any,
+                    load_rows: Callable[[], Sequence[Sequence[Any]]]) -> Sheet:
+        """Sheet for a DB-stored sheet, built from load_rows() once per version"""
+        key = (source, version)
+        with self._lock:
+            sheet = self._sheets.get(key)
+            if sheet is not None:
+                self._sheets.move_to_end(key)
+                return sheet
+        sheet = Sheet.from_rows(load_rows() or [])
+        with self._lock:
+            # 같은 원본의 이전 버전은 버림
+            for stale in [k for k in self._sheets if k[0] == source]:
+                del self._sheets[stale]
+            self._sheets[key] = sheet
+            while len(self._sheets) > self.max_sheets:
+                self._sheets.popitem(last=False)
+        return sheet
+
+    def query(self, source: Tuple, version: Any, sheet: Sheet,
+              offset: int = 0, limit: int = 500,
+              columns: Optional[List[int]] = None,
+              sort: Optional[List[Dict[str, Any]]] = None,
+              filters: Optional[List[Dict[str, Any]]] = None,
+              checked_rows: Optional[Dict[Any, bool]] = None,
+              hide_checked: bool = False) -> Dict[str, Any]:
+        """One window of a filtered, sorted sheet
+
+        sort: [{"col", "desc"}] (first entry is the primary key);
+        filters: [{"col", "op", "value"}], all must match;
+        hide_checked drops rows whose index is checked in checked_rows.
+
+        Raises:
+            ValueError: bad offset/limit/column/filter
+        """
+        if offset < 0 or not 0 < limit <= MAX_VIEW_ROWS:
+            raise ValueError(f"offset must be >= 0 and limit between 1 and {MAX_VIEW_ROWS}")
+        for col in (columns or []) + [f["col"] for f in filters or []] + [s["col"] for s in sort or []]:
+            if col < 0:
+                raise ValueError(f"Bad column: {col}")
+
+        hidden = ()
+        if hide_checked and checked_rows:
+            hidden = tuple(sorted(int(row) for row, checked in checked_rows.items() if checked))
+        order_key = (
+            source, version,
+            json.dumps(filters or [], sort_keys=True, ensure_ascii=False, default=str),
+            json.dumps(sort or [], sort_keys=True),
+            hidden
+        )
+        with self._lock:
+            order = self._orders.get(order_key)
+            if order is not None:
+                self._orders.move_to_end(order_key)
+                self.hits += 1
+        if order is None:
+            order = self._row_order(sheet, sort or [], filters or [], hidden)
+            with self._lock:
+                self.misses += 1
+                self._orders[order_key] = order
+                while len(self._orders) > self.max_orders:
+                    self._orders.popitem(last=False)
+
+        header_rows = sheet.header_rows
+        window = (order[offset:offset + limit] + header_rows).tolist()
+        return {
+            "total_rows": sheet.body_rows,
+            "matched_rows": len(order),
+            "offset": offset,
+            "limit": limit,
+            "columns": columns,
+            "header_rows": sheet.take(range(header_rows), columns),
+            "row_indices": window,
+            "rows": sheet.take(window, columns)
+        }
+
+    @staticmethod
+    def _row_order(sheet: Sheet, sort: List[Dict[str, Any]], filters: List[Dict[str, Any]],
+                   hidden: Tuple[int, ...]) -> np.ndarray:
+        """Body-row indices that pass the filters, in sort order (stable)"""
+        mask = np.ones(sheet.body_rows, dtype=bool)
+        for f in filters:
+            mask &= sheet.body_mask(f["col"], _predicate(f.get("op", "eq"), f.get("value")))
+        if hidden:
+            body = np.asarray(hidden, dtype=np.int64) - sheet.header_rows
+            body = body[(body >= 0) & (body < sheet.body_rows)]
+            mask[body] = False
+        rows = np.flatnonzero(mask)
+        if not sort or not len(rows):
+            return rows
+        # np.lexsort는 마지막 키가 1순위. 빈칸은 내림차순에서도 맨 뒤
+        keys = []
+        for s in reversed(sort):
+            ranks, blanks = _ranks(sheet, s["col"])
+            ranks = ranks[rows]
+            keys.append(-ranks if s.get("desc") else ranks)
+            keys.append(blanks[rows])
+        return rows[np.lexsort(keys)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "materialized_sheets": len(self._sheets),
+                "cached_orders": len(self._orders),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+# Global instance
+sheet_views = SheetViews()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+셀 수정(PATCH) 파생 값 테스트 스크립트
+
+L/M/N/O열을 PATCH로 고치면 전체 저장과 같은 규칙으로 P열(차이 있음)과 노란 3행
+합계가 다시 계산돼야 합니다 (응답의 derived와 다시 읽은 시트 모두). 셀 값은
+문자열/숫자/bool/null만 받습니다 (dict/list는 422).
+
+- 기대값: 수정 후 시트 전체에 일별 주문서 저장(save_daily_order)의 P열 규칙과
+  업로드 파싱(_build_sheet_data)의 3행 합계 규칙을 그대로 적용한 결과
+
+서버를 띄우지 않고 앱을 직접 호출합니다 (로그인 대신 get_current_user를 바꿔 끼움).
+
+사용법: python test_cell_patch.py [주문서.xlsx]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import numpy as np
+from fastapi.testclient import TestClient
+from main import app, get_current_user, sheet_manager, User
+from sheet_manager import SUM_COLUMNS, SUM_ROW_INDEX, SUM_START_ROW
+
+DEFAULT_WORKBOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "docs", "references", "0828가나다란 주문서.xlsx")
+USERNAME = "cell_patch_tester"
+
+def full_save_p(row):
+    """save_daily_order의 P열 규칙 (None이면 그대로 둠)"""
+    try:
+        l_num, m_num, n_num, o_num = [float(row[col]) if len(row) > col and row[col] else 0 for col in (11, 12, 13, 14)]
+    except (ValueError, TypeError):
+        return None
+    return "차이 있음" if l_num + m_num + n_num != o_num else ""
+
+def full_sum(data, col_idx):
+    """_build_sheet_data의 3행 합계 (숫자가 아닌 셀은 건너뜀)"""
+    total = 0.0
+    for row in data[SUM_START_ROW:]:
+        value = row[col_idx] if col_idx < len(row) else None
+        if value is None or value in ("", " "):
+            continue
+        try:
+            number = float(value)
+        except (ValueError, TypeError):
+            continue
+        if not np.isnan(number):
+            total += number
+    return total if total != 0 else 0
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_WORKBOOK
+
+    # open_workbook은 파일을 옮기므로 사본으로
+    tmp_dir = tempfile.mkdtemp()
+    tmp_path = os.path.join(tmp_dir, "upload" + os.path.splitext(source)[1])
+    shutil.copy(source, tmp_path)
+    result = sheet_manager.open_workbook(tmp_path, original_filename=os.path.basename(source), user=USERNAME)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    if not result["success"]:
+        print(f"   ❌ 워크북 열기 실패: {result.get('error')}")
+        sys.exit(1)
+
+    workbook_id = result["workbook_id"]
+    sheet_name = result["sheets"][0]["sheet_name"]
+    base = f"/excel/workbooks/{workbook_id}/sheets/{sheet_name}"
+    app.dependency_overrides[get_current_user] = lambda: User(username=USERNAME, disabled=False)
+    errors = []
+    try:
+        client = TestClient(app)
+        response = client.get(base).json()
+        data, version = response["sheet"]["data"], response["version"]
+        rows = [i for i in range(SUM_START_ROW, len(data)) if len(data[i]) > 15][:3]
+
+        print("\n1. 셀 값 형식")
+        for value in ({"a": 1}, [1, 2]):
+            response = client.patch(base, json={"base_version": version, "edits": [{"row": rows[0], "col": 11, "value": value}]})
+            print(f"   {value!r}: {response.status_code}")
+            if response.status_code != 422:
+                errors.append(f"값 {value!r}: {response.status_code} (422 기대)")
+
+        print("\n2. L/M/N/O 수정 -> P열, 3행 합계")
+        old_o = data[rows[1]][14]
+        edits = [
+            {"row": rows[0], "col": 11, "value": 7},                                # L: 차이 생김
+            {"row": rows[1], "col": 14, "value": str(old_o if old_o else "") + "abc"},  # O: 숫자 아님 -> P 그대로
+            {"row": rows[2], "col": 12, "value": None},                             # M: 비움
+            {"row": rows[2], "col": 19, "value": 1000.5},                           # T: 합계만
+        ]
+        response = client.patch(base, json={"base_version": version, "edits": edits})
+        body = response.json()
+        print(f"   {response.status_code}: version {body.get('version')}, derived {body.get('derived')}")
+        if response.status_code != 200:
+            errors.append(f"PATCH: {response.status_code} {body}")
+        else:
+            after = client.get(base).json()["sheet"]["data"]
+            expected = {}
+            for row in rows:
+                p_value = full_save_p(after[row])
+                if p_value is not None:
+                    expected[(row, 15)] = p_value
+            for col_idx in sorted({edit["col"] for edit in edits if edit["col"] in SUM_COLUMNS}):
+                expected[(SUM_ROW_INDEX, col_idx)] = full_sum(after, col_idx)
+
+            derived = {(cell["row"], cell["col"]): cell["value"] for cell in body["derived"]}
+            if derived != expected:
+                errors.append(f"derived {derived} != 기대 {expected}")
+            for (row, col), value in expected.items():
+                if after[row][col] != value:
+                    errors.append(f"다시 읽은 시트 ({row}, {col}): {after[row][col]!r} ({value!r} 기대)")
+            if (rows[1], 15) in derived:
+                errors.append("O열이 숫자가 아닌 행의 P열이 바뀜")
+            print(f"   기대값 {expected}")
+    finally:
+        app.dependency_overrides.clear()
+        sheet_manager.close_workbook(workbook_id)
+
+    if errors:
+        print(f"\n   ❌ 실패 {len(errors)}건")
+        for error in errors:
+            print(f"      {error}")
+        sys.exit(1)
+    print("\n   ✅ PATCH 뒤 P열과 3행 합계가 전체 저장과 같음")
+
+if __name__ == "__main__":
+    main()
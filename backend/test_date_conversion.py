@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+날짜 변환 동일성 + 성능 테스트 스크립트
+
+date_utils의 일괄 변환(excel_serials_to_strings, excel_dates_to_strings)과 캐시된
+excel_date_to_string이 예전 셀 단위 변환(SheetManager.excel_date_to_string)과 같은
+MM/DD 결과를 내는지 비교하고, 한 열을 변환하는 시간을 잽니다.
+
+- 비교 데이터: 경계값(소수/음수/범위 밖 일련번호, NaN, inf, ISO/슬래시/숫자 문자열,
+  datetime, bool) + 무작위 일련번호
+- 성능: 예전 셀 단위 vs 캐시된 셀 단위 vs 일괄 변환 (일련번호 열, 섞인 열)
+
+사용법: python test_date_conversion.py [셀 수 ...]   (기본 10000 100000 1000000)
+"""
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from date_utils import excel_date_to_string, excel_dates_to_strings, excel_serials_to_strings
+
+DEFAULT_BENCH_CELLS = [10_000, 100_000, 1_000_000]
+
+def old_excel_date_to_string(excel_date):
+    """Convert Excel date to MM/DD format (예전 SheetManager 구현, 캐시 없음)"""
+    try:
+        from datetime import datetime, timedelta
+
+        # Handle datetime objects directly
+        if isinstance(excel_date, datetime):
+            return excel_date.strftime('%m/%d')
+
+        # Handle Excel serial date numbers
+        if isinstance(excel_date, (int, float)):
+            excel_epoch = datetime(1899, 12, 30)
+            date_obj = excel_epoch + timedelta(days=float(excel_date))
+            return date_obj.strftime('%m/%d')
+
+        # Handle string values
+        elif isinstance(excel_date, str):
+            # If it contains 'T' (ISO format like "2025-08-12T00:00:00")
+            if 'T' in excel_date:
+                # Parse ISO format and extract MM/DD
+                date_obj = datetime.fromisoformat(excel_date.replace('Z', '+00:00'))
+                return date_obj.strftime('%m/%d')
+
+            # If already has '/' just extract MM/DD
+            if '/' in excel_date:
+                parts = excel_date.split('/')
+                if len(parts) >= 2:
+                    return f"{parts[0]}/{parts[1]}"
+                return excel_date
+
+            # Try parsing as number
+            try:
+                num = float(excel_date)
+                excel_epoch = datetime(1899, 12, 30)
+                date_obj = excel_epoch + timedelta(days=num)
+                return date_obj.strftime('%m/%d')
+            except:
+                return excel_date
+
+        return excel_date
+    except:
+        return str(excel_date) if excel_date else excel_date
+
+EDGE_SERIALS = [0, 1, 59, 60, 61, 45898, 45898.0, 45898.5, 45898.999999, 45898.9999999999, -1, -0.5,
+                -693593, -693594, 2958465, 2958466, 1e12, -1e12, float("nan"), float("inf"), float("-inf")]
+EDGE_VALUES = EDGE_SERIALS + [
+    True, False, None, "", " ", "45898", " 45898 ", "45898.75", "abc", "nan", "inf",
+    "2025-08-12T00:00:00", "2025-08-12T00:00:00Z", "2025-13-45T00:00:00", "08/29/2025", "8/29", "/",
+    datetime(2025, 8, 29), datetime(2025, 12, 31, 23, 59), np.nan,
+]
+
+def random_serials(n_cells, seed=0):
+    """무작위 일련번호: 정수 / 시각 포함 소수 / 넓은 범위"""
+    rng = np.random.default_rng(seed)
+    return np.concatenate([
+        rng.integers(45000, 46500, n_cells).astype(np.float64),
+        rng.integers(45000, 46500, n_cells) + rng.random(n_cells),
+        rng.uniform(-693593, 2958465, n_cells),
+    ])
+
+def bench_column(n_cells, seed=0):
+    """입금일 열처럼 100일 안의 일련번호 (일부 문자열)"""
+    rng = np.random.default_rng(seed)
+    serials = rng.integers(45800, 45900, n_cells).astype(np.float64)
+    mixed = serials.tolist()
+    for idx in np.flatnonzero(rng.random(n_cells) < 0.1):
+        mixed[idx] = f"{int(serials[idx])}"
+    return serials, mixed
+
+def compare(name, expected, got, errors):
+    """expected / got 리스트를 셀 단위로 (값과 타입)"""
+    bad = [(i, e, g) for i, (e, g) in enumerate(zip(expected, got)) if type(e) is not type(g) or e != g]
+    if len(expected) != len(got):
+        bad.insert(0, ("길이", len(expected), len(got)))
+    if bad:
+        errors.append(name)
+        print(f"   ❌ {name}: {len(bad)}건 불일치, 처음: {bad[0]}")
+    else:
+        print(f"   ✅ {name} ({len(expected):,}개)")
+
+def best_time(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    bench_cells = [int(arg) for arg in sys.argv[1:]] or DEFAULT_BENCH_CELLS
+    errors = []
+
+    print("\n1. 예전 셀 단위 변환과 결과 비교")
+    expected = [old_excel_date_to_string(v) for v in EDGE_VALUES]
+    compare("경계값 excel_date_to_string", expected, [excel_date_to_string(v) for v in EDGE_VALUES], errors)
+    compare("경계값 excel_dates_to_strings", expected, excel_dates_to_strings(EDGE_VALUES), errors)
+    compare("경계값 excel_serials_to_strings",
+            [old_excel_date_to_string(v) for v in EDGE_SERIALS], excel_serials_to_strings(EDGE_SERIALS).tolist(), errors)
+    serials = random_serials(100_000)
+    compare("무작위 일련번호 excel_serials_to_strings",
+            [old_excel_date_to_string(v) for v in serials.tolist()], excel_serials_to_strings(serials).tolist(), errors)
+
+    print("\n2. 성능 (한 열 변환, 3회 중 최소)")
+    for n_cells in bench_cells:
+        serials, mixed = bench_column(n_cells)
+        serial_list = serials.tolist()
+        old_time = best_time(lambda: [old_excel_date_to_string(v) for v in serial_list])
+        cached_time = best_time(lambda: [excel_date_to_string(v) for v in serial_list])
+        batch_time = best_time(lambda: excel_serials_to_strings(serials))
+        mixed_old = best_time(lambda: [old_excel_date_to_string(v) for v in mixed])
+        mixed_batch = best_time(lambda: excel_dates_to_strings(mixed))
+        print(f"   {n_cells:>9,}개 일련번호: 예전 {old_time:.3f}초, 캐시 {cached_time:.3f}초, "
+              f"일괄 {batch_time:.3f}초 ({old_time / batch_time:.0f}배)")
+        print(f"   {n_cells:>9,}개 섞인 열:   예전 {mixed_old:.3f}초, 일괄 {mixed_batch:.3f}초 "
+              f"({mixed_old / mixed_batch:.0f}배)")
+
+    if errors:
+        print(f"\n   ❌ 불일치 {len(errors)}건")
+        sys.exit(1)
+    print("\n   ✅ 결과 동일")
+
+if __name__ == "__main__":
+    main()
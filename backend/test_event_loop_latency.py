@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+업로드 중 이벤트 루프 응답성 테스트 스크립트
+
+큰 엑셀 파일을 /excel/upload로 올리는 동안 /users/me를 계속 호출해서
+응답 지연(p50/p95/max)을 측정합니다. 파싱이 이벤트 루프를 막으면
+업로드가 끝날 때까지 /users/me도 함께 멈춥니다.
+
+사용법: python test_event_loop_latency.py <엑셀 파일> [반복 횟수]
+(업로드 사전 검사를 통과하도록 주문서 양식 파일을 사용)
+"""
+import io
+import os
+import sys
+import threading
+import time
+import uuid
+import zipfile
+import requests
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+# 설정
+BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
+ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "gndr_admin")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "gndr12345!")
+# 업로드 중 /users/me 최대 허용 지연 (초)
+# 루프가 막힌 동안은 요청이 하나밖에 나가지 못하므로 p95가 아니라 최대값으로 판정
+MAX_LATENCY_SECONDS = float(os.getenv("MAX_LATENCY_SECONDS", 0.5))
+
+def get_token():
+    """관리자 토큰 받기"""
+    response = requests.post(
+        f"{BASE_URL}/token",
+        data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD},
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+def unique_content(file_path):
+    """업로드 캐시에 적중하지 않도록 매번 다른 바이트로 (.xlsx는 zip 주석만 변경)"""
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    if not file_path.lower().endswith('.xlsx'):
+        return content
+
+    buffer = io.BytesIO(content)
+    with zipfile.ZipFile(buffer, 'a') as archive:
+        archive.comment = uuid.uuid4().hex.encode()
+    return buffer.getvalue()
+
+def upload(token, file_path, results):
+    """엑셀 업로드 (별도 스레드)"""
+    content = unique_content(file_path)
+
+    started = time.perf_counter()
+    response = requests.post(
+        f"{BASE_URL}/excel/upload",
+        headers={"Authorization": f"Bearer {token}"},
+        files={"file": (os.path.basename(file_path), content)}
+    )
+    results["upload_seconds"] = time.perf_counter() - started
+    results["upload_status"] = response.status_code
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+def measure(token, file_path):
+    """업로드 1회 동안 /users/me 지연 측정"""
+    results = {}
+    uploader = threading.Thread(target=upload, args=(token, file_path, results))
+    uploader.start()
+
+    latencies = []
+    headers = {"Authorization": f"Bearer {token}"}
+    while uploader.is_alive():
+        started = time.perf_counter()
+        requests.get(f"{BASE_URL}/users/me", headers=headers).raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        time.sleep(0.01)
+    uploader.join()
+
+    return results, latencies
+
+def main():
+    """메인 함수"""
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+
+    file_path = sys.argv[1]
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print("=" * 60)
+    print("업로드 중 /users/me 응답 지연 측정")
+    print("=" * 60)
+
+    token = get_token()
+    all_latencies = []
+    for attempt in range(1, repeat + 1):
+        results, latencies = measure(token, file_path)
+        all_latencies.extend(latencies)
+        print(f"\n{attempt}. 업로드 {results['upload_seconds']:.2f}s (HTTP {results['upload_status']}), "
+              f"/users/me {len(latencies)}회: p50 {percentile(latencies, 0.5) * 1000:.0f}ms, "
+              f"p95 {percentile(latencies, 0.95) * 1000:.0f}ms, max {max(latencies) * 1000:.0f}ms")
+
+    worst = max(all_latencies)
+    print("\n" + "=" * 60)
+    print(f"전체 p95 {percentile(all_latencies, 0.95) * 1000:.0f}ms, "
+          f"max {worst * 1000:.0f}ms (허용치 {MAX_LATENCY_SECONDS * 1000:.0f}ms)")
+    if worst > MAX_LATENCY_SECONDS:
+        print("❌ 업로드 중 이벤트 루프가 막혀 있습니다")
+        sys.exit(1)
+    print("✅ 업로드 중에도 /users/me가 바로 응답합니다")
+
+if __name__ == "__main__":
+    main()
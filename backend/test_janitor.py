@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+디스크 정리(janitor) 테스트 스크립트
+
+임시 폴더에 sheet_cache / exports / workbooks / saved_files와 임시 상태 파일, 임시 DB를
+만들고 지워야 할 파일과 지우면 안 되는 파일을 섞어 둔 뒤:
+
+1. 미리 보기(dry_run): 지울 파일을 사유별로 보고하지만 아무 파일도, 색인도 바뀌지 않음
+2. 실제 실행: 미리 보기와 같은 개수/용량을 지우고, 보호 대상은 모두 남음
+   - 열린 워크북의 시트 캐시와 원본, 같은 시트 이름의 DailyOrder가 있는 편집 시트,
+     SavedFile이 가리키는 파일, 색인에 있는 파일, 유예 시간 안의 새 파일
+3. 한 번 더 실행: 지울 것이 없음
+
+사용법: python test_janitor.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base, DailyOrder, SavedFile
+from janitor import Janitor, REASON_AGE, REASON_ORPHAN, REASON_SIZE
+from shared_state import SharedState
+from sheet_manager import SheetManager, EDITED_SHEETS_WORKBOOK
+from sheet_model import Sheet
+
+DAY = 24 * 3600
+OPEN_WORKBOOK = "openwb"
+CLOSED_WORKBOOK = "closedwb"
+
+def make_file(path, size, age_days):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    old = time.time() - age_days * DAY
+    os.utime(path, (old, old))
+    return path
+
+def snapshot(root):
+    """폴더 아래 모든 파일 -> 크기"""
+    files = {}
+    for dir_path, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dir_path, name)
+            files[os.path.relpath(path, root)] = os.path.getsize(path)
+    return files
+
+def setup(root):
+    """(janitor, manager, 지워야 할 파일, 남아야 할 파일)"""
+    state = SharedState(os.path.join(root, "state.db"))
+    manager = SheetManager(os.path.join(root, "sheet_cache"), os.path.join(root, "workbooks"), state=state)
+    engine = create_engine(f"sqlite:///{os.path.join(root, 'app.db')}")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    exports_dir = os.path.join(root, "exports")
+    saved_dir = os.path.join(root, "saved_files")
+    os.mkdir(exports_dir)
+    os.mkdir(saved_dir)
+    removed, kept = {}, set()
+
+    # 시트 캐시 색인 항목: (워크북, 시트, 나이(일), 사유 또는 None=남음)
+    store = manager.store
+    rows = [["주문서"], ["열"], [0], ["메모"]] + [[f"거래처{i}", "주소", None, None, f"상품{i}"] for i in range(20)]
+    entries = [
+        (OPEN_WORKBOOK, "0828", 30, None),                   # 열린 워크북
+        (EDITED_SHEETS_WORKBOOK, "0828", 5, None),           # DailyOrder 있음, 기간 안
+        (EDITED_SHEETS_WORKBOOK, "0827", 20, REASON_AGE),    # DailyOrder 있음, 14일 지남
+        (EDITED_SHEETS_WORKBOOK, "0901", 5, REASON_ORPHAN),  # DailyOrder 없음
+        (CLOSED_WORKBOOK, "0828", 5, REASON_ORPHAN),         # 닫힌 워크북
+        (CLOSED_WORKBOOK, "0829", 0, None),                  # 닫힌 워크북이지만 방금 기록
+    ]
+    for workbook, sheet_name, _, _ in entries:
+        store.save(workbook, sheet_name, Sheet.from_rows(rows), {"version": 0})
+    store.flush()
+    for workbook, sheet_name, age_days, reason in entries:
+        written_at = datetime.fromtimestamp(time.time() - age_days * DAY).isoformat()
+        state.execute("UPDATE sheets SET written_at = ? WHERE key = ?", (written_at, store.key(workbook, sheet_name)))
+        entry = store.entry(workbook, sheet_name)
+        path = os.path.join("sheet_cache", entry["file"])
+        old = time.time() - age_days * DAY
+        os.utime(os.path.join(root, path), (old, old))
+        if reason:
+            removed[path] = reason
+        else:
+            kept.add(path)
+    # 색인에 없는 파일
+    removed[os.path.join("sheet_cache", "tmp1a2b_0828.json")] = REASON_ORPHAN
+    make_file(os.path.join(root, "sheet_cache", "tmp1a2b_0828.json"), 300, 2)
+    kept.add(os.path.join("sheet_cache", "tmp9z8y_0829.json"))
+    make_file(os.path.join(root, "sheet_cache", "tmp9z8y_0829.json"), 300, 0)
+
+    # 열린 워크북 (다른 워커가 연 것처럼 공유 상태에만 등록)
+    now = time.time()
+    state.execute(
+        "INSERT INTO workbooks (workbook_id, user, file_path, display_filename, sheet_names, is_html, "
+        "created_at, last_used_at) VALUES (?, ?, ?, ?, ?, 0, ?, ?)",
+        (OPEN_WORKBOOK, "tester", os.path.join(root, "workbooks", f"{OPEN_WORKBOOK}.xlsx"), "a.xlsx", "[]", now, now)
+    )
+    for name, age_days, reason in ((f"{OPEN_WORKBOOK}.xlsx", 10, None), (f"{CLOSED_WORKBOOK}.xlsx", 10, REASON_ORPHAN),
+                                   ("new_upload.xlsx", 0, None)):
+        path = os.path.join("workbooks", name)
+        make_file(os.path.join(root, path), 2000, age_days)
+        if reason:
+            removed[path] = reason
+        else:
+            kept.add(path)
+
+    # exports: 3일 지나면 기간, 나머지는 오래된 것부터 용량 한도(3000바이트)까지
+    for name, age_days, reason in (("export_old.xlsx", 5, REASON_AGE), ("export_2d.xlsx", 2, REASON_SIZE),
+                                   ("export_1d.xlsx", 1, None), ("export_12h.xlsx", 0.5, None),
+                                   ("export_now.xlsx", 0, None)):
+        path = os.path.join("exports", name)
+        make_file(os.path.join(root, path), 1000, age_days)
+        if reason:
+            removed[path] = reason
+        else:
+            kept.add(path)
+
+    # saved_files: SavedFile이 가리키는 파일만 남김
+    db = session_factory()
+    for name, age_days, referenced in (("0828_matched.xlsx", 30, True), ("0828_error_old.xlsx", 30, False),
+                                       ("0829_normal.xlsx", 0, False)):
+        path = os.path.join("saved_files", name)
+        make_file(os.path.join(root, path), 1500, age_days)
+        if referenced:
+            db.add(SavedFile(date="0828", file_type="matched", file_name=name,
+                             file_path=os.path.join(root, path), sheet_data=[]))
+            kept.add(path)
+        elif age_days:
+            removed[path] = REASON_ORPHAN
+        else:
+            kept.add(path)
+    for sheet_name in ("0828", "0827"):
+        db.add(DailyOrder(date=date(2025, 8, 28), order_type="order", sheet_name=sheet_name, data=[]))
+    db.commit()
+    db.close()
+
+    janitor = Janitor(manager, session_factory, exports_dir=exports_dir, saved_files_dir=saved_dir)
+    janitor.exports_max_bytes = 3000
+    return janitor, manager, removed, kept
+
+def removed_counts(report):
+    """디렉터리별 {사유: 개수}"""
+    return {name: {reason: count for reason, count in d["removed"].items() if count}
+            for name, d in report["directories"].items()}
+
+def expected_counts(removed):
+    counts = {}
+    for path, reason in removed.items():
+        directory = counts.setdefault(path.split(os.sep)[0], {})
+        directory[reason] = directory.get(reason, 0) + 1
+    return counts
+
+def main():
+    root = tempfile.mkdtemp()
+    errors = []
+
+    def check(name, passed, detail=""):
+        print(f"   {'✅' if passed else '❌'} {name}{f' ({detail})' if detail else ''}")
+        if not passed:
+            errors.append(f"{name} {detail}".strip())
+
+    try:
+        janitor, manager, removed, kept = setup(root)
+        expected = expected_counts(removed)
+        before = snapshot(root)
+        entries_before = sorted((e["workbook"], e["sheet_name"]) for e in manager.store.entries())
+
+        print("\n1. 미리 보기 (dry_run)")
+        report = janitor.run(dry_run=True)
+        counts = {name: c for name, c in removed_counts(report).items() if c}
+        check("지울 파일 사유별 개수", counts == expected, f"보고 {counts}, 기대 {expected}")
+        check("파일은 그대로", snapshot(root) == before)
+        check("시트 캐시 색인도 그대로",
+              sorted((e["workbook"], e["sheet_name"]) for e in manager.store.entries()) == entries_before)
+        check("누적 통계에 안 들어감", janitor.stats()["runs"] == 0 and janitor.stats()["total_removed_files"] == 0)
+
+        print("\n2. 실제 실행")
+        real = janitor.run()
+        after = snapshot(root)
+        check("미리 보기와 같은 개수/용량",
+              (real["removed_files"], real["reclaimed_bytes"]) == (report["removed_files"], report["reclaimed_bytes"]),
+              f"실제 {real['removed_files']}개 {real['reclaimed_bytes']}B, 미리 보기 "
+              f"{report['removed_files']}개 {report['reclaimed_bytes']}B")
+        gone = set(before) - set(after)
+        expected_gone = set(removed) | {p + ".edits" for p in removed if p + ".edits" in before}
+        check("지운 파일 = 지워야 할 파일", gone == expected_gone,
+              f"더 지움 {sorted(gone - expected_gone)}, 안 지움 {sorted(expected_gone - gone)}")
+        survivors = kept - set(after)
+        check(f"보호 대상 {len(kept)}개 모두 남음", not survivors, f"사라짐 {sorted(survivors)}")
+        remaining = {(e["workbook"], e["sheet_name"]) for e in manager.store.entries()}
+        check("지운 시트의 색인 항목 삭제", remaining == {(OPEN_WORKBOOK, "0828"), (EDITED_SHEETS_WORKBOOK, "0828"),
+                                                 (CLOSED_WORKBOOK, "0829")}, f"{sorted(remaining)}")
+
+        print("\n3. 한 번 더")
+        again = janitor.run()
+        check("지울 것 없음", again["removed_files"] == 0, f"{removed_counts(again)}")
+        check("누적 통계", janitor.stats()["runs"] == 2 and janitor.stats()["total_removed_files"] == real["removed_files"])
+        manager.store.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if errors:
+        print(f"\n   ❌ 실패 {len(errors)}건")
+        for error in errors:
+            print(f"      {error}")
+        sys.exit(1)
+    print("\n   ✅ 미리 보기는 아무것도 지우지 않고, 실제 실행은 보호 대상을 남김")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+입금 내역 저장 숫자 검증 테스트 스크립트
+
+원가(H)/입고수량(O)/입금액(T)에 숫자가 아닌 값이 있으면 엉뚱한 숫자로 저장하지 않고
+400으로 해당 행을 알려줘야 합니다 (아무것도 저장하지 않음).
+
+- "abc", "1,000" -> 예전에는 0으로 저장
+- 입고수량 "3.9" -> 예전에는 3으로 저장
+- "inf" -> 예전에는 1.797e308 / INT64_MIN으로 저장
+
+서버를 띄우지 않고 앱을 직접 호출합니다 (로그인 대신 get_current_user, DB는 임시 SQLite).
+
+사용법: python test_payment_save.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from main import app, get_current_user, get_db, sheet_manager, User
+from database import Base, PaymentRecord
+
+USERNAME = "payment_tester"
+PAYMENT_DATE = "2026-10-17"
+
+def payment_row(company, code, unit_price, qty, amount):
+    """A~T열 입금 행 (H: 원가, O: 입고수량, T: 입금액)"""
+    row = [""] * 20
+    row[0], row[4], row[5] = company, code, f"{code} 상품"
+    row[7], row[14], row[19] = unit_price, qty, amount
+    return row
+
+def sheet_with(rows):
+    header = [[f"헤더{i}"] + [""] * 19 for i in range(4)]
+    return header + rows
+
+def post(client, rows):
+    return client.post("/payments/save", json={
+        "payment_date": PAYMENT_DATE,
+        "data": sheet_with(rows),
+        "columns": [chr(ord("A") + i) for i in range(20)],
+        "created_by": USERNAME
+    })
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'payments.db')}",
+                           connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    TestSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def test_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def saved():
+        db = TestSession()
+        try:
+            return db.query(PaymentRecord).filter(PaymentRecord.company_name != "_HEADER_").all()
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_current_user] = lambda: User(username=USERNAME, disabled=False)
+    app.dependency_overrides[get_db] = test_db
+    sheet_manager.set_header_rows(USERNAME, [])
+    errors = []
+    try:
+        client = TestClient(app)
+
+        print("\n1. 숫자가 아닌 값 -> 400")
+        bad_rows = [
+            payment_row("정상", "A1", 1000, 2, 2000),                 # 행 5
+            payment_row("문자", "A2", "abc", 1, 1000),                # 행 6: 원가
+            payment_row("쉼표", "A3", 1000, 1, "1,000"),              # 행 7: 입금액
+            payment_row("소수", "A4", 1000, "3.9", 3900),             # 행 8: 입고수량
+            payment_row("무한", "A5", "inf", "inf", 1000),            # 행 9: 원가, 입고수량
+            payment_row("", "A6", "abc", "abc", "abc"),               # 행 10: 거래처명 없음 -> 건너뜀
+        ]
+        response = post(client, bad_rows)
+        detail = response.json().get("detail", "")
+        print(f"   {response.status_code}: {detail}")
+        if response.status_code != 400:
+            errors.append(f"잘못된 값: {response.status_code} (400 기대)")
+        for cell in ("행 6 H열(원가) 'abc'", "행 7 T열(입금액) '1,000'", "행 8 O열(입고수량) '3.9'",
+                     "행 9 H열(원가) 'inf'", "행 9 O열(입고수량) 'inf'"):
+            if cell not in detail:
+                errors.append(f"응답에 {cell} 없음")
+        for cell in ("행 5 ", "행 10 "):
+            if cell in detail:
+                errors.append(f"정상/건너뛰는 행이 응답에 있음: {cell.strip()}")
+        if saved():
+            errors.append(f"400인데 {len(saved())}건 저장됨")
+        if sheet_manager.get_header_rows(USERNAME):
+            errors.append("400인데 헤더가 저장됨")
+
+        print("\n2. 올바른 값 -> 200")
+        good_rows = [
+            payment_row("정상", "A1", 1000, 2, 2000),
+            payment_row("문자열 숫자", "A2", "1500.5", "3", " 4501.5"),
+            payment_row("빈칸", "A3", "", None, ""),
+            payment_row("정수 실수", "A4", 700, 4.0, 2800),
+        ]
+        response = post(client, good_rows)
+        print(f"   {response.status_code}: {response.json().get('message', response.json())}")
+        if response.status_code != 200:
+            errors.append(f"올바른 값: {response.status_code} (200 기대)")
+        records = {r.company_name: (r.unit_price, r.receipt_qty, r.payment_amount) for r in saved()}
+        expected = {
+            "정상": (1000.0, 2, 2000.0),
+            "문자열 숫자": (1500.5, 3, 4501.5),
+            "빈칸": (0.0, 0, 0.0),
+            "정수 실수": (700.0, 4, 2800.0),
+        }
+        for company, values in expected.items():
+            print(f"   {company}: {records.get(company)}")
+            if records.get(company) != values:
+                errors.append(f"{company}: {records.get(company)} ({values} 기대)")
+    finally:
+        app.dependency_overrides.clear()
+        sheet_manager.set_header_rows(USERNAME, [])
+        engine.dispose()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if errors:
+        print(f"\n   ❌ 실패 {len(errors)}건")
+        for error in errors:
+            print(f"      {error}")
+        sys.exit(1)
+    print("\n   ✅ 잘못된 숫자는 400, 올바른 숫자는 그대로 저장")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+process_dataframe 동일성 + 성능 테스트 스크립트
+
+열 단위로 바꾼 SheetManager.process_dataframe이 예전 셀 단위 구현과 같은 결과(값과
+타입)를 내는지 같은 데이터로 비교하고, 합성 주문서로 두 구현의 시간을 잽니다.
+
+- 비교 데이터: 샘플 주문서(0825 주문서, docs/references)의 모든 시트를 dtype 그대로 /
+  dtype=str로 읽은 것 + 경계값('nan' 문자열, inf, bool, datetime, 공백, V열 숫자/문자열)
+- 각 데이터에 convert_dates 켜고 끄고 둘 다
+
+사용법: python test_process_dataframe.py [행 수 ...]   (기본 10000 100000)
+"""
+import glob
+import os
+import sys
+import time
+import warnings
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from sheet_manager import sheet_manager
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SAMPLE_WORKBOOKS = sorted(glob.glob(os.path.join(ROOT, "*.xlsx")) +
+                          glob.glob(os.path.join(ROOT, "docs", "references", "*.xlsx")))
+DEFAULT_BENCH_ROWS = [10_000, 100_000]
+
+# 샘플 주문서의 머리글/바닥글 경고는 무시
+warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+
+# ==================== 예전 구현 (셀 단위) ====================
+
+def old_excel_date_to_string(excel_date):
+    """Convert Excel date to MM/DD format"""
+    try:
+        from datetime import datetime, timedelta
+
+        # Handle datetime objects directly
+        if isinstance(excel_date, datetime):
+            return excel_date.strftime('%m/%d')
+
+        # Handle Excel serial date numbers
+        if isinstance(excel_date, (int, float)):
+            excel_epoch = datetime(1899, 12, 30)
+            date_obj = excel_epoch + timedelta(days=float(excel_date))
+            return date_obj.strftime('%m/%d')
+
+        # Handle string values
+        elif isinstance(excel_date, str):
+            # If it contains 'T' (ISO format like "2025-08-12T00:00:00")
+            if 'T' in excel_date:
+                # Parse ISO format and extract MM/DD
+                date_obj = datetime.fromisoformat(excel_date.replace('Z', '+00:00'))
+                return date_obj.strftime('%m/%d')
+
+            # If already has '/' just extract MM/DD
+            if '/' in excel_date:
+                parts = excel_date.split('/')
+                if len(parts) >= 2:
+                    return f"{parts[0]}/{parts[1]}"
+                return excel_date
+
+            # Try parsing as number
+            try:
+                num = float(excel_date)
+                excel_epoch = datetime(1899, 12, 30)
+                date_obj = excel_epoch + timedelta(days=num)
+                return date_obj.strftime('%m/%d')
+            except:
+                return excel_date
+
+        return excel_date
+    except:
+        return str(excel_date) if excel_date else excel_date
+
+def old_process_dataframe(df, convert_dates=True):
+    """Process dataframe to handle NaN, inf values for JSON serialization"""
+    data = []
+    for row_idx, row in enumerate(df.values.tolist()):
+        processed_row = []
+        for col_idx, cell in enumerate(row):
+            if isinstance(cell, str):
+                if cell.lower() == 'nan':
+                    processed_row.append(None)
+                else:
+                    if convert_dates and col_idx == 21 and row_idx >= 4:
+                        processed_row.append(old_excel_date_to_string(cell))
+                    else:
+                        processed_row.append(cell.strip() if cell else cell)
+            elif isinstance(cell, (int, float, np.integer, np.floating)):
+                if pd.isna(cell) or np.isinf(cell):
+                    processed_row.append(None)
+                else:
+                    if convert_dates and col_idx == 21 and row_idx >= 4:
+                        processed_row.append(old_excel_date_to_string(cell))
+                    else:
+                        processed_row.append(cell)
+            elif pd.isna(cell) or cell is None:
+                processed_row.append(None)
+            else:
+                processed_row.append(cell)
+        data.append(processed_row)
+    return data
+
+# ==================== 비교 데이터 ====================
+
+def sample_frames():
+    """(이름, DataFrame) - 샘플 주문서의 모든 시트, dtype 그대로 / dtype=str"""
+    for path in SAMPLE_WORKBOOKS:
+        name = os.path.basename(path)
+        for dtype in (None, str):
+            sheets = pd.read_excel(path, sheet_name=None, header=None, dtype=dtype)
+            for sheet_name, df in sheets.items():
+                yield f"{name} / {sheet_name} ({'str' if dtype else 'auto'})", df
+
+def edge_case_frame():
+    """경계값 모음 (23열, V열에 숫자/문자열/날짜 섞음)"""
+    cells = ["nan", "NaN", " 공백 ", "", np.nan, None, np.inf, -np.inf, True, False, 0, 12, 3.5,
+             datetime(2025, 8, 29), "45898", "45898.75", "2025-08-12T00:00:00", "08/29/2025", "8/29",
+             " 45898 ", 45898, 45898.5, -1.0, 1e12, "abc"]
+    rows = []
+    for i in range(len(cells) + 4):
+        rows.append([cells[(i + col) % len(cells)] for col in range(23)])
+    return pd.DataFrame(rows)
+
+def synthetic_order_frame(n_rows, seed=0):
+    """23열 합성 주문서: 문자열, 30% 빈칸 숫자, V열 날짜 일련번호"""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    companies = np.array([f"거래처{i}" for i in range(200)], dtype=object)
+    products = np.array([f" 상품 {i} " for i in range(3000)], dtype=object)
+    for col in range(23):
+        if col == 21:
+            serials = rng.integers(45800, 45900, n_rows).astype(np.float64)
+            serials[rng.random(n_rows) < 0.3] = np.nan
+            columns[col] = serials
+        elif col in (0, 1, 2):
+            columns[col] = companies[rng.integers(0, len(companies), n_rows)]
+        elif col in (4, 5, 6):
+            columns[col] = products[rng.integers(0, len(products), n_rows)]
+        else:
+            numbers = rng.integers(0, 50_000, n_rows).astype(np.float64)
+            numbers[rng.random(n_rows) < 0.3] = np.nan
+            columns[col] = numbers
+    return pd.DataFrame(columns)
+
+# ==================== 비교 / 측정 ====================
+
+def first_difference(old, new):
+    """첫 번째로 다른 셀 (행, 열, 예전 값, 새 값) - 같으면 None"""
+    if len(old) != len(new):
+        return ("행 수", None, len(old), len(new))
+    for r, (old_row, new_row) in enumerate(zip(old, new)):
+        if len(old_row) != len(new_row):
+            return (r, "열 수", len(old_row), len(new_row))
+        for c, (a, b) in enumerate(zip(old_row, new_row)):
+            if type(a) is not type(b) or a != b:
+                return (r, c, a, b)
+    return None
+
+def best_time(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    bench_rows = [int(arg) for arg in sys.argv[1:]] or DEFAULT_BENCH_ROWS
+    errors = []
+
+    print("\n1. 예전 구현과 결과 비교")
+    frames = list(sample_frames()) + [("경계값", edge_case_frame()),
+                                      ("합성 주문서 2000행", synthetic_order_frame(2000))]
+    for name, df in frames:
+        for convert_dates in (True, False):
+            diff = first_difference(old_process_dataframe(df, convert_dates),
+                                    sheet_manager.process_dataframe(df, convert_dates))
+            if diff:
+                errors.append(f"{name} convert_dates={convert_dates}: {diff}")
+    print(f"   {len(frames)}개 데이터 x convert_dates 켜고/끄고 = {len(frames) * 2}건 비교")
+    if errors:
+        for error in errors:
+            print(f"   ❌ {error}")
+    else:
+        print("   ✅ 모두 값과 타입이 같음")
+
+    print("\n2. 성능 (합성 주문서, 3회 중 최소)")
+    for n_rows in bench_rows:
+        df = synthetic_order_frame(n_rows)
+        old_time = best_time(lambda: old_process_dataframe(df))
+        new_time = best_time(lambda: sheet_manager.process_dataframe(df))
+        print(f"   {n_rows:>9,}행: 예전 {old_time:.2f}초 -> 지금 {new_time:.2f}초 ({old_time / new_time:.1f}배)")
+
+    if errors:
+        print(f"\n   ❌ 불일치 {len(errors)}건")
+        sys.exit(1)
+    print("\n   ✅ 결과 동일")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+입고전표 분류 / 매칭·정상·오류 분리 고정 테스트 스크립트
+
+receipt_classify의 결과를 예전 브라우저 구현(sortReceiptData +
+processReceiptSlipData, 입금 관리 확인 시 정상/오류 분리)이 같은 입력에 대해
+만든 결과(test_data/receipt_classify.json)와 비교합니다.
+
+- 분류: 주소 정렬 + 구분선, 배경색(일치/구분선), 교환 글자색, 중복 상품코드, 자동 체크
+- 분리: 정상(체크된 행 + 입금액), 오류(교환 행 포함 나머지, 입고 없는 행 포함)
+
+사용법: python test_receipt_classify.py [고정 데이터.json]
+"""
+import json
+import os
+import sys
+from receipt_classify import prepare_receipt_sheet, split_receipt_sheet
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_data", "receipt_classify.json")
+
+def as_json(value):
+    """브라우저 결과와 같은 형태로 (숫자 키 -> 문자열 키)"""
+    return json.loads(json.dumps(value, ensure_ascii=False))
+
+def compare(name, got, expected, errors):
+    if as_json(got) == expected:
+        print(f"   ✅ {name}")
+        return
+    errors.append(name)
+    print(f"   ❌ {name} 불일치")
+    if isinstance(expected, list):
+        got = as_json(got)
+        for i, (a, b) in enumerate(zip(got, expected)):
+            if a != b:
+                print(f"      행 {i}: {a}")
+                print(f"      기대: {b}")
+                break
+        if len(got) != len(expected):
+            print(f"      행 수: {len(got)} (기대 {len(expected)})")
+    else:
+        print(f"      결과: {as_json(got)}")
+        print(f"      기대: {expected}")
+
+def main():
+    fixture_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FIXTURE
+    with open(fixture_path, encoding="utf-8") as f:
+        fixture = json.load(f)
+    data = fixture["input"]["data"]
+    checked_rows = {int(k): v for k, v in fixture["input"]["checked_rows"].items()}
+    expected = fixture["expected"]
+    errors = []
+
+    print("\n1. 분류 (정렬, 색상, 중복, 자동 체크)")
+    prepared = prepare_receipt_sheet(data)
+    compare("정렬 + 구분선", prepared["data"], expected["data"], errors)
+    compare("배경색", prepared["row_colors"], expected["row_colors"], errors)
+    compare("교환 글자색", prepared["row_text_colors"], expected["row_text_colors"], errors)
+    compare("중복 상품코드", prepared["duplicates"], expected["duplicates"], errors)
+    compare("자동 체크", prepared["auto_checked"], expected["auto_checked"], errors)
+
+    print("\n2. 정상 / 오류 분리")
+    split = split_receipt_sheet(prepared["data"], checked_rows, prepared["row_colors"], prepared["row_text_colors"])
+    for part, label in (("normal", "정상"), ("error", "오류")):
+        for field in ("data", "row_colors", "row_text_colors"):
+            compare(f"{label} {field}", split[part][field], expected[part][field], errors)
+    normal_rows = sum(1 for row in split["normal"]["data"][4:] if any(row))
+    error_rows = sum(1 for row in split["error"]["data"][4:] if any(row))
+    print(f"   정상 {normal_rows}행, 오류 {error_rows}행 (교환 {len(split['error']['row_text_colors'])}행)")
+
+    if errors:
+        print(f"\n   ❌ 불일치 {len(errors)}건")
+        sys.exit(1)
+    print("\n   ✅ 모두 일치")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+주문입고 / 입고전표 병합 동등성 테스트 스크립트
+
+/excel/merge-order-receipt, /excel/merge-receipt-slip 결과를 예전 브라우저
+구현(excelValidation.ts의 validateAndMergeData / validateAndMergeReceiptSlip)을
+그대로 옮긴 O(n·m) 루프와 비교합니다.
+
+- consume_duplicates=false: 병합 결과, 매칭 수, 교환 행 색상, 실패 목록, 메시지가 모두 같아야 함
+- consume_duplicates=true: 매칭 수와 실패 목록은 같고, 같은 키의 입고 행은 위에서부터
+  한 번씩 사용 (다 쓰면 첫 행)
+
+사용법: python test_receipt_merge.py [주문서.xlsx 주문입고.xlsx 입고전표.xls] [무작위 케이스 수]
+"""
+import math
+import os
+import random
+import re
+import sys
+import time
+import requests
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+# 설정
+BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
+ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "gndr_admin")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "gndr12345!")
+
+def get_token():
+    """관리자 토큰 받기"""
+    response = requests.post(
+        f"{BASE_URL}/token",
+        data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD},
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+# --- 브라우저 구현 (excelValidation.ts / dataProcessing.ts) ---
+
+def js_string(value):
+    """String(value)"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def parse_float(value):
+    """parseFloat(String(value))"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    match = re.match(r'[+-]?(?:Infinity|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)', js_string(value).lstrip())
+    return float(match.group(0).replace("Infinity", "inf")) if match else math.nan
+
+def falsy(value):
+    return value is None or value is False or value == "" or (
+        isinstance(value, (int, float)) and (value == 0 or value != value))
+
+def normalize_string(value):
+    if falsy(value):
+        return ""
+    return re.sub(r'\s+', '', js_string(value).strip().lower())
+
+def compare_numbers(a, b):
+    num_a = parse_float(js_string(a).replace(",", "")) if not isinstance(a, (int, float)) or isinstance(a, bool) else a
+    num_b = parse_float(js_string(b).replace(",", "")) if not isinstance(b, (int, float)) or isinstance(b, bool) else b
+    return not math.isnan(num_a) and not math.isnan(num_b) and abs(num_a - num_b) < 0.01
+
+def cell(row, col):
+    return row[col] if row and col < len(row) else None
+
+def label(row, col):
+    return "undefined" if col >= len(row) else js_string(row[col])
+
+def put(row, col, value):
+    while len(row) <= col:
+        row.append(None)
+    row[col] = value
+
+def message(matched, unmatched):
+    if unmatched:
+        return f"{matched}개 행 매칭됨. 매칭 실패: {len(unmatched)}개"
+    return f"{matched}개 행 매칭됨"
+
+def validate_and_merge_data(original, receipt):
+    merged = [list(row) for row in original]
+    matched_count, unmatched, exchange_rows = 0, [], {}
+    for i in range(4, len(original)):
+        store, product, qty = cell(original[i], 0), cell(original[i], 4), cell(original[i], 8)
+        if falsy(store) and falsy(product) and falsy(qty):
+            continue
+        matched = False
+        for j in range(4, len(receipt)):
+            receipt_qty = cell(receipt[j], 8)
+            if (normalize_string(store) == normalize_string(cell(receipt[j], 0)) and
+                    normalize_string(product) == normalize_string(cell(receipt[j], 4)) and
+                    (receipt_qty is None or receipt_qty == "" or
+                     math.isnan(parse_float(js_string(receipt_qty).replace(",", ""))) or
+                     compare_numbers(qty, receipt_qty))):
+                matched = True
+                matched_count += 1
+                for col in (9, 10, 11, 12, 13, 16):
+                    put(merged[i], col, cell(receipt[j], col))
+                if parse_float(merged[i][10]) > 0:
+                    exchange_rows[str(i)] = "#ff0000"
+                break
+        if not matched:
+            unmatched.append(f"행 {i + 1}: {label(original[i], 0)} - {label(original[i], 4)}")
+    return merged, matched_count, exchange_rows, unmatched, message(matched_count, unmatched)
+
+def validate_and_merge_receipt_slip(current, slip):
+    merged = [list(row) for row in current]
+    matched_count, unmatched = 0, []
+    for i in range(4, len(current)):
+        product = cell(current[i], 4)
+        if falsy(product):
+            continue
+        matched = False
+        for j in range(4, len(slip)):
+            if normalize_string(product) == normalize_string(cell(slip[j], 8)):
+                matched = True
+                matched_count += 1
+                put(merged[i], 14, cell(slip[j], 14))
+                break
+        if not matched:
+            unmatched.append(f"행 {i + 1}: {label(current[i], 4)}")
+    return merged, matched_count, {}, unmatched, message(matched_count, unmatched)
+
+# --- 비교 ---
+
+def merge(token, kind, data, other, consume):
+    if kind == "order":
+        body = {"original_data": data, "receipt_data": other, "consume_duplicates": consume}
+    else:
+        body = {"current_data": data, "slip_data": other, "consume_duplicates": consume}
+    response = requests.post(
+        f"{BASE_URL}/excel/merge-{'order-receipt' if kind == 'order' else 'receipt-slip'}",
+        json=body, headers={"Authorization": f"Bearer {token}"}
+    )
+    response.raise_for_status()
+    return response.json()
+
+def check(token, name, kind, data, other):
+    """서버 결과와 브라우저 구현 비교, 실패 사유 목록 반환"""
+    reference = (validate_and_merge_data if kind == "order" else validate_and_merge_receipt_slip)(data, other)
+    errors = []
+
+    started = time.perf_counter()
+    result = merge(token, kind, data, other, consume=False)
+    elapsed = time.perf_counter() - started
+    got = (result["merged_data"], result["matched_count"], result.get("exchange_rows", {}),
+           result["unmatched"], result["message"])
+    for field, a, b in zip(("merged_data", "matched_count", "exchange_rows", "unmatched", "message"), got, reference):
+        if a != b:
+            errors.append(f"{name}: {field} 불일치")
+
+    consumed = merge(token, kind, data, other, consume=True)
+    if (consumed["matched_count"], consumed["unmatched"]) != (reference[1], reference[3]):
+        errors.append(f"{name}: consume_duplicates 매칭 수/실패 목록 불일치")
+    if name.startswith("파일"):
+        print(f"   {name}: {len(data) - 4}행 x {len(other) - 4}행, {result['message']} ({elapsed * 1000:.0f}ms)")
+    return errors
+
+def upload_receipt(token, endpoint, file_path):
+    with open(file_path, 'rb') as f:
+        response = requests.post(
+            f"{BASE_URL}/excel/{endpoint}",
+            files={"file": (os.path.basename(file_path), f.read())},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+    response.raise_for_status()
+    return response.json()["data"]
+
+def upload_order(token, file_path):
+    """주문서 업로드 후 첫 시트 데이터"""
+    headers = {"Authorization": f"Bearer {token}"}
+    with open(file_path, 'rb') as f:
+        response = requests.post(f"{BASE_URL}/excel/upload", files={"file": (os.path.basename(file_path), f.read())},
+                                 headers=headers)
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+    while True:
+        job = requests.get(f"{BASE_URL}/jobs/{job_id}", headers=headers).json()["job"]
+        if job["status"] in ("done", "failed"):
+            break
+        time.sleep(0.5)
+    if job["status"] != "done":
+        raise RuntimeError(f"주문서 업로드 실패: {job.get('errors')}")
+    return job["result"]["sheets"][0]["data"]
+
+def random_cases(count, seed=22):
+    """표기 차이(공백/대소문자/콤마), 빈 칸, 짧은 행, 0.01 경계 수량, 중복 키"""
+    rnd = random.Random(seed)
+    stores = ["가나", "가 나", " 가나 ", "ABC", "abc", "", None, 0, "다라"]
+    products = ["S1", "s1", " S 1", "A10", "", None, 0, 12, 12.0, "12", True]
+    qtys = [1, 1.0, "1", "1,000", 1000, "2개", " 3", 3.004, 3.01, 0.28, 0.29, "", None, "abc", 0, "-1", ".5"]
+    cells = ["", None, 0, 1, "2", "x", "1,5", -3, 2.5, True]
+
+    def row():
+        r = [rnd.choice(stores), "", "", "", rnd.choice(products), "", "", "", rnd.choice(qtys)]
+        r += [rnd.choice(cells) for _ in range(9)]
+        return r[:rnd.randint(0, len(r))] if rnd.random() < 0.2 else r
+
+    for n in range(count):
+        data = [["h"] * 18] * 4 + [row() for _ in range(rnd.randint(0, 40))]
+        other = [["h"] * 18] * 4 + [row() for _ in range(rnd.randint(0, 40))]
+        yield f"무작위 {n + 1}", rnd.choice(["order", "slip"]), data, other
+
+def main():
+    args = sys.argv[1:]
+    count = int(args.pop()) if args and args[-1].isdigit() else 200
+
+    print("\n1. 로그인")
+    token = get_token()
+    errors = []
+
+    if len(args) >= 3:
+        print("\n2. 파일 병합 비교")
+        order = upload_order(token, args[0])
+        receipt = upload_receipt(token, "upload-order-receipt", args[1])
+        slip = upload_receipt(token, "upload-receipt-slip", args[2])
+        errors += check(token, "파일 주문입고", "order", order, receipt)
+        errors += check(token, "파일 입고전표", "slip", order, slip)
+
+    print(f"\n3. 무작위 {count}개 비교")
+    for name, kind, data, other in random_cases(count):
+        errors += check(token, name, kind, data, other)
+
+    if errors:
+        print(f"\n   ❌ 불일치 {len(errors)}건")
+        for error in errors[:20]:
+            print(f"      {error}")
+        sys.exit(1)
+    print("\n   ✅ 모두 일치")
+
+if __name__ == "__main__":
+    main()
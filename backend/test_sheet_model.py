@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Sheet 열 저장 왕복 테스트 스크립트
+
+Sheet.from_rows(rows).to_rows()가 넣은 행을 그대로 (값, 타입, 행 길이까지) 돌려주는지
+확인합니다. 숫자 열(I~O, S~U)은 float 배열로, 문자열 열(A/B/E/F/G)은 사전 인코딩으로
+바뀌므로 그 열에 섞여 들어오는 값이 특히 중요합니다.
+
+- 경계값: bool(True/False는 1/0과 다름), NaN/inf, 2**53을 넘는 큰 정수, -0.0,
+  numpy 숫자, float32로 줄일 수 없는 소수, 문자열/None/날짜 섞인 숫자 열
+- 모양: 헤더만 있는 시트, 빈 행, 길이가 다른 행, 열이 23개를 넘는 행
+- 무작위 행 + 같은 셀 수정(set_cell/set_row)을 리스트와 Sheet에 똑같이 적용한 결과
+
+사용법: python test_sheet_model.py [무작위 케이스 수]   (기본 200)
+"""
+import math
+import random
+import sys
+from datetime import datetime
+import numpy as np
+from sheet_model import Sheet, NUMERIC_COLUMNS, CATEGORY_COLUMNS, ORDER_HEADER_ROWS
+
+DEFAULT_RANDOM_CASES = 200
+WIDTH = 23
+
+EDGE_VALUES = [
+    True, False, 0, 1, -1, 0.0, -0.0, 1.5, 0.1, 1e-320, 1e308,
+    float("nan"), float("inf"), float("-inf"),
+    2 ** 53, 2 ** 53 + 1, -(2 ** 53) - 1, 2 ** 63, 10 ** 30,
+    np.float64(2.5), np.int64(7), np.nan,
+    None, "", " ", "12", "abc", " 공백 ", "nan", datetime(2025, 8, 29),
+]
+
+def same_cell(a, b):
+    """값과 타입이 같은지 (NaN끼리, -0.0/0.0 부호까지 구분)"""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, float):
+        if math.isnan(a) or math.isnan(b):
+            return math.isnan(a) and math.isnan(b)
+        return a == b and math.copysign(1, a) == math.copysign(1, b)
+    return a == b
+
+def first_difference(expected, got):
+    """첫 번째로 다른 곳 (행, 열, 기대값, 결과) - 같으면 None"""
+    if len(expected) != len(got):
+        return ("행 수", None, len(expected), len(got))
+    for r, (e_row, g_row) in enumerate(zip(expected, got)):
+        if len(e_row) != len(g_row):
+            return (r, "행 길이", len(e_row), len(g_row))
+        for c, (a, b) in enumerate(zip(e_row, g_row)):
+            if not same_cell(a, b):
+                return (r, c, a, b)
+    return None
+
+def header():
+    return [["주문서"], [f"열{c}" for c in range(WIDTH)], [0] * WIDTH, ["메모"]]
+
+def edge_rows():
+    """경계값을 모든 열 위치에 한 번씩 돌려 넣은 행들"""
+    rows = header()
+    for i in range(len(EDGE_VALUES)):
+        rows.append([EDGE_VALUES[(i + c) % len(EDGE_VALUES)] for c in range(WIDTH)])
+    return rows
+
+def numeric_column_rows():
+    """숫자 열이 숫자 위주라 float 배열로 저장되는 경우 (예외 값이 조금 섞임)"""
+    rows = header()
+    extras = [True, False, 2 ** 53 + 1, 10 ** 30, float("nan"), float("inf"), "abc", "", -0.0, 0.1, np.int64(3)]
+    for i in range(200):
+        row = [f"거래처{i % 7}"] + [None] * (WIDTH - 1)
+        for col in NUMERIC_COLUMNS:
+            row[col] = extras[(i + col) % len(extras)] if i % 5 == 0 else (i * col if i % 2 else i * 0.5)
+        rows.append(row)
+    return rows
+
+def category_column_rows():
+    """문자열 열에 1 / 1.0 / True처럼 같다고 비교되는 값이 섞인 경우"""
+    rows = header()
+    values = ["A", "A", 1, 1.0, True, 0, 0.0, False, None, "", float("nan")]
+    for i in range(100):
+        row = [None] * WIDTH
+        for col in CATEGORY_COLUMNS:
+            row[col] = values[(i * 3 + col) % len(values)] if i % 4 else "같은 값"
+        rows.append(row)
+    return rows
+
+def shape_cases():
+    """(이름, 행들) - 모양이 특이한 시트"""
+    yield "헤더만", header()
+    yield "헤더보다 짧음", [["주문서"], []]
+    yield "빈 행", header() + [[], [], ["A"]]
+    yield "길이가 다른 행", header() + [[1] * n for n in (0, 3, 9, 15, 23, 30, 1)]
+    yield "넓은 행", header() + [[f"c{c}" for c in range(40)], [None] * 40, list(range(40))]
+
+def random_cell(rng, col):
+    choice = rng.random()
+    if col in NUMERIC_COLUMNS and choice < 0.6:
+        return rng.choice([rng.randint(-1000, 100000), rng.randint(0, 100) * 0.5, rng.random() * 1e6])
+    if col in CATEGORY_COLUMNS and choice < 0.6:
+        return rng.choice(["신평화 3층 301호", "APM 2층", "상품A", "상품B", "거래처"])
+    return rng.choice(EDGE_VALUES)
+
+def random_rows(rng):
+    rows = header()
+    for _ in range(rng.randint(0, 60)):
+        width = rng.choice([WIDTH, WIDTH, WIDTH, rng.randint(0, WIDTH + 5)])
+        rows.append([random_cell(rng, col) for col in range(width)])
+    return rows
+
+def apply_edits(rng, rows, sheet):
+    """같은 수정을 리스트 행과 Sheet에 적용"""
+    for _ in range(rng.randint(0, 20)):
+        if len(rows) == 0:
+            return
+        i = rng.randrange(len(rows))
+        if rng.random() < 0.8:
+            col = rng.randrange(WIDTH + 3)
+            value = random_cell(rng, col)
+            if col >= len(rows[i]):
+                rows[i].extend([None] * (col + 1 - len(rows[i])))
+            rows[i][col] = value
+            sheet.set_cell(i, col, value)
+        else:
+            row = [random_cell(rng, col) for col in range(rng.randint(0, WIDTH + 3))]
+            rows[i] = list(row)
+            sheet[i] = row
+
+def check(name, rows, errors, edit_rng=None):
+    expected = [list(row) for row in rows]
+    sheet = Sheet.from_rows(rows)
+    if edit_rng is not None:
+        apply_edits(edit_rng, expected, sheet)
+    diff = first_difference(expected, sheet.to_rows())
+    if diff is None and len(sheet) != len(expected):
+        diff = ("len()", None, len(expected), len(sheet))
+    if diff is None:
+        diff = first_difference(expected, [sheet[i] for i in range(len(sheet))])
+    if diff:
+        errors.append(f"{name}: {diff}")
+    return diff is None
+
+def main():
+    random_cases = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RANDOM_CASES
+    errors = []
+
+    print("\n1. 경계값 / 열 종류별")
+    for name, rows in (("경계값", edge_rows()), ("숫자 열", numeric_column_rows()),
+                       ("문자열 열", category_column_rows())):
+        ok = check(name, rows, errors)
+        print(f"   {'✅' if ok else '❌'} {name} ({len(rows) - ORDER_HEADER_ROWS}행)")
+
+    print("\n2. 시트 모양")
+    for name, rows in shape_cases():
+        ok = check(name, rows, errors)
+        print(f"   {'✅' if ok else '❌'} {name}")
+
+    print(f"\n3. 무작위 시트 {random_cases}개 (셀/행 수정 포함)")
+    rng = random.Random(0)
+    failed = sum(0 if check(f"무작위 {case}", random_rows(rng), errors, random.Random(case)) else 1
+                 for case in range(random_cases))
+    print(f"   {'✅' if not failed else '❌'} 불일치 {failed}건")
+
+    if errors:
+        print(f"\n   ❌ 실패 {len(errors)}건")
+        for error in errors[:10]:
+            print(f"      {error}")
+        sys.exit(1)
+    print("\n   ✅ from_rows → to_rows가 넣은 행을 그대로 돌려줌")
+
+if __name__ == "__main__":
+    main()
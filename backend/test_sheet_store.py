@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+시트 캐시(sheet_store) 저장/편집/읽기 테스트 스크립트
+
+임시 폴더와 임시 상태 파일에 SheetStore 두 개(워커 프로세스 두 개 역할)를 만들고
+save → commit_edits → load 순서로 쓰면서, 같은 편집을 리스트 행에도 적용한 기대값과
+비교합니다.
+
+- 편집 기록 재생: load, 다른 워커의 편집을 메모리 사본에 반영하는 refresh
+- 버전 충돌: 옛 버전 기준 편집은 SheetVersionConflict, 같은 버전에 동시에 편집하면 하나만 성공
+- 새 스냅샷: 스냅샷에 없는 편집은 새 기록으로 옮기고, 더 옛 스냅샷은 무시,
+  replace=True(전체 저장)는 다음 버전으로
+- 기록 중 끊긴 마지막 줄 (그 뒤에 이어 쓴 편집), 캐시에 없는 시트, 워크북 삭제
+
+사용법: python test_sheet_store.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from shared_state import SharedState
+from sheet_model import Sheet
+from sheet_store import SheetStore, SheetVersionConflict
+from test_sheet_model import first_difference
+
+WORKBOOK = "wb_store_test"
+SHEET = "0828"
+
+def sample_rows():
+    rows = [["주문서"], [f"열{c}" for c in range(23)], [0] * 23, ["메모"]]
+    for i in range(50):
+        row = [f"거래처{i % 5}", f"신평화 {i % 3 + 1}층 {100 + i}호", None, None, f"상품{i}", "상품명", "옵션",
+               None, i, 0, 0, i % 4, 0, 0, i % 4 + (i % 7 == 0), "", None, None, i * 100, i * 1000, 0.5 * i]
+        rows.append(row)
+    return rows
+
+def apply(rows, edits):
+    for row, col, value in edits:
+        if col >= len(rows[row]):
+            rows[row].extend([None] * (col + 1 - len(rows[row])))
+        rows[row][col] = value
+
+class Checker:
+    def __init__(self):
+        self.errors = []
+
+    def ok(self, name, passed, detail=""):
+        print(f"   {'✅' if passed else '❌'} {name}{f' ({detail})' if detail else ''}")
+        if not passed:
+            self.errors.append(f"{name} {detail}".strip())
+
+    def same(self, name, expected, sheet):
+        diff = first_difference(expected, sheet.to_rows())
+        self.ok(name, diff is None, f"첫 차이 {diff}" if diff else "")
+
+    def raises(self, name, exc_type, func):
+        try:
+            func()
+        except exc_type as e:
+            self.ok(name, True, f"{exc_type.__name__}: {e}")
+            return e
+        except Exception as e:
+            self.ok(name, False, f"{type(e).__name__}: {e}")
+            return None
+        self.ok(name, False, "예외 없음")
+        return None
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    cache_dir = os.path.join(tmp_dir, "sheet_cache")
+    os.mkdir(cache_dir)
+    state_path = os.path.join(tmp_dir, "state.db")
+    worker_a = SheetStore(cache_dir, SharedState(state_path))
+    worker_b = SheetStore(cache_dir, SharedState(state_path))
+    check = Checker()
+
+    try:
+        expected = sample_rows()
+        print("\n1. 저장 → 읽기")
+        worker_a.save(WORKBOOK, SHEET, Sheet.from_rows(sample_rows()), {"version": 0, "sheet_type": "order"})
+        # 다른 워커의 load는 이 워커의 대기 중인 기록을 기다리지 않음
+        worker_a.flush()
+        loaded, entry = worker_b.load(WORKBOOK, SHEET)
+        check.same("다른 워커에서 읽은 시트", expected, loaded)
+        check.ok("버전 0, 편집 기록 없음", entry["version"] == 0 and entry["edit_count"] == 0,
+                 f"version {entry['version']}, edit_count {entry['edit_count']}")
+        memory_copy = Sheet.from_rows(sample_rows())
+
+        print("\n2. 편집 → 재생")
+        edits_1 = [[4, 11, 7], [5, 14, "abc"], [6, 30, True], [3, 0, "메모 수정"]]
+        version, edit_count = worker_a.commit_edits(WORKBOOK, SHEET, 0, edits_1)
+        apply(expected, edits_1)
+        check.ok("commit_edits → 버전 1", (version, edit_count) == (1, len(edits_1)), f"{version}, {edit_count}")
+        check.same("load가 편집 기록을 재생", expected, worker_b.load(WORKBOOK, SHEET)[0])
+
+        print("\n3. 버전 충돌")
+        error = check.raises("옛 버전(0) 기준 편집", SheetVersionConflict,
+                             lambda: worker_b.commit_edits(WORKBOOK, SHEET, 0, [[4, 11, 99]]))
+        check.ok("충돌에 현재 버전", error is not None and error.current_version == 1)
+        check.same("충돌한 편집은 반영 안 됨", expected, worker_a.load(WORKBOOK, SHEET)[0])
+
+        results = []
+        barrier = threading.Barrier(8)
+
+        def racer(n):
+            store = worker_a if n % 2 else worker_b
+            barrier.wait()
+            try:
+                results.append(store.commit_edits(WORKBOOK, SHEET, 1, [[7, 12, n]])[0])
+            except SheetVersionConflict:
+                results.append(None)
+
+        threads = [threading.Thread(target=racer, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        winners = [r for r in results if r is not None]
+        check.ok("같은 버전에 동시에 8번 편집 → 하나만 성공", winners == [2], f"결과 {results}")
+        winner_value = worker_a.load(WORKBOOK, SHEET)[0][7][12]
+        apply(expected, [[7, 12, winner_value]])
+        check.same("성공한 편집만 반영", expected, worker_b.load(WORKBOOK, SHEET)[0])
+
+        print("\n4. 메모리 사본 갱신 (refresh)")
+        check.ok("버전 0 사본 → 2", worker_b.refresh(WORKBOOK, SHEET, memory_copy, 0) == 2)
+        check.same("갱신된 사본", expected, memory_copy)
+        check.ok("이미 최신이면 그대로", worker_b.refresh(WORKBOOK, SHEET, memory_copy, 2) == 2)
+
+        print("\n5. 새 스냅샷")
+        snapshot_rows = sample_rows()
+        apply(snapshot_rows, edits_1)
+        worker_b.save(WORKBOOK, SHEET, Sheet.from_rows(snapshot_rows), {"version": 1, "sheet_type": "order"})
+        worker_b.flush()
+        loaded, entry = worker_a.load(WORKBOOK, SHEET)
+        check.ok("버전 1 스냅샷 → file_version 1, 버전 2 유지",
+                 (entry["file_version"], entry["version"]) == (1, 2), f"{entry['file_version']}, {entry['version']}")
+        check.same("스냅샷에 없는 편집(버전 2)은 새 기록에서 재생", expected, loaded)
+        files = sorted(os.listdir(cache_dir))
+        check.ok("옛 시트 파일과 기록 삭제", len(files) == 2, f"{files}")
+
+        worker_a.save(WORKBOOK, SHEET, Sheet.from_rows(sample_rows()), {"version": 0, "sheet_type": "order"})
+        worker_a.flush()
+        loaded, entry = worker_b.load(WORKBOOK, SHEET)
+        check.ok("더 옛 스냅샷(버전 0)은 무시", entry["file_version"] == 1, f"file_version {entry['file_version']}")
+        check.same("무시된 뒤에도 같은 내용", expected, loaded)
+
+        version, _ = worker_a.commit_edits(WORKBOOK, SHEET, 2, [[8, 19, 123456]])
+        apply(expected, [[8, 19, 123456]])
+        check.same("새 기록에 이어서 편집 (버전 3)", expected, worker_b.load(WORKBOOK, SHEET)[0])
+
+        replaced = sample_rows()
+        apply(replaced, [[9, 11, 42]])
+        worker_b.save(WORKBOOK, SHEET, Sheet.from_rows(replaced), {"sheet_type": "order"}, replace=True)
+        worker_b.flush()
+        loaded, entry = worker_a.load(WORKBOOK, SHEET)
+        check.ok("replace=True → 버전 4", (entry["file_version"], entry["version"]) == (4, 4),
+                 f"{entry['file_version']}, {entry['version']}")
+        check.same("전체 저장 내용 (이전 편집은 재생 안 함)", replaced, loaded)
+        check.ok("기록보다 옛 사본은 다시 읽어야 함", worker_a.refresh(WORKBOOK, SHEET, memory_copy, 2) is None)
+
+        print("\n6. 기록 중 끊긴 줄 / 없는 시트 / 삭제")
+        version, _ = worker_a.commit_edits(WORKBOOK, SHEET, 4, [[10, 12, 5]])
+        apply(replaced, [[10, 12, 5]])
+        log_path = os.path.join(cache_dir, entry["file"] + ".edits")
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write('{"version": 6, "edits": [[10, 12')
+        check.same("끊긴 마지막 줄은 무시", replaced, worker_b.load(WORKBOOK, SHEET)[0])
+        worker_b.commit_edits(WORKBOOK, SHEET, version, [[11, 13, 9]])
+        apply(replaced, [[11, 13, 9]])
+        check.same("끊긴 줄 뒤에 이어서 쓴 편집도 재생", replaced, worker_a.load(WORKBOOK, SHEET)[0])
+        check.raises("캐시에 없는 시트 편집", KeyError,
+                     lambda: worker_a.commit_edits(WORKBOOK, "없는 시트", 0, [[4, 0, "x"]]))
+        worker_a.remove_workbook(WORKBOOK).result()
+        check.ok("삭제 후 load는 None", worker_b.load(WORKBOOK, SHEET) is None)
+        check.ok("삭제 후 파일 없음", os.listdir(cache_dir) == [], f"{os.listdir(cache_dir)}")
+    finally:
+        worker_a.close()
+        worker_b.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if check.errors:
+        print(f"\n   ❌ 실패 {len(check.errors)}건")
+        for error in check.errors:
+            print(f"      {error}")
+        sys.exit(1)
+    print("\n   ✅ 저장 → 편집 → 읽기가 리스트에 같은 편집을 한 결과와 같음")
+
+if __name__ == "__main__":
+    main()
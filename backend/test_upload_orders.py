@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+업로드 주문 DB 저장 동일성 테스트 스크립트
+
+POST /excel/upload 백그라운드 작업이 저장하는 주문 데이터(Order, OrderItem,
+Supplier, Product, FileUploadHistory)가 예전 업로드(앞 3개 시트를 pandas로 읽어
+바로 저장)와 같은지 비교합니다. 업로드 응답은 시트 목록만 주고 나머지 시트는
+나중에 파싱하지만, DB에는 예전처럼 앞 3개 시트가 저장돼야 합니다.
+
+- 비교 데이터: 샘플 주문서(0825 주문서, docs/references의 주문서)
+- 같은 파일을 두 번 올려 캐시 적중 때도 같은지 확인 ('거래처' 시트가 있으면 캐시
+  적중 때도 거래처가 똑같이 동기화돼야 함)
+- 저장 함수에 넘기는 시트/행, DB 내용, 저장 성공 여부를 모두 비교 (지금은 Product에
+  supplier_name 열이 없어 예전 코드도 저장에 실패하므로 실패한 결과까지 같아야 함)
+
+서버를 띄우지 않고 앱을 직접 호출합니다 (로그인 대신 get_current_user, DB는 임시 SQLite).
+
+사용법: python test_upload_orders.py
+"""
+import glob
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from datetime import date
+import pandas as pd
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+# 앱 시작 시 예약되는 디스크 정리(janitor)가 테스트 중에 저장소 파일을 지우지 않도록
+os.environ["JANITOR_STARTUP_DELAY_SECONDS"] = str(24 * 3600)
+import main as app_main
+from main import app, get_current_user, sheet_manager, User
+from database import Base, Supplier, Product, Order, OrderItem, FileUploadHistory, Client
+from jobs import JOB_DONE, JOB_FAILED
+from test_process_dataframe import old_process_dataframe
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SAMPLE_WORKBOOKS = sorted(glob.glob(os.path.join(ROOT, "*주문서*.xlsx")) +
+                          glob.glob(os.path.join(ROOT, "docs", "references", "*주문서*.xlsx")))
+USERNAME = "upload_tester"
+JOB_TIMEOUT_SECONDS = 120
+
+# 샘플 주문서의 머리글/바닥글 경고와 작업 상태 폴링 로그는 무시
+warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# ==================== 예전 구현 (앞 3개 시트를 읽어 바로 저장) ====================
+
+def old_load_sheets(file_path):
+    """예전 SheetManager.load_excel_file (.xlsx): 앞 3개 시트, 3행 합계 포함"""
+    sheets = []
+    sheet_names = pd.ExcelFile(file_path, engine='openpyxl').sheet_names
+    for sheet_name in sheet_names[:3]:
+        df = pd.read_excel(file_path, sheet_name=sheet_name, header=None, engine='openpyxl')
+        data = old_process_dataframe(df, convert_dates=True)
+        if len(data) > 3:
+            sum_columns = [8, 9, 10, 11, 12, 13, 14, 18, 19, 20]
+            row_index = 2
+            while len(data[row_index]) < max(sum_columns) + 1:
+                data[row_index].append(None)
+            for col_idx in sum_columns:
+                total = 0
+                for data_row_idx in range(4, len(data)):
+                    cell_value = data[data_row_idx][col_idx] if col_idx < len(data[data_row_idx]) else None
+                    if cell_value is not None:
+                        try:
+                            total += float(cell_value)
+                        except (ValueError, TypeError):
+                            pass
+                data[row_index][col_idx] = total if total != 0 else 0
+        sheets.append({
+            "sheet_name": sheet_name,
+            "sheet_type": sheet_manager.classify_sheet(file_path, sheet_name).value,
+            "data": data,
+        })
+    return sheets
+
+def old_save_order_data_to_db(sheets, file_path, db: Session):
+    """예전 save_order_data_to_db (셀 값을 그대로 int/float 변환)"""
+    try:
+        for sheet in sheets:
+            order = Order(
+                order_date=date.today(),
+                order_type=sheet.get("sheet_type", "주문서"),
+                sheet_name=sheet.get("sheet_name", "Unknown"),
+                total_amount=0
+            )
+            db.add(order)
+            db.flush()
+
+            for idx, row in enumerate(sheet.get("data", [])[1:]):
+                if idx == 0:
+                    continue
+                supplier_name = row[0] if row else None
+                if not supplier_name:
+                    continue
+                supplier = db.query(Supplier).filter_by(name=supplier_name).first()
+                if not supplier:
+                    supplier = Supplier(
+                        name=supplier_name,
+                        address=row[1] if len(row) > 1 else None,
+                        phone=row[2] if len(row) > 2 else None,
+                        mobile=row[3] if len(row) > 3 else None
+                    )
+                    db.add(supplier)
+                    db.flush()
+
+                product_code = row[4] if len(row) > 4 else None
+                product_name = row[5] if len(row) > 5 else None
+                if product_code or product_name:
+                    product = db.query(Product).filter_by(code=product_code).first()
+                    if not product:
+                        product = Product(
+                            code=product_code,
+                            name=product_name,
+                            supplier_name=row[5] if len(row) > 5 else None,
+                            supplier_option=row[6] if len(row) > 6 else None,
+                            price=float(row[7]) if len(row) > 7 and row[7] else 0
+                        )
+                        db.add(product)
+                        db.flush()
+
+                    db.add(OrderItem(
+                        order_id=order.id,
+                        product_id=product.id,
+                        new_order_qty=int(row[8]) if len(row) > 8 and row[8] else 0,
+                        undelivered_qty=int(row[9]) if len(row) > 9 and row[9] else 0,
+                        exchange_qty=int(row[10]) if len(row) > 10 and row[10] else 0,
+                        janggi_qty=int(row[11]) if len(row) > 11 and row[11] else 0,
+                        janggi_undelivered=int(row[12]) if len(row) > 12 and row[12] else 0,
+                        janggi_exchange=int(row[13]) if len(row) > 13 and row[13] else 0,
+                        received_qty=int(row[14]) if len(row) > 14 and row[14] else 0,
+                        difference_qty=int(row[15]) if len(row) > 15 and row[15] else 0,
+                        uncle_comment=row[16] if len(row) > 16 else None,
+                        gndr_comment=row[17] if len(row) > 17 else None
+                    ))
+
+            if supplier:
+                order.supplier_id = supplier.id
+
+        db.add(FileUploadHistory(
+            filename=os.path.basename(file_path),
+            file_path=file_path,
+            sheet_count=len(sheets),
+            row_count=sum(len(sheet.get("data", [])) for sheet in sheets),
+            status="success",
+            user="system"
+        ))
+        db.commit()
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"Error saving to database: {e}")
+        return False
+
+# ==================== 비교 ====================
+
+def temp_sessionmaker(tmp_dir, name):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, name)}",
+                           connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def snapshot(session_factory):
+    """저장된 주문 데이터 (id, 날짜, 파일 경로 제외)"""
+    db = session_factory()
+    try:
+        suppliers = {s.id: s.name for s in db.query(Supplier).all()}
+        products = {p.id: p.code for p in db.query(Product).all()}
+        orders = db.query(Order).order_by(Order.id).all()
+        order_sheets = {o.id: o.sheet_name for o in orders}
+        return {
+            "orders": [(o.order_type, o.sheet_name, suppliers.get(o.supplier_id)) for o in orders],
+            "items": [(order_sheets[i.order_id], products[i.product_id], i.new_order_qty, i.undelivered_qty,
+                       i.exchange_qty, i.janggi_qty, i.janggi_undelivered, i.janggi_exchange,
+                       i.received_qty, i.difference_qty, i.uncle_comment, i.gndr_comment)
+                      for i in db.query(OrderItem).order_by(OrderItem.id).all()],
+            "suppliers": sorted((s.name, s.address or "", s.phone or "", s.mobile or "") for s in db.query(Supplier).all()),
+            "products": sorted((p.code or "", p.name or "", p.supplier_name or "", p.supplier_option or "", p.price)
+                               for p in db.query(Product).all()),
+            "history": [(h.sheet_count, h.row_count, h.status)
+                        for h in db.query(FileUploadHistory).order_by(FileUploadHistory.id).all()],
+        }
+    finally:
+        db.close()
+
+def count_clients(session_factory):
+    db = session_factory()
+    try:
+        return db.query(Client).count()
+    finally:
+        db.close()
+
+def save_inputs(sheets):
+    """save_order_data_to_db가 읽는 부분: 시트 이름/종류와 2행부터의 A~R열"""
+    return [(sheet.get("sheet_name"), sheet.get("sheet_type"), [list(row[:18]) for row in sheet.get("data", [])[2:]])
+            for sheet in sheets]
+
+def first_difference(old, new):
+    """처음으로 다른 항목 (표, 위치, 예전, 지금) - 같으면 None"""
+    for table in old:
+        if len(old[table]) != len(new[table]):
+            return (table, "개수", len(old[table]), len(new[table]))
+        for i, (a, b) in enumerate(zip(old[table], new[table])):
+            if a != b:
+                return (table, i, a, b)
+    return None
+
+def upload(client, path):
+    """업로드 후 작업이 끝날 때까지 기다려 작업 상태를 반환"""
+    with open(path, "rb") as f:
+        response = client.post("/excel/upload", files={"file": (os.path.basename(path), f.read())})
+    if response.status_code != 202:
+        return {"status": JOB_FAILED, "errors": [f"{response.status_code}: {response.json()}"]}
+    job_id = response.json()["job_id"]
+    deadline = time.time() + JOB_TIMEOUT_SECONDS
+    while time.time() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()["job"]
+        if job["status"] in (JOB_DONE, JOB_FAILED):
+            return job
+        time.sleep(0.2)
+    return {"status": JOB_FAILED, "errors": ["시간 초과"]}
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    engines = []
+    original_session = app_main.SessionLocal
+    original_save = app_main.save_order_data_to_db
+    saved_sheets = []
+
+    def recording_save(sheets, *args, **kwargs):
+        saved_sheets.append(sheets)
+        return original_save(sheets, *args, **kwargs)
+
+    app_main.save_order_data_to_db = recording_save
+    app.dependency_overrides[get_current_user] = lambda: User(username=USERNAME, disabled=False)
+    errors = []
+    try:
+        with TestClient(app) as client:
+            for n, path in enumerate(SAMPLE_WORKBOOKS):
+                name = os.path.basename(path)
+                print(f"\n{n + 1}. {name}")
+
+                # 예전: 앞 3개 시트를 읽어 바로 저장
+                engine, OldSession = temp_sessionmaker(tmp_dir, f"old_{n}.db")
+                engines.append(engine)
+                old_sheets = old_load_sheets(path)
+                db = OldSession()
+                try:
+                    old_saved = old_save_order_data_to_db(old_sheets, path, db)
+                finally:
+                    db.close()
+                expected_inputs = save_inputs(old_sheets)
+                expected = snapshot(OldSession)
+
+                # 지금: 업로드 작업 (두 번째는 캐시 적중, 빈 DB라 거래처도 다시 만들어져야 함)
+                first_clients = None
+                for attempt in ("처음", "캐시 적중"):
+                    engine, NewSession = temp_sessionmaker(tmp_dir, f"new_{n}_{attempt}.db")
+                    engines.append(engine)
+                    app_main.SessionLocal = NewSession
+                    saved_sheets.clear()
+                    upload_path = os.path.join(tmp_dir, name)
+                    shutil.copy(path, upload_path)
+                    job = upload(client, upload_path)
+                    if job["status"] != JOB_DONE:
+                        errors.append(f"{name} ({attempt}): 업로드 실패 {job['errors']}")
+                        print(f"   ❌ {attempt}: 업로드 실패 {job['errors']}")
+                        continue
+
+                    got_inputs = save_inputs(saved_sheets[0]) if saved_sheets else []
+                    saved = "주문 데이터 DB 저장 실패" not in job["errors"]
+                    diff = (first_difference({"save_inputs": expected_inputs}, {"save_inputs": got_inputs}) or
+                            first_difference(expected, snapshot(NewSession)))
+                    if diff is None and saved != old_saved:
+                        diff = ("저장 결과", None, old_saved, saved)
+                    clients = count_clients(NewSession)
+                    if first_clients is None:
+                        first_clients = clients
+                    elif diff is None and clients != first_clients:
+                        diff = ("거래처", None, first_clients, clients)
+                    if diff:
+                        errors.append(f"{name} ({attempt}): {diff}")
+                        print(f"   ❌ {attempt}: {diff}")
+                    else:
+                        print(f"   ✅ {attempt}: 시트 {[sheet[0] for sheet in got_inputs]}, "
+                              f"행 {sum(len(sheet[2]) for sheet in got_inputs)}개, "
+                              f"주문 {len(expected['orders'])}건, 품목 {len(expected['items'])}건, 거래처 {clients}건 "
+                              f"(저장 {'성공' if saved else '실패 - 예전과 같음'})")
+    finally:
+        app_main.SessionLocal = original_session
+        app_main.save_order_data_to_db = original_save
+        app.dependency_overrides.clear()
+        for engine in engines:
+            engine.dispose()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if errors:
+        print(f"\n   ❌ 불일치 {len(errors)}건")
+        sys.exit(1)
+    print("\n   ✅ 예전 업로드와 같은 시트/행을 주문 DB에 저장")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+워크북 접근 권한 테스트 스크립트
+
+한 사용자가 올린 워크북의 시트 조회 / 행 조회 / 셀 수정(PATCH)을 다른 사용자가
+workbook_id만으로 요청하면 404가 나와야 합니다. 올린 사용자는 그대로 200.
+
+서버를 띄우지 않고 앱을 직접 호출합니다 (로그인 대신 get_current_user를 바꿔 끼움).
+
+사용법: python test_workbook_access.py [주문서.xlsx]
+"""
+import os
+import shutil
+import sys
+import tempfile
+from fastapi.testclient import TestClient
+from main import app, get_current_user, sheet_manager, User
+
+DEFAULT_WORKBOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "docs", "references", "0828가나다란 주문서.xlsx")
+
+OWNER = "workbook_owner"
+OTHER = "workbook_other"
+
+def as_user(username):
+    """이후 요청을 username 사용자로"""
+    app.dependency_overrides[get_current_user] = lambda: User(username=username, disabled=False)
+
+def requests_for(client, workbook_id, sheet_name, version):
+    """시트 조회, 행 조회, 셀 수정 응답 코드"""
+    base = f"/excel/workbooks/{workbook_id}/sheets/{sheet_name}"
+    return {
+        "GET": client.get(base).status_code,
+        "POST rows": client.post(f"{base}/rows", json={"offset": 0, "limit": 10}).status_code,
+        "PATCH": client.patch(base, json={
+            "base_version": version,
+            "edits": [{"row": 4, "col": 8, "value": 1}]
+        }).status_code
+    }
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_WORKBOOK
+
+    # open_workbook은 파일을 옮기므로 사본으로
+    tmp_dir = tempfile.mkdtemp()
+    tmp_path = os.path.join(tmp_dir, "upload" + os.path.splitext(source)[1])
+    shutil.copy(source, tmp_path)
+    result = sheet_manager.open_workbook(tmp_path, original_filename=os.path.basename(source), user=OWNER)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    if not result["success"]:
+        print(f"   ❌ 워크북 열기 실패: {result.get('error')}")
+        sys.exit(1)
+
+    workbook_id = result["workbook_id"]
+    sheet_name = result["sheets"][0]["sheet_name"]
+    errors = []
+    try:
+        with TestClient(app) as client:
+            print(f"\n1. 다른 사용자({OTHER}) 요청")
+            as_user(OTHER)
+            for name, code in requests_for(client, workbook_id, sheet_name, 0).items():
+                print(f"   {name}: {code}")
+                if code != 404:
+                    errors.append(f"다른 사용자 {name}: {code} (404 기대)")
+
+            print(f"\n2. 올린 사용자({OWNER}) 요청")
+            as_user(OWNER)
+            for name, code in requests_for(client, workbook_id, sheet_name, 0).items():
+                print(f"   {name}: {code}")
+                if code != 200:
+                    errors.append(f"올린 사용자 {name}: {code} (200 기대)")
+    finally:
+        app.dependency_overrides.clear()
+        sheet_manager.close_workbook(workbook_id)
+
+    if errors:
+        print(f"\n   ❌ 실패 {len(errors)}건")
+        for error in errors:
+            print(f"      {error}")
+        sys.exit(1)
+    print("\n   ✅ 다른 사용자의 워크북은 모두 404")
+
+if __name__ == "__main__":
+    main()
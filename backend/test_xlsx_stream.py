@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+xlsx 스트리밍 출력 비교 테스트 스크립트
+
+excel_render의 세 함수(일별 주문서 다운로드, 색칠한 파일, /excel/export)는
+xlsx_stream.XlsxStreamWriter로 파일을 씁니다. 같은 행을 예전 openpyxl 코드
+(XlsxStreamWriter 이전의 excel_render, 아래에 그대로 옮김)로도 쓰고, 두 파일을
+openpyxl로 다시 읽어 셀마다 비교합니다.
+
+- 비교: 값과 타입, 표시 형식, 배경색, 굵게/글자색, 테두리, 정렬, 시트 이름,
+  일별 주문서의 열 너비 (색칠한 파일과 export는 이제 열 너비가 들어가므로 비교 안 함)
+- 데이터: 샘플 주문서(docs/references의 주문서)의 시트들 + 경계값 행
+  (bool, 큰 정수, numpy 숫자, Decimal, 날짜/시각/기간, 앞뒤 공백, XML 특수 문자, =로 시작하는 글자),
+  export에는 JSON으로 올 수 있는 dict/list 셀도 (pandas처럼 글자로)
+- 기본 글꼴 셀의 테마 색(예전 파일에만 있음)은 비교하지 않음
+
+사용법: python test_xlsx_stream.py [주문서.xlsx ...]
+"""
+import glob
+import io
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
+from excel_render import render_daily_order, write_colored_workbook, export_to_excel
+from sheet_model import Sheet
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MAX_SHEETS_PER_FILE = 3
+
+EDGE_VALUES = [
+    True, False, 0, -1, 7, 0.1, -2.5, 1e-7, 123456789.125, 2 ** 53 + 1, 10 ** 15,
+    np.int64(42), np.float64(3.25), None, "", " 앞뒤 공백 ", "<a & b>", '"따옴표"',
+    "=SUM(A1:A3)", "줄\n바꿈", "0828", datetime(2025, 8, 28, 9, 30), date(2025, 8, 29), time(13, 5),
+    timedelta(hours=30, minutes=15), Decimal("1.25"),
+]
+
+
+# --- 예전 코드 (XlsxStreamWriter 이전 excel_render) ---
+
+def old_render_daily_order(sheet_name, data):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = sheet_name
+
+    header_fill = PatternFill(start_color="CCE5FF", end_color="CCE5FF", fill_type="solid")
+    orange_fill = PatternFill(start_color="FFF3E0", end_color="FFF3E0", fill_type="solid")
+    blue_fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
+    green_fill = PatternFill(start_color="E8F5E9", end_color="E8F5E9", fill_type="solid")
+    red_font = Font(color="FF0000", bold=True)
+
+    thin_border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
+    if data:
+        sheet = Sheet.from_rows(data, header_rows=2)
+        l_num, m_num, n_num, o_num = (sheet.numeric(col_idx, blank=0.0) for col_idx in (11, 12, 13, 14))
+        lmn_sum = l_num + m_num + n_num
+        p_invalid = np.isnan(lmn_sum) | np.isnan(o_num)
+        p_differs = ~p_invalid & (lmn_sum != o_num)
+
+    if data:
+        for row_idx, row_data in enumerate(data, start=1):
+            for col_idx, value in enumerate(row_data, start=1):
+                if col_idx == 16 and row_idx > 2:
+                    if p_differs[row_idx - 1]:
+                        cell = ws.cell(row=row_idx, column=col_idx, value="차이 있음")
+                        cell.font = red_font
+                    else:
+                        cell = ws.cell(row=row_idx, column=col_idx, value="")
+                else:
+                    cell = ws.cell(row=row_idx, column=col_idx, value=value)
+
+                cell.border = thin_border
+
+                if row_idx <= 2:
+                    cell.fill = header_fill
+                    cell.font = Font(bold=True)
+                    cell.alignment = Alignment(horizontal='center', vertical='center')
+                elif row_idx > 2:
+                    if 12 <= col_idx <= 14:
+                        cell.fill = orange_fill
+                    elif 15 <= col_idx <= 16:
+                        cell.fill = blue_fill
+                    elif 17 <= col_idx <= 23:
+                        cell.fill = green_fill
+
+    for column in ws.columns:
+        max_length = 0
+        column_letter = column[0].column_letter
+        for cell in column:
+            try:
+                if cell.value:
+                    max_length = max(max_length, len(str(cell.value)))
+            except:
+                pass
+        adjusted_width = min(max_length + 2, 50)
+        ws.column_dimensions[column_letter].width = adjusted_width
+
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def old_write_colored_workbook(file_path, data, row_colors, row_text_colors):
+    wb = Workbook()
+    ws = wb.active
+
+    for row_idx, row_data in enumerate(data):
+        for col_idx, cell_value in enumerate(row_data):
+            cell = ws.cell(row=row_idx+1, column=col_idx+1, value=cell_value)
+
+            if str(row_idx) in row_colors:
+                color = row_colors[str(row_idx)].replace('#', '')
+                cell.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+            if str(row_idx) in row_text_colors:
+                color = row_text_colors[str(row_idx)].replace('#', '')
+                cell.font = Font(color=color)
+
+    wb.save(file_path)
+
+
+def old_export_to_excel(data, columns, file_path, sheet_name="Sheet1"):
+    df = pd.DataFrame(data, columns=columns)
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+
+# --- 다시 읽어서 비교 ---
+
+def cell_signature(cell):
+    """값, 타입, 표시 형식, 배경색, 굵게, 글자색, 테두리, 정렬"""
+    value = cell.value
+    fill = cell.fill.fgColor.rgb if cell.fill.fill_type == "solid" else None
+    font_color = cell.font.color.rgb if cell.font.color is not None and cell.font.color.type == "rgb" else None
+    border = tuple(side.style for side in (cell.border.left, cell.border.right, cell.border.top, cell.border.bottom))
+    return (value, type(value).__name__, cell.number_format, fill, bool(cell.font.b), font_color, border,
+            cell.alignment.horizontal, cell.alignment.vertical)
+
+
+def read_back(source):
+    """(시트 이름, {(행, 열): 셀 서명}, {열 글자: 너비})"""
+    wb = load_workbook(source)
+    ws = wb.active
+    cells = {}
+    for row in ws.iter_rows():
+        for cell in row:
+            cells[(cell.row, cell.column)] = cell_signature(cell)
+    widths = {letter: dim.width for letter, dim in ws.column_dimensions.items() if dim.customWidth}
+    return ws.title, cells, widths
+
+
+def compare(name, old_source, new_source, errors, compare_widths):
+    old_title, old_cells, old_widths = read_back(old_source)
+    new_title, new_cells, new_widths = read_back(new_source)
+    problems = []
+    if old_title != new_title:
+        problems.append(f"시트 이름 {old_title!r} != {new_title!r}")
+    empty = cell_signature(Workbook().active.cell(1, 1))
+    for key in sorted(set(old_cells) | set(new_cells)):
+        old, new = old_cells.get(key, empty), new_cells.get(key, empty)
+        if old != new:
+            problems.append(f"{get_column_letter(key[1])}{key[0]}: 예전 {old} / 지금 {new}")
+    if compare_widths:
+        for letter in sorted(set(old_widths) | set(new_widths)):
+            if old_widths.get(letter) != new_widths.get(letter):
+                problems.append(f"{letter}열 너비: 예전 {old_widths.get(letter)} / 지금 {new_widths.get(letter)}")
+    print(f"   {'✅' if not problems else '❌'} {name} ({len(new_cells)}셀"
+          f"{f', 다른 곳 {len(problems)}' if problems else ''})")
+    for problem in problems[:5]:
+        print(f"      {problem}")
+    errors.extend(f"{name}: {problem}" for problem in problems[:20])
+
+
+# --- 비교 데이터 ---
+
+def reference_sheets(paths):
+    """(이름, 행들) - 값만 읽은 샘플 주문서 시트"""
+    for path in paths:
+        wb = load_workbook(path, read_only=True, data_only=True)
+        for ws in wb.worksheets[:MAX_SHEETS_PER_FILE]:
+            rows = [list(row) for row in ws.iter_rows(values_only=True)]
+            # 끝의 빈 셀 제거 (업로드 파싱과 같은 모양)
+            for row in rows:
+                while row and row[-1] is None:
+                    row.pop()
+            yield f"{os.path.basename(path)}/{ws.title}", rows
+        wb.close()
+
+
+def edge_rows():
+    """경계값을 모든 열 위치에 한 번씩 돌려 넣은 행들 (헤더 2행 + L~O 합계가 맞는/다른 행)"""
+    width = 24
+    rows = [[f"열{c}" for c in range(width)], [None] * width]
+    for i in range(len(EDGE_VALUES)):
+        rows.append([EDGE_VALUES[(i + c) % len(EDGE_VALUES)] for c in range(width)])
+    rows.append(["합계 같음"] + [None] * 10 + [1, 2, 3, 6])
+    rows.append(["합계 다름"] + [None] * 10 + [1, 2, 3, 7, "원래 P열", "Q"])
+    rows.append([])
+    return rows
+
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob(os.path.join(ROOT, "docs", "references", "*주문서*.xlsx")))
+    cases = list(reference_sheets(paths)) + [("경계값", edge_rows())]
+    tmp_dir = tempfile.mkdtemp()
+    errors = []
+    try:
+        print("\n1. 일별 주문서 다운로드 (render_daily_order)")
+        for name, rows in cases:
+            new_path = os.path.join(tmp_dir, "daily.xlsx")
+            render_daily_order("0828", rows, new_path)
+            compare(name, io.BytesIO(old_render_daily_order("0828", rows)), new_path, errors, compare_widths=True)
+
+        print("\n2. 색칠한 파일 (write_colored_workbook)")
+        for name, rows in cases:
+            row_colors = {str(i): "#FFF3E0" if i % 3 else "E3F2FD" for i in range(0, len(rows), 2)}
+            row_text_colors = {str(i): "#FF0000" for i in range(0, len(rows), 5)}
+            old_path, new_path = os.path.join(tmp_dir, "old_colored.xlsx"), os.path.join(tmp_dir, "colored.xlsx")
+            old_write_colored_workbook(old_path, rows, row_colors, row_text_colors)
+            write_colored_workbook(new_path, rows, row_colors, row_text_colors)
+            compare(name, old_path, new_path, errors, compare_widths=False)
+
+        print("\n3. /excel/export (export_to_excel)")
+        for name, rows in cases:
+            body = [row for row in rows[2:] if row]
+            width = max((len(row) for row in body), default=0)
+            columns = [f"열{c}" for c in range(width)]
+            body = [row + [None] * (width - len(row)) for row in body]
+            body.append([{"a": 1}, [1, 2]] + [None] * (width - 2))
+            old_path = os.path.join(tmp_dir, "old_export.xlsx")
+            old_export_to_excel(body, columns, old_path, "내보내기")
+            new_path = export_to_excel(body, columns, "export", "내보내기", export_dir=tmp_dir)
+            compare(name, old_path, new_path, errors, compare_widths=False)
+            os.remove(new_path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if errors:
+        print(f"\n   ❌ 실패 {len(errors)}건")
+        for error in errors[:10]:
+            print(f"      {error}")
+        sys.exit(1)
+    print("\n   ✅ 다시 읽은 값과 서식이 예전 openpyxl 출력과 같음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Parsed upload cache for GNDR order management
+
+Staff re-upload the same 주문입고/입고전표 files several times a day. Parsed
+(and sorted) results are stored on disk under the SHA-256 of the uploaded
+bytes, so an identical upload skips parsing entirely. The directory and its
+size index (in the shared state, see shared_state) are shared by all worker
+processes, so the size limit applies to the cache as a whole.
+"""
+from typing import Any, Dict, Optional
+from pathlib import Path
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from shared_state import SharedState, shared_state
+
+# 파싱 결과 형식이 바뀌면 올려서 이전 캐시를 무효화
+CACHE_VERSION = 4
+
+
+class UploadCache:
+    """Disk-backed LRU of parsed uploads, bounded by total file size
+
+    The size and last-use index is kept in the shared state, so the byte
+    budget holds for all worker processes together; evictions run inside
+    the shared write transaction.
+    """
+
+    def __init__(self, cache_dir: str = "./upload_cache", max_bytes: int = 256 * 1024 * 1024,
+                 state: Optional[SharedState] = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(exist_ok=True)
+        self.max_bytes = max_bytes
+        self.state = state or shared_state
+        # 이 프로세스의 조회 수 (크기/항목 수는 모든 프로세스 합계)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        # 색인과 디렉터리 맞추기 (색인 없는 예전 파일은 mtime 순으로 추가, 파일 없는 항목은 삭제)
+        # 쓰기 잠금을 잡은 뒤에 디렉터리를 봐야 다른 프로세스가 막 색인한 파일을 놓치지 않음
+        with self.state.transaction() as conn:
+            cache_files = {}
+            for path in self.cache_dir.glob("*.pkl"):
+                try:
+                    cache_files[path.stem] = path.stat()
+                except OSError:
+                    pass
+            indexed = {row["key"] for row in conn.execute("SELECT key FROM upload_cache")}
+            for key in indexed - cache_files.keys():
+                conn.execute("DELETE FROM upload_cache WHERE key = ?", (key,))
+            for key in cache_files.keys() - indexed:
+                conn.execute(
+                    "INSERT INTO upload_cache (key, bytes, last_used_at) VALUES (?, ?, ?)",
+                    (key, cache_files[key].st_size, cache_files[key].st_mtime)
+                )
+            self._evict(conn)
+
+    @staticmethod
+    def make_key(kind: str, content: bytes) -> str:
+        """Cache key for an upload endpoint (kind) and the uploaded bytes"""
+        return UploadCache.key_for_digest(kind, hashlib.sha256(content).hexdigest())
+
+    @staticmethod
+    def key_for_digest(kind: str, digest: str) -> str:
+        """Cache key from a SHA-256 hex digest computed while the upload was spooled"""
+        return f"{kind}_v{CACHE_VERSION}_{digest}"
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for key, or None on a miss"""
+        path = self._path(key)
+        if self.state.query_one("SELECT 1 FROM upload_cache WHERE key = ?", (key,)) is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except Exception as e:
+            # 다른 프로세스가 방금 내보냈거나 파일이 깨짐
+            print(f"Error reading upload cache {path.name}: {e}")
+            self.state.execute("DELETE FROM upload_cache WHERE key = ?", (key,))
+            with self._lock:
+                self.misses += 1
+            return None
+
+        self.state.execute("UPDATE upload_cache SET last_used_at = ? WHERE key = ?", (time.time(), key))
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any):
+        """Store a parsed result, evicting least recently used entries over max_bytes"""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+
+        # 임시 파일에 쓴 뒤 교체해서 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            print(f"Error writing upload cache: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+
+        with self.state.transaction() as conn:
+            conn.execute(
+                "INSERT INTO upload_cache (key, bytes, last_used_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET bytes = excluded.bytes, last_used_at = excluded.last_used_at",
+                (key, len(payload), time.time())
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """Drop least recently used entries until the total fits (inside a shared transaction)"""
+        total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM upload_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        oldest = conn.execute("SELECT key, bytes FROM upload_cache ORDER BY last_used_at").fetchall()
+        for row in oldest:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM upload_cache WHERE key = ?", (row["key"],))
+            total -= row["bytes"]
+            with self._lock:
+                self.evictions += 1
+            try:
+                os.unlink(self._path(row["key"]))
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters (this process) and current size (all processes)"""
+        row = self.state.query_one("SELECT COUNT(*) AS entries, COALESCE(SUM(bytes), 0) AS total FROM upload_cache")
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": row["entries"],
+                "total_bytes": row["total"],
+                "max_bytes": self.max_bytes
+            }
+
+
+# Global instance
+upload_cache = UploadCache(max_bytes=int(os.getenv("UPLOAD_CACHE_MAX_BYTES", 256 * 1024 * 1024)))
@@ -0,0 +1,235 @@
+"""
+Upload spooling for GNDR order management
+
+Uploaded workbooks are streamed from the request body straight into a
+temporary file as the multipart parser reaches them, instead of being
+spooled by the form parser and then copied again. The first bytes are
+sniffed for the xlsx (zip), xls (OLE2) or HTML signature, so a wrong file
+is rejected before the rest of the body is read. Request bodies over
+MAX_UPLOAD_BYTES are cut off while they are still being received.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from multipart.multipart import MultipartParser, MultipartParseError, parse_options_header
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import hashlib
+import os
+import tempfile
+from workbook_reader import sniff_workbook_format
+from workers import run_io
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 100 * 1024 * 1024))
+# 형식 확인에 쓰는 앞부분 크기 (HTML 표 .xls는 처음 100바이트에서 찾음)
+SNIFF_BYTES = 100
+
+# multipart 경계/헤더 여유분
+_FORM_OVERHEAD_BYTES = 64 * 1024
+
+# 확장자별로 허용하는 실제 형식 (HTML 표를 .xls로 내보내는 도매 플랫폼 파일 포함)
+ALLOWED_FORMATS = {
+    '.xlsx': ('xlsx',),
+    '.xls': ('xls', 'html'),
+}
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large (max {MAX_UPLOAD_BYTES // (1024 * 1024)}MB)"
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """Reject multipart request bodies over MAX_UPLOAD_BYTES while they are received
+
+    A Content-Length over the limit is refused before reading any of the body;
+    otherwise the received bytes are counted and reading the body is aborted
+    as soon as the limit is passed (chunked uploads).
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: Optional[int] = None):
+        self.app = app
+        self.max_bytes = (max_bytes if max_bytes is not None else MAX_UPLOAD_BYTES) + _FORM_OVERHEAD_BYTES
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            error = _too_large()
+            response = JSONResponse(status_code=error.status_code, content={"detail": error.detail})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # 본문을 읽는 중에 발생 → FastAPI가 그대로 413 응답으로 변환
+                    raise _too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class _FilePartCollector:
+    """Multipart parser callbacks that keep the bytes of one file field
+
+    The bytes of the part named field are gathered in chunks as the parser
+    reaches them; every other part is skipped.
+    """
+
+    def __init__(self, field: str):
+        self.field = field.encode()
+        self.filename: Optional[str] = None
+        self.chunks: List[bytes] = []
+        self.finished = False
+        self._in_file = False
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+
+    def callbacks(self) -> Dict[str, Any]:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self):
+        self._disposition = b""
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        # 같은 이름의 파일 필드가 여러 개면 첫 번째만
+        self._in_file = (not self.finished and self.filename is None
+                         and options.get(b"name") == self.field and b"filename" in options)
+        if self._in_file:
+            self.filename = options[b"filename"].decode("utf-8", errors="replace")
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self.chunks.append(data[start:end])
+
+    def on_part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self.finished = True
+
+    def take(self) -> bytes:
+        """File bytes received since the last call"""
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _upload_suffix(filename: str) -> str:
+    """Temp file suffix for an uploaded workbook name (400 unless .xlsx / .xls)"""
+    if not filename.endswith(tuple(ALLOWED_FORMATS)):
+        raise HTTPException(status_code=400, detail="Only Excel files are allowed")
+    return '.xls' if filename.endswith('.xls') else '.xlsx'
+
+
+async def spool_upload(request: Request, suffix: Optional[str] = None,
+                       field: str = "file") -> Tuple[str, str, str]:
+    """Stream the file field of a multipart upload to a temporary file
+
+    The body is read from request.stream() as it arrives; Starlette's form
+    parser, which would first spool the whole body, is not used. The file
+    name is checked as soon as the part headers are in, the first
+    SNIFF_BYTES are checked for the xlsx (zip), xls (OLE2) or HTML
+    signature before anything is written, and the rest is copied and
+    hashed chunk by chunk. Reading stops at the end of the file part.
+
+    Returns (temp file path, SHA-256 hex digest of the content, file name).
+    The caller owns the temp file.
+
+    Args:
+        suffix: Workbook kind the endpoint accepts ('.xlsx'); None takes it
+            from the file name (.xlsx or .xls)
+
+    Raises:
+        HTTPException: 400 if the request has no such file, the name or the
+            first bytes are not a workbook of the expected kind, or the body
+            ends early; 413 if the file is over MAX_UPLOAD_BYTES
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    part = _FilePartCollector(field)
+    parser = MultipartParser(params[b"boundary"], part.callbacks())
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    tmp_file = None
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except MultipartParseError:
+                raise HTTPException(status_code=400, detail="Malformed multipart upload")
+            if part.filename is None:
+                continue
+            if suffix is None:
+                suffix = _upload_suffix(part.filename)
+
+            data = part.take()
+            if tmp_file is None:
+                # 앞부분이 모이면 형식부터 확인 (아니면 나머지는 받지 않음)
+                head += data
+                if len(head) < SNIFF_BYTES and not part.finished:
+                    continue
+                if sniff_workbook_format(head) not in ALLOWED_FORMATS.get(suffix, ()):
+                    raise HTTPException(status_code=400, detail="File content is not a valid Excel file")
+                tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+                data = head
+
+            size += len(data)
+            if size > MAX_UPLOAD_BYTES:
+                raise _too_large()
+            digest.update(data)
+            await run_io(tmp_file.write, data)
+            if part.finished:
+                break
+
+        if part.filename is None:
+            raise HTTPException(status_code=400, detail=f"No file in the '{field}' field")
+        if not part.finished:
+            raise HTTPException(status_code=400, detail="Upload ended before the file was complete")
+        tmp_file.close()
+    except BaseException:
+        if tmp_file is not None:
+            tmp_file.close()
+            os.unlink(tmp_file.name)
+        raise
+
+    return tmp_file.name, digest.hexdigest(), part.filename
@@ -0,0 +1,694 @@
+"""
+Workbook reader for GNDR order management
+
+Opens an Excel workbook once and streams each sheet's rows straight into the
+sheet row format used by SheetManager (list of lists, None for empty cells).
+"""
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from pathlib import Path
+import io
+import os
+import re
+import zipfile
+
+from lxml import etree
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+
+
+def normalize_cell(value: Any) -> Any:
+    """Normalize a raw cell value the same way pandas + process_dataframe did"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        # 빈 문자열, 'nan' 문자열, 엑셀 오류값(#N/A 등)은 빈 셀로 처리
+        if value == '' or value.lower() == 'nan' or value in ERROR_CODES:
+            return None
+        return value.strip()
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        if value != value or value in (float('inf'), float('-inf')):
+            return None
+        # 정수로 표현 가능한 숫자는 int로 (pandas openpyxl 엔진과 동일)
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+# 파일 시그니처 (매직 바이트)
+XLSX_MAGIC = b'PK\x03\x04'  # zip (Office Open XML)
+XLS_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'  # OLE2 compound file (BIFF .xls)
+
+
+def _is_html_header(header: bytes) -> bool:
+    header = header[:100].lower()
+    return b'<html' in header or b'<!doctype' in header or b'<meta' in header
+
+
+def is_html_xls(file_path: str) -> bool:
+    """Detect HTML tables exported with a .xls extension"""
+    if Path(file_path).suffix.lower() != '.xls':
+        return False
+    with open(file_path, 'rb') as f:
+        return _is_html_header(f.read(100))
+
+
+def sniff_workbook_format(header: bytes) -> Optional[str]:
+    """Workbook format from the first bytes of a file: 'xlsx', 'xls', 'html' or None"""
+    if header.startswith(XLSX_MAGIC):
+        return 'xlsx'
+    if header.startswith(XLS_MAGIC):
+        return 'xls'
+    if _is_html_header(header):
+        return 'html'
+    return None
+
+
+class WorkbookReader:
+    """Read-only, single-open handle on an .xlsx/.xls workbook"""
+
+    def __init__(self, file_path: Union[str, BinaryIO]):
+        self.file_path = file_path
+        # File-like objects (in-memory uploads) are always treated as .xlsx
+        self.file_ext = Path(file_path).suffix.lower() if isinstance(file_path, (str, os.PathLike)) else '.xlsx'
+        self._book = None
+
+        if self.file_ext == '.xls':
+            # For older Excel files - on_demand loads each sheet only when requested
+            import xlrd
+            self._book = xlrd.open_workbook(file_path, on_demand=True)
+            self.sheet_names: List[str] = self._book.sheet_names()
+        else:
+            # For newer Excel files - streaming read-only mode
+            self._book = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+            self.sheet_names = self._book.sheetnames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Release the underlying workbook (closes the zip archive for .xlsx)"""
+        if self._book is None:
+            return
+        if self.file_ext == '.xls':
+            self._book.release_resources()
+        else:
+            self._book.close()
+        self._book = None
+
+    def sheet_dimensions(self, sheet_name: str) -> Tuple[Optional[int], Optional[int]]:
+        """Return (rows, cols) from the sheet's <dimension> record without reading its cells
+
+        Returns (None, None) when unknown (.xls sheets are only sized once loaded).
+        """
+        if self.file_ext == '.xls':
+            return None, None
+        ws = self._book[sheet_name]
+        return ws.max_row, ws.max_column
+
+    def iter_raw_rows(self, sheet_name: str, max_rows: Optional[int] = None) -> Iterator[List[Any]]:
+        """Yield normalized rows of a sheet, without trailing-row/column trimming"""
+        if self.file_ext == '.xls':
+            yield from self._iter_xls_rows(sheet_name, max_rows)
+            return
+
+        ws = self._book[sheet_name]
+        # Some generators write a wrong <dimension>; read everything that is actually there
+        ws.reset_dimensions()
+        for row_idx, row in enumerate(ws.iter_rows(values_only=True)):
+            if max_rows is not None and row_idx >= max_rows:
+                break
+            yield [normalize_cell(value) for value in row]
+
+    def _iter_xls_rows(self, sheet_name: str, max_rows: Optional[int]) -> Iterator[List[Any]]:
+        import xlrd
+
+        sheet = self._book.sheet_by_name(sheet_name)
+        datemode = self._book.datemode
+        nrows = sheet.nrows if max_rows is None else min(sheet.nrows, max_rows)
+        for row_idx in range(nrows):
+            row = []
+            for cell in sheet.row(row_idx):
+                if cell.ctype == xlrd.XL_CELL_DATE:
+                    try:
+                        row.append(xlrd.xldate.xldate_as_datetime(cell.value, datemode))
+                    except xlrd.xldate.XLDateError:
+                        row.append(cell.value)
+                elif cell.ctype == xlrd.XL_CELL_BOOLEAN:
+                    row.append(bool(cell.value))
+                elif cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+                    row.append(None)
+                else:
+                    row.append(normalize_cell(cell.value))
+            yield row
+        self._book.unload_sheet(sheet_name)
+
+    def find_sheet(self, keyword: str) -> Optional[str]:
+        """Return the first sheet name containing keyword (looked up from the workbook index only)"""
+        for sheet_name in self.sheet_names:
+            if keyword in sheet_name:
+                return sheet_name
+        return None
+
+    def read_rows(self, sheet_name: str, max_rows: Optional[int] = None) -> List[List[Any]]:
+        """Read a whole sheet as a rectangular list of rows
+
+        Trailing empty cells and trailing empty rows are dropped, then every row
+        is padded with None to the widest row (same shape pd.read_excel produced).
+        """
+        data: List[List[Any]] = []
+        last_row_with_data = -1
+        for row_idx, row in enumerate(self.iter_raw_rows(sheet_name, max_rows)):
+            while row and row[-1] is None:
+                row.pop()
+            if row:
+                last_row_with_data = row_idx
+            data.append(row)
+
+        data = data[:last_row_with_data + 1]
+
+        if data:
+            width = max(len(row) for row in data)
+            for row in data:
+                if len(row) < width:
+                    row.extend([None] * (width - len(row)))
+
+        return data
+
+
+def read_sheet_by_keyword(source: Union[str, bytes], keyword: str) -> Optional[Tuple[str, List[List[Any]]]]:
+    """(sheet name, rows) of the first sheet whose name contains keyword, or None
+
+    source is a file path or the raw workbook bytes (module-level so it can run
+    in a worker process).
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    with WorkbookReader(source) as reader:
+        sheet_name = reader.find_sheet(keyword)
+        if not sheet_name:
+            return None
+        return sheet_name, reader.read_rows(sheet_name)
+
+
+# ---------------------------------------------------------------------------
+# .xlsx 앞부분만 읽기 (업로드 사전 검사용)
+# ---------------------------------------------------------------------------
+
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_DOC_REL_NS = ('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}',
+               '{http://purl.oclc.org/ooxml/officeDocument/relationships}')
+_SHEET_NAMESPACES = ('{http://schemas.openxmlformats.org/spreadsheetml/2006/main}',
+                     '{http://purl.oclc.org/ooxml/spreadsheetml/main}')
+
+
+def _local_name(element) -> str:
+    tag = element.tag
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def _xlsx_sheet_paths(archive: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """(sheet name, part path) in workbook order, from workbook.xml and its rels"""
+    targets = {}
+    rels = etree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels.iter(f'{_PKG_REL_NS}Relationship'):
+        target = rel.get('Target', '')
+        targets[rel.get('Id')] = target.lstrip('/') if target.startswith('/') else f"xl/{target}"
+
+    sheets = []
+    workbook = etree.fromstring(archive.read('xl/workbook.xml'))
+    for element in workbook.iter():
+        if _local_name(element) != 'sheet':
+            continue
+        rel_id = next((element.get(f'{ns}id') for ns in _DOC_REL_NS if element.get(f'{ns}id')), None)
+        if rel_id in targets:
+            sheets.append((element.get('name'), targets[rel_id]))
+    return sheets
+
+
+def _xlsx_col_index(ref: str) -> int:
+    """0-based column index of a cell reference like 'AB12'"""
+    idx = 0
+    for ch in ref:
+        if 'A' <= ch <= 'Z':
+            idx = idx * 26 + ord(ch) - 64
+        else:
+            break
+    return idx - 1
+
+
+def _xlsx_head_cells(archive: zipfile.ZipFile, path: str, max_rows: int) -> List[List[Any]]:
+    """First max_rows rows of a worksheet part; shared strings come back as ('s', index)"""
+    rows: List[List[Any]] = []
+    row_tags = tuple(f'{ns}row' for ns in _SHEET_NAMESPACES)
+    with archive.open(path) as stream:
+        for _, row_element in etree.iterparse(stream, events=('end',), tag=row_tags):
+            row_number = int(row_element.get('r') or len(rows) + 1)
+            if row_number > max_rows:
+                break
+            while len(rows) < row_number - 1:
+                rows.append([])
+
+            row: List[Any] = []
+            for cell in row_element:
+                if _local_name(cell) != 'c':
+                    continue
+                ref = cell.get('r')
+                col_idx = _xlsx_col_index(ref) if ref else len(row)
+                cell_type = cell.get('t', 'n')
+                value = None
+                if cell_type == 'inlineStr':
+                    value = ''.join(t.text or '' for t in cell.iter() if _local_name(t) == 't')
+                else:
+                    v = next((child.text for child in cell if _local_name(child) == 'v'), None)
+                    if v is not None:
+                        if cell_type == 's':
+                            value = ('s', int(v))
+                        elif cell_type == 'b':
+                            value = v == '1'
+                        elif cell_type == 'e':
+                            value = None
+                        elif cell_type in ('str', 'd'):
+                            value = v
+                        else:
+                            value = float(v)
+                if col_idx >= len(row):
+                    row.extend([None] * (col_idx + 1 - len(row)))
+                row[col_idx] = value
+            rows.append(row)
+            row_element.clear()
+    return rows
+
+
+def _xlsx_shared_strings(archive: zipfile.ZipFile, last_index: int) -> List[str]:
+    """Shared strings 0..last_index (stops reading the part right after)"""
+    strings: List[str] = []
+    try:
+        stream = archive.open('xl/sharedStrings.xml')
+    except KeyError:
+        return strings
+    si_tags = tuple(f'{ns}si' for ns in _SHEET_NAMESPACES)
+    with stream:
+        for _, si in etree.iterparse(stream, events=('end',), tag=si_tags):
+            # 루비(rPh) 텍스트는 제외하고 <t>, <r><t>만 (openpyxl과 동일)
+            texts = []
+            for child in si:
+                name = _local_name(child)
+                if name == 't':
+                    texts.append(child.text or '')
+                elif name == 'r':
+                    texts.extend(t.text or '' for t in child if _local_name(t) == 't')
+            strings.append(''.join(texts))
+            si.clear()
+            if len(strings) > last_index:
+                break
+    return strings
+
+
+def read_xlsx_head(file_path: Union[str, BinaryIO], max_rows: int) -> List[Tuple[str, List[List[Any]]]]:
+    """(sheet name, first max_rows rows) for every sheet of an .xlsx, in workbook order
+
+    Reads the zip parts directly and stops each sheet after max_rows rows, so
+    it takes milliseconds where opening the workbook with openpyxl loads every
+    shared string and style first. Cells are normalized like read_rows, except
+    that date-formatted numbers stay numbers (styles are not read).
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        sheets = [(name, _xlsx_head_cells(archive, path, max_rows))
+                  for name, path in _xlsx_sheet_paths(archive)]
+
+        last_index = max((value[1] for _, rows in sheets for row in rows for value in row
+                          if isinstance(value, tuple)), default=-1)
+        strings = _xlsx_shared_strings(archive, last_index) if last_index >= 0 else []
+
+    result = []
+    for name, rows in sheets:
+        for row in rows:
+            for idx, value in enumerate(row):
+                if isinstance(value, tuple):
+                    value = strings[value[1]] if value[1] < len(strings) else None
+                row[idx] = normalize_cell(value)
+            while row and row[-1] is None:
+                row.pop()
+        while rows and not rows[-1]:
+            rows.pop()
+        width = max((len(row) for row in rows), default=0)
+        for row in rows:
+            row.extend([None] * (width - len(row)))
+        result.append((name, rows))
+    return result
+
+
+def read_head_rows(file_path: str, max_rows: int) -> List[Tuple[str, List[List[Any]]]]:
+    """(sheet name, first max_rows rows) of every sheet, whatever the workbook format
+
+    HTML .xls exports have one sheet, named "Sheet1" like in load_excel_file.
+    """
+    if is_html_xls(file_path):
+        return [("Sheet1", read_html_table(file_path, max_rows=max_rows))]
+    if Path(file_path).suffix.lower() == '.xls':
+        with WorkbookReader(file_path) as reader:
+            return [(name, reader.read_rows(name, max_rows=max_rows)) for name in reader.sheet_names]
+    return read_xlsx_head(file_path, max_rows)
+
+
+# ---------------------------------------------------------------------------
+# HTML 형식 .xls (도매 플랫폼 내보내기) 스트리밍 파서
+# ---------------------------------------------------------------------------
+
+# pd.read_html 기본 결측값 (pandas STR_NA_VALUES)
+HTML_NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+])
+_TRUE_VALUES = frozenset(['True', 'TRUE', 'true'])
+_FALSE_VALUES = frozenset(['False', 'FALSE', 'false'])
+
+_RE_WHITESPACE = re.compile(r"[\r\n]+|\s{2,}")
+# 천 단위 구분자(,)를 지울 숫자 모양 (pandas python parser와 동일)
+_RE_THOUSANDS_NUMBER = re.compile(r"^[\-\+]?([0-9]+,|[0-9])*(\.[0-9]*)?([0-9]?(E|e)\-?[0-9]+)?$")
+_RE_INT = re.compile(r"^[+-]?[0-9]+$")
+_RE_FLOAT = re.compile(r"^[+-]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][+-]?[0-9]+)?$")
+_RE_INF = re.compile(r"^[+-]?inf(inity)?$", re.IGNORECASE)
+_INT64_MIN, _UINT64_MAX = -2 ** 63, 2 ** 64 - 1
+
+_TABLE_SECTIONS = ('thead', 'tbody', 'tfoot')
+
+# (셀 텍스트, {셀 위치: (rowspan, colspan)} 또는 None, 모든 셀이 <th>인지)
+_HtmlRow = Tuple[List[str], Optional[Dict[int, Tuple[int, int]]], bool]
+
+
+def _is_hidden(element) -> bool:
+    return 'display:none' in (element.get('style') or '').replace(' ', '')
+
+
+def _cell_text(cell) -> Tuple[str, bool]:
+    """Text of a <td>/<th> as pd.read_html sees it, plus whether it had any raw text"""
+    if len(cell):
+        # display:none 요소와 <style>은 pd.read_html(displayed_only=True)처럼 제외
+        for element in list(cell.iterdescendants()):
+            if not isinstance(element.tag, str):
+                continue
+            if element.tag == 'style' or _is_hidden(element):
+                element.drop_tree()
+            elif element.tag == 'br':
+                element.tail = "\n" + (element.tail or "")
+        raw = etree.tostring(cell, method='text', encoding=str, with_tail=False)
+    else:
+        raw = cell.text or ''
+    text = raw.strip()
+    # 공백 외의 공백 문자(줄바꿈, 탭, nbsp 등)는 모두 isprintable()이 False
+    if '  ' in text or not text.isprintable():
+        text = _RE_WHITESPACE.sub(" ", text)
+    return text, bool(text) or bool(raw.strip('\r\n'))
+
+
+def _read_first_table(file_path: str, chunk_size: int, encoding: str,
+                      max_rows: Optional[int] = None) -> Dict[str, List[_HtmlRow]]:
+    """Stream an HTML file and return the rows of its first visible table with text
+
+    Rows come back per section (thead / tbody / root <tr> / tfoot) as
+    (cell texts, {cell index: (rowspan, colspan)} or None, all cells <th>). Only </tr>, </thead> and </table> events
+    reach Python, and each finished <tr> is removed from the tree right away,
+    so memory stays bounded by one row plus the extracted texts. Tables nested
+    inside a cell become part of that cell's text. With max_rows, reading
+    stops once that many rows of the table have been collected.
+    """
+    parser = etree.HTMLPullParser(events=('end',), tag=('tr', 'thead', 'table'), encoding=encoding)
+    sections: Dict[str, List[_HtmlRow]] = {'thead': [], 'tbody': [], 'root': [], 'tfoot': []}
+    table = None
+    has_text = False
+
+    def finish_row(row_element, section_element) -> None:
+        nonlocal has_text
+        if _is_hidden(row_element) or (section_element is not None and _is_hidden(section_element)):
+            return
+        section = section_element.tag if section_element is not None else 'root'
+        texts: List[str] = []
+        spans: Optional[Dict[int, Tuple[int, int]]] = None
+        all_th = True
+        for cell in row_element:
+            tag = cell.tag
+            if tag != 'td' and tag != 'th':
+                continue
+            attrib = cell.attrib
+            if attrib:
+                style = attrib.get('style')
+                if style and 'display' in style and _is_hidden(cell):
+                    continue
+                rowspan, colspan = attrib.get('rowspan'), attrib.get('colspan')
+                if rowspan or colspan:
+                    if spans is None:
+                        spans = {}
+                    spans[len(texts)] = (int(rowspan or 1), int(colspan or 1))
+            if tag != 'th':
+                all_th = False
+            text, cell_has_text = _cell_text(cell)
+            if cell_has_text:
+                has_text = True
+            texts.append(text)
+        sections[section].append((texts, spans, all_th))
+
+    def owner_table(element):
+        """Top-level, visible <table> an element belongs to (None if nested/hidden)"""
+        parent = element.getparent()
+        if parent is None:
+            return None
+        if parent.tag in _TABLE_SECTIONS:
+            section = parent
+            parent = parent.getparent()
+        else:
+            section = None
+        if parent is None or parent.tag != 'table' or _is_hidden(parent):
+            return None
+        if next(parent.iterancestors('table'), None) is not None:
+            return None
+        return parent, section
+
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if chunk:
+                parser.feed(chunk)
+            else:
+                parser.close()
+
+            for _, element in parser.read_events():
+                tag = element.tag
+                if tag == 'table':
+                    if element is table:
+                        if has_text:
+                            return sections
+                        # 텍스트가 없는 테이블은 건너뛰고 다음 테이블을 찾음
+                        table = None
+                        for rows in sections.values():
+                            rows.clear()
+                    continue
+
+                owner = owner_table(element)
+                if owner is None:
+                    continue  # 셀 안에 중첩된 테이블 또는 숨겨진 테이블
+                owner_element, section = owner
+                if table is None:
+                    table = owner_element
+                elif owner_element is not table:
+                    continue
+
+                if tag == 'tr':
+                    finish_row(element, section)
+                    if max_rows is not None and has_text and sum(map(len, sections.values())) >= max_rows:
+                        return sections
+                    # 처리한 행은 트리에서 제거해서 메모리를 일정하게 유지
+                    parent = element.getparent()
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del parent[0]
+                elif section is None and not _is_hidden(element):
+                    # <thead><th>..</th></thead>처럼 <tr> 없이 온 셀
+                    if any(child.tag in ('td', 'th') for child in element):
+                        finish_row(element, element)
+
+            if not chunk:
+                break
+
+    if table is not None and has_text:
+        return sections
+    raise ValueError("No tables found")
+
+
+def _expand_spans(rows: List[_HtmlRow]) -> List[List[str]]:
+    """Copy rowspan/colspan cells into every position they cover (like pd.read_html)"""
+    all_texts: List[List[str]] = []
+    remainder: List[Tuple[int, str, int]] = []
+
+    for row_texts, spans, _ in rows:
+        if spans is None and not remainder:
+            all_texts.append(row_texts)
+            continue
+
+        texts: List[str] = []
+        next_remainder: List[Tuple[int, str, int]] = []
+        index = 0
+        for cell_idx, text in enumerate(row_texts):
+            rowspan, colspan = spans.get(cell_idx, (1, 1)) if spans else (1, 1)
+            while remainder and remainder[0][0] <= index:
+                prev_i, prev_text, prev_rowspan = remainder.pop(0)
+                texts.append(prev_text)
+                if prev_rowspan > 1:
+                    next_remainder.append((prev_i, prev_text, prev_rowspan - 1))
+                index += 1
+            for _ in range(colspan):
+                texts.append(text)
+                if rowspan > 1:
+                    next_remainder.append((index, text, rowspan - 1))
+                index += 1
+        for prev_i, prev_text, prev_rowspan in remainder:
+            texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_i, prev_text, prev_rowspan - 1))
+        all_texts.append(texts)
+        remainder = next_remainder
+
+    while remainder:
+        next_remainder = []
+        texts = []
+        for prev_i, prev_text, prev_rowspan in remainder:
+            texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_i, prev_text, prev_rowspan - 1))
+        all_texts.append(texts)
+        remainder = next_remainder
+
+    return all_texts
+
+
+def _header_names(header: List[str]) -> List[str]:
+    """Column names the way pandas builds them (Unnamed: i, duplicates as a.1)"""
+    names = [text if text != '' else f"Unnamed: {i}" for i, text in enumerate(header)]
+    counts: Dict[str, int] = {}
+    for i, name in enumerate(names):
+        cur_count = counts.get(name, 0)
+        while cur_count > 0:
+            counts[name] = cur_count + 1
+            name = f"{name}.{cur_count}"
+            cur_count = counts.get(name, 0)
+        names[i] = name
+        counts[name] = cur_count + 1
+    return names
+
+
+def _classify_text(text: str) -> Tuple[str, Any]:
+    """Classify one cell text: ('na', None), ('int', n), ('float', x) or ('str', text)"""
+    if text in HTML_NA_VALUES:
+        return 'na', None
+    # 숫자 모양이면 천 단위 구분자(,) 제거 (문자열로 남는 열에서도 제거됨)
+    if ',' in text and _RE_THOUSANDS_NUMBER.search(text.strip()):
+        text = text.replace(',', '')
+    if _RE_INT.match(text):
+        number = int(text)
+        if _INT64_MIN <= number <= _UINT64_MAX:
+            return 'int', number
+    elif _RE_FLOAT.match(text):
+        number = float(text)
+        # overflow ("1e400") is not numeric for pandas
+        if number not in (float('inf'), float('-inf')):
+            return 'float', number
+    elif _RE_INF.match(text):
+        return 'float', None  # inf은 process_dataframe에서 빈 셀
+    return 'str', text
+
+
+def _infer_column(values: Sequence[str]) -> Tuple[List[Any], str]:
+    """Type one column of cell texts like pandas' TextParser
+
+    Returns the converted values (None for missing) and the column kind:
+    'i' (all integers, no missing), 'f' (numeric), 'b' (booleans) or 'O'.
+    Each distinct text is classified once.
+    """
+    classified: Dict[str, Tuple[str, Any]] = {}
+    cells = []
+    kinds = set()
+    for text in values:
+        cell = classified.get(text)
+        if cell is None:
+            cell = classified[text] = _classify_text(text)
+            kinds.add(cell[0])
+        cells.append(cell)
+
+    if 'str' not in kinds:
+        if kinds <= {'int'}:
+            return [value for _, value in cells], 'i'
+        return [float(value) if value is not None else None for _, value in cells], 'f'
+
+    if kinds == {'str'} and all(text in _TRUE_VALUES or text in _FALSE_VALUES for text in classified):
+        return [value in _TRUE_VALUES for _, value in cells], 'b'
+
+    converted: Dict[str, Any] = {}
+    for text, (kind, value) in classified.items():
+        if kind == 'na':
+            converted[text] = None
+        elif kind == 'str':
+            converted[text] = None if value.lower() == 'nan' else value.strip()
+        else:
+            # 숫자처럼 보여도 문자열 열에서는 (쉼표만 지운) 문자열 그대로
+            converted[text] = text.replace(',', '') if ',' in text and _RE_THOUSANDS_NUMBER.search(text.strip()) else text
+    return [converted[text] for text in values], 'O'
+
+
+def read_html_table(file_path: str, chunk_size: int = 64 * 1024,
+                    encoding: str = 'utf-8', max_rows: Optional[int] = None) -> List[List[Any]]:
+    """Read the first table of an HTML file saved as .xls into sheet rows
+
+    Feeds the file to lxml's incremental HTML parser in chunk_size pieces,
+    dropping each row from the tree once read (no full DOM, no DataFrame),
+    and stops after the first table. The result is what
+    pd.read_html(header=0) + process_dataframe produced: the header row first
+    (empty names as "Unnamed: i"), numbers typed per column, "1,000" read as
+    1000 in numeric cells, missing cells as None.
+
+    With max_rows only the first max_rows rows (header included) are read;
+    column types are then inferred from those rows only.
+    """
+    sections = _read_first_table(file_path, chunk_size, encoding, max_rows)
+    head_rows, body_rows = sections['thead'], sections['tbody'] + sections['root']
+    if not head_rows:
+        # <thead>가 없으면 맨 위의 <th>만 있는 행을 헤더로
+        while body_rows and body_rows[0][2]:
+            head_rows.append(body_rows.pop(0))
+    rows = (_expand_spans(head_rows) + _expand_spans(body_rows)
+            + _expand_spans(sections['tfoot']))
+    if not rows:
+        raise ValueError("No tables found")
+
+    # Ragged rows are padded with empty cells
+    width = max(len(row) for row in rows)
+    for row in rows:
+        if len(row) < width:
+            row.extend([''] * (width - len(row)))
+    if width == 1:
+        rows = [row for row in rows if row[0].strip()]
+        if not rows:
+            raise ValueError("No columns to parse from table")
+
+    header = _header_names(rows[0])
+    body = rows[1:]
+
+    columns: List[List[Any]] = []
+    kinds: List[str] = []
+    for texts in (zip(*body) if body else [()] * width):
+        values, kind = _infer_column(texts)
+        columns.append(values)
+        kinds.append(kind)
+
+    # DataFrame.values에서 정수+실수 열만 있으면 모두 실수로 바뀌던 동작 유지
+    if 'O' not in kinds and 'b' not in kinds and 'i' in kinds and 'f' in kinds:
+        columns = [[float(v) for v in values] if kind == 'i' else values
+                   for values, kind in zip(columns, kinds)]
+
+    data: List[List[Any]] = [[None if name.lower() == 'nan' else name.strip() for name in header]]
+    data.extend([list(row) for row in zip(*columns)] if body else [])
+    return data
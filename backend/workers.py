@@ -0,0 +1,88 @@
+"""
+Worker pools for GNDR order management
+
+Request handlers must not block the event loop: a 30MB upload parsed inline
+stalls every other request (even /users/me) until it finishes. Blocking work
+is handed to one of two bounded pools instead:
+
+- run_io: thread pool for DB queries and file IO (releases the GIL while waiting)
+- run_cpu: process pool for parsing workbooks and rendering xlsx files
+  (map_cpu spreads one job over the same pool from a thread)
+
+Functions given to run_cpu/map_cpu run in another process, so they must be module-level
+and their arguments and results picklable.
+"""
+from typing import Any, Callable, List, Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import functools
+import os
+import threading
+
+IO_WORKERS = int(os.getenv("IO_WORKERS", 16))
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", min(4, os.cpu_count() or 1)))
+
+io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="gndr-io")
+
+# 프로세스 풀은 처음 쓸 때 생성 (임포트만 하는 스크립트/워커 프로세스에서는 만들지 않음)
+_cpu_executor: Optional[ProcessPoolExecutor] = None
+_cpu_lock = threading.Lock()
+
+
+def get_cpu_executor() -> ProcessPoolExecutor:
+    global _cpu_executor
+    with _cpu_lock:
+        if _cpu_executor is None:
+            _cpu_executor = ProcessPoolExecutor(max_workers=CPU_WORKERS)
+        return _cpu_executor
+
+
+async def run_io(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking DB/IO call in the IO thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, functools.partial(func, *args, **kwargs))
+
+
+def _discard_cpu_executor(executor: ProcessPoolExecutor):
+    # 워커가 죽으면(메모리 부족 등) 풀을 새로 만들어 다음 요청은 정상 처리
+    global _cpu_executor
+    with _cpu_lock:
+        if _cpu_executor is executor:
+            _cpu_executor = None
+    executor.shutdown(wait=False)
+
+
+async def run_cpu(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a CPU-bound call in the worker process pool"""
+    loop = asyncio.get_running_loop()
+    executor = get_cpu_executor()
+    try:
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+    except BrokenProcessPool:
+        _discard_cpu_executor(executor)
+        raise
+
+
+def map_cpu(func: Callable[..., Any], *iterables) -> List[Any]:
+    """Run func over iterables in the worker process pool and wait for the results (in order)
+
+    For code that already runs off the event loop (sync handlers, IO threads)
+    and wants to spread one job over several worker processes.
+    """
+    executor = get_cpu_executor()
+    try:
+        return list(executor.map(func, *iterables))
+    except BrokenProcessPool:
+        _discard_cpu_executor(executor)
+        raise
+
+
+def shutdown():
+    """Stop both pools (app shutdown)"""
+    global _cpu_executor
+    io_executor.shutdown(wait=False, cancel_futures=True)
+    with _cpu_lock:
+        if _cpu_executor is not None:
+            _cpu_executor.shutdown(wait=False, cancel_futures=True)
+            _cpu_executor = None
@@ -0,0 +1,430 @@
+"""
+Streaming xlsx writer for GNDR order management
+
+The download/export endpoints used to build full openpyxl workbooks: a Cell
+object per cell, new Font/PatternFill/Border objects per cell, a second walk
+over ws.columns for the column widths, and the whole file in memory before
+the first byte went out (~40s and ~450MB for 50k rows). XlsxStreamWriter
+writes one worksheet in a single pass:
+
+- rows are converted straight to sheet XML and flushed to a temporary file
+  every ROW_BUFFER rows, so memory does not grow with the row count
+  (constant-memory mode)
+- styles are registered once by name (CellStyle -> named cell style in
+  styles.xml) and cells only carry the style index
+- column widths are tracked while the rows are written and emitted when the
+  file is closed. openpyxl's write-only mode has to write <cols> before the
+  first row, which is why the sheet XML is assembled here instead.
+- the zip is written to a path or any binary file object, e.g. a temporary
+  file that the endpoint then streams in chunks (FileResponse)
+
+Values are written like openpyxl does (numbers as "%.16g", "" and None as
+empty cells, NaN/inf as empty values), so reading a file back with openpyxl
+gives the same values as before. NumPy scalars are unwrapped first;
+datetime/date/time/timedelta become Excel serial numbers with openpyxl's
+default number formats (or the writer's date_formats), and other types raise
+ValueError instead of being written as text unless other_as_text is set
+(what pandas to_excel does). Strings are written inline (no shared string table to keep
+in memory); characters XML does not allow are dropped.
+"""
+from typing import Any, BinaryIO, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+from datetime import datetime, date, time, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from xml.sax.saxutils import escape, quoteattr
+import math
+import re
+import shutil
+import tempfile
+import zipfile
+import numpy as np
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.datetime import to_excel
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# 열 너비 = 가장 긴 값의 글자 수 + 2, 최대 50
+MAX_COLUMN_WIDTH = 50
+COLUMN_PADDING = 2
+# 이 행 수마다 임시 파일로 내보냄
+ROW_BUFFER = 1000
+
+_STRING_CACHE_SIZE = 65536
+# XML 1.0에서 허용하지 않는 제어 문자 (openpyxl은 IllegalCharacterError)
+_ILLEGAL_CHARACTERS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+# 시트 이름에 쓸 수 없는 문자, 최대 길이
+_SHEET_NAME_INVALID = re.compile(r'[\\*?:/\[\]]')
+_SHEET_NAME_MAX = 31
+_HEX_COLOR = re.compile(r'(?:[0-9A-Fa-f]{2})?[0-9A-Fa-f]{6}')
+
+# 날짜/시각 셀의 표시 형식 (openpyxl 기본값과 같음, datetime이 date보다 먼저)
+DATE_FORMATS = (
+    (datetime, "yyyy-mm-dd h:mm:ss"),
+    (date, "yyyy-mm-dd"),
+    (time, "h:mm:ss"),
+    (timedelta, "[hh]:mm:ss"),
+)
+# 사용자 정의 표시 형식 번호는 164부터 (그 아래는 Excel 기본 형식)
+_FIRST_CUSTOM_NUM_FMT = 164
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+_CONTENT_TYPES = _XML_HEADER + (
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = _XML_HEADER + (
+    f'<Relationships xmlns="{_PACKAGE_REL_NS}">'
+    f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK_RELS = _XML_HEADER + (
+    f'<Relationships xmlns="{_PACKAGE_REL_NS}">'
+    f'<Relationship Id="rId1" Type="{_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+    f'<Relationship Id="rId2" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+
+class CellStyle(NamedTuple):
+    """Cell formatting; colors are hex "RRGGBB" (a leading # is ignored)"""
+    fill: Optional[str] = None
+    font_color: Optional[str] = None
+    bold: bool = False
+    border: bool = False
+    horizontal: Optional[str] = None
+    vertical: Optional[str] = None
+    number_format: Optional[str] = None
+
+
+def _argb(color: str) -> str:
+    # openpyxl과 같은 표기: 6자리면 앞에 00
+    color = color.lstrip("#")
+    if not _HEX_COLOR.fullmatch(color):
+        raise ValueError(f"Colors must be aRGB hex values: {color}")
+    return "00" + color if len(color) == 6 else color
+
+
+def _font_xml(style: CellStyle) -> str:
+    bold = "<b/>" if style.bold else ""
+    color = f'<color rgb="{_argb(style.font_color)}"/>' if style.font_color else ""
+    return (f'<font>{bold}<sz val="11"/>{color}<name val="Calibri"/>'
+            f'<family val="2"/><scheme val="minor"/></font>')
+
+
+def _fill_xml(style: CellStyle) -> str:
+    color = _argb(style.fill)
+    return (f'<fill><patternFill patternType="solid"><fgColor rgb="{color}"/>'
+            f'<bgColor rgb="{color}"/></patternFill></fill>')
+
+
+_THIN_BORDER = ('<border><left style="thin"/><right style="thin"/><top style="thin"/>'
+                '<bottom style="thin"/><diagonal/></border>')
+
+
+@lru_cache(maxsize=_STRING_CACHE_SIZE)
+def _string_xml(text: str) -> str:
+    """Inline string cell body (after the reference), e.g. ' t="inlineStr"><is><t>..</t></is></c>'"""
+    if _ILLEGAL_CHARACTERS.search(text):
+        text = _ILLEGAL_CHARACTERS.sub("", text)
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    return f' t="inlineStr"><is><t{space}>{escape(text)}</t></is></c>'
+
+
+def _excel_value(value: Any, date_formats: Sequence[Tuple[type, str]] = DATE_FORMATS,
+                 other_as_text: bool = False) -> Tuple[Any, Optional[str]]:
+    """(value, number format) for a cell that is not None/str/int/float/bool
+
+    NumPy scalars are unwrapped, values of a type in date_formats become Excel
+    serial numbers with its number format and Decimal becomes float. NaT is an
+    empty cell. With other_as_text, every other value (Decimal included) is
+    written as str(value).
+
+    Raises:
+        ValueError: a type Excel has no cell value for (or a timezone-aware datetime)
+    """
+    if isinstance(value, np.generic):
+        if isinstance(value, (np.datetime64, np.timedelta64)):
+            # .item()은 ns 단위면 int를 돌려주므로 us로 바꿔서 (NaT -> None)
+            value = value.astype("M8[us]" if isinstance(value, np.datetime64) else "m8[us]").item()
+        else:
+            value = value.item()
+        if value is None or type(value) in (str, int, float, bool):
+            return value, None
+    for kind, number_format in date_formats:
+        if isinstance(value, kind):
+            # pandas NaT도 datetime (자기 자신과 같지 않음)
+            if value != value:
+                return None, None
+            if isinstance(value, (datetime, time)) and value.tzinfo is not None:
+                raise ValueError(f"Excel does not support timezones: {value!r}")
+            return to_excel(value), number_format
+    if isinstance(value, Decimal) and not other_as_text:
+        return float(value), None
+    # str/int/float의 하위 클래스 (bool은 위에서 처리됨)
+    for kind in (str, int, float):
+        if isinstance(value, kind):
+            return kind(value), None
+    if other_as_text:
+        return str(value), None
+    raise ValueError(f"Cannot convert {value!r} to Excel")
+
+
+def _sheet_name(name: str) -> str:
+    return _SHEET_NAME_INVALID.sub("_", str(name or "Sheet1"))[:_SHEET_NAME_MAX] or "Sheet1"
+
+
+class XlsxStreamWriter:
+    """Single-sheet xlsx written row by row
+
+        with XlsxStreamWriter(path, "Sheet1") as writer:
+            header = writer.add_style("header", CellStyle(bold=True, border=True))
+            writer.write_row(["거래처명", "수량"], header)
+            for row in rows:
+                writer.write_row(row)
+
+    write_row takes one style index for the whole row or one per cell
+    (0 = default). Cells of value None or "" are written only when styled.
+    date_formats and other_as_text are passed to _excel_value for cells of
+    other types.
+    """
+
+    def __init__(self, target: Union[str, BinaryIO], sheet_name: str = "Sheet1", auto_width: bool = True,
+                 date_formats: Sequence[Tuple[type, str]] = DATE_FORMATS, other_as_text: bool = False):
+        self.target = target
+        self.sheet_name = _sheet_name(sheet_name)
+        self.auto_width = auto_width
+        self.date_formats = date_formats
+        self.other_as_text = other_as_text
+        # 이름 -> 스타일 번호 (0은 기본 스타일)
+        self.style_ids: Dict[str, int] = {}
+        self._styles: List[CellStyle] = [CellStyle()]
+        self.widths: List[int] = []
+        self.rows = 0
+        self._max_col = 0
+        self._buffer: List[str] = []
+        self._rows_file = tempfile.TemporaryFile()
+        self._letters: List[str] = []
+        # (스타일 번호, 표시 형식) -> 그 형식을 더한 스타일 번호
+        self._format_styles: Dict[Tuple[int, str], int] = {}
+
+    def __enter__(self) -> "XlsxStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._rows_file.close()
+
+    # --- 스타일 ---
+
+    def add_style(self, name: str, style: CellStyle) -> int:
+        """Register a named style (once per name) and return its index"""
+        style_id = self.style_ids.get(name)
+        if style_id is None:
+            for color in (style.fill, style.font_color):
+                if color:
+                    _argb(color)
+            style_id = self.style_ids[name] = len(self._styles)
+            self._styles.append(style)
+        return style_id
+
+    def color_style(self, fill: Optional[str] = None, font_color: Optional[str] = None) -> int:
+        """Style index of a fill / text color pair (named after the colors), 0 for neither"""
+        if not fill and not font_color:
+            return 0
+        fill = fill.lstrip("#") if fill else None
+        font_color = font_color.lstrip("#") if font_color else None
+        return self.add_style(f"fill {fill or '-'} text {font_color or '-'}",
+                              CellStyle(fill=fill, font_color=font_color))
+
+    def _number_format_style(self, style_id: int, number_format: str) -> int:
+        """Style index of style_id with number_format added (registered once per pair)"""
+        key = (style_id, number_format)
+        format_style = self._format_styles.get(key)
+        if format_style is None:
+            base_name = next((name for name, i in self.style_ids.items() if i == style_id), "default")
+            format_style = self._format_styles[key] = self.add_style(
+                f"{base_name} {number_format}", self._styles[style_id]._replace(number_format=number_format))
+        return format_style
+
+    # --- 행 쓰기 ---
+
+    def _letter(self, col: int) -> str:
+        while len(self._letters) <= col:
+            self._letters.append(get_column_letter(len(self._letters) + 1))
+        return self._letters[col]
+
+    def write_row(self, values: Sequence[Any], styles: Union[int, Sequence[int]] = 0):
+        self.rows += 1
+        r = self.rows
+        n = len(values)
+        if n > self._max_col:
+            self._letter(n - 1)
+            if self.auto_width:
+                self.widths.extend([0] * (n - self._max_col))
+            self._max_col = n
+        letters, widths, auto_width = self._letters, self.widths, self.auto_width
+        row_style = styles if isinstance(styles, int) else None
+
+        parts = [f'<row r="{r}">']
+        append = parts.append
+        for c, value in enumerate(values):
+            s = row_style if row_style is not None else styles[c]
+            t = type(value)
+            shown = value
+            if t is not str and t is not int and t is not float and t is not bool and value is not None:
+                # NumPy 스칼라, 날짜/시각 등은 기본 값으로 (날짜는 표시 형식 있는 스타일)
+                value, number_format = _excel_value(value, self.date_formats, self.other_as_text)
+                if number_format:
+                    s = self._number_format_style(s, number_format)
+                t = type(value)
+            ref = f'<c r="{letters[c]}{r}"' + (f' s="{s}"' if s else "")
+            if value is None or value == "":
+                if s:
+                    append(ref + "/>")
+                continue
+            if t is str:
+                append(ref + _string_xml(value))
+                width = len(value)
+                if auto_width and width > widths[c]:
+                    widths[c] = width
+                continue
+            if t is bool:
+                append(ref + f' t="b"><v>{int(value)}</v></c>')
+            elif (t is int or t is float) and math.isfinite(value):
+                append(ref + "><v>%.16g</v></c>" % value)
+            elif t is float:
+                # NaN/inf: 값 없는 셀
+                append(ref + "><v></v></c>")
+            # 너비는 원래 셀 값의 str() 길이 (거짓 값은 0)
+            width = len(str(shown)) if value else 0
+            if auto_width and width > widths[c]:
+                widths[c] = width
+        append("</row>")
+        self._buffer.append("".join(parts))
+        if len(self._buffer) >= ROW_BUFFER:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._rows_file.write("".join(self._buffer).encode("utf-8", "replace"))
+            self._buffer = []
+
+    # --- 파일 조립 ---
+
+    def _styles_xml(self) -> str:
+        fonts = [_font_xml(CellStyle())]
+        fills = ['<fill><patternFill patternType="none"/></fill>', '<fill><patternFill patternType="gray125"/></fill>']
+        borders = ['<border><left/><right/><top/><bottom/><diagonal/></border>']
+        font_ids: Dict[str, int] = {fonts[0]: 0}
+        fill_ids: Dict[str, int] = {}
+        num_fmt_ids: Dict[str, int] = {}
+        xfs = []
+        for style in self._styles[1:]:
+            font = _font_xml(style)
+            font_id = font_ids.setdefault(font, len(font_ids))
+            if font_id == len(fonts):
+                fonts.append(font)
+            fill_id = 0
+            if style.fill:
+                fill = _fill_xml(style)
+                fill_id = fill_ids.setdefault(fill, len(fills))
+                if fill_id == len(fills):
+                    fills.append(fill)
+            border_id = 0
+            if style.border:
+                if len(borders) == 1:
+                    borders.append(_THIN_BORDER)
+                border_id = 1
+            alignment = ""
+            if style.horizontal or style.vertical:
+                attrs = "".join(f' {key}="{value}"' for key, value in
+                                (("horizontal", style.horizontal), ("vertical", style.vertical)) if value)
+                alignment = f"<alignment{attrs}/>"
+            num_fmt_id = 0
+            if style.number_format:
+                num_fmt_id = num_fmt_ids.setdefault(style.number_format, _FIRST_CUSTOM_NUM_FMT + len(num_fmt_ids))
+            xfs.append((f'numFmtId="{num_fmt_id}" fontId="{font_id}" fillId="{fill_id}" borderId="{border_id}"',
+                        ' applyFont="1" applyFill="1" applyBorder="1"'
+                        + (' applyNumberFormat="1"' if num_fmt_id else "")
+                        + (' applyAlignment="1"' if alignment else ""),
+                        alignment))
+
+        # 등록한 스타일마다 이름 있는 셀 스타일 + 그 스타일을 쓰는 셀 서식
+        style_xfs = ['<xf numFmtId="0" fontId="0" fillId="0" borderId="0"/>']
+        cell_xfs = ['<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>']
+        for n, (ids, apply, alignment) in enumerate(xfs, start=1):
+            style_xfs.append(f"<xf {ids}{apply}>{alignment}</xf>")
+            cell_xfs.append(f'<xf {ids} xfId="{n}"{apply}>{alignment}</xf>')
+        names = ['<cellStyle name="Normal" xfId="0" builtinId="0"/>']
+        names += [f'<cellStyle name={quoteattr(name)} xfId="{style_id}"/>'
+                  for name, style_id in sorted(self.style_ids.items(), key=lambda item: item[1])]
+        num_fmts = ""
+        if num_fmt_ids:
+            num_fmts = f'<numFmts count="{len(num_fmt_ids)}">' + "".join(
+                f'<numFmt numFmtId="{num_fmt_id}" formatCode={quoteattr(code)}/>'
+                for code, num_fmt_id in num_fmt_ids.items()
+            ) + "</numFmts>"
+        return _XML_HEADER + (
+            f'<styleSheet xmlns="{_MAIN_NS}">'
+            f'{num_fmts}<fonts count="{len(fonts)}">{"".join(fonts)}</fonts>'
+            f'<fills count="{len(fills)}">{"".join(fills)}</fills>'
+            f'<borders count="{len(borders)}">{"".join(borders)}</borders>'
+            f'<cellStyleXfs count="{len(style_xfs)}">{"".join(style_xfs)}</cellStyleXfs>'
+            f'<cellXfs count="{len(cell_xfs)}">{"".join(cell_xfs)}</cellXfs>'
+            f'<cellStyles count="{len(names)}">{"".join(names)}</cellStyles>'
+            '</styleSheet>'
+        )
+
+    def _sheet_head(self) -> str:
+        dimension = f"A1:{self._letter(self._max_col - 1)}{self.rows}" if self._max_col and self.rows else "A1"
+        cols = ""
+        if self.auto_width and self._max_col:
+            cols = "<cols>" + "".join(
+                f'<col min="{c}" max="{c}" width="{min(width + COLUMN_PADDING, MAX_COLUMN_WIDTH)}" customWidth="1"/>'
+                for c, width in enumerate(self.widths[:self._max_col], start=1)
+            ) + "</cols>"
+        return _XML_HEADER + (
+            f'<worksheet xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+            f'<dimension ref="{dimension}"/>'
+            '<sheetViews><sheetView workbookViewId="0"/></sheetViews>'
+            '<sheetFormatPr defaultRowHeight="15"/>'
+            f'{cols}<sheetData>'
+        )
+
+    def close(self):
+        """Write the xlsx (zip) to the target"""
+        self._flush()
+        workbook = _XML_HEADER + (
+            f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+            '<bookViews><workbookView/></bookViews>'
+            f'<sheets><sheet name={quoteattr(self.sheet_name)} sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        )
+        try:
+            with zipfile.ZipFile(self.target, "w", zipfile.ZIP_DEFLATED) as zf:
+                zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+                zf.writestr("_rels/.rels", _ROOT_RELS)
+                zf.writestr("xl/workbook.xml", workbook)
+                zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+                zf.writestr("xl/styles.xml", self._styles_xml())
+                with zf.open("xl/worksheets/sheet1.xml", "w") as sheet:
+                    sheet.write(self._sheet_head().encode("utf-8"))
+                    self._rows_file.seek(0)
+                    shutil.copyfileobj(self._rows_file, sheet, 1 << 20)
+                    sheet.write(b"</sheetData></worksheet>")
+        finally:
+            self._rows_file.close()
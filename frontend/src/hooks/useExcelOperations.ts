@@ -1,8 +1,8 @@
-import { useState } from 'react'
+import { useState, useEffect, useRef, Dispatch, SetStateAction } from 'react'
 import toast from 'react-hot-toast'
-import { excelAPI } from '../services/api'
-import { validateAndMergeData, validateAndMergeReceiptSlip, mergeOrderReceiptByRow } from '../utils/excelValidation'
-import { sortSheetData, detectDuplicateProducts, processReceiptSlipData, sortReceiptData } from '../utils/dataProcessing'
+import { excelAPI, isMissingEndpoint, ReceiptMergeResult } from '../services/api'
+import { mergeOrderReceiptByRow, validateAndMergeReceiptSlip } from '../utils/excelValidation'
+import { detectDuplicateProducts, sortReceiptData, processReceiptSlipData } from '../utils/dataProcessing'
 import { SheetData } from './useSheetManagement'
 
 /**
@@ -12,12 +12,12 @@ import { SheetData } from './useSheetManagement'
  */
 interface UseExcelOperationsParams {
   sheets: SheetData[]
-  setSheets: (sheets: SheetData[]) => void
+  setSheets: Dispatch<SetStateAction<SheetData[]>>
   selectedSheet: number
   setRowColors: (colors: { [key: number]: string }) => void
   setRowTextColors: (colors: { [key: number]: string }) => void
   setDuplicateProducts: (products: { [key: number]: string }) => void
-  updateCurrentSheetData: (data: any[][]) => void
+  updateCurrentSheetData: (data: any[][], rowsUnchanged?: boolean) => void
 }
 
 export const useExcelOperations = (params: UseExcelOperationsParams) => {
@@ -31,6 +31,12 @@ export const useExcelOperations = (params: UseExcelOperationsParams) => {
   const [isOrderReceiptUploaded, setIsOrderReceiptUploaded] = useState(false)
   const [isReceiptSlipUploaded, setIsReceiptSlipUploaded] = useState(false)
 
+  // 요청 중인 지연 로딩 시트 (중복 요청 방지)
+  const pendingSheetLoads = useRef<Set<string>>(new Set())
+  // 시트별 셀 PATCH 대기열과 마지막으로 받은 서버 버전 (앞 요청의 응답 버전을 다음 요청의 base_version으로)
+  const patchQueues = useRef<Map<string, Promise<void>>>(new Map())
+  const serverVersions = useRef<Map<string, number>>(new Map())
+
   /**
    * 주문서 엑셀 업로드 및 시트 생성
    */
@@ -38,10 +44,20 @@ export const useExcelOperations = (params: UseExcelOperationsParams) => {
     const loadingToast = toast.loading('파일 업로드 중...')
 
     try {
-      const response = await excelAPI.uploadExcel(file)
+      const stageLabels: { [stage: string]: string } = {
+        parsing: '파일 분석 중',
+        caching: '분석 결과 저장 중',
+        saving_orders: '주문 데이터 저장 중',
+        syncing_clients: '거래처 정보 업데이트 중'
+      }
+      const response = await excelAPI.uploadExcel(file, (job) => {
+        if (!job.stage) return
+        const total = job.rows_total ? ` (${job.rows_processed}/${job.rows_total})` : ''
+        toast.loading(`${stageLabels[job.stage] || job.stage}...${total}`, { id: loadingToast })
+      })
       if (response.success && response.sheets) {
         // Transform backend sheets to frontend SheetData format
-        const transformedSheets = response.sheets.map((sheet: any) => {
+        const toSheetData = (sheet: any) => {
           const data = sheet.data || []
           // P열 (index 15) 헤더 수정: "주문" -> "차이"
           if (data.length > 1 && data[1][15] === '주문') {
@@ -58,6 +74,22 @@ export const useExcelOperations = (params: UseExcelOperationsParams) => {
             file_path: response.filename || file.name,
             loaded_at: new Date().toISOString()
           }
+        }
+
+        // 시트 목록 전체를 탭으로 만들고, 아직 파싱되지 않은 시트는 선택할 때 불러옴
+        // (작업 없이 바로 응답하는 서버는 시트 목록 없이 sheets만, 이름은 name으로 줌)
+        const loadedSheets: { [name: string]: any } = {}
+        response.sheets.forEach((sheet: any) => { loadedSheets[sheet.sheet_name ?? sheet.name] = sheet })
+        const catalog: any[] = response.sheet_catalog || response.sheets
+        const transformedSheets: SheetData[] = catalog.map((entry: any) => {
+          const loaded = loadedSheets[entry.sheet_name ?? entry.name]
+          return {
+            ...toSheetData(loaded || {}),
+            workbook_id: response.workbook_id,
+            source_sheet_name: entry.sheet_name,
+            is_loaded: !!loaded,
+            version: response.workbook_id && loaded ? (loaded.version ?? 0) : undefined
+          }
         })
 
         // 파일명 저장
@@ -65,6 +97,12 @@ export const useExcelOperations = (params: UseExcelOperationsParams) => {
           localStorage.setItem('current_filename', response.filename)
         }
 
+        serverVersions.current.clear()
+        transformedSheets.forEach((sheet) => {
+          if (sheet.version !== undefined) {
+            serverVersions.current.set(`${sheet.workbook_id}/${sheet.source_sheet_name}`, sheet.version)
+          }
+        })
         setSheets(transformedSheets)
 
         // Reset progressive state
@@ -79,10 +117,121 @@ export const useExcelOperations = (params: UseExcelOperationsParams) => {
       }
     } catch (error: any) {
       console.error('Upload error:', error)
-      toast.error('파일 업로드에 실패했습니다.', { id: loadingToast })
+      // 서버 사전 검사에서 거절되면 어떤 헤더가 다른지 detail로 옴
+      const errorMessage = error?.response?.data?.detail || '파일 업로드에 실패했습니다.'
+      toast.error(errorMessage, { id: loadingToast })
     }
   }
 
+  /**
+   * 선택한 시트가 아직 로드되지 않았으면 서버에서 파싱해서 가져옴
+   */
+  useEffect(() => {
+    const sheet = sheets[selectedSheet]
+    if (!sheet || sheet.is_loaded !== false || !sheet.workbook_id || !sheet.source_sheet_name) return
+
+    const { workbook_id, source_sheet_name } = sheet
+    const loadKey = `${workbook_id}/${source_sheet_name}`
+    if (pendingSheetLoads.current.has(loadKey)) return
+    pendingSheetLoads.current.add(loadKey)
+
+    excelAPI.loadSheet(workbook_id, source_sheet_name)
+      .then((response) => {
+        if (!response.success) return
+        serverVersions.current.set(loadKey, response.version ?? 0)
+        const data = response.sheet.data || []
+        if (data.length > 1 && data[1][15] === '주문') {
+          data[1][15] = '차이'
+        }
+        setSheets(prevSheets => prevSheets.map(s =>
+          s.workbook_id === workbook_id && s.source_sheet_name === source_sheet_name
+            ? {
+                ...s,
+                data: data,
+                columns: data.length > 1 ? data[1] : [],
+                rows: data.length,
+                cols: data[0] ? data[0].length : 0,
+                loaded_at: new Date().toISOString(),
+                is_loaded: true,
+                version: response.version ?? 0
+              }
+            : s
+        ))
+      })
+      .catch((error) => {
+        console.error('Sheet load error:', error)
+        toast.error('시트를 불러오지 못했습니다.')
+      })
+      .finally(() => {
+        pendingSheetLoads.current.delete(loadKey)
+      })
+  }, [sheets, selectedSheet])
+
+  /**
+   * 셀 하나 수정: 화면에 바로 반영하고 서버 시트에는 바뀐 셀만 PATCH
+   *
+   * 다른 곳에서 시트가 먼저 바뀌었으면(409) 서버 시트를 다시 불러옴. 셀 수정
+   * 엔드포인트가 없는 서버(Cloud Functions)면 화면에만 반영.
+   */
+  const handleCellEdit = (rowIndex: number, colIndex: number, value: any) => {
+    const sheet = sheets[selectedSheet]
+    if (!sheet) return
+    // 연속 수정이 서로 덮어쓰지 않도록 최신 시트에 반영 (행 수/순서는 그대로)
+    setSheets(prevSheets => prevSheets.map((s, i) => {
+      if (i !== selectedSheet) return s
+      const data = [...s.data]
+      data[rowIndex] = [...data[rowIndex]]
+      data[rowIndex][colIndex] = value
+      return { ...s, data }
+    }))
+
+    const { workbook_id, source_sheet_name } = sheet
+    if (!workbook_id || !source_sheet_name || sheet.version === undefined) return
+    const sheetKey = `${workbook_id}/${source_sheet_name}`
+    const isSheet = (s: SheetData) => s.workbook_id === workbook_id && s.source_sheet_name === source_sheet_name
+    const edits = [{ row: rowIndex, col: colIndex, value: value === '' ? null : value }]
+
+    const previous = patchQueues.current.get(sheetKey) || Promise.resolve()
+    const next = previous.then(async () => {
+      // 앞 요청이 끝난 뒤의 버전 (충돌로 다시 불러오는 중이면 없음 -> 보내지 않음)
+      const baseVersion = serverVersions.current.get(sheetKey)
+      if (baseVersion === undefined) return
+
+      try {
+        const result = await excelAPI.patchSheetCells(workbook_id, source_sheet_name, baseVersion, edits)
+        serverVersions.current.set(sheetKey, result.version)
+        // 서버가 다시 계산한 셀(P열 차이, 노란 3행 합계)도 반영
+        const derived: { row: number; col: number; value: any }[] = result.derived || []
+        setSheets(prevSheets => prevSheets.map(s => {
+          if (!isSheet(s) || s.version === undefined) return s
+          if (derived.length === 0) return { ...s, version: result.version }
+          const data = [...s.data]
+          derived.forEach(({ row, col, value }) => {
+            data[row] = [...data[row]]
+            data[row][col] = value
+          })
+          return { ...s, data, version: result.version }
+        }))
+      } catch (error: any) {
+        if (error?.response?.status === 409) {
+          serverVersions.current.delete(sheetKey)
+          toast.error('다른 곳에서 시트가 바뀌어 서버 시트를 다시 불러옵니다')
+          setSheets(prevSheets => prevSheets.map(s => isSheet(s) ? { ...s, is_loaded: false } : s))
+        } else if (isMissingEndpoint(error)) {
+          serverVersions.current.delete(sheetKey)
+          setSheets(prevSheets => prevSheets.map(s => isSheet(s) ? { ...s, version: undefined } : s))
+        } else {
+          console.error('Cell patch error:', error)
+          toast.error(error?.response?.data?.detail || '셀 수정을 서버에 저장하지 못했습니다')
+        }
+      }
+    })
+    patchQueues.current.set(sheetKey, next)
+    next.finally(() => {
+      if (patchQueues.current.get(sheetKey) === next) patchQueues.current.delete(sheetKey)
+    })
+  }
+
   /**
    * 주문입고 엑셀 업로드 및 데이터 병합
    */
@@ -136,6 +285,34 @@ export const useExcelOperations = (params: UseExcelOperationsParams) => {
     }
   }
 
+  /**
+   * 입고전표 O열 병합 + 주소 정렬 + 색상/중복/자동 체크
+   * (병합 엔드포인트가 없는 서버에서는 브라우저에서 병합하고 분류)
+   */
+  const mergeReceiptSlip = async (currentSheetData: any[][], receiptSlipData: any[][]): Promise<ReceiptMergeResult> => {
+    try {
+      return await excelAPI.mergeReceiptSlip(currentSheetData, receiptSlipData, true, 0, true)
+    } catch (error) {
+      if (!isMissingEndpoint(error)) throw error
+    }
+    const local = validateAndMergeReceiptSlip(currentSheetData, receiptSlipData)
+    // 데이터 정렬 (주소 → 거래처명 → 상품코드, 구분선 포함) 후 정렬된 데이터 기준으로 가공
+    const sortedData = sortReceiptData(local.mergedData || [])
+    const processed = processReceiptSlipData(sortedData)
+    return {
+      success: local.success,
+      merged_data: sortedData,
+      matched_count: local.matchedCount || 0,
+      unmatched: [],
+      unmatched_rows: [],
+      message: local.message || '',
+      row_colors: processed.colors,
+      row_text_colors: processed.textColors,
+      duplicates: processed.duplicates,
+      auto_checked: processed.autoChecked
+    }
+  }
+
   /**
    * 입고전표 업로드 및 O열 병합 + 자동 체크 + 정렬
    */
@@ -168,27 +345,21 @@ export const useExcelOperations = (params: UseExcelOperationsParams) => {
           return
         }
 
-        // 입고전표 데이터 매칭 및 O열 업데이트
-        const validationResult = validateAndMergeReceiptSlip(currentSheetData, receiptSlipData)
+        // 입고전표 데이터 매칭 및 O열 업데이트, 주소 정렬 + 색상/중복/자동 체크까지 서버에서 한 번에
+        const validationResult = await mergeReceiptSlip(currentSheetData, receiptSlipData)
 
         if (validationResult.success) {
           setIsReceiptSlipUploaded(true)
 
-          // 데이터 정렬 (상품코드 > 상태)
-          const sortedData = sortReceiptData(validationResult.mergedData || [])
-
-          // 데이터 가공 (색상, 자동 체크 등) - 정렬된 데이터 기준
-          const processed = processReceiptSlipData(sortedData)
-
           onSuccess({
-            sortedData: sortedData,
-            colors: processed.colors,
-            textColors: processed.textColors,
-            duplicates: processed.duplicates,
-            autoChecked: processed.autoChecked
+            sortedData: validationResult.merged_data || [],
+            colors: validationResult.row_colors || {},
+            textColors: validationResult.row_text_colors || {},
+            duplicates: validationResult.duplicates || {},
+            autoChecked: validationResult.auto_checked || {}
           })
 
-          toast.success(`${validationResult.matchedCount}개 행의 입고량이 업데이트되었습니다.`, { id: loadingToast })
+          toast.success(`${validationResult.matched_count}개 행의 입고량이 업데이트되었습니다.`, { id: loadingToast })
         } else {
           toast.error(validationResult.message || '데이터 매칭에 실패했습니다.', { id: loadingToast })
         }
@@ -350,8 +521,9 @@ export const useExcelOperations = (params: UseExcelOperationsParams) => {
     isReceiptSlipUploaded,
     setIsReceiptSlipUploaded,
 
-    // 업로드 핸들러
+    // 업로드 / 셀 수정 핸들러
     handleFileUpload,
+    handleCellEdit,
     handleOrderReceiptUpload,
     handleReceiptSlipUpload,
 
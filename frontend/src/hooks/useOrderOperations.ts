@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import toast from 'react-hot-toast'
-import { ordersAPI } from '../services/api'
+import { ordersAPI, excelAPI, isMissingEndpoint } from '../services/api'
 import { parseAddress, detectDuplicateProducts } from '../utils/dataProcessing'
 import { useAuthStore } from '../store/authStore'
 
@@ -17,6 +17,45 @@ interface UseOrderOperationsParams {
   rowTextColors: { [key: number]: string }
 }
 
+/**
+ * 행들의 주소 정렬 순서 (건물 → 층 → 호실 → 거래처명)
+ * 서버 /excel/sort-by-address로 정렬하고, 그 엔드포인트가 없는 서버(Cloud Functions)에서만 브라우저에서 정렬
+ */
+const addressOrder = async (rows: any[][]): Promise<number[]> => {
+  try {
+    const result = await excelAPI.sortByAddress(rows, 0, [0])
+    return result.order
+  } catch (error) {
+    if (!isMissingEndpoint(error)) throw error
+  }
+
+  const addresses = rows.map(row => parseAddress(row[1] || ''))
+  const companies = rows.map(row => (row[0] || '').toString().trim())
+  return rows.map((_, i) => i).sort((a, b) => {
+    const addrA = addresses[a]
+    const addrB = addresses[b]
+
+    // 1. 건물명으로 정렬
+    if (!addrA.building && addrB.building) return 1
+    if (addrA.building && !addrB.building) return -1
+    const buildingCompare = addrA.building.localeCompare(addrB.building, 'ko-KR')
+    if (buildingCompare !== 0) return buildingCompare
+
+    // 2. 층으로 정렬 (지하는 음수로 처리되어 있음)
+    if (addrA.floor !== addrB.floor) return addrA.floor - addrB.floor
+
+    // 3. 호실로 정렬
+    if (addrA.room !== addrB.room) return addrA.room - addrB.room
+
+    // 4. 거래처명으로 정렬
+    const companyA = companies[a]
+    const companyB = companies[b]
+    if (!companyA && companyB) return 1
+    if (companyA && !companyB) return -1
+    return companyA.localeCompare(companyB, 'ko-KR')
+  })
+}
+
 /**
  * useOrderOperations Hook
  *
@@ -186,38 +225,16 @@ export const useOrderOperations = ({
         }
       }
 
-      // 정렬 (새로운 기준: 건물 → 층 → 호실 → 거래처명)
-      remainingRows.sort((a, b) => {
-        const addrA = parseAddress(a[1] || '')
-        const addrB = parseAddress(b[1] || '')
-
-        // 1. 건물명으로 정렬
-        if (!addrA.building && addrB.building) return 1
-        if (addrA.building && !addrB.building) return -1
-        const buildingCompare = addrA.building.localeCompare(addrB.building, 'ko-KR')
-        if (buildingCompare !== 0) return buildingCompare
-
-        // 2. 층으로 정렬 (지하는 음수로 처리되어 있음)
-        if (addrA.floor !== addrB.floor) return addrA.floor - addrB.floor
-
-        // 3. 호실로 정렬
-        if (addrA.room !== addrB.room) return addrA.room - addrB.room
-
-        // 4. 거래처명으로 정렬
-        const companyA = (a[0] || '').toString().trim()
-        const companyB = (b[0] || '').toString().trim()
-        if (!companyA && companyB) return 1
-        if (companyA && !companyB) return -1
-        return companyA.localeCompare(companyB, 'ko-KR')
-      })
+      // 정렬 (건물 → 층 → 호실 → 거래처명), order[i]: i번째 정렬 결과의 remainingRows 위치
+      const order = await addressOrder(remainingRows)
 
       // 정렬된 데이터를 추가하면서 건물/거래처별 구분선 삽입
       let prevCompany = ''
       let prevBuilding = ''
       let currentRowIndex = 4
 
-      for (let i = 0; i < remainingRows.length; i++) {
-        const row = remainingRows[i]
+      for (let i = 0; i < order.length; i++) {
+        const row = remainingRows[order[i]]
         const currentCompany = (row[0] || '').toString().trim()
         const address = (row[1] || '').toString()
         const currentBuilding = parseAddress(address).building
@@ -238,12 +255,12 @@ export const useOrderOperations = ({
         }
 
         newData.push(row)
-        // 기존 색상 복원
-        if (remainingRowTextColors[i]) {
-          newRowTextColors[currentRowIndex] = remainingRowTextColors[i]
+        // 기존 색상 복원 (정렬 전 위치 기준)
+        if (remainingRowTextColors[order[i]]) {
+          newRowTextColors[currentRowIndex] = remainingRowTextColors[order[i]]
         }
-        if (remainingRowColors[i]) {
-          newRowColors[currentRowIndex] = remainingRowColors[i]
+        if (remainingRowColors[order[i]]) {
+          newRowColors[currentRowIndex] = remainingRowColors[order[i]]
         }
         currentRowIndex++
         prevCompany = currentCompany
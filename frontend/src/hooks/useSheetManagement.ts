@@ -13,6 +13,12 @@ export interface SheetData {
   cols: number
   file_path?: string
   loaded_at?: string
+  // 지연 로딩: 업로드한 워크북의 아직 파싱되지 않은 시트
+  workbook_id?: string
+  source_sheet_name?: string
+  is_loaded?: boolean
+  // 서버 시트 버전 (셀 수정은 이 버전 기준으로 PATCH, 행이 서버와 달라지면 없음)
+  version?: number
   // 시트별 독립적인 상태 저장
   rowColors?: { [key: number]: string }
   rowTextColors?: { [key: number]: string }
@@ -149,16 +155,21 @@ export const useSheetManagement = () => {
 
   /**
    * 현재 시트의 데이터 업데이트
+   *
+   * 정렬/병합/행 삭제처럼 시트를 통째로 바꾸면 행 번호가 서버 시트와 달라지므로
+   * 서버 버전을 지워 이후 셀 수정을 PATCH하지 않음 (rowsUnchanged면 유지)
    */
-  const updateCurrentSheetData = (newData: any[][]) => {
+  const updateCurrentSheetData = (newData: any[][], rowsUnchanged: boolean = false) => {
     setSheets(prevSheets => {
       if (prevSheets.length === 0 || !prevSheets[selectedSheet]) return prevSheets
       const updatedSheets = [...prevSheets]
+      const current = updatedSheets[selectedSheet]
       updatedSheets[selectedSheet] = {
-        ...updatedSheets[selectedSheet],
+        ...current,
         data: newData,
         rows: newData.length,
-        cols: newData[0]?.length || 0
+        cols: newData[0]?.length || 0,
+        version: rowsUnchanged ? current.version : undefined
       }
       return updatedSheets
     })
@@ -82,6 +82,7 @@ function Dashboard() {
     isReceiptSlipUploaded,
     setIsReceiptSlipUploaded,
     handleFileUpload,
+    handleCellEdit,
     handleOrderReceiptUpload,
     handleReceiptSlipUpload,
     handleSaveToWeb,
@@ -748,12 +749,8 @@ function Dashboard() {
                   duplicateProducts={duplicateProducts}
                   checkedRows={checkedRows}
                   onCheckRow={handleCheckRow}
-                  onSave={(updatedData) => updateCurrentSheetData(updatedData)}
-                  onDataChange={(rowIndex, colIndex, value) => {
-                    const newData = [...getCurrentSheetData()]
-                    newData[rowIndex][colIndex] = value
-                    updateCurrentSheetData(newData)
-                  }}
+                  onSave={(updatedData) => updateCurrentSheetData(updatedData, true)}
+                  onDataChange={handleCellEdit}
                 />
               ) : (
                 <div className="flex items-center justify-center h-full">
@@ -7,6 +7,46 @@ const api = axios.create({
   baseURL: API_URL,
 })
 
+// 주문입고 / 입고전표 병합 결과 (unmatched_rows: 매칭 실패한 주문서 행 번호)
+export interface ReceiptMergeResult {
+  success: boolean
+  merged_data: any[][]
+  matched_count: number
+  exchange_rows?: { [key: number]: string }
+  unmatched: string[]
+  unmatched_rows: number[]
+  message: string
+  // suggestions 옵션을 준 경우: 매칭 실패 행 -> 비슷한 입고 행 (점수 순)
+  suggestions?: { [row: number]: MatchSuggestion[] }
+  suggestions_complete?: boolean
+  pending_rows?: number[]
+  suggest_ms?: number
+  // classify 옵션을 준 경우 (입고전표): merged_data는 주소 정렬 + 구분선 행 포함
+  row_colors?: { [key: number]: string }
+  row_text_colors?: { [key: number]: string }
+  duplicates?: { [key: number]: string }
+  auto_checked?: { [key: number]: boolean }
+}
+
+// 매칭/정상/오류 시트 한 장
+export interface ReceiptSheetPart {
+  data: any[][]
+  row_colors: { [key: number]: string }
+  row_text_colors: { [key: number]: string }
+}
+
+// values: 입고 행의 [거래처명, 상품코드, 수량] (입고전표는 [상품코드])
+export interface MatchSuggestion {
+  receipt_row: number
+  score: number
+  qty_match: boolean
+  values: any[]
+}
+
+// 이 서버에 없는 엔드포인트 (Cloud Functions는 일부 엔드포인트만 제공) -> 브라우저 구현으로 대체
+export const isMissingEndpoint = (error: any): boolean =>
+  error?.response?.status === 404 || error?.response?.status === 405
+
 // Request interceptor to add token
 api.interceptors.request.use(
   (config) => {
@@ -55,6 +95,56 @@ export const authAPI = {
   },
 }
 
+export interface JobStatus {
+  job_id: string
+  status: 'queued' | 'running' | 'done' | 'failed'
+  stage: string | null
+  rows_processed: number
+  rows_total: number | null
+  errors: string[]
+  result: any
+}
+
+// 작업 폴링 한도: 최대 대기 시간, 연속 조회 실패 횟수
+const JOB_MAX_WAIT_MS = 10 * 60 * 1000
+const JOB_MAX_FAILED_POLLS = 5
+
+export const jobsAPI = {
+  getJob: async (jobId: string): Promise<JobStatus> => {
+    const response = await api.get(`/jobs/${jobId}`)
+    return response.data.job
+  },
+
+  /**
+   * 백그라운드 작업이 끝날 때까지 폴링해서 결과를 반환
+   * (작업 실패, maxWaitMs 초과, 조회 연속 maxFailedPolls회 실패 시 에러)
+   */
+  waitForJob: async (jobId: string, onProgress?: (job: JobStatus) => void, intervalMs = 1000,
+    maxWaitMs = JOB_MAX_WAIT_MS, maxFailedPolls = JOB_MAX_FAILED_POLLS) => {
+    const deadline = Date.now() + maxWaitMs
+    let failedPolls = 0
+    while (true) {
+      let job: JobStatus | null = null
+      try {
+        job = await jobsAPI.getJob(jobId)
+        failedPolls = 0
+      } catch (error) {
+        failedPolls++
+        if (failedPolls >= maxFailedPolls) throw error
+      }
+      if (job) {
+        if (job.status === 'done') return job.result
+        if (job.status === 'failed') throw new Error(job.errors[job.errors.length - 1] || 'Job failed')
+        onProgress?.(job)
+      }
+      if (Date.now() + intervalMs > deadline) {
+        throw new Error('작업이 시간 안에 끝나지 않았습니다. 잠시 후 다시 시도해 주세요.')
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs))
+    }
+  },
+}
+
 export const excelAPI = {
   checkExistingFile: async () => {
     const response = await api.get('/excel/check')
@@ -66,7 +156,10 @@ export const excelAPI = {
     return response.data
   },
 
-  uploadExcel: async (file: File) => {
+  // 업로드는 작업 ID만 바로 받고, 파싱/저장은 백그라운드 작업 결과를 폴링해서 받음
+  // (작업 ID 없이 결과를 바로 주는 서버(Cloud Functions)면 그 응답을 그대로 사용)
+  uploadExcel: async (file: File, onProgress?: (job: JobStatus) => void) => {
+    let data: any
     // Try base64 encoding for Gen2 Cloud Functions compatibility
     try {
       // Convert file to base64
@@ -91,7 +184,7 @@ export const excelAPI = {
           'Content-Type': 'application/json'
         }
       })
-      return response.data
+      data = response.data
     } catch (error) {
       console.log('Base64 upload failed, trying multipart...')
 
@@ -104,15 +197,59 @@ export const excelAPI = {
           'Content-Type': 'multipart/form-data'
         }
       })
-      return response.data
+      data = response.data
     }
+
+    if (!data?.job_id) return data
+
+    // 파일 전송은 끝났고 분석/저장은 서버 백그라운드 작업으로 진행
+    return await jobsAPI.waitForJob(data.job_id, onProgress)
   },
 
-  updateExcel: async (sheetData: any) => {
-    const response = await api.put('/excel/update', sheetData)
+  loadSheet: async (workbookId: string, sheetName: string) => {
+    const response = await api.get(`/excel/workbooks/${workbookId}/sheets/${encodeURIComponent(sheetName)}`)
     return response.data
   },
 
+  // 바뀐 셀만 전송 (baseVersion은 마지막으로 받은 시트 버전, 응답의 version을 다음 요청에 사용)
+  patchSheetCells: async (
+    workbookId: string,
+    sheetName: string,
+    baseVersion: number,
+    edits: { row: number; col: number; value: any }[]
+  ) => {
+    const response = await api.patch(
+      `/excel/workbooks/${workbookId}/sheets/${encodeURIComponent(sheetName)}`,
+      { base_version: baseVersion, edits }
+    )
+    return response.data
+  },
+
+  // 건물명 → 층 → 호실 → 거래처명 → 상품코드 정렬 (order[i]: i번째 결과 행의 원래 행 번호)
+  // tieColumns: 주소가 같을 때 비교할 열 (기본 A열 거래처명, E열 상품코드)
+  sortByAddress: async (data: any[][], headerRows: number = 4, tieColumns: number[] = [0, 4]) => {
+    const response = await api.post('/excel/sort-by-address', {
+      data,
+      header_rows: headerRows,
+      tie_columns: tieColumns
+    })
+    return response.data as { success: boolean; data: any[][]; order: number[] }
+  },
+
+  // 입고전표 O열(입고수량) 병합 (상품코드 매칭)
+  mergeReceiptSlip: async (currentData: any[][], slipData: any[][], consumeDuplicates: boolean = true,
+    suggestions: number = 0, classify: boolean = false) => {
+    const response = await api.post('/excel/merge-receipt-slip', {
+      current_data: currentData,
+      slip_data: slipData,
+      consume_duplicates: consumeDuplicates,
+      suggestions,
+      classify
+    })
+    return response.data as ReceiptMergeResult
+  },
+
+
   uploadOrderReceipt: async (file: File) => {
     // Try base64 encoding for Gen2 Cloud Functions compatibility
     try {
@@ -313,6 +450,26 @@ export const savedFilesAPI = {
     return response.data
   },
 
+  // 시트 한 번 + 체크/색상 맵으로 매칭/정상/오류 파일 생성 및 저장 (정상/오류 시트 반환)
+  saveReceiptSplit: async (splitData: {
+    date: string  // MMDD 형식
+    data: any[][]
+    columns: string[]
+    checked_rows: { [key: number]: boolean }
+    row_colors: { [key: number]: string }
+    row_text_colors: { [key: number]: string }
+    created_by: string
+  }) => {
+    const response = await api.post('/files/save-receipt-split', splitData)
+    return response.data as {
+      success: boolean
+      message: string
+      files: { file_type: string, file_name: string, file_path: string, total_rows: number }[]
+      normal_data: ReceiptSheetPart
+      error_data: ReceiptSheetPart
+    }
+  },
+
   listFiles: async () => {
     const response = await api.get('/files/list')
     return response.data
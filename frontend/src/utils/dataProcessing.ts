@@ -90,63 +90,7 @@ export const extractFloor = (address: string): number => {
 }
 
 /**
- * 시트 데이터를 SORTING_RULES.md 기준으로 정렬
- * 정렬 기준: 건물명 → 층수 → 호실 → 거래처명 → 상품코드
- */
-export const sortSheetData = (data: any[][]): any[][] => {
-  // 헤더 4행 분리
-  const headers = data.slice(0, 4)
-  const dataRows = data.slice(4)
-
-  // 데이터 행 정렬
-  const sortedRows = dataRows.sort((a, b) => {
-    // 공급처주소 (B열, index 1)에서 정보 추출
-    const addrA = parseAddress(a[1])
-    const addrB = parseAddress(b[1])
-
-    // 1차: 건물명 비교 (가나다순)
-    if (!addrA.building && addrB.building) return 1
-    if (addrA.building && !addrB.building) return -1
-
-    const buildingCompare = addrA.building.localeCompare(addrB.building, 'ko-KR')
-    if (buildingCompare !== 0) return buildingCompare
-
-    // 2차: 층수 비교 (지하는 역순, 지상은 정순)
-    if (addrA.floor !== addrB.floor) {
-      return addrA.floor - addrB.floor
-    }
-
-    // 3차: 호실 비교 (오름차순)
-    if (addrA.room !== addrB.room) {
-      return addrA.room - addrB.room
-    }
-
-    // 4차: 거래처명 비교 (가나다순)
-    const companyA = (a[0] || '').toString().trim()
-    const companyB = (b[0] || '').toString().trim()
-
-    if (!companyA && companyB) return 1
-    if (companyA && !companyB) return -1
-
-    const companyCompare = companyA.localeCompare(companyB, 'ko-KR')
-    if (companyCompare !== 0) return companyCompare
-
-    // 5차: 상품코드 비교 (E열, index 4) - 같은 업체 내 상품코드 정렬
-    const productA = (a[4] || '').toString().trim()
-    const productB = (b[4] || '').toString().trim()
-
-    if (!productA && productB) return 1
-    if (productA && !productB) return -1
-
-    return productA.localeCompare(productB, 'ko-KR')
-  })
-
-  // 헤더 + 정렬된 데이터 결합
-  return [...headers, ...sortedRows]
-}
-
-/**
- * 입고전표 업로드 후 데이터 정렬
+ * 입고전표 업로드 후 데이터 정렬 (서버 분류가 없는 서버용, 서버는 /excel/merge-receipt-slip classify)
  * 정렬 기준:
  * 1. 공급처주소(건물/층/호) → 거래처명 → 상품코드 (SORTING_RULES.md)
  * 2. 건물/업체 구분선 삽입
@@ -287,7 +231,7 @@ export const compareNumbers = (a: any, b: any): boolean => {
 }
 
 /**
- * 입고전표 처리 후 데이터 가공 (색상, 자동 체크 등)
+ * 입고전표 처리 후 데이터 가공 (색상, 자동 체크 등, 서버 분류가 없는 서버용)
  */
 export const processReceiptSlipData = (data: any[][]) => {
   const colors: { [key: number]: string } = {}
@@ -344,3 +288,142 @@ export const processReceiptSlipData = (data: any[][]) => {
     autoChecked
   }
 }
+
+/**
+ * 입금 관리로 보낼 때 시트를 정상 / 오류 시트로 나눔 (/files/save-receipt-split이 없는 서버용)
+ * - 정상: 체크된 행 + T열 입금액(H x O), 건물명 → 층수 → 거래처명 순, 건물/거래처 구분 빈 행
+ * - 오류: 체크되지 않은 데이터 행, 주소(건물/층/호) → 거래처명 → 상품코드 순, 교환 글자색 유지
+ */
+export const splitReceiptSheet = (
+  data: any[][],
+  checkedRows: { [key: number]: boolean },
+  rowColors: { [key: number]: string },
+  rowTextColors: { [key: number]: string }
+) => {
+  type SheetPart = { data: any[][]; row_colors: { [key: number]: string }; row_text_colors: { [key: number]: string } }
+  const normal: SheetPart = { data: [], row_colors: {}, row_text_colors: {} }
+  const error: SheetPart = { data: [], row_colors: {}, row_text_colors: {} }
+
+  // 헤더 행들(0-3)은 그대로 포함
+  for (let i = 0; i < 4 && i < data.length; i++) {
+    normal.data.push([...data[i]])
+    error.data.push(data[i])
+    if (rowColors[i]) error.row_colors[i] = rowColors[i]
+    if (rowTextColors[i]) error.row_text_colors[i] = rowTextColors[i]
+  }
+
+  // 체크된 데이터 행들 (T열(인덱스 19)에 입금액 계산: H(인덱스 7) * O(인덱스 14))
+  // 체크되지 않은 행은 A열(거래처명), B열(공급처주소), E열(상품명) 중 하나라도 있으면 데이터 행
+  const checkedRowsData: any[][] = []
+  const rowsToSort: { data: any[]; textColor: string | null }[] = []
+  for (let i = 4; i < data.length; i++) {
+    const row = data[i]
+    if (checkedRows[i]) {
+      const checkedRow = [...row]
+      const hValue = parseFloat(checkedRow[7]) || 0
+      const oValue = parseFloat(checkedRow[14]) || 0
+      checkedRow[19] = hValue * oValue
+      checkedRowsData.push(checkedRow)
+    } else if ((row[0] && row[0] !== '') || (row[1] && row[1] !== '') || (row[4] && row[4] !== '')) {
+      rowsToSort.push({ data: row, textColor: rowTextColors[i] || null })
+    }
+  }
+
+  // 정상: 공급처주소(B열) 기준 건물명 → 층수 → 거래처명
+  checkedRowsData.sort((a, b) => {
+    const addressA = (a[1] || '').toString()
+    const addressB = (b[1] || '').toString()
+
+    const buildingA = extractBuilding(addressA)
+    const buildingB = extractBuilding(addressB)
+    if (buildingA !== buildingB) {
+      return buildingA.localeCompare(buildingB, 'ko-KR')
+    }
+
+    const floorA = extractFloor(addressA)
+    const floorB = extractFloor(addressB)
+    if (floorA !== floorB) {
+      return floorA - floorB
+    }
+
+    const nameA = (a[0] || '').toString()
+    const nameB = (b[0] || '').toString()
+    return nameA.localeCompare(nameB, 'ko-KR')
+  })
+
+  let prevBuilding = ''
+  let prevCompany = ''
+  for (let i = 0; i < checkedRowsData.length; i++) {
+    const row = checkedRowsData[i]
+    const building = extractBuilding((row[1] || '').toString())
+    const company = (row[0] || '').toString()
+
+    // 건물이 바뀌면 회색 빈 행, 같은 건물 내에서 거래처가 바뀌면 흰색 빈 행
+    if (i > 0 && prevBuilding !== building && prevBuilding !== '') {
+      normal.row_colors[normal.data.length] = '#d1d5db'
+      normal.data.push(new Array(row.length).fill(''))
+    } else if (i > 0 && prevBuilding === building && prevCompany !== company && prevCompany !== '') {
+      normal.data.push(new Array(row.length).fill(''))
+    }
+
+    normal.data.push(row)
+    prevBuilding = building
+    prevCompany = company
+  }
+
+  // 오류: 공급처주소(건물/층/호) → 거래처명 → 상품코드 (SORTING_RULES.md)
+  rowsToSort.sort((a, b) => {
+    const rowA = a.data
+    const rowB = b.data
+
+    const addrA = parseAddress(rowA[1] || '')
+    const addrB = parseAddress(rowB[1] || '')
+
+    if (!addrA.building && addrB.building) return 1
+    if (addrA.building && !addrB.building) return -1
+    const buildingCompare = addrA.building.localeCompare(addrB.building, 'ko-KR')
+    if (buildingCompare !== 0) return buildingCompare
+
+    if (addrA.floor !== addrB.floor) return addrA.floor - addrB.floor
+    if (addrA.room !== addrB.room) return addrA.room - addrB.room
+
+    const companyA = (rowA[0] || '').toString().trim()
+    const companyB = (rowB[0] || '').toString().trim()
+    if (!companyA && companyB) return 1
+    if (companyA && !companyB) return -1
+    const companyCompare = companyA.localeCompare(companyB, 'ko-KR')
+    if (companyCompare !== 0) return companyCompare
+
+    const productA = (rowA[4] || '').toString().trim()
+    const productB = (rowB[4] || '').toString().trim()
+    if (!productA && productB) return 1
+    if (productA && !productB) return -1
+    return productA.localeCompare(productB, 'ko-KR')
+  })
+
+  prevBuilding = ''
+  prevCompany = ''
+  for (let i = 0; i < rowsToSort.length; i++) {
+    const item = rowsToSort[i]
+    const row = item.data
+    const building = parseAddress((row[1] || '').toString()).building
+    const company = (row[0] || '').toString().trim()
+
+    if (i > 0 && prevBuilding !== building && prevBuilding !== '') {
+      error.row_colors[error.data.length] = '#d1d5db'
+      error.data.push(new Array(row.length).fill(''))
+    } else if (i > 0 && prevBuilding === building && prevCompany !== company && prevCompany !== '') {
+      error.data.push(new Array(row.length).fill(''))
+    }
+
+    // 교환 항목 등 글자색 유지
+    if (item.textColor) {
+      error.row_text_colors[error.data.length] = item.textColor
+    }
+    error.data.push(row)
+    prevBuilding = building
+    prevCompany = company
+  }
+
+  return { normal, error }
+}
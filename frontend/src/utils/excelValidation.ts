@@ -1,4 +1,4 @@
-import { normalizeString, compareNumbers } from './dataProcessing'
+import { normalizeString } from './dataProcessing'
 
 export interface ValidationResult {
   success: boolean
@@ -8,89 +8,32 @@ export interface ValidationResult {
   exchangeRows?: { [key: number]: string }
 }
 
-/**
- * 주문서와 주문입고 데이터를 검증하고 병합
- */
-export const validateAndMergeData = (originalData: any[][], receiptData: any[][]): ValidationResult => {
-  const mergedData = originalData.map(row => [...row])
-  let matchedCount = 0
-  const unmatchedRows: string[] = []
-  const exchangeRows: { [key: number]: string } = {}
-
-  // 5행부터 검증 및 병합 (index 4부터)
-  for (let i = 4; i < originalData.length; i++) {
-    // 원본 데이터
-    const originalStore = originalData[i]?.[0] // A열: 거래처명
-    const originalProduct = originalData[i]?.[4] // E열: 공급처상품명
-    const originalQty = originalData[i]?.[8] // I열: 발주수량
-
-    // 원본에 데이터가 없으면 스킵
-    if (!originalStore && !originalProduct && !originalQty) {
-      continue
-    }
-
-    // 입고 파일에서 매칭되는 행 찾기
-    let matched = false
-    for (let j = 4; j < receiptData.length; j++) {
-      const receiptStore = receiptData[j]?.[0] // A열: 거래처명
-      const receiptProduct = receiptData[j]?.[4] // E열: 공급처상품명
-      const receiptQty = receiptData[j]?.[8] // I열: 발주수량
-
-      // 매칭 로직:
-      // 1. 입고 파일의 I열이 있으면: A, E, I 모두 일치
-      // 2. 입고 파일의 I열이 없으면: A, E만 일치
-      const isMatched = normalizeString(originalStore) === normalizeString(receiptStore) &&
-        normalizeString(originalProduct) === normalizeString(receiptProduct) &&
-        (receiptQty === null || receiptQty === undefined || receiptQty === '' ||
-          isNaN(parseFloat(String(receiptQty).replace(/,/g, ''))) ||
-          compareNumbers(originalQty, receiptQty))
-
-      if (isMatched) {
-        matched = true
-        matchedCount++
-
-        // 입고 파일에서 데이터 병합
-        mergedData[i][9] = receiptData[j][9]   // J열: 미송
-        mergedData[i][10] = receiptData[j][10] // K열: 교환
-        mergedData[i][11] = receiptData[j][11] // L열: 장끼
-        mergedData[i][12] = receiptData[j][12] // M열
-        mergedData[i][13] = receiptData[j][13] // N열
-        mergedData[i][16] = receiptData[j][16] // Q열: 삼촌 코멘트
-
-        // K열(교환) 값이 있으면 빨간색 표시
-        const kValue = parseFloat(mergedData[i][10]) || 0
-        if (kValue > 0) {
-          exchangeRows[i] = '#ff0000' // 빨간색
-        }
-
-        break
-      }
-    }
-
-    if (!matched) {
-      unmatchedRows.push(`행 ${i + 1}: ${originalStore} - ${originalProduct}`)
-    }
-  }
-
-  return {
-    success: true,
-    mergedData,
-    matchedCount,
-    exchangeRows,
-    message: unmatchedRows.length > 0
-      ? `${matchedCount}개 행 매칭됨. 매칭 실패: ${unmatchedRows.length}개`
-      : `${matchedCount}개 행 매칭됨`
-  }
-}
+// 입고전표 상품코드 매칭 병합은 서버에서 (/excel/merge-receipt-slip -> excelAPI.mergeReceiptSlip)
+// 아래 validateAndMergeReceiptSlip은 그 엔드포인트가 없는 서버(Cloud Functions)용
 
 /**
  * 입고전표와 주문입고 데이터를 검증하고 병합
+ * (서버의 consume_duplicates=true와 같은 규칙: 상품코드가 같은 입고전표 행을 위에서부터
+ *  한 번씩 사용하고, 다 쓰면 첫 행과 매칭. 상품코드 색인으로 한 번씩만 순회)
  */
 export const validateAndMergeReceiptSlip = (currentData: any[][], receiptSlipData: any[][]): ValidationResult => {
   const mergedData = currentData.map(row => [...row])
   let matchedCount = 0
   const unmatchedRows: string[] = []
 
+  // 입고전표 I열(상품코드) -> 그 상품코드의 행들 (위에서부터), 다음에 쓸 행 위치
+  const slipRows = new Map<string, number[]>()
+  for (let j = 4; j < receiptSlipData.length; j++) {
+    const key = normalizeString(receiptSlipData[j]?.[8])
+    const rows = slipRows.get(key)
+    if (rows) {
+      rows.push(j)
+    } else {
+      slipRows.set(key, [j])
+    }
+  }
+  const nextRow = new Map<string, number>()
+
   // 5행부터 검증 및 병합 (index 4부터)
   for (let i = 4; i < currentData.length; i++) {
     const originalProduct = currentData[i]?.[4] // E열: 공급처상품명 (상품코드)
@@ -100,30 +43,20 @@ export const validateAndMergeReceiptSlip = (currentData: any[][], receiptSlipDat
       continue
     }
 
-    // 입고전표 파일에서 매칭되는 행 찾기
-    let matched = false
-    for (let j = 4; j < receiptSlipData.length; j++) {
-      const slipProduct = receiptSlipData[j]?.[8] // I열: 상품코드
-
-      // 매칭 로직: 상품코드(E열 vs I열) 일치
-      const isMatched = normalizeString(originalProduct) === normalizeString(slipProduct)
-
-      if (isMatched) {
-        matched = true
-        matchedCount++
-
-        // 입고전표 파일의 O열(14) 값을 주문서의 O열(14)에 복사
-        // "입고전표의 O열이 수량이야. O열의 숫자들을 가져와야해."
-        const slipQty = receiptSlipData[j][14] // O열: 입고수량
-        mergedData[i][14] = slipQty
-
-        break
-      }
-    }
-
-    if (!matched) {
+    const key = normalizeString(originalProduct)
+    const rows = slipRows.get(key)
+    if (!rows) {
       unmatchedRows.push(`행 ${i + 1}: ${originalProduct}`)
+      continue
     }
+    // 아직 쓰지 않은 행 우선, 다 썼으면 첫 번째 행
+    const next = nextRow.get(key) || 0
+    const j = next < rows.length ? rows[next] : rows[0]
+    nextRow.set(key, next + 1)
+
+    // 입고전표 파일의 O열(14) 값을 주문서의 O열(14)에 복사
+    matchedCount++
+    mergedData[i][14] = receiptSlipData[j][14]
   }
 
   return {
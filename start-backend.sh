@@ -12,5 +12,11 @@ if [ -f requirements.txt ]; then
 fi
 
 # Start the backend server
-echo "Starting FastAPI server on http://localhost:8000"
-python3 -m uvicorn main:app --reload --host 0.0.0.0 --port 8000
\ No newline at end of file
+# WORKERS=4 ./start-backend.sh : 워커 프로세스 여러 개 (작업 상태는 workspace_state.db로 공유, --reload 없음)
+WORKERS=${WORKERS:-1}
+echo "Starting FastAPI server on http://localhost:8000 ($WORKERS worker(s))"
+if [ "$WORKERS" -gt 1 ]; then
+    python3 -m uvicorn main:app --workers "$WORKERS" --host 0.0.0.0 --port 8000
+else
+    python3 -m uvicorn main:app --reload --host 0.0.0.0 --port 8000
+fi
\ No newline at end of file